@@ -0,0 +1,61 @@
+"""Lazy registry for agents.
+
+Agents (and the models and clients they pull in) are registered as factories and
+only built the first time they are requested, so importing a pattern module does
+not resolve the DI container or create any client.
+"""
+
+import threading
+from typing import Any, Callable
+
+from agents import Agent
+
+AgentFactory = Callable[[], Agent[Any]]
+
+
+class AgentRegistry:
+    def __init__(self) -> None:
+        self._factories: dict[str, AgentFactory] = {}
+        self._agents: dict[str, Agent[Any]] = {}
+        # re-entrant, factories resolve the agents they hand off to or use as tools
+        self._lock = threading.RLock()
+
+    def register(
+        self, name: str | None = None
+    ) -> Callable[[AgentFactory], AgentFactory]:
+        """Register an agent factory, defaults to the factory's qualified name.
+        The returned getter builds the agent on first call and caches it.
+        """
+
+        def decorator(factory: AgentFactory) -> AgentFactory:
+            key = name or f"{factory.__module__}.{factory.__qualname__}"
+            self.add(key, factory)
+            return lambda: self.get(key)
+
+        return decorator
+
+    def add(self, name: str, factory: AgentFactory) -> None:
+        with self._lock:
+            if name in self._factories:
+                raise ValueError(f"Agent '{name}' is already registered.")
+            self._factories[name] = factory
+
+    def get(self, name: str) -> Agent[Any]:
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+
+        with self._lock:
+            if name not in self._agents:
+                self._agents[name] = self._factories[name]()
+            return self._agents[name]
+
+    def names(self) -> list[str]:
+        return list(self._factories)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._agents
+
+
+agent_registry = AgentRegistry()
+"""The process wide agent registry."""
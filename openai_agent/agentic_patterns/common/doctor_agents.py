@@ -1,15 +1,15 @@
 import re
+from functools import cache, partial
+from typing import Any
 
-from agents import (
-    Agent,
-    OpenAIChatCompletionsModel,
-)
+from agents import Agent, Handoff, RunContextWrapper
+from agents.strict_schema import ensure_strict_json_schema
 from pydantic import BaseModel
 
-from openai_agent.hosting import container
-from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
-
-azure_openai_service = container[IAzureOpenAIService]
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.agentic_patterns.common.prompts import compose_instructions
+from openai_agent.services.local_router import LocalRouter
 
 
 class TranslationOutput(BaseModel):
@@ -17,127 +17,191 @@ class TranslationOutput(BaseModel):
     translated_text: str
 
 
-llm_model = OpenAIChatCompletionsModel(
-    model=azure_openai_service.get_deployed_model_name(),
-    openai_client=azure_openai_service.get_client(),
-)
-
-emergency_department_agent = Agent(
-    name="emergency_department_agent",
-    instructions=(
+DOCTOR_INSTRUCTIONS: dict[str, str] = {
+    "emergency_department_agent": (
         "Handle emergency medical situations promptly and efficiently. "
         "Triage patients based on the severity of their conditions and "
         "provide immediate care."
     ),
-    model=llm_model,
-)
-
-surgery_agent = Agent(
-    name="surgery_agent",
-    instructions=(
+    "surgery_agent": (
         "Manage surgical procedures, both inpatient and outpatient. "
         "Coordinate pre-operative and post-operative care, ensuring patient safety."
     ),
-    model=llm_model,
-)
-
-icu_agent = Agent(
-    name="icu_agent",
-    instructions=(
+    "icu_agent": (
         "Provide critical care for severely ill or injured patients. "
         "Manage life-support systems and monitor vital signs closely."
     ),
-    model=llm_model,
-)
-
-cardiolofy_agent = Agent(
-    name="cardiology_agent",
-    instructions=(
+    "cardiology_agent": (
         "Focus on diagnosing and treating heart-related conditions. "
         "Perform cardiac assessments and recommend appropriate interventions."
     ),
-    model=llm_model,
-)
-
-obstetrics_agent = Agent(
-    name="obstetrics_agent",
-    instructions=(
+    "obstetrics_agent": (
         "Oversee pregnancy, childbirth, and postpartum care. "
         "Monitor fetal development and manage any complications that arise."
     ),
-    model=llm_model,
-)
-
-pediatrics_agent = Agent(
-    name="pediatrics_agent",
-    instructions=(
+    "pediatrics_agent": (
         "Specialize in the medical care of infants, children, and "
         "adolescents. Monitor growth and development, and address "
         "common childhood illnesses."
     ),
-    model=llm_model,
-)
-
-oncology_agent = Agent(
-    name="oncology_agent",
-    instructions=(
+    "oncology_agent": (
         "Deal with the diagnosis and treatment of cancer. "
         "Develop treatment plans and provide supportive care to patients."
     ),
-    model=llm_model,
-)
-
-neurology_agent = Agent(
-    name="neurology_agent",
-    instructions=(
+    "neurology_agent": (
         "Specialize in diagnosing and treating disorders of the nervous system. "
         "Conduct neurological assessments and recommend treatment options."
     ),
-    model=llm_model,
-)
-
-radiology_agent = Agent(
-    name="radiology_agent",
-    instructions=(
+    "radiology_agent": (
         "Use medical imaging techniques to diagnose and treat diseases. "
         "Interpret X-rays, CT scans, MRIs, and other imaging results."
     ),
-    model=llm_model,
-)
-
-orthopedics_agent = Agent(
-    name="orthopedics_agent",
-    instructions=(
+    "orthopedics_agent": (
         "Treat injuries and diseases of the musculoskeletal system. "
         "Perform orthopedic assessments and recommend treatment plans."
     ),
-    model=llm_model,
-)
-
-gastroenterology_agent = Agent(
-    name="gastroenterology_agent",
-    instructions=(
+    "gastroenterology_agent": (
         "Deal with the digestive system. "
         "Diagnose and treat conditions related to the gastrointestinal tract."
     ),
-    model=llm_model,
+}
+"""Instructions of the specialist agents, keyed by agent name."""
+
+DOCTOR_VOCABULARY: dict[str, str] = {
+    "emergency_department_agent": (
+        "emergency urgent accident bleeding heavily unconscious collapsed overdose "
+        "poisoning burn severe allergic reaction anaphylaxis choking car crash "
+        "trauma wound cut deep laceration sudden can't breathe"
+    ),
+    "surgery_agent": (
+        "surgery operation surgeon appendicitis appendix hernia gallbladder "
+        "gallstones incision stitches post-operative pre-operative procedure "
+        "removal laparoscopic anesthesia recovery after operation"
+    ),
+    "icu_agent": (
+        "intensive care icu ventilator life support sepsis septic shock critical "
+        "condition multiple organ failure coma intubated respiratory failure "
+        "vital signs unstable"
+    ),
+    "cardiology_agent": (
+        "heart cardiac chest pain palpitations arrhythmia irregular heartbeat "
+        "blood pressure hypertension heart attack angina murmur cholesterol "
+        "shortness breath exertion swollen ankles cardiologist"
+    ),
+    "obstetrics_agent": (
+        "pregnant pregnancy prenatal antenatal labor delivery childbirth birth "
+        "contractions miscarriage fetal baby movement trimester postpartum "
+        "morning sickness obstetrician midwife ultrasound pregnancy"
+    ),
+    "pediatrics_agent": (
+        "child children kid toddler infant newborn baby son daughter year old "
+        "vaccination growth development fever child rash teething colic "
+        "pediatrician adolescent teenager"
+    ),
+    "oncology_agent": (
+        "cancer tumor tumour malignant chemotherapy chemo radiation therapy "
+        "oncologist lump mass biopsy metastasis lymphoma leukemia melanoma "
+        "carcinoma remission"
+    ),
+    "neurology_agent": (
+        "headache migraine seizure epilepsy stroke numbness tingling dizziness "
+        "vertigo memory loss tremor parkinson multiple sclerosis nerve brain "
+        "paralysis weakness one side slurred speech neurologist"
+    ),
+    "radiology_agent": (
+        "x-ray xray ct scan mri ultrasound imaging scan results radiologist "
+        "mammogram contrast dye imaging report pet scan"
+    ),
+    "orthopedics_agent": (
+        "bone fracture broken arm leg wrist ankle sprain joint pain knee hip "
+        "shoulder back pain spine arthritis ligament tendon cast orthopedic "
+        "sports injury dislocated"
+    ),
+    "gastroenterology_agent": (
+        "stomach abdominal pain belly nausea vomiting diarrhea constipation "
+        "heartburn acid reflux ulcer bloating bowel ibs crohn colitis liver "
+        "jaundice colonoscopy digestion indigestion"
+    ),
+}
+"""Patient facing vocabulary of each department, used for local routing."""
+
+ESCALATE_TERMS = (
+    "emergency urgent bleeding bleed blood unconscious collapsed faint fainted "
+    "overdose swallowed poison poisoning burn burned allergic anaphylaxis swelling "
+    "choking crash accident trauma breathe breathing suicide suicidal stroke "
+    "seizure drooping waters knife stabbed"
+)
+"""Signs of an emergency, messages with any of them are always triaged by the LLM,
+a wrong local route would leave the patient with the wrong specialist."""
+
+
+TRIAGE_AGENT = "triage_agent"
+
+BACK_TO_TRIAGE_INSTRUCTIONS = (
+    " If the patient's problem belongs to another department or is an emergency, "
+    "transfer them back to triage."
 )
 
 
+async def _get_triage_agent(context: RunContextWrapper[Any], arguments: str) -> Agent:
+    return agent_registry.get(TRIAGE_AGENT)
+
+
+def get_back_to_triage() -> Handoff:
+    """The handoff of a specialist back to the triage agent. Triage hands off to
+    every specialist, so the agent is only resolved when the handoff is taken."""
+    return Handoff(
+        tool_name=f"transfer_to_{TRIAGE_AGENT}",
+        tool_description=(
+            "Hand the patient back to triage when their problem belongs to "
+            "another department or is an emergency."
+        ),
+        input_json_schema=ensure_strict_json_schema({}),
+        on_invoke_handoff=_get_triage_agent,
+        agent_name=TRIAGE_AGENT,
+        # a specialist is also used without the handoff pattern
+        is_enabled=lambda context, agent: TRIAGE_AGENT in agent_registry.names(),
+    )
+
+
+def _build_doctor_agent(name: str) -> Agent:
+    # a locally routed patient stays with the specialist, which can send them
+    # back when the route was wrong
+    return Agent(
+        name=name,
+        instructions=compose_instructions(
+            name, DOCTOR_INSTRUCTIONS[name] + BACK_TO_TRIAGE_INSTRUCTIONS
+        ),
+        handoffs=[get_back_to_triage()],
+        model=get_llm_model(agent=name),
+    )
+
+
+for _name in DOCTOR_INSTRUCTIONS:
+    agent_registry.add(_name, partial(_build_doctor_agent, _name))
+
+
 def get_all_agents() -> list[Agent]:
-    return [
-        emergency_department_agent,
-        surgery_agent,
-        icu_agent,
-        cardiolofy_agent,
-        obstetrics_agent,
-        pediatrics_agent,
-        oncology_agent,
-        neurology_agent,
-        radiology_agent,
-        orthopedics_agent,
-        gastroenterology_agent,
-    ]
+    return [agent_registry.get(name) for name in DOCTOR_INSTRUCTIONS]
+
+
+@cache
+def get_doctor_router() -> LocalRouter:
+    """Routes a patient message straight to a specialist when it is clear enough
+    from the department vocabularies and instructions. The thresholds are tuned
+    for precision on the held-out messages of `benchmarks/routing.py`, at the
+    cost of sending most messages to the LLM triage."""
+    departments = dict(zip(DOCTOR_INSTRUCTIONS, get_departments()))
+    return LocalRouter(
+        routes={
+            name: " ".join([departments[name], DOCTOR_VOCABULARY[name], instructions])
+            for name, instructions in DOCTOR_INSTRUCTIONS.items()
+        },
+        min_score=2.0,
+        min_margin=1.0,
+        min_matches=2,
+        escalate_terms=ESCALATE_TERMS,
+    )
 
 
 def get_departments() -> list[str]:
@@ -151,7 +215,7 @@ def get_departments() -> list[str]:
         re.sub(
             r"^(\S)",
             fn_upper,
-            re.sub(r"_(\S)", fn_space_upper, re.sub(r"_agent$", "", agent.name)),
+            re.sub(r"_(\S)", fn_space_upper, re.sub(r"_agent$", "", name)),
         )
-        for agent in get_all_agents()
+        for name in DOCTOR_INSTRUCTIONS
     ]
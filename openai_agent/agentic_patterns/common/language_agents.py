@@ -1,13 +1,28 @@
+import asyncio
+import json
+from functools import partial
+from typing import Any, Callable
+
 from agents import (
     Agent,
-    OpenAIChatCompletionsModel,
+    AgentBase,
+    FunctionTool,
+    RunContextWrapper,
+    Runner,
+    function_tool,
 )
 from pydantic import BaseModel
 
+from openai_agent.agentic_patterns.common.agent_registry import (
+    AgentFactory,
+    agent_registry,
+)
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.agentic_patterns.common.prompts import TRANSLATION_RULES
 from openai_agent.hosting import container
-from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
-
-azure_openai_service = container[IAzureOpenAIService]
+from openai_agent.protocols.i_tool_memo import IToolMemo
+from openai_agent.protocols.i_translation_memory import ITranslationMemory
+from openai_agent.services.model_tiers import SMALL
 
 
 class TranslationOutput(BaseModel):
@@ -15,11 +30,6 @@ class TranslationOutput(BaseModel):
     translated_text: str
 
 
-llm_model = OpenAIChatCompletionsModel(
-    model=azure_openai_service.get_deployed_model_name(),
-    openai_client=azure_openai_service.get_client(),
-)
-
 INSTRUCTIONS = (
     "You are a professional medical translator specializing in "
     "@@from_language@@ to @@to_language@@ translation. Translate medical "
@@ -30,29 +40,136 @@ INSTRUCTIONS = (
     "@@to_language@@s medical conventions and terminology standards."
 )
 
-spanish_agent = Agent(
-    name="spanish_agent",
-    instructions=INSTRUCTIONS.replace("@@to_language@@", "Spanish").replace(
-        "@@from_language@@", "English"
-    ),
-    handoff_description="An english to spanish translator",
-    model=llm_model,
-)
 
-french_agent = Agent(
-    name="french_agent",
-    instructions=INSTRUCTIONS.replace("@@to_language@@", "French").replace(
-        "@@from_language@@", "English"
-    ),
-    handoff_description="An english to french translator",
-    model=llm_model,
-)
+def get_instructions(from_language: str, to_language: str) -> str:
+    # the shared prefix would cost the small tier more than it saves
+    role = INSTRUCTIONS.replace("@@to_language@@", to_language).replace(
+        "@@from_language@@", from_language
+    )
+    return f"{role}\n\n{TRANSLATION_RULES}"
+
+
+@agent_registry.register("spanish_agent")
+def get_spanish_agent() -> Agent:
+    return Agent(
+        name="spanish_agent",
+        instructions=get_instructions("English", "Spanish"),
+        handoff_description="An english to spanish translator",
+        model=get_llm_model(tier=SMALL, agent="spanish_agent", cached=True),
+    )
 
-italian_agent = Agent(
-    name="italian_agent",
-    instructions=INSTRUCTIONS.replace("@@to_language@@", "Italian").replace(
-        "@@from_language@@", "Spanish"
-    ),
-    handoff_description="An spanish to italian translator",
-    model=llm_model,
+
+@agent_registry.register("french_agent")
+def get_french_agent() -> Agent:
+    return Agent(
+        name="french_agent",
+        instructions=get_instructions("English", "French"),
+        handoff_description="An english to french translator",
+        model=get_llm_model(tier=SMALL, agent="french_agent", cached=True),
+    )
+
+
+@agent_registry.register("italian_agent")
+def get_italian_agent() -> Agent:
+    return Agent(
+        name="italian_agent",
+        instructions=get_instructions("Spanish", "Italian"),
+        handoff_description="An spanish to italian translator",
+        model=get_llm_model(tier=SMALL, agent="italian_agent", cached=True),
+    )
+
+
+LANGUAGE_AGENTS: dict[str, AgentFactory] = {
+    "Spanish": get_spanish_agent,
+    "French": get_french_agent,
+    "Italian": get_italian_agent,
+}
+
+SOURCE_LANGUAGES = {"Spanish": "English", "French": "English", "Italian": "Spanish"}
+"""The language each agent translates from."""
+
+SEGMENT_INSTRUCTIONS = (
+    " The input is a JSON list of sentences from one message. Translate every "
+    "sentence and return exactly one translation per sentence, in the same order."
 )
+
+
+class SegmentTranslations(BaseModel):
+    translations: list[str]
+
+
+def _register_segment_agent(language: str) -> AgentFactory:
+    @agent_registry.register(f"{language.lower()}_segment_agent")
+    def get_segment_agent() -> Agent:
+        agent = LANGUAGE_AGENTS[language]()
+        return agent.clone(
+            name=f"{language.lower()}_segment_agent",
+            instructions=f"{agent.instructions}{SEGMENT_INSTRUCTIONS}",
+            output_type=SegmentTranslations,
+        )
+
+    return get_segment_agent
+
+
+SEGMENT_AGENTS = {
+    language: _register_segment_agent(language) for language in LANGUAGE_AGENTS
+}
+
+
+async def translate_segments(segments: list[str], to_language: str) -> list[str]:
+    result = await Runner.run(
+        SEGMENT_AGENTS[to_language](), json.dumps(segments, ensure_ascii=False)
+    )
+    translations = result.final_output.translations
+    if len(translations) == len(segments):
+        return translations
+
+    # the model merged or split sentences, translate them one by one
+    results = await asyncio.gather(
+        *(Runner.run(LANGUAGE_AGENTS[to_language](), segment) for segment in segments)
+    )
+    return [str(result.final_output) for result in results]
+
+
+async def translate_from(text: str, from_language: str, to_language: str) -> str:
+    """Translate with the translation memory, only sentences it has not seen are
+    sent to the language agent."""
+    return await container[ITranslationMemory].translate(
+        text,
+        from_language,
+        to_language,
+        partial(translate_segments, to_language=to_language),
+    )
+
+
+async def translate_text(text: str, to_language: str) -> str:
+    """Translate an English text, through the intermediate languages the agent
+    for `to_language` needs. Intermediate translations come from the memory as
+    well, so they are shared with direct translations to those languages."""
+    from_language = SOURCE_LANGUAGES[to_language]
+    if from_language != "English":
+        text = await translate_text(text, from_language)
+    return await translate_from(text, from_language, to_language)
+
+
+def get_translation_tool(
+    language: str,
+    is_enabled: bool | Callable[[RunContextWrapper[Any], AgentBase], bool] = True,
+) -> FunctionTool:
+    """A tool like `as_tool` of the language agent, backed by the memory. Calls
+    repeating a message within a run or across runs are answered by the tool memo
+    without splitting the message again."""
+    from_language = SOURCE_LANGUAGES[language]
+
+    async def translate(message: str) -> str:
+        return await translate_from(message, from_language, language)
+
+    return container[IToolMemo].memoize(
+        function_tool(
+            translate,
+            name_override=f"translate_to_{language.lower()}",
+            description_override=f"Translate the doctor's message to {language}",
+            is_enabled=is_enabled,
+            failure_error_function=None,
+        )
+    )
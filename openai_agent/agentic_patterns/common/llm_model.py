@@ -1,15 +1,71 @@
+from functools import cache
+
 from agents import (
+    Model,
     OpenAIChatCompletionsModel,
     set_tracing_disabled,
 )
 
 from openai_agent.hosting import container
+from openai_agent.models.caching_model import CachingModel
+from openai_agent.models.hedged_model import HedgedModel
+from openai_agent.models.metered_model import MeteredModel
+from openai_agent.models.traced_model import TracedModel
 from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
+from openai_agent.protocols.i_hedge_policy import IHedgePolicy
+from openai_agent.protocols.i_model_tiers import IModelTiers
+from openai_agent.protocols.i_response_cache import IResponseCache
+from openai_agent.protocols.i_token_accountant import ITokenAccountant
+from openai_agent.protocols.i_trace_metrics import ITraceMetrics
+from openai_agent.services.model_tiers import DEFAULT_TIER
 
 set_tracing_disabled(True)
-azure_openai_service = container[IAzureOpenAIService]
 
-llm_model = OpenAIChatCompletionsModel(
-    model=azure_openai_service.get_deployed_model_name(),
-    openai_client=azure_openai_service.get_client(),
-)
+
+def get_llm_model(
+    cached: bool = False, tier: str = DEFAULT_TIER, agent: str | None = None
+) -> Model:
+    """The chat completions model of a tier, built on first use and shared by
+    every agent whose tier runs on the same deployment. `agent` names the agent
+    the model is for, so `LLM_AGENT_TIERS` can move it to another tier.
+    Responses are served from the response cache if `cached` is True, which
+    agents whose answer depends on their input alone opt into, unless the cache
+    is disabled via `LLM_CACHE_ENABLED`; conversational agents always call the
+    model. Slow calls are hedged with a duplicate when `LLM_HEDGING_ENABLED` is
+    true. The tokens of every call are accounted against the budgets of the
+    current request. Runs are traced into the in-memory trace metrics unless
+    `TRACE_METRICS_ENABLED` is false.
+    """
+    model_tiers = container[IModelTiers]
+    if agent is not None:
+        tier = model_tiers.get_tier(agent, tier)
+    return _get_deployment_model(model_tiers.get_deployment(tier), cached)
+
+
+@cache
+def _get_deployment_model(model_name: str, cached: bool) -> Model:
+    azure_openai_service = container[IAzureOpenAIService]
+
+    model: Model = OpenAIChatCompletionsModel(
+        model=model_name,
+        openai_client=azure_openai_service.get_client(),
+    )
+
+    # every call is accounted, the duplicates of hedged calls too, cache hits
+    # make no call
+    model = MeteredModel(model, container[ITokenAccountant])
+
+    hedge_policy = container[IHedgePolicy]
+    if hedge_policy.enabled:
+        model = HedgedModel(model, hedge_policy, model_name)
+
+    response_cache = container[IResponseCache]
+    if cached and response_cache.enabled:
+        model = CachingModel(model, model_name, response_cache)
+
+    trace_metrics = container[ITraceMetrics]
+    if not trace_metrics.enabled:
+        return model
+
+    trace_metrics.install()
+    return TracedModel(model, trace_metrics)
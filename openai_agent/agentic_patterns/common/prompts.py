@@ -0,0 +1,102 @@
+"""Layout of the system prompts, for the provider side prompt cache.
+
+Azure OpenAI caches the longest previously seen prefix of a prompt in 128 token
+steps once a prompt is at least 1024 tokens long, and bills and serves the
+cached part at a fraction of the cost and latency. Agents that each send their
+own short system prompt never reach that size nor share a prefix. The doctor
+and triage agents therefore start their instructions with the same static
+prefix: the service rules, the directory of departments and the translation
+services, rendered in a fixed order. Only the role of the agent follows it, so
+one warm prefix serves all of them.
+
+The prefix is only shared by agents on the same deployment, and the language
+agents run on the small tier, which may be a deployment of its own. Their
+prompts would be an order of magnitude longer with the prefix, which even
+served from the cache costs more than their role alone, so they keep short
+instructions: their role and the translation conventions.
+
+Anything that varies between requests must go after the prefix: the prefix
+is built once per process from constants, and tools and handoffs are listed in
+the order the agents declare them, which does not depend on the request.
+"""
+
+from functools import cache
+
+SERVICE_RULES = """\
+# Service
+You are one of the agents of the virtual care service of a general hospital.
+Patients, relatives and clinical staff write to the service in free text. Every
+message is handled by the agent whose role is described at the end of these
+instructions; the other agents of the service are listed below so that you know
+what they cover and where a request belongs.
+
+# Rules for every agent
+1. Stay within your role. When a request belongs to another department or
+   service, say so briefly and name it instead of answering it yourself.
+2. Never diagnose with certainty and never prescribe or dose medication. Explain
+   what the symptoms may indicate, which examinations are usual and when to see
+   a doctor in person.
+3. If a message describes an emergency, such as chest pain with shortness of
+   breath, signs of a stroke, severe bleeding, loss of consciousness, a seizure
+   that does not stop, suicidal thoughts or a severe allergic reaction, tell the
+   patient to call the local emergency number or go to the nearest emergency
+   department immediately, before anything else.
+4. Use plain, calm and respectful language suited to patients. Define medical
+   terms the first time you use them and avoid abbreviations.
+5. Do not ask for or repeat identifying details such as full names, addresses,
+   dates of birth or insurance numbers; they are not needed to help.
+6. Keep answers short: a few sentences or a short list. Do not use tables.
+7. Do not invent facts about the hospital, such as opening hours, doctors'
+   names, prices or waiting times.
+8. Answer in the language of the message unless your role says otherwise.
+"""
+
+TRANSLATION_RULES = """\
+# Translation conventions
+Translations of clinical texts keep the meaning, the level of certainty and the
+instructions of the original exactly. Drug names, doses, units, dates and
+numbers are kept as written. Medical terms use the standard term of the target
+language, not a literal rendering, and the register is formal. Names of
+departments are translated, names of people and places are not.
+"""
+
+
+@cache
+def get_shared_prefix() -> str:
+    """The static prefix of every system prompt, the same in every process."""
+    # imported here, the agent modules use this module to build their agents
+    from openai_agent.agentic_patterns.common.doctor_agents import (
+        DOCTOR_INSTRUCTIONS,
+        DOCTOR_VOCABULARY,
+        get_departments,
+    )
+    from openai_agent.agentic_patterns.common.language_agents import (
+        SOURCE_LANGUAGES,
+    )
+
+    departments = [
+        f"- {department} ({name}): {DOCTOR_INSTRUCTIONS[name]} Typical patient "
+        f"concerns: {DOCTOR_VOCABULARY[name]}."
+        for name, department in zip(DOCTOR_INSTRUCTIONS, get_departments())
+    ]
+    languages = [
+        f"- {language} ({language.lower()}_agent): translates from {source} to "
+        f"{language}."
+        for language, source in SOURCE_LANGUAGES.items()
+    ]
+    return "\n".join(
+        [
+            SERVICE_RULES,
+            "# Departments",
+            *departments,
+            "",
+            "# Translation services",
+            *languages,
+            "",
+        ]
+    )
+
+
+def compose_instructions(agent_name: str, role: str) -> str:
+    """The system prompt of an agent, its role after the shared prefix."""
+    return f"{get_shared_prefix()}\n# Your role\nYou are the {agent_name}. {role}"
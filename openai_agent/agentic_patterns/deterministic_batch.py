@@ -0,0 +1,83 @@
+"""
+Runs the deterministic flow over a file of conditions.
+
+The input is a JSONL or CSV file with a `condition` field per record (and an
+optional `id`). Each result is appended to the output JSONL as soon as it is
+ready; running the same command again resumes an interrupted batch and skips the
+records already in the output. Failed records are written to
+`<output>.errors.jsonl` and retried on the next run, which rewrites the file.
+
+Usage:
+python -m openai_agent.agentic_patterns.deterministic_batch conditions.jsonl triage.jsonl
+python -m openai_agent.agentic_patterns.deterministic_batch conditions.csv triage.jsonl -c 32
+"""  # noqa: E501
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from agents import Usage
+
+from openai_agent.agentic_patterns.deterministic_flow import TriageOutput, run_flow
+from openai_agent.services.batch_runner import (
+    BatchRunner,
+    BatchStats,
+    Record,
+    read_records,
+)
+
+
+def print_progress(stats: BatchStats) -> None:
+    print(
+        f"{stats.completed} done, {stats.failed} failed, "
+        f"{stats.rows_per_second:.2f} rows/s, "
+        f"{stats.tokens_per_second:.0f} tokens/s",
+        file=sys.stderr,
+    )
+
+
+async def main(
+    input_path: Path, output_path: Path, concurrency: int, field: str
+) -> None:
+    async def triage(record: Record) -> tuple[TriageOutput, Usage]:
+        return await run_flow(record[field])
+
+    runner = BatchRunner(
+        output_path=output_path,
+        errors_path=output_path.with_suffix(".errors.jsonl"),
+        concurrency=concurrency,
+        on_progress=print_progress,
+        progress_every=max(concurrency, 10),
+    )
+    try:
+        await runner.run(read_records(input_path), triage)
+    finally:
+        stats = runner.stats
+        print(
+            f"\ncompleted: {stats.completed}, skipped: {stats.skipped}, "
+            f"duplicates: {stats.duplicates}, failed: {stats.failed} "
+            f"in {stats.elapsed_seconds:.1f}s"
+        )
+        print(f"throughput: {stats.rows_per_second:.2f} rows/s")
+        print(
+            f"tokens: {stats.input_tokens} in, {stats.output_tokens} out "
+            f"({stats.tokens_per_second:.0f} tokens/s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", type=Path, help="JSONL or CSV file of conditions.")
+    parser.add_argument("output", type=Path, help="JSONL file the results go to.")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=16, help="Conditions in flight."
+    )
+    parser.add_argument(
+        "-f", "--field", default="condition", help="The field with the condition."
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.input, args.output, args.concurrency, args.field))
+    except KeyboardInterrupt:
+        print("Interrupted, run the same command again to resume.", file=sys.stderr)
@@ -1,9 +1,12 @@
 import asyncio
+from collections.abc import AsyncIterator
 
-from agents import Agent, Runner
+from agents import Agent, Runner, Usage
 from pydantic import BaseModel
 
-from openai_agent.agentic_patterns.common.llm_model import llm_model
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.services.structured_stream import FieldEvent, stream_fields
 
 
 class DepartmentOutput(BaseModel):
@@ -11,32 +14,88 @@ class DepartmentOutput(BaseModel):
     department_name: str
 
 
-symptom_agent = Agent(
-    name="symptom_agent",
-    instructions=(
-        "You are a medical symptom generator. Given a disease or medical condition, "
-        "generate the most characteristic and clinically significant symptoms that "
-        "patients typically experience. Focus on primary symptoms that are commonly "
-        "observed and would be most relevant for medical triage. Present symptoms "
-        "in a clear, concise manner using medical terminology that healthcare "
-        "professionals would recognize. Prioritize symptoms by frequency and "
-        "diagnostic significance."
-    ),
-    model=llm_model,
-)
-medical_agent = Agent(
-    name="medical_agent",
-    instructions=(
-        "You are a medical triage specialist. Analyze the given symptoms and provide "
-        "a comprehensive assessment including: 1) Clear reasoning that explains the "
-        "medical rationale for your recommendation, 2) The most appropriate hospital "
-        "department name for initial evaluation and treatment. Consider symptom "
-        "severity, urgency, and specialization requirements. Provide professional, "
-        "evidence-based recommendations suitable for healthcare routing decisions."
-    ),
-    model=llm_model,
-    output_type=DepartmentOutput,
-)
+class StreamedDepartmentOutput(BaseModel):
+    # declared first, so it is generated and streamed before the long reasoning
+    department_name: str
+    reasoning: str
+
+
+class TriageOutput(BaseModel):
+    symptoms: str
+    department: DepartmentOutput
+
+
+@agent_registry.register()
+def get_symptom_agent() -> Agent:
+    return Agent(
+        name="symptom_agent",
+        instructions=(
+            "You are a medical symptom generator. Given a disease or medical "
+            "condition, generate the most characteristic and clinically significant "
+            "symptoms that patients typically experience. Focus on primary symptoms "
+            "that are commonly observed and would be most relevant for medical "
+            "triage. Present symptoms in a clear, concise manner using medical "
+            "terminology that healthcare professionals would recognize. Prioritize "
+            "symptoms by frequency and diagnostic significance."
+        ),
+        model=get_llm_model(agent="symptom_agent", cached=True),
+    )
+
+
+@agent_registry.register()
+def get_medical_agent() -> Agent:
+    return Agent(
+        name="medical_agent",
+        instructions=(
+            "You are a medical triage specialist. Analyze the given symptoms and "
+            "provide a comprehensive assessment including: 1) Clear reasoning that "
+            "explains the medical rationale for your recommendation, 2) The most "
+            "appropriate hospital department name for initial evaluation and "
+            "treatment. Consider symptom severity, urgency, and specialization "
+            "requirements. Provide professional, evidence-based recommendations "
+            "suitable for healthcare routing decisions."
+        ),
+        model=get_llm_model(agent="medical_agent", cached=True),
+        output_type=DepartmentOutput,
+    )
+
+
+@agent_registry.register()
+def get_streamed_medical_agent() -> Agent:
+    """The medical agent answering with the department name first, so it can be
+    streamed before the reasoning."""
+    return get_medical_agent().clone(output_type=StreamedDepartmentOutput)
+
+
+async def run_flow(condition: str) -> tuple[TriageOutput, Usage]:
+    """The symptoms of a condition and the department that should treat them, with
+    the tokens used by both agents."""
+    symptom = await Runner.run(get_symptom_agent(), condition)
+    department_result = await Runner.run(get_medical_agent(), symptom.final_output)
+
+    usage = Usage()
+    usage.add(symptom.context_wrapper.usage)
+    usage.add(department_result.context_wrapper.usage)
+    output = TriageOutput(
+        symptoms=symptom.final_output, department=department_result.final_output
+    )
+    return output, usage
+
+
+async def stream_department(
+    symptoms: str, stop_after: str | None = None
+) -> AsyncIterator[FieldEvent]:
+    """The fields of the department for the symptoms as soon as each is complete,
+    `department_name` first. With `stop_after="department_name"` the reasoning is
+    never generated."""
+    result = Runner.run_streamed(get_streamed_medical_agent(), symptoms)
+    try:
+        async for event in stream_fields(result, stop_after):
+            yield event
+    finally:
+        if not result.is_complete:
+            # the caller stopped reading, stop the model call
+            result.cancel()
 
 
 async def main():
@@ -44,13 +103,13 @@ async def main():
         "Enter a medical condition or disease name (e.g., 'diabetes', 'pneumonia', 'migraine'): "  # noqa: E501
     )
 
-    symptom = await Runner.run(symptom_agent, input_prompt)
+    symptom = await Runner.run(get_symptom_agent(), input_prompt)
     print("\nSymptom:")
     print(symptom.final_output)
 
-    department_result = await Runner.run(medical_agent, symptom.final_output)
     print("\nDepartment Information:")
-    print(department_result.final_output.model_dump_json(indent=4))
+    async for event in stream_department(symptom.final_output):
+        print(f"{event.name}: {event.value}")
     print()
 
 
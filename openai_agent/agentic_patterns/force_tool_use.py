@@ -1,5 +1,7 @@
 import asyncio
-from typing import Any, Literal
+from dataclasses import asdict
+from functools import partial
+from typing import Any, Literal, get_args
 
 from agents import (
     Agent,
@@ -11,12 +13,14 @@ from agents import (
     ToolsToFinalOutputResult,
     function_tool,
 )
-from faker import Faker
 from pydantic import BaseModel
 
-from openai_agent.agentic_patterns.common.llm_model import llm_model
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.hosting import container
+from openai_agent.protocols.i_specialist_directory import ISpecialistDirectory
+from openai_agent.protocols.i_tool_memo import IToolMemo
 
-fake = Faker()
 """
 This example shows how to force the agent to use a tool. It uses
 `ModelSettings(tool_choice="required")` to force the agent to use any tool.
@@ -42,31 +46,55 @@ python examples/agent_patterns/forcing_tool_use.py -t custom
 class Specialist(BaseModel):
     first_name: str
     last_name: str
+    specialty: str
+    city: str
     salutation: str = "Dr."
 
-    @classmethod
-    def generate(cls) -> "Specialist":
-        return cls(first_name=fake.first_name(), last_name=fake.last_name())
-
     def __str__(self) -> str:  # pragma: no cover
-        return f"{self.salutation} {self.first_name} {self.last_name}"
+        return (
+            f"{self.salutation} {self.first_name} {self.last_name}, "
+            f"{self.specialty}, {self.city}"
+        )
+
+
+@function_tool(failure_error_function=None)
+def get_specialist(city: str, specialty: str | None = None) -> list[Specialist]:
+    """Find specialists practicing in a city.
 
+    Args:
+        city: The city, partial or misspelled names are matched too.
+        specialty: The medical specialty, such as cardiology, null for any.
+    """
+    records = container[ISpecialistDirectory].search(city, specialty)
+    return [Specialist(**asdict(record)) for record in records]
 
-@function_tool
-def get_specialist(city: str) -> Specialist:
-    return Specialist.generate()
+
+def get_specialist_key(arguments: dict[str, Any]) -> tuple[str, str]:
+    """Searches differing only in case or spacing find the same specialists."""
+    city, specialty = (
+        " ".join((arguments.get(name) or "").casefold().split())
+        for name in ("city", "specialty")
+    )
+    return city, specialty
 
 
 async def custom_tool_use_behavior(
     context: RunContextWrapper[Any], results: list[FunctionToolResult]
 ) -> ToolsToFinalOutputResult:
-    specialist: Specialist = results[0].output
-    return ToolsToFinalOutputResult(is_final_output=True, final_output=str(specialist))
+    output = results[0].output
+    if not isinstance(output, list):
+        # the error message of a failed tool call
+        final_output = str(output)
+    else:
+        specialists: list[Specialist] = output
+        final_output = str(specialists[0]) if specialists else "No specialist found."
+    return ToolsToFinalOutputResult(is_final_output=True, final_output=final_output)
 
 
-async def main(
-    tool_use_behavior: Literal["default", "first_tool", "custom"] = "default",
-):
+ToolUseBehavior = Literal["default", "first_tool", "custom"]
+
+
+def _build_medical_expert_agent(tool_use_behavior: ToolUseBehavior) -> Agent:
     if tool_use_behavior == "default":
         behavior: (
             Literal["run_llm_again", "stop_on_first_tool"] | ToolsToFinalOutputFunction
@@ -76,19 +104,41 @@ async def main(
     elif tool_use_behavior == "custom":
         behavior = custom_tool_use_behavior
 
-    agent = Agent(
+    return Agent(
         name="Medical Expert agent",
         instructions="You are a helpful agent who assist in finding medical specialists.",  # noqa E501
-        tools=[get_specialist],
+        tools=[container[IToolMemo].memoize(get_specialist, key=get_specialist_key)],
         tool_use_behavior=behavior,
         model_settings=ModelSettings(
             tool_choice="required" if tool_use_behavior != "default" else None
         ),
-        model=llm_model,
+        model=get_llm_model(agent="Medical Expert agent"),
     )
 
-    result = await Runner.run(agent, input="I need a cardiologist in Seattle")
-    print(result.final_output)
+
+def _get_agent_name(tool_use_behavior: ToolUseBehavior) -> str:
+    return f"{__name__}.medical_expert_agent.{tool_use_behavior}"
+
+
+for _behavior in get_args(ToolUseBehavior):
+    agent_registry.add(
+        _get_agent_name(_behavior), partial(_build_medical_expert_agent, _behavior)
+    )
+
+
+def get_medical_expert_agent(tool_use_behavior: ToolUseBehavior = "default") -> Agent:
+    return agent_registry.get(_get_agent_name(tool_use_behavior))
+
+
+async def find_specialist(
+    request: str, tool_use_behavior: ToolUseBehavior = "default"
+) -> str:
+    result = await Runner.run(get_medical_expert_agent(tool_use_behavior), request)
+    return str(result.final_output)
+
+
+async def main(tool_use_behavior: ToolUseBehavior = "default"):
+    print(await find_specialist("I need a cardiologist in Seattle", tool_use_behavior))
 
 
 if __name__ == "__main__":
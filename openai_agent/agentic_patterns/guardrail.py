@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import uuid
 
 from agents import (
     Agent,
@@ -13,7 +14,20 @@ from agents import (
 )
 from pydantic import BaseModel
 
-from openai_agent.agentic_patterns.common.llm_model import llm_model
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.agentic_patterns.common.summary_agent import summarize
+from openai_agent.guardrails.incremental_guardrail import (
+    FullHistoryPolicy,
+    GuardrailContext,
+    IncrementalGuardrail,
+)
+from openai_agent.guardrails.tiered_guardrail import TieredGuardrail, run_guarded
+from openai_agent.hosting import container
+from openai_agent.protocols.i_history_manager import IHistoryManager
+from openai_agent.protocols.i_session_store import ISessionStore
+from openai_agent.services.lexicon_classifier import LexiconClassifier
+from openai_agent.services.model_tiers import FAST
 
 
 class DrugPurchaseOutput(BaseModel):
@@ -21,20 +35,44 @@ class DrugPurchaseOutput(BaseModel):
     requested: bool
 
 
-@input_guardrail
-async def drug_purchase_guardrail(
-    context: RunContextWrapper[None],
-    agent: Agent,
-    input: str | list[TResponseInputItem],
-) -> GuardrailFunctionOutput:
-    guardrail_agent = Agent(
+drug_purchase_classifier = LexiconClassifier(
+    weights={
+        # purchase intent
+        r"buy(ing)?|purchas(e|ing)|order(ing)?|sell(ing)?|ship(ping)?": 1.0,
+        r"where (can|do) i (get|find)|how (can|do) i get|get (me )?some": 1.0,
+        r"without (a )?prescription|no prescription|online pharmacy|cheap": 1.0,
+        # drugs
+        r"drugs?|pills?|meds|medications?|painkillers?|opioids?|narcotics?": 1.0,
+        r"oxycodone|oxycontin|fentanyl|xanax|adderall|vicodin|percocet|codeine": 1.5,
+        r"morphine|tramadol|valium|ambien|ritalin|ketamine|viagra|antibiotics": 1.5,
+        # clinical questions about a drug are fine
+        r"side effects?|dosage|interactions?|allerg(y|ic)|symptoms?": -1.0,
+    },
+    block_threshold=2.0,
+    allow_threshold=0.0,
+)
+"""Local fast path: clear purchase requests are blocked and messages without any
+purchase or drug cues are allowed without an LLM call. Clinical terms only lower a
+block to an LLM check, they never allow a message with a cue."""
+
+
+@agent_registry.register()
+def get_guardrail_agent() -> Agent:
+    return Agent(
         name="Guardrail check",
         instructions="Check if the user is requesting for any drug purchases.",
         output_type=DrugPurchaseOutput,
-        model=llm_model,
+        model=get_llm_model(tier=FAST, agent="Guardrail check", cached=True),
     )
 
-    result = await Runner.run(guardrail_agent, input, context=context.context)
+
+@input_guardrail
+async def drug_purchase_llm_guardrail(
+    context: RunContextWrapper[None],
+    agent: Agent,
+    input: str | list[TResponseInputItem],
+) -> GuardrailFunctionOutput:
+    result = await Runner.run(get_guardrail_agent(), input, context=context.context)
     final_output = result.final_output_as(DrugPurchaseOutput)
 
     return GuardrailFunctionOutput(
@@ -43,42 +81,74 @@ async def drug_purchase_guardrail(
     )
 
 
-async def main():
-    agent = Agent(
+drug_purchase_guardrail = TieredGuardrail(
+    classifier=drug_purchase_classifier,
+    # only the new user messages of a turn are sent to the LLM check, with the
+    # last exchange as context; the full history of a session is re-checked
+    # every 10 turns
+    guardrail=IncrementalGuardrail(
+        drug_purchase_llm_guardrail,
+        policy=FullHistoryPolicy(every_n_checks=10, context_messages=2),
+    ).as_input_guardrail(),
+)
+
+
+@agent_registry.register()
+def get_customer_support_agent() -> Agent:
+    # the guardrails are evaluated by `run_guarded`, concurrently with the agent
+    return Agent(
         name="Customer support agent",
         instructions=(
             "You are a medical customer support agent. Answer user questions "
             "about medical products and services, but do not assist with drug "
             "purchases."
         ),
-        input_guardrails=[drug_purchase_guardrail],
-        model=llm_model,
+        model=get_llm_model(agent="Customer support agent"),
     )
 
-    input_data: list[TResponseInputItem] = []
 
-    while True:
-        user_input = input("Enter a message: ")
-        input_data.append(
-            {
-                "role": "user",
-                "content": user_input,
-            }
+REFUSAL = "Sorry, I can't help you with your request."
+
+
+async def respond(
+    input_data: list[TResponseInputItem], session_id: str
+) -> tuple[str, list[TResponseInputItem]]:
+    """The reply to the conversation of a session, and the conversation including
+    the reply."""
+    try:
+        result = await run_guarded(
+            get_customer_support_agent(),
+            input_data,
+            [drug_purchase_guardrail],
+            context=GuardrailContext(session_id),
         )
+        return str(result.final_output), result.to_input_list()
+    except InputGuardrailTripwireTriggered:
+        return REFUSAL, [*input_data, {"role": "assistant", "content": REFUSAL}]
+
+
+async def main():
+    store = container[ISessionStore]
+    history_manager = container[IHistoryManager]
+    session_id = uuid.uuid4().hex
 
-        try:
-            result = await Runner.run(agent, input_data)
-            print(result.final_output)
-            input_data = result.to_input_list()
-        except InputGuardrailTripwireTriggered:
-            message = "Sorry, I can't help you with your request."
-            print(message)
-            input_data.append(
+    while True:
+        user_input = input("Enter a message: ")
+        history = history_manager.compact(
+            session_id, (await store.load(session_id)).history, summarize
+        ).items
+        reply, items = await respond(
+            [
+                *history,
                 {
-                    "role": "assistant",
-                    "content": message,
-                }
-            )
+                    "role": "user",
+                    "content": user_input,
+                },
+            ],
+            session_id,
+        )
+        await store.append(session_id, items[len(history) :])
+        print(reply)
 
 
 if __name__ == "__main__":
@@ -1,54 +1,106 @@
 import asyncio
+import uuid
+from collections.abc import AsyncIterator
 
-from agents import Agent, RawResponsesStreamEvent, Runner, TResponseInputItem
+from agents import (
+    Agent,
+    RawResponsesStreamEvent,
+    Runner,
+    RunResultStreaming,
+    TResponseInputItem,
+)
 from openai.types.responses import ResponseTextDeltaEvent
 
-from openai_agent.agentic_patterns.common.doctor_agents import get_all_agents
-from openai_agent.agentic_patterns.common.llm_model import llm_model
-
-triage_agent = Agent(
-    name="triage_agent",
-    instructions=(
-        "Handoff to the appropriate agent based on the medical condition of "
-        "the patient."
-    ),
-    handoffs=get_all_agents(),  # type: ignore
-    model=llm_model,
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.doctor_agents import (
+    TRIAGE_AGENT,
+    get_all_agents,
+    get_doctor_router,
 )
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.agentic_patterns.common.prompts import compose_instructions
+from openai_agent.agentic_patterns.common.summary_agent import summarize
+from openai_agent.hosting import container
+from openai_agent.protocols.i_history_manager import IHistoryManager
+from openai_agent.protocols.i_session_store import ISessionStore
+from openai_agent.services.model_tiers import FAST
+
+
+@agent_registry.register(TRIAGE_AGENT)
+def get_triage_agent() -> Agent:
+    return Agent(
+        name=TRIAGE_AGENT,
+        instructions=compose_instructions(
+            TRIAGE_AGENT,
+            "Handoff to the appropriate agent based on the medical condition of "
+            "the patient.",
+        ),
+        handoffs=get_all_agents(),  # type: ignore
+        model=get_llm_model(tier=FAST, agent=TRIAGE_AGENT),
+    )
+
+
+def select_agent(msg: str) -> Agent:
+    """The specialist for `msg` when the local router is confident, otherwise the
+    LLM triage agent."""
+    decision = get_doctor_router().route(msg)
+    if decision.route is None:
+        return get_triage_agent()
+    return agent_registry.get(decision.route)
+
+
+async def stream_text(result: RunResultStreaming) -> AsyncIterator[tuple[Agent, str]]:
+    """The text deltas of a streamed run, with the agent producing them."""
+    async for event in result.stream_events():
+        if isinstance(event, RawResponsesStreamEvent):
+            data = event.data
+            if isinstance(data, ResponseTextDeltaEvent):
+                yield result.current_agent, data.delta
 
 
 async def main():
+    store = container[ISessionStore]
+    history_manager = container[IHistoryManager]
+    session_id = uuid.uuid4().hex
     msg = input(
         (
             "Hi! Tell me about your medical condition and we will route your request "
             "to the appropriate agent: "
         )
     )
-    agent = triage_agent
-    inputs: list[TResponseInputItem] = [{"content": msg, "role": "user"}]
+    agent = select_agent(msg)
+    if agent.name != "triage_agent":
+        print(f"\n\033[33m--- Routed to {agent.name} ---\033[0m\n")
 
     while True:
+        state = await store.load(session_id)
+        # later turns stay with the current specialist instead of restarting at
+        # triage
+        if state.agent_name:
+            agent = agent_registry.get(state.agent_name)
+        # the prompt stays within the history budget however long the session
+        history = history_manager.compact(session_id, state.history, summarize).items
+        inputs: list[TResponseInputItem] = [
+            *history,
+            {"content": msg, "role": "user"},
+        ]
         result = Runner.run_streamed(
             agent,
             input=inputs,
         )
 
-        async for event in result.stream_events():
-            if isinstance(event, RawResponsesStreamEvent):
-                data = event.data
-                if isinstance(data, ResponseTextDeltaEvent):
-                    if result.current_agent.name != agent.name:
-                        print(
-                            f"\n\033[33m--- Handing off to {result.current_agent.name} ---\033[0m\n"  # noqa: E501
-                        )
-                        agent = result.current_agent
-                    print(data.delta, end="", flush=True)
-
-        inputs = result.to_input_list()
+        async for current_agent, delta in stream_text(result):
+            if current_agent.name != agent.name:
+                print(f"\n\033[33m--- Handing off to {current_agent.name} ---\033[0m\n")
+                agent = current_agent
+            print(delta, end="", flush=True)
+
+        await store.append(
+            session_id, result.to_input_list()[len(history) :], result.last_agent.name
+        )
         print("\n")
 
-        user_msg = input("Enter a message: ")
-        inputs.append({"content": user_msg, "role": "user"})
+        msg = input("Enter a message: ")
 
 
 if __name__ == "__main__":
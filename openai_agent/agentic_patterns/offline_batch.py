@@ -0,0 +1,226 @@
+"""
+Runs triage or translation over a file of records as batch jobs.
+
+Every agent turn of a flow is one stage: the records are written to a JSONL file
+of requests, submitted as a single job and polled until it finishes, which may
+take up to the completion window. Stage results are indexed by record id in
+`<output>.batch/results.db`, so running the same command again resumes an
+interrupted run: finished stages are not submitted again and a job that is still
+running is polled instead. Results are written to the output JSONL in the format
+of `deterministic_batch`, failed records to `<output>.errors.jsonl`.
+
+Jobs go to the Azure OpenAI Batch API by default. Set `BATCH_BACKEND=local` to
+run them through the file based stand-in, which sends the requests as real-time
+chat completions.
+
+Usage:
+python -m openai_agent.agentic_patterns.offline_batch triage conditions.jsonl triage.jsonl
+python -m openai_agent.agentic_patterns.offline_batch translate notes.csv notes.it.jsonl -l Italian -f message
+"""  # noqa: E501
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from agents import Agent
+from pydantic import BaseModel
+
+from openai_agent.agentic_patterns.common.language_agents import (
+    LANGUAGE_AGENTS,
+    SOURCE_LANGUAGES,
+    TranslationOutput,
+)
+from openai_agent.agentic_patterns.deterministic_flow import (
+    TriageOutput,
+    get_medical_agent,
+    get_symptom_agent,
+)
+from openai_agent.hosting import container, load_env
+from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
+from openai_agent.protocols.i_batch_job_backend import IBatchJobBackend
+from openai_agent.services.batch_jobs import (
+    BatchJob,
+    BatchJobEnv,
+    ResultIndex,
+    build_agent_request,
+    parse_agent_output,
+    read_results,
+    wait_for_job,
+    write_requests,
+)
+from openai_agent.services.batch_runner import Record, read_records
+
+Stage = tuple[str, Callable[[], Agent]]
+"""The name of a stage and the agent that answers its requests."""
+
+
+def print_job(job: BatchJob) -> None:
+    print(
+        f"{job.id}: {job.status}, {job.completed}/{job.total} done, "
+        f"{job.failed} failed",
+        file=sys.stderr,
+    )
+
+
+async def run_stage(
+    name: str,
+    agent: Agent,
+    inputs: Iterator[tuple[str, str]],
+    workdir: Path,
+    index: ResultIndex,
+) -> None:
+    if index.has_stage(name):
+        print(f"{name}: already done", file=sys.stderr)
+        return
+
+    env = container[BatchJobEnv]
+    backend = container[IBatchJobBackend]
+    job_path = workdir / f"{name}.job"
+    if job_path.exists():
+        job_id = job_path.read_text()
+    else:
+        model = (
+            env.azure_openai_batch_deployed_model_name
+            or container[IAzureOpenAIService].get_deployed_model_name()
+        )
+        requests_path = workdir / f"{name}.requests.jsonl"
+        count = write_requests(
+            requests_path,
+            (build_agent_request(agent, id, text, model) for id, text in inputs),
+        )
+        if not count:
+            return
+        job_id = (await backend.submit(requests_path)).id
+        job_path.write_text(job_id)
+        print(f"{name}: submitted {count} requests as {job_id}", file=sys.stderr)
+
+    job = await wait_for_job(backend, job_id, env.batch_poll_interval, print_job)
+    if job.status != "completed":
+        # forget the job, so running the command again submits the stage anew
+        job_path.unlink()
+        reason = f" ({job.error})" if job.error else ""
+        raise RuntimeError(
+            f"Batch job {job.id} of stage '{name}' is {job.status}{reason}, run "
+            "the command again to resubmit the stage."
+        )
+
+    output_path = workdir / f"{name}.output.jsonl"
+    errors_path = workdir / f"{name}.errors.jsonl"
+    await backend.download(job, output_path, errors_path)
+    index.add(name, read_results(output_path), read_results(errors_path))
+
+
+def stage_inputs(
+    input_path: Path, field: str, index: ResultIndex, previous: str | None
+) -> Iterator[tuple[str, str]]:
+    """The input of every record for a stage, the field of the record for the
+    first stage and the output of the previous stage for the others."""
+    for id, record in read_records(input_path):
+        if previous is None:
+            yield id, record[field]
+        elif (result := index.get(previous, id)) and result[0] is not None:
+            yield id, result[0]
+
+
+async def run_stages(
+    stages: list[Stage],
+    input_path: Path,
+    output_path: Path,
+    field: str,
+    to_output: Callable[[Record, list[str]], BaseModel],
+) -> None:
+    workdir = output_path.with_suffix(".batch")
+    workdir.mkdir(exist_ok=True)
+    index = ResultIndex(workdir / "results.db")
+    try:
+        previous: str | None = None
+        for name, get_agent in stages:
+            inputs = stage_inputs(input_path, field, index, previous)
+            await run_stage(name, get_agent(), inputs, workdir, index)
+            previous = name
+
+        completed = failed = 0
+        with (
+            output_path.open("w") as output,
+            output_path.with_suffix(".errors.jsonl").open("w") as errors,
+        ):
+            for id, record in read_records(input_path):
+                contents: list[str] = []
+                error = None
+                for name, _ in stages:
+                    content, error = index.get(name, id) or (None, "no result")
+                    if content is None:
+                        break
+                    contents.append(content)
+                try:
+                    if error is not None:
+                        raise RuntimeError(error)
+                    result = to_output(record, contents).model_dump(mode="json")
+                except Exception as e:
+                    failed += 1
+                    row = {"id": id, "input": record, "error": repr(e)}
+                    errors.write(json.dumps(row) + "\n")
+                    continue
+                completed += 1
+                output.write(json.dumps({"id": id, "input": record, "output": result}))
+                output.write("\n")
+    finally:
+        index.close()
+
+    print(f"\ncompleted: {completed}, failed: {failed}")
+
+
+async def triage(input_path: Path, output_path: Path, field: str) -> None:
+    def to_output(record: Record, contents: list[str]) -> TriageOutput:
+        symptoms, department = contents
+        return TriageOutput(
+            symptoms=symptoms,
+            department=parse_agent_output(get_medical_agent(), department),
+        )
+
+    stages = [("symptoms", get_symptom_agent), ("department", get_medical_agent)]
+    await run_stages(stages, input_path, output_path, field, to_output)
+
+
+async def translate(
+    input_path: Path, output_path: Path, field: str, language: str
+) -> None:
+    languages = [language]
+    while (source := SOURCE_LANGUAGES[languages[0]]) != "English":
+        languages.insert(0, source)
+
+    def to_output(record: Record, contents: list[str]) -> TranslationOutput:
+        return TranslationOutput(input_text=record[field], translated_text=contents[-1])
+
+    stages = [(source.lower(), LANGUAGE_AGENTS[source]) for source in languages]
+    await run_stages(stages, input_path, output_path, field, to_output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("flow", choices=["triage", "translate"])
+    parser.add_argument("input", type=Path, help="JSONL or CSV file of records.")
+    parser.add_argument("output", type=Path, help="JSONL file the results go to.")
+    parser.add_argument(
+        "-f", "--field", help="The field with the input, condition or message."
+    )
+    parser.add_argument(
+        "-l", "--language", choices=list(LANGUAGE_AGENTS), default="Spanish"
+    )
+    args = parser.parse_args()
+
+    load_env()
+    try:
+        if args.flow == "triage":
+            asyncio.run(triage(args.input, args.output, args.field or "condition"))
+        else:
+            asyncio.run(
+                translate(
+                    args.input, args.output, args.field or "message", args.language
+                )
+            )
+    except KeyboardInterrupt:
+        print("Interrupted, run the same command again to resume.", file=sys.stderr)
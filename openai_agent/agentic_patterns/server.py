@@ -0,0 +1,249 @@
+"""
+Serves every pattern over HTTP, so one process handles many concurrent sessions.
+
+Endpoints:
+- `POST /patterns/{name}` runs a turn of a pattern, `handoff` and
+  `deterministic_flow_stream` stream Server-Sent Events, all other patterns
+  answer with JSON
+- `DELETE /sessions/{session_id}` cancels the runs of a session and forgets it
+  and its conversation
+- `GET /health` reports the current load, the rate limiter state and the tokens
+  used so far
+- `GET /metrics` serves the per-agent trace metrics in the Prometheus format
+
+Usage:
+python -m openai_agent.agentic_patterns.server
+curl -N localhost:8000/patterns/handoff -d '{"message": "I broke my wrist"}'
+"""
+
+import logging
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from agents import Runner, TResponseInputItem
+from pydantic import BaseModel
+
+from openai_agent.agentic_patterns import (
+    deterministic_flow,
+    force_tool_use,
+    guardrail,
+    handoff,
+    tool_conditional,
+    tool_selection,
+)
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.summary_agent import summarize
+from openai_agent.hosting import container, load_env
+from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
+from openai_agent.protocols.i_endpoint_pool import IEndpointPool
+from openai_agent.protocols.i_hedge_policy import IHedgePolicy
+from openai_agent.protocols.i_history_manager import IHistoryManager
+from openai_agent.protocols.i_model_tiers import IModelTiers
+from openai_agent.protocols.i_rate_limiter import IRateLimiter
+from openai_agent.protocols.i_response_cache import IResponseCache
+from openai_agent.protocols.i_session_manager import ISessionManager
+from openai_agent.protocols.i_session_store import ISessionStore
+from openai_agent.protocols.i_token_accountant import ITokenAccountant
+from openai_agent.protocols.i_tool_memo import IToolMemo
+from openai_agent.protocols.i_trace_metrics import ITraceMetrics
+from openai_agent.services.azure_ad_token_provider import (
+    get_token_fetch_metrics,
+    render_token_fetch_prometheus,
+)
+from openai_agent.services.session_manager import Session
+from openai_agent.serving.app import (
+    Endpoint,
+    ServerEnv,
+    ServerSentEvent,
+    SessionRequest,
+    StreamingEndpoint,
+    create_app,
+)
+
+
+class MessageRequest(SessionRequest):
+    message: str
+
+
+class ConditionRequest(SessionRequest):
+    condition: str
+
+
+class StreamingConditionRequest(ConditionRequest):
+    stop_after: Literal["department_name"] | None = None
+    """Ends the run once this field of the department arrived."""
+
+
+class TranslationRequest(SessionRequest):
+    message: str
+    language_preference: tool_conditional.LanguagePreference = "spanish_only"
+    fan_out: bool = False
+
+
+class SpecialistRequest(SessionRequest):
+    message: str = "I need a cardiologist in Seattle"
+    tool_use_behavior: force_tool_use.ToolUseBehavior = "default"
+
+
+async def run_deterministic_flow(
+    session: Session, request: ConditionRequest
+) -> BaseModel:
+    output, _ = await deterministic_flow.run_flow(request.condition)
+    return output
+
+
+async def run_deterministic_flow_stream(
+    session: Session, request: StreamingConditionRequest
+) -> AsyncIterator[ServerSentEvent]:
+    symptom = await Runner.run(
+        deterministic_flow.get_symptom_agent(), request.condition
+    )
+    yield "symptoms", {"text": symptom.final_output}
+    async for event in deterministic_flow.stream_department(
+        symptom.final_output, request.stop_after
+    ):
+        yield "field", {"name": event.name, "value": event.value}
+    yield "done", {}
+
+
+async def run_handoff(
+    session: Session, request: MessageRequest
+) -> AsyncIterator[ServerSentEvent]:
+    store = container[ISessionStore]
+    state = await store.load(session.id)
+    # later turns stay with the current specialist instead of restarting at triage
+    agent = (
+        agent_registry.get(state.agent_name)
+        if state.agent_name
+        else handoff.select_agent(request.message)
+    )
+    compacted = container[IHistoryManager].compact(session.id, state.history, summarize)
+    history = compacted.items
+    inputs: list[TResponseInputItem] = [
+        *history,
+        {"content": request.message, "role": "user"},
+    ]
+    yield "agent", {"name": agent.name}
+
+    result = Runner.run_streamed(agent, input=inputs)
+    try:
+        async for current_agent, delta in handoff.stream_text(result):
+            if current_agent.name != agent.name:
+                agent = current_agent
+                yield "agent", {"name": agent.name}
+            yield "delta", {"text": delta}
+    finally:
+        if not result.is_complete:
+            # the run was cancelled, stop the model call
+            result.cancel()
+
+    agent_name = result.last_agent.name
+    await store.append(session.id, result.to_input_list()[len(history) :], agent_name)
+    yield "done", {"name": agent_name, "saved_tokens": compacted.saved_tokens}
+
+
+async def run_guardrail(session: Session, request: MessageRequest) -> str:
+    store = container[ISessionStore]
+    compacted = container[IHistoryManager].compact(
+        session.id, (await store.load(session.id)).history, summarize
+    )
+    history = compacted.items
+    reply, items = await guardrail.respond(
+        [*history, {"role": "user", "content": request.message}], session.id
+    )
+    await store.append(session.id, items[len(history) :])
+    return reply
+
+
+async def run_tool_selection(session: Session, request: MessageRequest) -> BaseModel:
+    return await tool_selection.translate(request.message)
+
+
+async def run_tool_conditional(
+    session: Session, request: TranslationRequest
+) -> BaseModel:
+    context = tool_conditional.AppContext(
+        language_preference=request.language_preference
+    )
+    if request.fan_out:
+        return await tool_conditional.translate_fan_out(request.message, context)
+    return await tool_conditional.translate(request.message, context)
+
+
+async def run_force_tool_use(session: Session, request: SpecialistRequest) -> str:
+    return await force_tool_use.find_specialist(
+        request.message, request.tool_use_behavior
+    )
+
+
+ENDPOINTS: dict[str, Endpoint | StreamingEndpoint] = {
+    "deterministic_flow": Endpoint(ConditionRequest, run_deterministic_flow),
+    "deterministic_flow_stream": StreamingEndpoint(
+        StreamingConditionRequest, run_deterministic_flow_stream
+    ),
+    "handoff": StreamingEndpoint(MessageRequest, run_handoff),
+    "guardrail": Endpoint(MessageRequest, run_guardrail),
+    "tool_selection": Endpoint(MessageRequest, run_tool_selection),
+    "tool_conditional": Endpoint(TranslationRequest, run_tool_conditional),
+    "force_tool_use": Endpoint(SpecialistRequest, run_force_tool_use),
+}
+
+
+def main() -> None:
+    import uvicorn
+
+    load_env()
+    env = container[ServerEnv]
+    trace_metrics = container[ITraceMetrics]
+    accountant = container[ITokenAccountant]
+    store = container[ISessionStore]
+    history = container[IHistoryManager]
+
+    async def remove(session_id: str) -> bool:
+        history.forget(session_id)
+        return await store.delete(session_id)
+
+    async def close() -> None:
+        await container[IAzureOpenAIService].close()
+        container[IResponseCache].close()
+        store.close()
+
+    def render_prometheus() -> str:
+        rendered = trace_metrics.render_prometheus() if trace_metrics.enabled else ""
+        return rendered + render_token_fetch_prometheus()
+
+    app = create_app(
+        container[ISessionManager],
+        ENDPOINTS,
+        container[logging.Logger],
+        drain_timeout=env.server_drain_timeout,
+        stream_buffer=env.server_stream_buffer,
+        on_startup=container[IAzureOpenAIService].warm_up,
+        on_shutdown=close,
+        on_remove=remove,
+        metrics={
+            "rate_limiter": container[IRateLimiter].get_metrics,
+            "hedging": container[IHedgePolicy].get_metrics,
+            "endpoints": container[IEndpointPool].get_metrics,
+            "model_tiers": container[IModelTiers].get_metrics,
+            "token_usage": accountant.get_summary,
+            "session_store": store.get_metrics,
+            "history": history.get_metrics,
+            "tool_memo": container[IToolMemo].get_metrics,
+            "response_cache": container[IResponseCache].get_metrics,
+            "aad_token": get_token_fetch_metrics,
+        },
+        prometheus=render_prometheus,
+        run_scope=lambda session: accountant.track(session.usage),
+    )
+    # open connections stay open for the drain timeout before runs are cancelled
+    uvicorn.run(
+        app,
+        host=env.server_host,
+        port=env.server_port,
+        timeout_graceful_shutdown=int(env.server_drain_timeout),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Literal
 
 from agents import (
@@ -9,13 +12,15 @@ from agents import (
 )
 from pydantic import BaseModel
 
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
 from openai_agent.agentic_patterns.common.language_agents import (
+    SOURCE_LANGUAGES,
     TranslationOutput,
-    french_agent,
-    italian_agent,
-    spanish_agent,
+    get_translation_tool,
+    translate_from,
 )
-from openai_agent.agentic_patterns.common.llm_model import llm_model
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.services.model_tiers import SMALL
 
 # in the other example, we default the language to Spanish if not specified.
 # here, we will use a context object to control which languages are available
@@ -28,10 +33,11 @@ language_options = [
 ]
 
 
+LanguagePreference = Literal["spanish_only", "french_spanish", "italian_spanish"]
+
+
 class AppContext(BaseModel):
-    language_preference: Literal[
-        "spanish_only", "french_spanish", "italian_spanish"
-    ] = "spanish_only"
+    language_preference: LanguagePreference = "spanish_only"
 
 
 def french_spanish_enabled(
@@ -48,34 +54,39 @@ def italian_spanish_enabled(
     return ctx.context.language_preference == "italian_spanish"
 
 
-orchestrator_agent = Agent(
-    name="orchestrator_agent",
-    instructions=(
-        "You are a translator. You use the tools given to you to respond to users. "
-        "You must call ALL available tools to provide responses in different"
-        "languages. You never respond in languages yourself, you always use the "
-        "provided tools."
-    ),
-    tools=[
-        spanish_agent.as_tool(
-            tool_name="translate_to_spanish",
-            tool_description="Translate the doctor's message to Spanish",
-            is_enabled=True,
-        ),
-        french_agent.as_tool(
-            tool_name="translate_to_french",
-            tool_description="Translate the doctor's message to French",
-            is_enabled=french_spanish_enabled,
-        ),
-        italian_agent.as_tool(
-            tool_name="translate_to_italian",
-            tool_description="Translate the doctor's message to Italian",
-            is_enabled=italian_spanish_enabled,
+@dataclass
+class Translator:
+    language: str
+    is_enabled: bool | Callable[[RunContextWrapper[AppContext], AgentBase], bool]
+
+
+TRANSLATORS = [
+    Translator("Spanish", True),
+    Translator("French", french_spanish_enabled),
+    Translator("Italian", italian_spanish_enabled),
+]
+
+_FAN_OUT_AGENT = Agent(name="translation_fan_out")
+"""Passed to the `is_enabled` callbacks, which only read the context."""
+
+
+@agent_registry.register()
+def get_orchestrator_agent() -> Agent:
+    return Agent(
+        name="orchestrator_agent",
+        instructions=(
+            "You are a translator. You use the tools given to you to respond to "
+            "users. You must call ALL available tools to provide responses in "
+            "different languages. You never respond in languages yourself, you "
+            "always use the provided tools."
         ),
-    ],
-    model=llm_model,
-    output_type=TranslationOutput,
-)
+        tools=[
+            get_translation_tool(translator.language, translator.is_enabled)
+            for translator in TRANSLATORS
+        ],
+        model=get_llm_model(tier=SMALL, agent="orchestrator_agent"),
+        output_type=TranslationOutput,
+    )
 
 
 def select_languages() -> RunContextWrapper:
@@ -99,7 +110,67 @@ def select_languages() -> RunContextWrapper:
     )
 
 
-async def main():
+async def translate(msg: str, context: AppContext) -> TranslationOutput:
+    result = await Runner.run(
+        starting_agent=get_orchestrator_agent(),
+        input=msg,
+        context=context,
+    )
+    return result.final_output
+
+
+def get_enabled_translators(context: AppContext) -> list[Translator]:
+    wrapper = RunContextWrapper(context)
+    enabled = []
+    for translator in TRANSLATORS:
+        is_enabled = translator.is_enabled
+        if callable(is_enabled):
+            is_enabled = is_enabled(wrapper, _FAN_OUT_AGENT)
+        if is_enabled:
+            enabled.append(translator)
+    return enabled
+
+
+async def translate_fan_out(msg: str, context: AppContext) -> TranslationOutput:
+    """Runs the enabled translators directly instead of asking the orchestrator to
+    call them. Translators are started together, one that translates from another
+    language waits for that translation only. Sentences are translated through
+    the translation memory, so chained translators reuse the remembered
+    intermediate sentences."""
+    by_language = {translator.language: translator for translator in TRANSLATORS}
+    tasks: dict[str, asyncio.Task[str]] = {}
+
+    async def run(translator: Translator) -> str:
+        source_language = SOURCE_LANGUAGES[translator.language]
+        text = msg
+        if source_language in by_language:
+            text = await get_task(source_language)
+        return await translate_from(text, source_language, translator.language)
+
+    def get_task(language: str) -> asyncio.Task[str]:
+        if language not in tasks:
+            tasks[language] = asyncio.create_task(run(by_language[language]))
+        return tasks[language]
+
+    enabled = get_enabled_translators(context)
+    try:
+        translations = await asyncio.gather(
+            *(get_task(translator.language) for translator in enabled)
+        )
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    return TranslationOutput(
+        input_text=msg,
+        translated_text="\n".join(
+            f"{translator.language}: {translation}"
+            for translator, translation in zip(enabled, translations)
+        ),
+    )
+
+
+async def main(fan_out: bool = False):
     context = select_languages()
 
     user_request = input(
@@ -107,17 +178,27 @@ async def main():
     )
 
     # Run with LLM interaction
-    result = await Runner.run(
-        starting_agent=orchestrator_agent,
-        input=user_request,
-        context=context.context,
-    )
-
-    print("\nResponse:")
+    started = time.perf_counter()
+    if fan_out:
+        translation = await translate_fan_out(user_request, context.context)
+    else:
+        translation = await translate(user_request, context.context)
+    elapsed = time.perf_counter() - started
+
+    print(f"\nResponse ({'fan-out' if fan_out else 'orchestrated'}, {elapsed:.2f}s):")
     print()
-    print(result.final_output.model_dump_json(indent=4))
+    print(translation.model_dump_json(indent=4))
     print()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--fan-out",
+        action="store_true",
+        help="Run the enabled translators directly, without the orchestrator.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.fan_out))
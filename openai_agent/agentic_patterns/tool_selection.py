@@ -1,48 +1,51 @@
 import asyncio
+from dataclasses import asdict
 
 from agents import (
     Agent,
     Runner,
 )
 
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
 from openai_agent.agentic_patterns.common.language_agents import (
     TranslationOutput,
-    french_agent,
-    italian_agent,
-    spanish_agent,
+    get_translation_tool,
 )
-from openai_agent.agentic_patterns.common.llm_model import llm_model
-
-orchestrator_agent = Agent(
-    name="orchestrator_agent",
-    instructions=(
-        "You are a medical translation orchestrator responsible for routing "
-        "translation requests to specialized medical translators. Analyze the "
-        "user's request to identify the target language (Spanish, French, or "
-        "Italian) and select the appropriate translation tool. If no specific "
-        "language is mentioned, default to Spanish translation. You must always "
-        "delegate translations to the specialized tools - never attempt to "
-        "translate directly. Ensure accurate routing for optimal medical "
-        "translation quality. You may need to use multiple tools in sequence "
-        "because some translations may require an intermediate language step."
-    ),
-    tools=[
-        spanish_agent.as_tool(
-            tool_name="translate_to_spanish",
-            tool_description="Translate the doctor's message to Spanish",
-        ),
-        french_agent.as_tool(
-            tool_name="translate_to_french",
-            tool_description="Translate the doctor's message to French",
-        ),
-        italian_agent.as_tool(
-            tool_name="translate_to_italian",
-            tool_description="Translate the doctor's message to Italian",
+from openai_agent.agentic_patterns.common.llm_model import get_llm_model
+from openai_agent.hosting import container
+from openai_agent.protocols.i_token_accountant import ITokenAccountant
+from openai_agent.protocols.i_tool_memo import IToolMemo
+from openai_agent.services.model_tiers import SMALL
+
+
+@agent_registry.register()
+def get_orchestrator_agent() -> Agent:
+    return Agent(
+        name="orchestrator_agent",
+        instructions=(
+            "You are a medical translation orchestrator responsible for routing "
+            "translation requests to specialized medical translators. Analyze the "
+            "user's request to identify the target language (Spanish, French, or "
+            "Italian) and select the appropriate translation tool. If no specific "
+            "language is mentioned, default to Spanish translation. You must always "
+            "delegate translations to the specialized tools - never attempt to "
+            "translate directly. Ensure accurate routing for optimal medical "
+            "translation quality. You may need to use multiple tools in sequence "
+            "because some translations may require an intermediate language step."
         ),
-    ],
-    model=llm_model,
-    output_type=TranslationOutput,
-)
+        tools=[
+            get_translation_tool("Spanish"),
+            get_translation_tool("French"),
+            get_translation_tool("Italian"),
+        ],
+        model=get_llm_model(tier=SMALL, agent="orchestrator_agent"),
+        output_type=TranslationOutput,
+    )
+
+
+async def translate(msg: str) -> TranslationOutput:
+    result = await Runner.run(get_orchestrator_agent(), msg)
+    return result.final_output
 
 
 async def main():
@@ -51,12 +54,19 @@ async def main():
         "(Spanish, French, Italian, or leave blank for Spanish): "
     )
 
-    orchestrator_result = await Runner.run(orchestrator_agent, msg)
+    accountant = container[ITokenAccountant]
+    # counts the orchestrator and every translator it calls
+    with accountant.track() as usage:
+        result = await Runner.run(get_orchestrator_agent(), msg)
+    translation: TranslationOutput = result.final_output
 
     print()
     print("Translation Result:")
-    print(orchestrator_result.final_output.model_dump_json(indent=4))
+    print(translation.model_dump_json(indent=4))
     print()
+    print(f"Token usage: {accountant.get_summary(usage)}")
+    # a translator the orchestrator calls twice with the same message runs once
+    print(f"Tool memo: {asdict(container[IToolMemo].get_run_stats(result))}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""Latency and errors of model calls during a partial outage, with one endpoint
+and with a pool of endpoints.
+
+Each endpoint is an in-process mock deployment. The first one is degraded, its
+latency is `--slowdown` times the others' and it throttles `--error-rate` of
+the requests with a 429. With one endpoint every call goes to it, as with a
+single `AZURE_OPENAI_ENDPOINT` in a regional slowdown; the pool adds `--healthy`
+endpoints and balances the calls across them. The table reports per mode the
+latency percentiles, the calls that failed after the client's retries and the
+requests each endpoint served.
+
+Usage:
+python -m openai_agent.benchmarks.endpoint_pool
+python -m openai_agent.benchmarks.endpoint_pool --calls 1000 --error-rate 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+import openai
+from agents import ModelSettings, ModelTracing, OpenAIChatCompletionsModel
+from openai import AsyncAzureOpenAI
+
+from openai_agent.services.endpoint_pool import (
+    BalancedTransport,
+    EndpointPool,
+    EndpointPoolEnv,
+)
+from openai_agent.serving.mock_openai import MockOpenAI, MockOpenAIEnv, create_mock_app
+
+
+class HostTransport(httpx.AsyncBaseTransport):
+    """Sends each request to the mock of its host."""
+
+    def __init__(self, transports: dict[str, httpx.AsyncBaseTransport]):
+        self.transports = transports
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transports[request.url.host].handle_async_request(request)
+
+
+async def run(
+    client: AsyncAzureOpenAI, calls: int, concurrency: int
+) -> tuple[list[float], int]:
+    model = OpenAIChatCompletionsModel("gpt", client)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def call(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await model.get_response(
+                    None,
+                    f"Patient {i} reports a headache.",
+                    ModelSettings(),
+                    [],
+                    None,
+                    [],
+                    ModelTracing.DISABLED,
+                    previous_response_id=None,
+                    conversation_id=None,
+                    prompt=None,
+                )
+            except openai.APIError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    return latencies, errors
+
+
+async def main(
+    calls: int,
+    concurrency: int,
+    healthy: int,
+    median_ms: float,
+    slowdown: float,
+    error_rate: float,
+) -> None:
+    print(
+        f"{'mode':<14} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}  requests per endpoint"
+    )
+    for endpoints in (1, 1 + healthy):
+        mocks = {
+            f"region{i}.example.com": MockOpenAI(
+                MockOpenAIEnv(
+                    mock_openai_latency="lognormal",
+                    mock_openai_latency_ms=median_ms * (slowdown if i == 0 else 1),
+                    mock_openai_latency_spread=0.3,
+                    mock_openai_token_latency_ms=0,
+                    mock_openai_error_rate=error_rate if i == 0 else 0.0,
+                    mock_openai_seed=str(i),
+                )
+            )
+            for i in range(endpoints)
+        }
+        pool = EndpointPool(
+            EndpointPoolEnv(
+                azure_openai_endpoint="http://region0.example.com",
+                azure_openai_deployed_model_name="gpt",
+                azure_openai_endpoints=json.dumps(
+                    [{"endpoint": f"http://{host}"} for host in mocks]
+                ),
+            )
+        )
+        transport: httpx.AsyncBaseTransport = HostTransport(
+            {
+                host: httpx.ASGITransport(app=create_mock_app(mock))
+                for host, mock in mocks.items()
+            }
+        )
+        if pool.size > 1:
+            transport = BalancedTransport(transport, pool)
+        client = AsyncAzureOpenAI(
+            azure_endpoint="http://region0.example.com",
+            api_key="mock",
+            api_version="2025-04-01-preview",
+            http_client=httpx.AsyncClient(transport=transport),
+        )
+
+        latencies, errors = await run(client, calls, concurrency)
+        quantiles = statistics.quantiles(latencies, n=100)
+        served = " ".join(str(mock.stats.requests) for mock in mocks.values())
+        print(
+            f"{f'{endpoints} endpoint(s)':<14} {quantiles[49] * 1000:>8.0f} "
+            f"{quantiles[98] * 1000:>8.0f} {errors:>7}  {served}"
+        )
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--healthy", type=int, default=2, help="Healthy endpoints.")
+    parser.add_argument("--median-ms", type=float, default=50.0)
+    parser.add_argument("--slowdown", type=float, default=8.0)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.calls,
+            args.concurrency,
+            args.healthy,
+            args.median_ms,
+            args.slowdown,
+            args.error_rate,
+        )
+    )
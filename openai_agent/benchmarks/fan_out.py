@@ -0,0 +1,80 @@
+"""Latency of the orchestrated and the fan-out translation paths.
+
+Both paths of `tool_conditional` translate the same message for every language
+preference against the configured deployment. The orchestrated path pays for the
+orchestrator deciding on the tool calls and for a final orchestrator turn; the
+fan-out path only runs the enabled translators. The response cache, translation
+memory and tool memo are disabled unless `--cache` is given, otherwise every run
+after the first would be answered without a request.
+
+Usage:
+python -m openai_agent.benchmarks.fan_out
+python -m openai_agent.benchmarks.fan_out --runs 5 --message "Take one pill daily."
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from openai_agent.agentic_patterns.tool_conditional import (
+    AppContext,
+    LanguagePreference,
+    translate,
+    translate_fan_out,
+)
+
+PREFERENCES: list[LanguagePreference] = [
+    "spanish_only",
+    "french_spanish",
+    "italian_spanish",
+]
+
+
+async def measure(fan_out: bool, message: str, context: AppContext) -> float:
+    started = time.perf_counter()
+    if fan_out:
+        await translate_fan_out(message, context)
+    else:
+        await translate(message, context)
+    return time.perf_counter() - started
+
+
+async def main(runs: int, message: str) -> None:
+    print(f"{'preference':<16} {'orchestrated':>14} {'fan-out':>10} {'speedup':>8}")
+    for preference in PREFERENCES:
+        context = AppContext(language_preference=preference)
+        orchestrated: list[float] = []
+        fan_out: list[float] = []
+        # alternate the paths so drifting latency of the deployment affects both
+        for _ in range(runs):
+            orchestrated.append(await measure(False, message, context))
+            fan_out.append(await measure(True, message, context))
+
+        orchestrated_s = statistics.median(orchestrated)
+        fan_out_s = statistics.median(fan_out)
+        print(
+            f"{preference:<16} {orchestrated_s:>13.2f}s {fan_out_s:>9.2f}s "
+            f"{orchestrated_s / fan_out_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="Runs per path.")
+    parser.add_argument(
+        "--message",
+        default="Take two tablets every eight hours after meals.",
+        help="The message to translate.",
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="Keep the caches configured in .env."
+    )
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["TRANSLATION_MEMORY_ENABLED"] = "false"
+        os.environ["TOOL_MEMO_ENABLED"] = "false"
+    asyncio.run(main(args.runs, args.message))
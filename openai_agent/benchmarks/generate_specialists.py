@@ -0,0 +1,44 @@
+"""Generates a synthetic specialist directory for the `get_specialist` tool.
+
+`--count` specialists in `--cities` cities are written to `--output`, by default
+`SPECIALIST_DIRECTORY_PATH`, in the memory mapped layout of
+`openai_agent.services.specialist_directory`.
+
+Usage:
+python -m openai_agent.benchmarks.generate_specialists
+python -m openai_agent.benchmarks.generate_specialists --count 5000000 --seed 1
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from openai_agent.services.specialist_directory import (
+    SpecialistDirectoryEnv,
+    generate_specialists,
+    write_directory,
+)
+
+
+def main(count: int, cities: int, seed: int | None, output: str) -> None:
+    started = time.perf_counter()
+    data = generate_specialists(count, cities, seed)
+    with open(output, "wb") as file:
+        write_directory(data, file)
+    size = Path(output).stat().st_size
+    print(
+        f"Wrote {count} specialists in {cities} cities to {output} "
+        f"({size / 2**20:.1f} MiB) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates a specialist directory.")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--output", default=SpecialistDirectoryEnv().specialist_directory_path
+    )
+    args = parser.parse_args()
+    main(args.count, args.cities, args.seed, args.output)
@@ -0,0 +1,106 @@
+"""Latency percentiles of model calls with and without hedging.
+
+Calls go to an in-process mock deployment whose first token latency follows a
+lognormal distribution with a long tail. `--concurrency` calls run at a time.
+The table reports per mode the latency percentiles, the share of calls that
+were hedged, the share of hedges that answered first and the requests the mock
+served per call, the extra load hedging costs.
+
+Usage:
+python -m openai_agent.benchmarks.hedging
+python -m openai_agent.benchmarks.hedging --calls 2000 --spread 1.2 --budget 0.05
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from agents import Model, ModelSettings, ModelTracing, OpenAIChatCompletionsModel
+from openai import AsyncAzureOpenAI
+
+from openai_agent.models.hedged_model import HedgedModel
+from openai_agent.services.hedge_policy import HedgePolicy, HedgePolicyEnv
+from openai_agent.serving.mock_openai import MockOpenAI, MockOpenAIEnv, create_mock_app
+
+
+async def run(model: Model, calls: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def call(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await model.get_response(
+                None,
+                f"Patient {i} reports a headache.",
+                ModelSettings(),
+                [],
+                None,
+                [],
+                ModelTracing.DISABLED,
+                previous_response_id=None,
+                conversation_id=None,
+                prompt=None,
+            )
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    return latencies
+
+
+async def main(
+    calls: int, concurrency: int, median_ms: float, spread: float, budget: float
+) -> None:
+    print(
+        f"{'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'hedged':>7} {'wins':>6} {'req/call':>9}"
+    )
+    for hedged in (False, True):
+        mock = MockOpenAI(
+            MockOpenAIEnv(
+                mock_openai_latency="lognormal",
+                mock_openai_latency_ms=median_ms,
+                mock_openai_latency_spread=spread,
+                mock_openai_token_latency_ms=0,
+                mock_openai_seed="1",
+            )
+        )
+        client = AsyncAzureOpenAI(
+            azure_endpoint="http://mock",
+            api_key="mock",
+            api_version="2025-04-01-preview",
+            http_client=httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=create_mock_app(mock))
+            ),
+        )
+        model: Model = OpenAIChatCompletionsModel("gpt", client)
+        policy = HedgePolicy(HedgePolicyEnv(llm_hedging_budget=budget))
+        if hedged:
+            model = HedgedModel(model, policy, "gpt")
+
+        quantiles = statistics.quantiles(await run(model, calls, concurrency), n=100)
+        metrics = policy.get_metrics()
+        print(
+            f"{'hedged' if hedged else 'plain':<10} {quantiles[49] * 1000:>8.0f} "
+            f"{quantiles[94] * 1000:>8.0f} {quantiles[98] * 1000:>8.0f} "
+            f"{metrics['hedge_rate']:>7.1%} {metrics['win_rate']:>6.0%} "
+            f"{mock.stats.requests / calls:>9.2f}"
+        )
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--median-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--spread", type=float, default=1.0, help="Sigma of the lognormal latency."
+    )
+    parser.add_argument("--budget", type=float, default=0.1, help="Hedges per call.")
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.calls, args.concurrency, args.median_ms, args.spread, args.budget)
+    )
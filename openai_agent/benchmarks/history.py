@@ -0,0 +1,115 @@
+"""Prompt size of a long session with and without history compaction.
+
+A session of `--turns` turns, each a patient message, a tool call with an
+output of `--output-chars` and a reply, is compacted before every turn as the
+handoff pattern does. Summaries take `--summary-ms`, as a model call would, and
+the turns go on meanwhile. The table reports every `--every` turns the
+estimated history tokens sent without and with compaction, and the last line
+the time compacting a turn takes.
+
+Usage:
+python -m openai_agent.benchmarks.history
+python -m openai_agent.benchmarks.history --turns 200 --max-tokens 4000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from agents import TResponseInputItem
+
+from openai_agent.services.history_manager import (
+    HistoryEnv,
+    HistoryManager,
+    estimate_tokens,
+)
+
+
+def get_turn(i: int, output_chars: int) -> list[TResponseInputItem]:
+    return [
+        {
+            "role": "user",
+            "content": f"Turn {i}: the pain in my left knee is worse when I climb "
+            "stairs, is there an orthopedic specialist near Seattle?",
+        },
+        {
+            "type": "function_call",
+            "call_id": f"call_{i}",
+            "name": "get_specialist",
+            "arguments": '{"city": "Seattle", "specialty": "orthopedics"}',
+        },
+        {
+            "type": "function_call_output",
+            "call_id": f"call_{i}",
+            "output": "Dr. Smith, Seattle, orthopedics. " * (output_chars // 33),
+        },
+        {
+            "role": "assistant",
+            "content": "Dr. Smith in Seattle treats knee injuries, rest the knee "
+            "and avoid stairs until your appointment.",
+        },
+    ]
+
+
+async def main(
+    turns: int,
+    every: int,
+    output_chars: int,
+    max_tokens: int,
+    summary_tokens: int,
+    summary_ms: float,
+) -> None:
+    manager = HistoryManager(
+        HistoryEnv(history_max_tokens=max_tokens, history_summary_tokens=summary_tokens)
+    )
+
+    async def summarize(items: list[TResponseInputItem]) -> str:
+        await asyncio.sleep(summary_ms / 1000)
+        return "The patient has knee pain climbing stairs. " * 20
+
+    history: list[TResponseInputItem] = []
+    durations: list[float] = []
+    print(f"{'turn':>5} {'full':>8} {'compacted':>10} {'saved':>6}")
+    for turn in range(1, turns + 1):
+        started = time.perf_counter()
+        compacted = manager.compact("session", history, summarize)
+        durations.append(time.perf_counter() - started)
+        if turn % every == 0:
+            full = estimate_tokens(history)
+            print(
+                f"{turn:>5} {full:>8} {compacted.tokens:>10} "
+                f"{compacted.saved_tokens / max(full, 1):>6.0%}"
+            )
+        history += get_turn(turn, output_chars)
+        # the model call of the turn, summaries run meanwhile
+        await asyncio.sleep(0.001)
+
+    metrics = manager.get_metrics()
+    print(
+        f"compaction p50 {statistics.median(durations) * 1e6:.0f} us, "
+        f"max {max(durations) * 1e6:.0f} us; {metrics['summaries']:.0f} summaries, "
+        f"{metrics['pruned']:.0f} tool outputs pruned, "
+        f"{metrics['dropped']:.0f} turns dropped"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--every", type=int, default=10)
+    parser.add_argument("--output-chars", type=int, default=2000)
+    parser.add_argument("--max-tokens", type=int, default=8000)
+    parser.add_argument("--summary-tokens", type=int, default=6000)
+    parser.add_argument("--summary-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.turns,
+            args.every,
+            args.output_chars,
+            args.max_tokens,
+            args.summary_tokens,
+            args.summary_ms,
+        )
+    )
@@ -0,0 +1,252 @@
+"""Latency, throughput and error rates of the patterns under load.
+
+Each scenario runs single turns of a pattern, either closed loop with
+`--concurrency` turns in flight, or open loop starting `--rps` turns per second
+however many are still running. Every turn goes through the shared client, so
+the rate limiter and connection pool are part of the measurement. The response
+cache, translation memory and tool memo are disabled unless `--cache` is given,
+otherwise repeated messages and tool calls would be answered without a request.
+
+With `--mock` the patterns run against the local mock deployment
+(`openai_agent.serving.mock_openai`), started on `--mock-port` with its
+`MOCK_OPENAI_*` settings from the environment. Without it they run against the
+deployment configured in `.env`, and spend real tokens.
+
+Usage:
+python -m openai_agent.benchmarks.load_test --mock
+python -m openai_agent.benchmarks.load_test handoff guardrail --mock --concurrency 64 --duration 30
+python -m openai_agent.benchmarks.load_test deterministic_flow --mock --rps 50 --duration 60
+"""  # noqa: E501
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+
+Scenario = Callable[[int], Awaitable[None]]
+"""Runs the i-th turn of a pattern."""
+
+MESSAGES = [
+    "I have chest pain and palpitations",
+    "My toddler has a fever and a rash",
+    "Where can I buy oxycodone without a prescription?",
+    "What are the side effects of ibuprofen?",
+    "I keep getting heartburn and acid reflux",
+    "Can you get me something stronger for the pain?",
+]
+
+CONDITIONS = ["diabetes", "pneumonia", "migraine", "appendicitis", "gout"]
+
+NOTES = [
+    "Take two tablets every eight hours after meals.",
+    "Rest and drink plenty of fluids. Call us if the fever persists.",
+]
+
+
+async def run_handoff(i: int) -> None:
+    from agents import Runner
+
+    from openai_agent.agentic_patterns import handoff
+
+    message = MESSAGES[i % len(MESSAGES)]
+    result = Runner.run_streamed(handoff.select_agent(message), input=message)
+    async for _ in handoff.stream_text(result):
+        pass
+
+
+async def run_guardrail(i: int) -> None:
+    from openai_agent.agentic_patterns import guardrail
+
+    message = MESSAGES[i % len(MESSAGES)]
+    await guardrail.respond([{"role": "user", "content": message}], f"load-{i}")
+
+
+async def run_deterministic_flow(i: int) -> None:
+    from openai_agent.agentic_patterns import deterministic_flow
+
+    await deterministic_flow.run_flow(CONDITIONS[i % len(CONDITIONS)])
+
+
+async def run_translation(i: int) -> None:
+    from openai_agent.agentic_patterns import tool_conditional
+    from openai_agent.benchmarks.fan_out import PREFERENCES
+
+    preference = PREFERENCES[i % len(PREFERENCES)]
+    context = tool_conditional.AppContext(language_preference=preference)
+    await tool_conditional.translate(NOTES[i % len(NOTES)], context)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "handoff": run_handoff,
+    "guardrail": run_guardrail,
+    "deterministic_flow": run_deterministic_flow,
+    "translation": run_translation,
+}
+
+
+@dataclass
+class LoadResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def turns(self) -> int:
+        return len(self.latencies) + self.errors.total()
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.elapsed_seconds
+
+    def percentile(self, q: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else float("nan")
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[q - 1]
+
+
+async def measure(scenario: Scenario, i: int, result: LoadResult) -> None:
+    started = time.perf_counter()
+    try:
+        await scenario(i)
+    except Exception as e:
+        result.errors[type(e).__name__] += 1
+    else:
+        result.latencies.append(time.perf_counter() - started)
+
+
+async def closed_loop(
+    scenario: Scenario, concurrency: int, duration: float
+) -> LoadResult:
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+    turns = iter(range(sys.maxsize))
+
+    async def work() -> None:
+        while time.perf_counter() < deadline:
+            await measure(scenario, next(turns), result)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(work() for _ in range(concurrency)))
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
+
+
+async def open_loop(scenario: Scenario, rps: float, duration: float) -> LoadResult:
+    result = LoadResult()
+    tasks: set[asyncio.Task[None]] = set()
+
+    started = time.perf_counter()
+    for i in range(int(rps * duration)):
+        # start on schedule, late turns don't delay the ones after them
+        await asyncio.sleep(max(0.0, started + i / rps - time.perf_counter()))
+        task = asyncio.create_task(measure(scenario, i, result))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
+
+
+def print_result(name: str, result: LoadResult) -> None:
+    error_rate = result.errors.total() / result.turns if result.turns else 0.0
+    print(
+        f"{name:<20} {result.turns:>6} {error_rate:>7.1%} {result.throughput:>8.1f} "
+        f"{result.percentile(50):>7.3f}s {result.percentile(95):>7.3f}s "
+        f"{result.percentile(99):>7.3f}s"
+    )
+    for error, count in result.errors.most_common():
+        print(f"{'':<20} {count:>6} {error}")
+
+
+def start_mock(port: int) -> subprocess.Popen[bytes]:
+    """Starts the mock deployment and points the client at it."""
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "openai_agent.serving.mock_openai"],
+        env={**os.environ, "MOCK_OPENAI_PORT": str(port)},
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{url}/stats")
+            break
+        except httpx.TransportError:
+            time.sleep(0.1)
+    else:
+        mock.terminate()
+        raise RuntimeError("The mock deployment did not start.")
+
+    os.environ["AZURE_OPENAI_ENDPOINT"] = url
+    os.environ["AZURE_OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("AZURE_OPENAI_API_VERSION", "2025-04-01-preview")
+    os.environ.setdefault("AZURE_OPENAI_DEPLOYED_MODEL_NAME", "mock")
+    return mock
+
+
+async def main(
+    scenarios: list[str],
+    concurrency: int,
+    rps: float | None,
+    duration: float,
+) -> None:
+    mode = f"{rps} rps" if rps else f"concurrency {concurrency}"
+    print(f"{duration:.0f}s per scenario at {mode}\n")
+    print(
+        f"{'scenario':<20} {'turns':>6} {'errors':>7} {'turns/s':>8} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for name in scenarios:
+        scenario = SCENARIOS[name]
+        # builds the agents and opens the first connection
+        await measure(scenario, 0, LoadResult())
+        if rps:
+            result = await open_loop(scenario, rps, duration)
+        else:
+            result = await closed_loop(scenario, concurrency, duration)
+        print_result(name, result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "scenarios", nargs="*", help=f"Any of {', '.join(SCENARIOS)}, default all."
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rps", type=float, help="Open loop turns per second.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds.")
+    parser.add_argument("--mock", action="store_true", help="Use the mock.")
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument(
+        "--cache", action="store_true", help="Keep the caches configured in .env."
+    )
+    args = parser.parse_args()
+    if unknown := set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if not args.cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["TRANSLATION_MEMORY_ENABLED"] = "false"
+        os.environ["TOOL_MEMO_ENABLED"] = "false"
+    mock = start_mock(args.mock_port) if args.mock else None
+    try:
+        asyncio.run(
+            main(
+                args.scenarios or list(SCENARIOS),
+                args.concurrency,
+                args.rps,
+                args.duration,
+            )
+        )
+        if mock is not None:
+            stats = httpx.get(f"http://127.0.0.1:{args.mock_port}/stats").json()
+            print(f"\nmock: {stats}")
+    finally:
+        if mock is not None:
+            mock.terminate()
@@ -0,0 +1,109 @@
+"""Prompt cache hits of the doctor and language agents, per prompt layout.
+
+Every doctor and language agent answers one message per round, first with only
+its role as instructions, the layout before the shared prefix, then with the
+instructions it is built with; only the doctors start theirs with the shared
+prefix, the language agents keep short instructions. The table reports per
+agent and layout the prompt tokens, the share of them served from the
+provider's prompt cache, the mean latency and the cost at the `TOKEN_PRICE_*`
+prices. The response cache is disabled, cached responses would report no usage.
+
+Usage:
+python -m openai_agent.benchmarks.prompt_cache
+python -m openai_agent.benchmarks.prompt_cache --rounds 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import defaultdict
+
+from agents import Agent, Runner
+
+from openai_agent.benchmarks.load_test import MESSAGES, NOTES
+
+
+def get_agents(layout: str) -> list[tuple[Agent, str]]:
+    """The agents of a layout, with the message each of them answers."""
+    from openai_agent.agentic_patterns.common.doctor_agents import (
+        DOCTOR_INSTRUCTIONS,
+        get_all_agents,
+    )
+    from openai_agent.agentic_patterns.common.language_agents import (
+        INSTRUCTIONS,
+        LANGUAGE_AGENTS,
+        SOURCE_LANGUAGES,
+    )
+
+    agents = [
+        (agent, MESSAGES[i % len(MESSAGES)]) for i, agent in enumerate(get_all_agents())
+    ]
+    agents += [(get(), NOTES[0]) for get in LANGUAGE_AGENTS.values()]
+    if layout == "shared prefix":
+        return agents
+
+    roles = {
+        f"{language.lower()}_agent": INSTRUCTIONS.replace(
+            "@@to_language@@", language
+        ).replace("@@from_language@@", source)
+        for language, source in SOURCE_LANGUAGES.items()
+    } | DOCTOR_INSTRUCTIONS
+    return [
+        (agent.clone(instructions=roles[agent.name]), message)
+        for agent, message in agents
+    ]
+
+
+async def main(rounds: int) -> None:
+    from openai_agent.hosting import container
+    from openai_agent.protocols.i_token_accountant import ITokenAccountant
+    from openai_agent.services.token_budget import TokenUsage
+
+    accountant = container[ITokenAccountant]
+    print(
+        f"{'agent':<28} {'layout':<14} {'prompt':>8} {'cached':>7} "
+        f"{'latency':>8} {'cost $':>9}"
+    )
+    for layout in ("role only", "shared prefix"):
+        usages: defaultdict[str, TokenUsage] = defaultdict(TokenUsage)
+        latencies: defaultdict[str, list[float]] = defaultdict(list)
+        agents = get_agents(layout)
+        for _ in range(rounds):
+            for agent, message in agents:
+                started = time.perf_counter()
+                with accountant.track() as usage:
+                    await Runner.run(agent, message)
+                latencies[agent.name].append(time.perf_counter() - started)
+                usages[agent.name].input_tokens += usage.input_tokens
+                usages[agent.name].cached_tokens += usage.cached_tokens
+                usages[agent.name].output_tokens += usage.output_tokens
+
+        total = TokenUsage()
+        for name, usage in usages.items():
+            total.input_tokens += usage.input_tokens
+            total.cached_tokens += usage.cached_tokens
+            total.output_tokens += usage.output_tokens
+            print(
+                f"{name:<28} {layout:<14} {usage.input_tokens:>8} "
+                f"{usage.cached_tokens / usage.input_tokens:>7.0%} "
+                f"{statistics.mean(latencies[name]):>7.3f}s "
+                f"{accountant.get_cost(usage):>9.5f}"
+            )
+        all_latencies = [latency for values in latencies.values() for latency in values]
+        print(
+            f"{'all':<28} {layout:<14} {total.input_tokens:>8} "
+            f"{total.cached_tokens / total.input_tokens:>7.0%} "
+            f"{statistics.mean(all_latencies):>7.3f}s "
+            f"{accountant.get_cost(total):>9.5f}\n"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=3, help="Runs per agent.")
+    args = parser.parse_args()
+
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    asyncio.run(main(args.rounds))
@@ -0,0 +1,205 @@
+"""Accuracy and hop savings of the local handoff router.
+
+Each labeled patient message is routed with the local router. Messages the router
+is not confident about, or with signs of an emergency, fall back to the LLM
+triage agent (one extra model call before the specialist answers); confidently
+routed messages skip that hop. A wrong local route is worse than a fallback, so
+the benchmark fails when fewer than `--min-precision` of the local routes are
+correct.
+Later turns of a conversation stay with the current specialist, so a session of
+`--turns` turns saves one triage hop per later turn compared with restarting at
+triage every turn.
+
+The router is built from the department vocabularies, so messages written from
+them would measure nothing. The default messages are held out: written the way
+patients describe their problem, not from the vocabularies, and including the
+load test messages, some of which belong to no specialist and should fall back.
+`--messages` reads a JSONL file of `{"message": ..., "agent": ...}` instead,
+such as the handoffs of the triage agent in production, with a null agent for
+messages triage kept.
+
+Usage:
+python -m openai_agent.benchmarks.routing
+python -m openai_agent.benchmarks.routing --turns 5 --verbose
+python -m openai_agent.benchmarks.routing --messages triage_log.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from openai_agent.agentic_patterns.common.doctor_agents import get_doctor_router
+from openai_agent.benchmarks.load_test import MESSAGES as LOAD_TEST_MESSAGES
+
+LOAD_TEST_LABELS: dict[str, str | None] = {
+    "I have chest pain and palpitations": "cardiology_agent",
+    "My toddler has a fever and a rash": "pediatrics_agent",
+    "Where can I buy oxycodone without a prescription?": None,
+    "What are the side effects of ibuprofen?": None,
+    "I keep getting heartburn and acid reflux": "gastroenterology_agent",
+    "Can you get me something stronger for the pain?": None,
+}
+
+HELD_OUT_MESSAGES: list[tuple[str, str | None]] = [
+    (
+        "My son swallowed a whole bottle of pills an hour ago",
+        "emergency_department_agent",
+    ),
+    (
+        "There's blood everywhere, I sliced my hand open with a kitchen knife",
+        "emergency_department_agent",
+    ),
+    (
+        "My lips and tongue are swelling up after eating peanuts",
+        "emergency_department_agent",
+    ),
+    (
+        "They're taking out my gallbladder next week, what should I expect?",
+        "surgery_agent",
+    ),
+    (
+        "The stitches on my belly from last week's keyhole procedure are oozing",
+        "surgery_agent",
+    ),
+    (
+        "How long should I fast before going under for my hernia repair?",
+        "surgery_agent",
+    ),
+    (
+        "My wife is on a breathing machine and the doctors say she is critical",
+        "icu_agent",
+    ),
+    ("Dad's kidneys and lungs are failing and he's sedated", "icu_agent"),
+    ("My heart races and skips beats when I climb the stairs", "cardiology_agent"),
+    (
+        "I get a tight squeezing feeling behind my breastbone when I walk uphill",
+        "cardiology_agent",
+    ),
+    ("My doctor said my cholesterol numbers are dangerously high", "cardiology_agent"),
+    ("I'm 30 weeks along and my waters might have broken", "obstetrics_agent"),
+    ("I just found out I'm expecting, when is my first checkup?", "obstetrics_agent"),
+    ("I've been bleeding since giving birth two weeks ago", "obstetrics_agent"),
+    ("My 2 year old keeps pulling at his ear and crying at night", "pediatrics_agent"),
+    ("Is it normal that my 8 month old isn't crawling yet?", "pediatrics_agent"),
+    ("My teenager has terrible acne and won't eat", "pediatrics_agent"),
+    (
+        "The scan found a shadow on my lung and they want to test it for cancer",
+        "oncology_agent",
+    ),
+    ("My hair is falling out since I started my cancer treatment", "oncology_agent"),
+    ("The mole on my back has changed color and bleeds", "oncology_agent"),
+    (
+        "The left side of my face is drooping and my words come out wrong",
+        "neurology_agent",
+    ),
+    ("I keep forgetting names and getting lost in my own street", "neurology_agent"),
+    ("My hand shakes when I try to hold a cup", "neurology_agent"),
+    ("What does it mean that my x-ray report mentions an opacity?", "radiology_agent"),
+    ("Do I need to stop eating before my abdominal ultrasound?", "radiology_agent"),
+    ("I'm claustrophobic, can I be sedated for the MRI?", "radiology_agent"),
+    (
+        "I twisted my ankle on the stairs and can't put weight on it",
+        "orthopedics_agent",
+    ),
+    ("My lower back locks up every morning", "orthopedics_agent"),
+    (
+        "I can't lift my arm above my shoulder since I fell off my bike",
+        "orthopedics_agent",
+    ),
+    ("I've been throwing up everything I eat for two days", "gastroenterology_agent"),
+    ("There's blood in my stool and I've lost weight", "gastroenterology_agent"),
+    ("The whites of my eyes have turned yellow", "gastroenterology_agent"),
+    ("Can I get a copy of my medical records?", None),
+    ("What are your visiting hours?", None),
+    ("I need a sick note for my employer", None),
+]
+"""Patient messages, written without the vocabularies, labeled with the
+specialist they should be routed to, None for those that belong to none."""
+
+
+def get_default_messages() -> list[tuple[str, str | None]]:
+    return HELD_OUT_MESSAGES + [
+        (message, LOAD_TEST_LABELS[message]) for message in LOAD_TEST_MESSAGES
+    ]
+
+
+def read_messages(path: Path) -> list[tuple[str, str | None]]:
+    with path.open() as file:
+        rows = [json.loads(line) for line in file if line.strip()]
+    return [(row["message"], row.get("agent")) for row in rows]
+
+
+def main(
+    messages: list[tuple[str, str | None]],
+    turns: int,
+    verbose: bool,
+    min_precision: float,
+) -> bool:
+    """Prints the report, returns False when the share of local routes that are
+    correct is below `min_precision`."""
+    router = get_doctor_router()
+    routed = correct = fallback_correct = 0
+
+    start = time.perf_counter()
+    decisions = [router.route(message) for message, _ in messages]
+    elapsed_us = (time.perf_counter() - start) / len(messages) * 1e6
+
+    for (message, expected), decision in zip(messages, decisions):
+        if decision.route is not None:
+            routed += 1
+            correct += decision.route == expected
+        else:
+            fallback_correct += expected is None
+        if verbose:
+            status = decision.route or (
+                "escalated" if decision.escalated else "fallback"
+            )
+            mark = "" if decision.route in (None, expected) else f" (want {expected})"
+            print(f"{decision.confidence:5.2f} {status:<27} {message}{mark}")
+
+    total = len(messages)
+    unlabeled = sum(expected is None for _, expected in messages)
+    # triage hops per session: first turn unless routed locally, plus one per
+    # later turn when every turn restarts at triage
+    baseline_hops = total * turns
+    saved_hops = routed + total * (turns - 1)
+
+    print(f"messages:          {total}")
+    print(f"routed locally:    {routed} ({routed / total:.0%})")
+    precision = correct / routed if routed else 1.0
+    print(f"local precision:   {precision:.0%} (target {min_precision:.0%})")
+    print(f"wrongly routed:    {routed - correct}")
+    print(
+        f"fallback to LLM:   {total - routed} ({fallback_correct}/{unlabeled} "
+        "without a specialist)"
+    )
+    print(f"escalated:         {router.stats.escalations}")
+    print(f"routing latency:   {elapsed_us:.0f} us/message")
+    print(f"triage hops saved: {saved_hops}/{baseline_hops} over {turns} turn sessions")
+    return precision >= min_precision
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1, help="Turns per session.")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument(
+        "--messages", type=Path, help="JSONL of labeled messages, e.g. triage logs."
+    )
+    parser.add_argument(
+        "--min-precision",
+        type=float,
+        default=0.95,
+        help="Fail when fewer of the local routes are correct.",
+    )
+    args = parser.parse_args()
+    messages = read_messages(args.messages) if args.messages else None
+    if not main(
+        messages or get_default_messages(),
+        args.turns,
+        args.verbose,
+        args.min_precision,
+    ):
+        sys.exit("Local routing precision is below the target.")
@@ -0,0 +1,126 @@
+"""Lookup latency and memory footprint of the specialist directory.
+
+A directory of `--count` specialists is generated and written to a temporary
+file, or the one at `--path` is opened, and memory mapped. The table reports per
+kind of query the lookup latency percentiles, then the file size and the memory
+the process holds for it: the Python heap (the city index) and the resident set
+growth, which includes the pages of the file the lookups touched. With
+`--baseline` the same specialists are also kept as a Python list and searched
+by scanning it, the layout a naive directory would use.
+
+Usage:
+python -m openai_agent.benchmarks.specialist_directory
+python -m openai_agent.benchmarks.specialist_directory --count 5000000 --baseline
+python -m openai_agent.benchmarks.specialist_directory --path .specialists.bin
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from openai_agent.services.specialist_directory import (
+    SpecialistDirectory,
+    SpecialistDirectoryEnv,
+    SpecialistRecord,
+    generate_specialists,
+    write_directory,
+)
+
+QUERIES: dict[str, tuple[str, str | None]] = {
+    "city and specialty": ("Seattle", "cardiologist"),
+    "city only": ("Chicago", None),
+    "prefix": ("San", "pediatrician"),
+    "fuzzy": ("Seatle", "oncologist"),
+    "miss": ("Atlantis", "cardiology"),
+}
+
+
+def get_rss_bytes() -> int:
+    """The resident set size of the process, 0 where /proc is not available."""
+    try:
+        pages = Path("/proc/self/statm").read_text().split()[1]
+    except OSError:
+        return 0
+    return int(pages) * 4096
+
+
+def measure(search: Callable[[str, str | None], object], lookups: int) -> None:
+    print(f"{'query':<20} {'p50 us':>9} {'p99 us':>9}")
+    for name, (city, specialty) in QUERIES.items():
+        latencies = []
+        for _ in range(lookups):
+            started = time.perf_counter()
+            search(city, specialty)
+            latencies.append((time.perf_counter() - started) * 1e6)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"{name:<20} {quantiles[49]:>9.1f} {quantiles[98]:>9.1f}")
+
+
+def scan(
+    records: list[SpecialistRecord], city: str, specialty: str | None
+) -> list[SpecialistRecord]:
+    return [
+        record
+        for record in records
+        if record.city == city and specialty in (None, record.specialty)
+    ][:5]
+
+
+def main(path: str | None, count: int, cities: int, lookups: int, baseline: bool):
+    env = SpecialistDirectoryEnv()
+    with tempfile.TemporaryDirectory() as directory:
+        if path is None:
+            path = str(Path(directory) / "specialists.bin")
+            started = time.perf_counter()
+            with open(path, "wb") as file:
+                write_directory(generate_specialists(count, cities, seed=1), file)
+            print(
+                f"generated {count} specialists in {cities} cities in "
+                f"{time.perf_counter() - started:.1f}s\n"
+            )
+
+        rss = get_rss_bytes()
+        tracemalloc.start()
+        started = time.perf_counter()
+        specialists = SpecialistDirectory.open(env, path)
+        opened = time.perf_counter() - started
+        heap, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        measure(specialists.search, lookups)
+        print(
+            f"\nindexed: {specialists.count} specialists, "
+            f"file {Path(path).stat().st_size / 2**20:.1f} MiB, "
+            f"opened in {opened * 1000:.0f} ms, heap {heap / 2**20:.1f} MiB, "
+            f"rss +{(get_rss_bytes() - rss) / 2**20:.1f} MiB"
+        )
+
+        if baseline:
+            rss = get_rss_bytes()
+            records = [
+                record
+                for city in range(len(specialists.cities))
+                for record in specialists.search(
+                    specialists.cities[city], None, limit=specialists.count
+                )
+            ]
+            print(f"\nbaseline, {len(records)} records in a list")
+            measure(lambda city, specialty: scan(records, city, specialty), 5)
+            print(f"\nbaseline: rss +{(get_rss_bytes() - rss) / 2**20:.1f} MiB")
+        specialists.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", help="Opens this directory instead of generating.")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=2000, help="Per query.")
+    parser.add_argument(
+        "--baseline", action="store_true", help="Also scans an in-memory list."
+    )
+    args = parser.parse_args()
+    main(args.path, args.count, args.cities, args.lookups, args.baseline)
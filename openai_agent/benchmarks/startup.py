@@ -0,0 +1,202 @@
+"""Cold-import benchmark for the Taskfile entry points.
+
+Every `python -m <module>` entry point in Taskfile.yml is imported in a fresh
+interpreter with `-X importtime`, then the first registered agent is built.
+The report shows the wall clock time, the cumulative import time of the module,
+the time until the first agent is ready (import and build, agents are built on
+first use), the slowest imports and how many agents were built at import time
+(which should always be 0).
+
+With `--baseline` the entry points are measured in a worktree of that revision
+too, for the import and ready times before and after. Revisions without the
+agent registry built their agents on import, they are ready once imported.
+
+Usage:
+python -m openai_agent.benchmarks.startup
+python -m openai_agent.benchmarks.startup --runs 5 --max-ms 3000
+python -m openai_agent.benchmarks.startup --baseline main
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+TASKFILE = Path(__file__).parents[2] / "Taskfile.yml"
+
+PROBE = """\
+import time
+import {module}
+try:
+    from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+except ImportError:
+    print(-1, 0.0)
+else:
+    names = agent_registry.names()
+    built = sum(agent_registry.is_built(name) for name in names)
+    started = time.perf_counter()
+    if names:
+        agent_registry.get(names[0])
+    print(built, (time.perf_counter() - started) * 1000)
+"""
+"""Prints the agents built on import, -1 without a registry, and the
+milliseconds it took to build the first agent."""
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    wall_ms: float
+    import_ms: float
+    build_ms: float
+    """Milliseconds to build the first agent after the import."""
+    agents_built: int
+    """Agents built on import, -1 for revisions without the agent registry."""
+    slowest: list[tuple[str, float]]
+
+    @property
+    def ready_ms(self) -> float:
+        return self.import_ms + self.build_ms
+
+
+def get_entry_points(taskfile: Path = TASKFILE) -> list[str]:
+    modules = re.findall(r"python -m (openai_agent[\w.]*)", taskfile.read_text())
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """Map of module name to cumulative import time in milliseconds."""
+    timings: dict[str, float] = {}
+    for match in re.finditer(r"import time:\s+\d+ \|\s+(\d+) \| +(\S+)", stderr):
+        timings[match.group(2)] = int(match.group(1)) / 1000
+    return timings
+
+
+def measure(module: str, root: Path = TASKFILE.parent) -> ImportTiming:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=root,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    timings = parse_importtime(proc.stderr)
+    slowest = sorted(
+        ((name, ms) for name, ms in timings.items() if name != module),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    agents_built, build_ms = proc.stdout.split()[-2:]
+    return ImportTiming(
+        module=module,
+        wall_ms=wall_ms,
+        import_ms=timings.get(module, 0.0),
+        build_ms=float(build_ms),
+        agents_built=int(agents_built),
+        slowest=slowest[:3],
+    )
+
+
+def measure_median(module: str, runs: int, root: Path) -> ImportTiming | None:
+    """The median timings of `runs` imports, None if the module fails to import,
+    such as an entry point the revision at `root` doesn't have."""
+    try:
+        samples = [measure(module, root) for _ in range(runs)]
+    except subprocess.CalledProcessError:
+        return None
+    return ImportTiming(
+        module=module,
+        wall_ms=statistics.median(s.wall_ms for s in samples),
+        import_ms=statistics.median(s.import_ms for s in samples),
+        build_ms=statistics.median(s.build_ms for s in samples),
+        agents_built=max(s.agents_built for s in samples),
+        slowest=samples[-1].slowest,
+    )
+
+
+def measure_baseline(
+    modules: list[str], runs: int, revision: str
+) -> dict[str, ImportTiming | None]:
+    """The timings of the entry points in a temporary worktree of `revision`."""
+    root = TASKFILE.parent
+    with tempfile.TemporaryDirectory() as worktree:
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, revision],
+            capture_output=True,
+            check=True,
+            cwd=root,
+        )
+        try:
+            return {
+                module: measure_median(module, runs, Path(worktree))
+                for module in modules
+            }
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                capture_output=True,
+                cwd=root,
+            )
+
+
+def main(runs: int, max_ms: float | None, baseline: str | None = None) -> int:
+    modules = get_entry_points()
+    before = measure_baseline(modules, runs, baseline) if baseline else {}
+
+    failed = False
+    header = f"{'module':<55} {'wall ms':>9} {'import ms':>10} {'ready ms':>9}"
+    if baseline:
+        header += f" {'import before':>14} {'ready before':>13}"
+    print(f"{header} {'agents':>7}")
+    for module in modules:
+        timing = measure_median(module, runs, TASKFILE.parent)
+        if timing is None:
+            print(f"{module:<55} failed to import")
+            failed = True
+            continue
+
+        row = (
+            f"{module:<55} {timing.wall_ms:>9.1f} {timing.import_ms:>10.1f} "
+            f"{timing.ready_ms:>9.1f}"
+        )
+        if baseline:
+            old = before.get(module)
+            row += (
+                f" {old.import_ms:>14.1f} {old.ready_ms:>13.1f}"
+                if old is not None
+                else f" {'-':>14} {'-':>13}"
+            )
+        print(f"{row} {timing.agents_built:>7}")
+        for name, ms in timing.slowest:
+            print(f"    {name:<51} {ms:>20.1f}")
+
+        if timing.agents_built or (max_ms is not None and timing.import_ms > max_ms):
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="Runs per entry point.")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail when the median import time of an entry point exceeds this.",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="A git revision to compare against, measured in a temporary worktree.",
+    )
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.max_ms, args.baseline))
@@ -0,0 +1,177 @@
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    RunContextWrapper,
+    TResponseInputItem,
+)
+
+
+def get_message_hash(*items: TResponseInputItem) -> str:
+    raw = json.dumps(
+        [[item.get("role"), item.get("content")] for item in items],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class GuardrailContext:
+    """The run context that tells the guardrail which session a check is for."""
+
+    session_id: str
+
+
+def get_new_user_messages(
+    items: list[TResponseInputItem],
+) -> tuple[int, list[TResponseInputItem]]:
+    """The user messages after the last assistant turn, and the index where they
+    start. Everything before that index was already checked in an earlier turn.
+    """
+    start = len(items)
+    while start > 0 and items[start - 1].get("role") == "user":
+        start -= 1
+    return start, items[start:]
+
+
+@dataclass
+class FullHistoryPolicy:
+    every_n_checks: int = 0
+    """Check the whole conversation every n-th check, 0 disables full checks."""
+
+    context_messages: int = 0
+    """Earlier messages sent along with the new ones, so the check can resolve
+    references such as "the ones I asked about before"."""
+
+    def requires_full_check(self, checks: int) -> bool:
+        return self.every_n_checks > 0 and checks % self.every_n_checks == 0
+
+
+@dataclass
+class IncrementalGuardrailStats:
+    checks: int = 0
+    full_checks: int = 0
+    messages_checked: int = 0
+    messages_skipped: int = 0
+
+
+@dataclass
+class IncrementalGuardrail:
+    """Runs `guardrail` on the new user messages of a conversation only.
+
+    Verdicts are stored by the hash of the message and the context it was
+    checked with, so repeated content is never checked twice and the cost of a
+    check does not grow with the conversation length. `policy` decides when the
+    whole history must be checked anyway, counting the checks of each session;
+    runs with a `GuardrailContext` are counted by its session, the others
+    together.
+    """
+
+    guardrail: InputGuardrail[Any]
+    policy: FullHistoryPolicy = field(default_factory=FullHistoryPolicy)
+    max_verdicts: int = 10_000
+    max_sessions: int = 10_000
+    stats: IncrementalGuardrailStats = field(default_factory=IncrementalGuardrailStats)
+    _verdicts: OrderedDict[str, GuardrailFunctionOutput] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _checks: OrderedDict[str | None, int] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+
+    def as_input_guardrail(self) -> InputGuardrail[Any]:
+        return InputGuardrail(
+            guardrail_function=self.check, name=self.guardrail.get_name()
+        )
+
+    async def check(
+        self,
+        context: RunContextWrapper[Any],
+        agent: Agent[Any],
+        input: str | list[TResponseInputItem],
+    ) -> GuardrailFunctionOutput:
+        items: list[TResponseInputItem] = (
+            [{"role": "user", "content": input}] if isinstance(input, str) else input
+        )
+        self.stats.checks += 1
+
+        if self.policy.requires_full_check(self._count_check(context)):
+            self.stats.full_checks += 1
+            # verdicts of the whole history only hold for this conversation
+            return await self._run(context, agent, items, items, None)
+
+        start, new_messages = get_new_user_messages(items)
+        context_items = (
+            items[:start][-self.policy.context_messages :]
+            if self.policy.context_messages
+            else []
+        )
+        unchecked: list[TResponseInputItem] = []
+        for message in new_messages:
+            key = get_message_hash(*context_items, message)
+            verdict = self._verdicts.get(key)
+            if verdict is None:
+                unchecked.append(message)
+                continue
+
+            self._verdicts.move_to_end(key)
+            self.stats.messages_skipped += 1
+            if verdict.tripwire_triggered:
+                return verdict
+
+        if not unchecked:
+            return GuardrailFunctionOutput(output_info=None, tripwire_triggered=False)
+
+        return await self._run(
+            context, agent, context_items + unchecked, unchecked, context_items
+        )
+
+    def _count_check(self, context: RunContextWrapper[Any]) -> int:
+        """Count a check of the session of the run, the checks of it so far."""
+        session_id = (
+            context.context.session_id
+            if isinstance(context.context, GuardrailContext)
+            else None
+        )
+        checks = self._checks.pop(session_id, 0) + 1
+        self._checks[session_id] = checks
+        while len(self._checks) > self.max_sessions:
+            self._checks.popitem(last=False)
+        return checks
+
+    async def _run(
+        self,
+        context: RunContextWrapper[Any],
+        agent: Agent[Any],
+        input: list[TResponseInputItem],
+        messages: list[TResponseInputItem],
+        context_items: list[TResponseInputItem] | None,
+    ) -> GuardrailFunctionOutput:
+        """Check `input`, the verdict of its user `messages` is stored with the
+        `context_items` they were checked with, not at all when None."""
+        result = await self.guardrail.run(agent, input, context)
+        output = result.output
+
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        self.stats.messages_checked += len(user_messages)
+        # a trip can't be attributed to one message when several were checked
+        if context_items is None or (
+            output.tripwire_triggered and len(user_messages) > 1
+        ):
+            return output
+        for message in user_messages:
+            self._store(get_message_hash(*context_items, message), output)
+        return output
+
+    def _store(self, key: str, output: GuardrailFunctionOutput) -> None:
+        self._verdicts[key] = output
+        self._verdicts.move_to_end(key)
+        while len(self._verdicts) > self.max_verdicts:
+            self._verdicts.popitem(last=False)
@@ -0,0 +1,150 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    InputGuardrailResult,
+    InputGuardrailTripwireTriggered,
+    RunContextWrapper,
+    Runner,
+    RunResult,
+    TResponseInputItem,
+)
+
+from openai_agent.services.lexicon_classifier import LexiconClassifier
+
+
+def get_user_messages(input: str | list[TResponseInputItem]) -> list[str]:
+    """The texts of the user messages, oldest first."""
+    if isinstance(input, str):
+        return [input]
+
+    messages: list[str] = []
+    for item in input:
+        if item.get("role") != "user":
+            continue
+
+        content = item.get("content")
+        if isinstance(content, str):
+            messages.append(content)
+        else:
+            messages.append(
+                " ".join(
+                    str(part.get("text", ""))
+                    for part in content or []
+                    if isinstance(part, dict)
+                )
+            )
+    return messages
+
+
+def get_last_user_message(input: str | list[TResponseInputItem]) -> str:
+    """The text of the most recent user message."""
+    messages = get_user_messages(input)
+    return messages[-1] if messages else ""
+
+
+@dataclass
+class TieredGuardrailStats:
+    local_allowed: int = 0
+    local_blocked: int = 0
+    escalated: int = 0
+
+
+@dataclass
+class TieredGuardrail:
+    """An input guardrail with a local fast path.
+
+    The latest user message is scored by `classifier` first. Clear cases are
+    decided locally; only uncertain messages are escalated to `guardrail`,
+    usually an LLM backed check. A message is only allowed locally if the
+    earlier user messages, scored together with it, are allowed too, so a
+    request spread over several turns is escalated.
+    """
+
+    classifier: LexiconClassifier
+    guardrail: InputGuardrail[Any]
+    stats: TieredGuardrailStats = field(default_factory=TieredGuardrailStats)
+
+    def check_local(
+        self, input: str | list[TResponseInputItem]
+    ) -> InputGuardrailResult | None:
+        """The local verdict, or None when the guardrail needs to be escalated."""
+        messages = get_user_messages(input)
+        verdict = self.classifier.classify(messages[-1] if messages else "")
+        if verdict.decision == "allow" and len(messages) > 1:
+            verdict = self.classifier.classify(" ".join(messages))
+            if verdict.decision != "allow":
+                verdict.decision = "uncertain"
+
+        if verdict.decision == "uncertain":
+            self.stats.escalated += 1
+            return None
+
+        if verdict.decision == "block":
+            self.stats.local_blocked += 1
+        else:
+            self.stats.local_allowed += 1
+
+        return InputGuardrailResult(
+            guardrail=self.guardrail,
+            output=GuardrailFunctionOutput(
+                output_info=verdict,
+                tripwire_triggered=verdict.decision == "block",
+            ),
+        )
+
+
+async def run_guarded(
+    agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    guardrails: list[TieredGuardrail | InputGuardrail[Any]],
+    context: Any = None,
+    **kwargs: Any,
+) -> RunResult:
+    """Run `agent` behind `guardrails`.
+
+    Local verdicts are taken first and a local block trips before any model call.
+    The remaining guardrails run concurrently with each other and with the agent;
+    the first tripwire cancels the agent run and every other check, and raises
+    `InputGuardrailTripwireTriggered`. The agent result is only returned once all
+    guardrails have passed.
+
+    The guardrails must not also be set on `agent.input_guardrails`.
+    """
+    pending: list[InputGuardrail[Any]] = []
+    for guardrail in guardrails:
+        if isinstance(guardrail, TieredGuardrail):
+            result = guardrail.check_local(input)
+            if result is None:
+                pending.append(guardrail.guardrail)
+            elif result.output.tripwire_triggered:
+                raise InputGuardrailTripwireTriggered(result)
+        else:
+            pending.append(guardrail)
+
+    if not pending:
+        return await Runner.run(agent, input, context=context, **kwargs)
+
+    context_wrapper = RunContextWrapper(context)
+    run_task = asyncio.create_task(Runner.run(agent, input, context=context, **kwargs))
+    check_tasks = [
+        asyncio.create_task(guardrail.run(agent, input, context_wrapper))
+        for guardrail in pending
+    ]
+
+    try:
+        for done in asyncio.as_completed(check_tasks):
+            result = await done
+            if result.output.tripwire_triggered:
+                raise InputGuardrailTripwireTriggered(result)
+        return await run_task
+    finally:
+        tasks = [run_task, *check_tasks]
+        for task in tasks:
+            task.cancel()
+        # let the cancelled run and checks finish before the caller goes on
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -5,15 +5,36 @@ Utilizes the Lagom library for dependency injection, see more at:
 - https://github.com/meadsteve/lagom
 """
 
+import atexit
 import logging
 import os
+from functools import cache
+from pathlib import Path
 
 from dotenv import load_dotenv
 from lagom import Container, dependency_definition
 
 from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
+from openai_agent.protocols.i_batch_job_backend import IBatchJobBackend
+from openai_agent.protocols.i_endpoint_pool import IEndpointPool
+from openai_agent.protocols.i_hedge_policy import IHedgePolicy
+from openai_agent.protocols.i_history_manager import IHistoryManager
+from openai_agent.protocols.i_model_tiers import IModelTiers
+from openai_agent.protocols.i_rate_limiter import IRateLimiter
+from openai_agent.protocols.i_response_cache import IResponseCache
+from openai_agent.protocols.i_session_manager import ISessionManager
+from openai_agent.protocols.i_session_store import ISessionStore
+from openai_agent.protocols.i_specialist_directory import ISpecialistDirectory
+from openai_agent.protocols.i_token_accountant import ITokenAccountant
+from openai_agent.protocols.i_tool_memo import IToolMemo
+from openai_agent.protocols.i_trace_metrics import ITraceMetrics
+from openai_agent.protocols.i_translation_memory import ITranslationMemory
 
-load_dotenv(dotenv_path=".env")
+
+@cache
+def load_env() -> None:
+    """Loads `.env` once, on first resolution rather than at import time."""
+    load_dotenv(dotenv_path=".env")
 
 
 container = Container()
@@ -25,13 +46,152 @@ container = Container()
 
 @dependency_definition(container, singleton=True)
 def logger() -> logging.Logger:
+    load_env()
     logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
     logging.Formatter(fmt=" %(name)s :: %(levelname)-8s :: %(message)s")
     return logging.getLogger("openai-agent")
 
 
+@dependency_definition(container, singleton=True)
+def rate_limiter() -> IRateLimiter:
+    from openai_agent.services.rate_limiter import RateLimiter
+
+    load_env()
+    return container[RateLimiter]
+
+
+@dependency_definition(container, singleton=True)
+def endpoint_pool() -> IEndpointPool:
+    from openai_agent.services.endpoint_pool import EndpointPool
+
+    load_env()
+    return container[EndpointPool]
+
+
 @dependency_definition(container, singleton=True)
 def azure_openai_service() -> IAzureOpenAIService:
     from openai_agent.services.azure_openai_service import AzureOpenAIService
 
+    load_env()
     return container[AzureOpenAIService]
+
+
+@dependency_definition(container, singleton=True)
+def model_tiers() -> IModelTiers:
+    from openai_agent.services.model_tiers import ModelTiers
+
+    load_env()
+    return container[ModelTiers]
+
+
+@dependency_definition(container, singleton=True)
+def hedge_policy() -> IHedgePolicy:
+    from openai_agent.services.hedge_policy import HedgePolicy
+
+    load_env()
+    return container[HedgePolicy]
+
+
+@dependency_definition(container, singleton=True)
+def response_cache() -> IResponseCache:
+    from openai_agent.services.response_cache import ResponseCache
+
+    load_env()
+    response_cache = container[ResponseCache]
+    atexit.register(response_cache.close)
+    return response_cache
+
+
+@dependency_definition(container, singleton=True)
+def session_manager() -> ISessionManager:
+    from openai_agent.services.session_manager import SessionManager
+
+    load_env()
+    return container[SessionManager]
+
+
+@dependency_definition(container, singleton=True)
+def session_store() -> ISessionStore:
+    from openai_agent.services.session_store import (
+        MemorySessionStore,
+        SessionStoreEnv,
+        SqliteSessionStore,
+    )
+
+    load_env()
+    if container[SessionStoreEnv].session_store_backend == "sqlite":
+        return container[SqliteSessionStore]
+    return container[MemorySessionStore]
+
+
+@dependency_definition(container, singleton=True)
+def history_manager() -> IHistoryManager:
+    from openai_agent.services.history_manager import HistoryManager
+
+    load_env()
+    return container[HistoryManager]
+
+
+@dependency_definition(container, singleton=True)
+def specialist_directory() -> ISpecialistDirectory:
+    from openai_agent.services.specialist_directory import (
+        SpecialistDirectory,
+        SpecialistDirectoryEnv,
+    )
+
+    load_env()
+    return SpecialistDirectory.load(container[SpecialistDirectoryEnv])
+
+
+@dependency_definition(container, singleton=True)
+def translation_memory() -> ITranslationMemory:
+    from openai_agent.services.translation_memory import TranslationMemory
+
+    load_env()
+    translation_memory = container[TranslationMemory]
+    atexit.register(translation_memory.close)
+    return translation_memory
+
+
+@dependency_definition(container, singleton=True)
+def tool_memo() -> IToolMemo:
+    from openai_agent.services.tool_memo import ToolMemo
+
+    load_env()
+    return container[ToolMemo]
+
+
+@dependency_definition(container, singleton=True)
+def trace_metrics() -> ITraceMetrics:
+    from openai_agent.services.trace_metrics import TraceMetrics
+
+    load_env()
+    return container[TraceMetrics]
+
+
+@dependency_definition(container, singleton=True)
+def token_accountant() -> ITokenAccountant:
+    from openai_agent.services.token_budget import TokenAccountant
+
+    load_env()
+    return container[TokenAccountant]
+
+
+@dependency_definition(container, singleton=True)
+def batch_job_backend() -> IBatchJobBackend:
+    from openai_agent.services.batch_jobs import (
+        AzureBatchJobBackend,
+        BatchJobEnv,
+        LocalBatchJobBackend,
+        complete_with_client,
+    )
+
+    load_env()
+    env = container[BatchJobEnv]
+    if env.batch_backend == "local":
+        return LocalBatchJobBackend(
+            directory=Path(env.batch_local_dir),
+            complete=complete_with_client(container[IAzureOpenAIService].get_client()),
+            concurrency=env.batch_local_concurrency,
+        )
+    return container[AzureBatchJobBackend]
@@ -0,0 +1,151 @@
+import hashlib
+import json
+from collections.abc import AsyncIterator
+
+from agents import (
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from agents.items import TResponseStreamEvent
+from openai.types.responses import ResponseOutputItem
+from openai.types.responses.response_prompt_param import ResponsePromptParam
+from pydantic import TypeAdapter
+
+from openai_agent.protocols.i_response_cache import IResponseCache
+
+_output_adapter = TypeAdapter(list[ResponseOutputItem])
+
+
+def get_cache_key(
+    model_name: str,
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    model_settings: ModelSettings,
+    tools: list[Tool],
+    output_schema: AgentOutputSchemaBase | None,
+    handoffs: list[Handoff],
+) -> str:
+    """Hash of everything that determines the model response."""
+    payload = {
+        "model": model_name,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict(),
+        "tools": [
+            [tool.name, getattr(tool, "params_json_schema", None)] for tool in tools
+        ],
+        "output_schema": (
+            output_schema.json_schema()
+            if output_schema and not output_schema.is_plain_text()
+            else None
+        ),
+        "handoffs": [[h.tool_name, h.input_json_schema] for h in handoffs],
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CachingModel(Model):
+    """Exact-match response cache around another model.
+
+    Only `get_response` is cached; streamed responses and calls that rely on
+    server side conversation state are passed through. Cached responses report
+    zero usage since no request was made. Agents that must not be cached should
+    use the wrapped model directly.
+    """
+
+    def __init__(self, model: Model, model_name: str, cache: IResponseCache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> ModelResponse:
+        async def fetch() -> ModelResponse:
+            return await self.model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                conversation_id=conversation_id,
+                prompt=prompt,
+            )
+
+        if previous_response_id or conversation_id or prompt:
+            return await fetch()
+
+        fetched: ModelResponse | None = None
+
+        async def fetch_serialized() -> str:
+            nonlocal fetched
+            fetched = await fetch()
+            return json.dumps([item.model_dump(mode="json") for item in fetched.output])
+
+        key = get_cache_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+        payload = await self.cache.get_or_set(key, fetch_serialized)
+        if fetched is not None:
+            return fetched
+
+        return ModelResponse(
+            output=_output_adapter.validate_json(payload),
+            usage=Usage(),
+            response_id=None,
+        )
+
+    def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        return self.model.stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        )
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
+
+from agents import (
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+)
+from agents.items import TResponseStreamEvent
+from openai.types.responses.response_prompt_param import ResponsePromptParam
+
+from openai_agent.protocols.i_hedge_policy import IHedgePolicy
+
+T = TypeVar("T")
+
+_Stream = tuple[TResponseStreamEvent, asyncio.Queue[Any], asyncio.Task[None]]
+"""The first event of a streamed call, the queue of its later events and the
+task that fills it."""
+
+
+class HedgedModel(Model):
+    """Sends a duplicate of a call to another model when the call has not
+    produced its first token within the delay of the hedge policy, continues
+    with whichever of them produces it first and cancels the other.
+
+    For `get_response` the first token is the whole response. A streamed call
+    runs in a task of its own, so the stream can be given up without leaving
+    it half iterated. A call that fails while its twin is still running waits
+    for the twin. Wrap the metering model in this one, not the other way around,
+    so both calls are accounted, the cancelled one too.
+    """
+
+    def __init__(self, model: Model, policy: IHedgePolicy, deployment: str):
+        self.model = model
+        self.policy = policy
+        self.deployment = deployment
+
+    async def _hedge(
+        self,
+        call: Callable[[], Awaitable[T]],
+        streamed: bool,
+        discard: Callable[[T], object] | None = None,
+    ) -> T:
+        delay = self.policy.start(self.deployment, streamed)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        calls = [primary]
+        try:
+            if delay is not None:
+                await asyncio.wait([primary], timeout=delay)
+                if not primary.done() and self.policy.try_hedge():
+                    calls.append(asyncio.ensure_future(call()))
+
+            pending = set(calls)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = next((t for t in done if t.exception() is None), None)
+                if winner is not None:
+                    break
+                if not pending:
+                    # every call failed, raise the error of the last one
+                    return await done.pop()
+
+            # the caller waited since the primary call started
+            self.policy.record_first_token(
+                self.deployment,
+                streamed,
+                time.perf_counter() - started,
+                winner is not primary,
+            )
+            for task in done - {winner}:
+                if discard is not None and task.exception() is None:
+                    discard(task.result())
+            return winner.result()
+        finally:
+            for task in calls:
+                task.cancel()
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> ModelResponse:
+        return await self._hedge(
+            lambda: self.model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                conversation_id=conversation_id,
+                prompt=prompt,
+            ),
+            streamed=False,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        async def pump(queue: asyncio.Queue[Any]) -> None:
+            try:
+                async for event in self.model.stream_response(
+                    system_instructions,
+                    input,
+                    model_settings,
+                    tools,
+                    output_schema,
+                    handoffs,
+                    tracing,
+                    previous_response_id=previous_response_id,
+                    conversation_id=conversation_id,
+                    prompt=prompt,
+                ):
+                    queue.put_nowait(event)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(None)
+
+        async def start() -> _Stream:
+            queue: asyncio.Queue[Any] = asyncio.Queue()
+            task = asyncio.ensure_future(pump(queue))
+            try:
+                first = await queue.get()
+            except BaseException:
+                task.cancel()
+                raise
+            if isinstance(first, Exception):
+                raise first
+            return first, queue, task
+
+        first, queue, task = await self._hedge(
+            start, streamed=True, discard=lambda stream: stream[2].cancel()
+        )
+        try:
+            event = first
+            while event is not None:
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+                event = await queue.get()
+        finally:
+            task.cancel()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from agents import (
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from agents.items import TResponseStreamEvent
+from openai.types.responses.response_prompt_param import ResponsePromptParam
+
+from openai_agent.protocols.i_token_accountant import ITokenAccountant
+
+
+def estimate_usage(
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    output_tokens: int = 0,
+) -> Usage:
+    """The usage of a call that ended before the model reported it: the prompt at
+    roughly 4 characters per token and the output tokens streamed so far."""
+    prompt = input if isinstance(input, str) else json.dumps(input, default=str)
+    input_tokens = (len(system_instructions or "") + len(prompt)) // 4
+    return Usage(
+        requests=1,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+class MeteredModel(Model):
+    """Accounts the usage of every call to another model and stops runs whose
+    budget is used up before they make another call.
+
+    Streamed calls ask for usage, which chat completions only report on request,
+    and are accounted when the stream completes. Calls cancelled before, such as
+    the losing duplicate of a hedged call or a stream given up once the wanted
+    field arrived, are accounted by `estimate_usage`, with one output token per
+    streamed delta.
+    """
+
+    def __init__(self, model: Model, accountant: ITokenAccountant):
+        self.model = model
+        self.accountant = accountant
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> ModelResponse:
+        self.accountant.check()
+        try:
+            response = await self.model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                conversation_id=conversation_id,
+                prompt=prompt,
+            )
+        except asyncio.CancelledError:
+            self.accountant.record(estimate_usage(system_instructions, input))
+            raise
+        self.accountant.record(response.usage)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        self.accountant.check()
+        if model_settings.include_usage is None:
+            model_settings = model_settings.resolve(ModelSettings(include_usage=True))
+
+        output_tokens = 0
+        completed = False
+        try:
+            async for event in self.model.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                previous_response_id=previous_response_id,
+                conversation_id=conversation_id,
+                prompt=prompt,
+            ):
+                if event.type == "response.completed" and event.response.usage:
+                    usage = event.response.usage
+                    self.accountant.record(
+                        Usage(
+                            requests=1,
+                            input_tokens=usage.input_tokens,
+                            input_tokens_details=usage.input_tokens_details,
+                            output_tokens=usage.output_tokens,
+                            output_tokens_details=usage.output_tokens_details,
+                            total_tokens=usage.total_tokens,
+                        )
+                    )
+                    completed = True
+                elif event.type.endswith(".delta"):
+                    output_tokens += 1
+                yield event
+        except (asyncio.CancelledError, GeneratorExit):
+            if not completed:
+                self.accountant.record(
+                    estimate_usage(system_instructions, input, output_tokens)
+                )
+            raise
@@ -0,0 +1,96 @@
+import time
+from collections.abc import AsyncIterator
+
+from agents import (
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+)
+from agents.items import TResponseStreamEvent
+from openai.types.responses.response_prompt_param import ResponsePromptParam
+
+from openai_agent.protocols.i_trace_metrics import ITraceMetrics
+
+
+class TracedModel(Model):
+    """Records what the SDK spans of another model's calls lack: the time to the
+    first token of streamed responses and the prompt tokens served from the
+    provider's prompt cache.
+    """
+
+    def __init__(self, model: Model, metrics: ITraceMetrics):
+        self.model = model
+        self.metrics = metrics
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> ModelResponse:
+        response = await self.model.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        )
+        self.metrics.record_cached_tokens(
+            response.usage.input_tokens_details.cached_tokens or 0
+        )
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        conversation_id: str | None,
+        prompt: ResponsePromptParam | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        started = time.perf_counter()
+        first_token = True
+        async for event in self.model.stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            previous_response_id=previous_response_id,
+            conversation_id=conversation_id,
+            prompt=prompt,
+        ):
+            # text, refusal and tool call arguments all arrive as deltas
+            if first_token and event.type.endswith(".delta"):
+                self.metrics.record_first_token(time.perf_counter() - started)
+                first_token = False
+            if event.type == "response.completed" and event.response.usage:
+                details = event.response.usage.input_tokens_details
+                self.metrics.record_cached_tokens(details.cached_tokens or 0)
+            yield event
@@ -6,7 +6,8 @@ from openai import AsyncAzureOpenAI
 class IAzureOpenAIService(Protocol):
     def get_client(self) -> AsyncAzureOpenAI:
         """
-        Get the Azure OpenAI client.
+        Get the shared Azure OpenAI client. The client (and its connection pool)
+        is created once and reused by every caller.
 
         :return: An instance of AsyncAzureOpenAI.
         """
@@ -19,3 +20,20 @@ class IAzureOpenAIService(Protocol):
         :return: The deployment name as a string.
         """
         ...
+
+    async def warm_up(self, connections: int | None = None) -> None:
+        """
+        Open connections to every Azure OpenAI endpoint ahead of the first
+        request, past the rate limiter, and fetch the first Azure AD token when
+        no API key is configured.
+
+        :param connections: The number of connections to open per endpoint,
+            defaults to the configured value.
+        """
+        ...
+
+    async def close(self) -> None:
+        """
+        Close the shared client and release its pooled connections.
+        """
+        ...
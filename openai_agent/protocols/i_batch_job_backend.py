@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from openai_agent.services.batch_jobs import BatchJob
+
+
+class IBatchJobBackend(Protocol):
+    async def submit(self, requests_path: Path) -> BatchJob:
+        """
+        Upload a JSONL file of chat completion requests and start a batch job
+        for it. The file is streamed, not read into memory.
+
+        :param requests_path: The file of requests, one per line.
+        :return: The started job.
+        """
+        ...
+
+    async def get_job(self, job_id: str) -> BatchJob:
+        """
+        Get the current state of a job.
+
+        :param job_id: The id returned by `submit`.
+        :return: The job.
+        """
+        ...
+
+    async def download(
+        self, job: BatchJob, output_path: Path, errors_path: Path
+    ) -> None:
+        """
+        Stream the results of a finished job to local files.
+
+        :param job: The finished job.
+        :param output_path: The file the successful responses are written to.
+        :param errors_path: The file the failed requests are written to.
+        """
+        ...
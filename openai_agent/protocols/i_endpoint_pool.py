@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections.abc import Collection
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from openai_agent.services.endpoint_pool import Endpoint
+
+
+class IEndpointPool(Protocol):
+    @property
+    def size(self) -> int:
+        """
+        Get the number of endpoints, a pool of one needs no balancing.
+
+        :return: The number of endpoints.
+        """
+        ...
+
+    endpoints: list[Endpoint]
+    """The endpoints of the pool in the configured order, the client's endpoint
+    alone unless several are configured."""
+
+    def choose(self, exclude: Collection[int] = ()) -> tuple[Endpoint, bool] | None:
+        """
+        Choose the endpoint for a request, of those whose circuit is closed the
+        one expected to answer first by its latency, its outstanding requests
+        and its weight. The request must be reported to `record` and ended with
+        `release`.
+
+        :param exclude: The indexes of endpoints already tried for the request.
+        :return: The endpoint and whether the request probes its half-open
+            circuit, None if no endpoint is available.
+        """
+        ...
+
+    def record(
+        self,
+        endpoint: Endpoint,
+        seconds: float,
+        status_code: int | None,
+        retry_after: float | None = None,
+    ) -> None:
+        """
+        Record the response of an endpoint, 5xx, 429 and connection errors
+        count as failures of its circuit.
+
+        :param endpoint: The endpoint that was chosen.
+        :param seconds: Seconds until the response headers or the error.
+        :param status_code: The status code, None if the request failed to
+            connect or timed out.
+        :param retry_after: Seconds the endpoint asked to wait, for a 429.
+        """
+        ...
+
+    def release(self, endpoint: Endpoint, probe: bool = False) -> None:
+        """
+        End a request to an endpoint, once its response was read or discarded.
+
+        :param endpoint: The endpoint that was chosen.
+        :param probe: Whether the request was the probe of the circuit, a probe
+            that ended without a response lets the next request probe.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the failovers and per endpoint the requests, failures, latency,
+        outstanding requests and circuit state.
+
+        :return: The metrics by name.
+        """
+        ...
@@ -0,0 +1,55 @@
+from typing import Any, Protocol
+
+
+class IHedgePolicy(Protocol):
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether model calls should be hedged at all.
+
+        :return: True if hedging is enabled.
+        """
+        ...
+
+    def start(self, deployment: str, streamed: bool) -> float | None:
+        """
+        Called when a model call starts, adds to the hedge budget.
+
+        :param deployment: The deployment the call is made to.
+        :param streamed: True if the call is streamed, its first token is its
+            first event rather than the whole response.
+        :return: Seconds to wait for the first token before sending a duplicate
+            call, None while too few calls were timed to tell.
+        """
+        ...
+
+    def try_hedge(self) -> bool:
+        """
+        Take a duplicate call from the hedge budget.
+
+        :return: True if the budget allows the duplicate.
+        """
+        ...
+
+    def record_first_token(
+        self, deployment: str, streamed: bool, seconds: float, hedge: bool
+    ) -> None:
+        """
+        Record the first token of a call, from the call whose response is used.
+
+        :param deployment: The deployment the call was made to.
+        :param streamed: True if the call was streamed.
+        :param seconds: Seconds from the start of the call to its first token,
+            the time its caller waited even if a duplicate produced it.
+        :param hedge: True if the duplicate won.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Get the counts of calls and duplicates, the hedge and win rates and the
+        current delays by deployment.
+
+        :return: The metrics by name.
+        """
+        ...
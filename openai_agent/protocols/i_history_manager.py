@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Protocol
+
+from agents import TResponseInputItem
+
+if TYPE_CHECKING:
+    from openai_agent.services.history_manager import CompactedHistory
+
+Summarize = Callable[[list[TResponseInputItem]], Awaitable[str]]
+"""Summarizes the items of a conversation, the first may be an earlier summary."""
+
+
+class IHistoryManager(Protocol):
+    def compact(
+        self,
+        session_id: str,
+        history: list[TResponseInputItem],
+        summarize: Summarize | None = None,
+    ) -> CompactedHistory:
+        """
+        Compact the history of a session to the items sent with the next turn,
+        within the token budget. The older turns are replaced by the latest
+        summary of the session, then large tool outputs are pruned and at last
+        the oldest turns are dropped, as far as the configured strategies allow.
+        Once the history outgrows the summary threshold, a new summary is made
+        in the background with `summarize` and used from a later turn on.
+
+        :param session_id: The session id.
+        :param history: The items of the previous turns, oldest first.
+        :param summarize: Summarizes the older turns, none are summarized when
+            None.
+        :return: The items to send and the tokens they take and saved.
+        """
+        ...
+
+    def forget(self, session_id: str) -> None:
+        """
+        Drop the summary of a session and stop summarizing it.
+
+        :param session_id: The session id.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the compacted turns, the tokens saved and the summaries made.
+
+        :return: The metrics by name.
+        """
+        ...
@@ -0,0 +1,34 @@
+from typing import Protocol
+
+
+class IModelTiers(Protocol):
+    def get_tier(self, agent: str, default: str) -> str:
+        """
+        Get the tier an agent runs on, the tier it declares unless the
+        configuration overrides it.
+
+        :param agent: The name of the agent.
+        :param default: The tier the agent declares.
+        :return: The name of the tier.
+        """
+        ...
+
+    def get_deployment(self, tier: str) -> str:
+        """
+        Get the deployment the models of a tier are called on.
+
+        :param tier: The name of the tier.
+        :return: The deployment name.
+        :raises ValueError: If the tier is not configured.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, dict[str, str]]:
+        """
+        Get the deployment of every tier and the tier of every agent that was
+        resolved so far.
+
+        :return: The deployments by tier under "tiers" and the tiers by agent
+            under "agents".
+        """
+        ...
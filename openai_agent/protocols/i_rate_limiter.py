@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Mapping, Protocol
+
+
+class IRateLimiter(Protocol):
+    async def acquire(self, estimated_tokens: int) -> None:
+        """
+        Wait until a request may be sent. Every call must be followed by a call
+        to `release`, unless it is cancelled, which gives its reservation back.
+
+        :param estimated_tokens: The tokens the request is expected to use.
+        """
+        ...
+
+    def on_response(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Adapt the limits to the response of a request.
+
+        :param status_code: The HTTP status code of the response.
+        :param headers: The response headers, including the rate limit headers.
+        """
+        ...
+
+    async def release(self) -> None:
+        """
+        Free the concurrency slot of a finished request.
+        """
+        ...
+
+    def for_endpoint(self, name: str) -> IRateLimiter:
+        """
+        Get the limiter of one endpoint of a balanced deployment, with the same
+        limits but its own buckets, concurrency and pauses.
+
+        :param name: The name of the endpoint.
+        :return: The limiter of the endpoint, the same one for every call.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the current state of the limiter, and of the limiters of the
+        endpoints prefixed by their names.
+
+        :return: The metrics by name.
+        """
+        ...
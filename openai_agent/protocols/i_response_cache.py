@@ -0,0 +1,39 @@
+from typing import Awaitable, Callable, Protocol
+
+
+class IResponseCache(Protocol):
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether responses should be cached at all.
+
+        :return: True if caching is enabled.
+        """
+        ...
+
+    async def get_or_set(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        """
+        Get the cached value for a key, or compute and cache it. Concurrent calls
+        with the same key share a single call to `factory`.
+
+        Cancelling a call does not cancel the others sharing it.
+
+        :param key: The cache key.
+        :param factory: Computes the value on a cache miss.
+        :return: The cached or computed value.
+        """
+        ...
+
+    def close(self) -> None:
+        """
+        Close the on-disk tier, if any. Later calls only use the memory tier.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the number of cached and in flight responses and the cache statistics.
+
+        :return: The metrics by name.
+        """
+        ...
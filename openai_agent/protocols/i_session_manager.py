@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Protocol, TypeVar
+
+if TYPE_CHECKING:
+    from openai_agent.services.session_manager import Session
+
+T = TypeVar("T")
+
+
+class ISessionManager(Protocol):
+    def get_session(self, session_id: str | None = None) -> Session:
+        """
+        Get a session by id, creating it when it does not exist.
+
+        :param session_id: The session id, a new id is generated when omitted.
+        :return: The session.
+        """
+        ...
+
+    def remove_session(self, session_id: str) -> bool:
+        """
+        Cancel the runs of a session and forget its state.
+
+        :param session_id: The session id.
+        :return: True if the session existed.
+        """
+        ...
+
+    def start(
+        self, session: Session, run: Callable[[], Awaitable[T]]
+    ) -> asyncio.Task[T]:
+        """
+        Admit a run for a session and start it as a task. Runs of one session are
+        serialized, runs of different sessions execute concurrently up to the
+        configured limit.
+
+        :param session: The session the run belongs to.
+        :param run: Executes the run once a slot is free.
+        :return: The task of the run, cancelling it cancels the run.
+        :raises ServerBusyError: If the run queue is full or the server is
+            draining.
+        """
+        ...
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stop admitting runs, wait for the active ones and cancel those still
+        running after `timeout` seconds.
+
+        :param timeout: The maximum time to wait for active runs.
+        """
+        ...
+
+    def get_status(self) -> dict[str, Any]:
+        """
+        Get the current load of the session manager.
+
+        :return: Counters describing sessions and runs.
+        """
+        ...
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Protocol
+
+from agents import TResponseInputItem
+
+if TYPE_CHECKING:
+    from openai_agent.services.session_store import SessionState
+
+
+class ISessionStore(Protocol):
+    async def load(self, session_id: str) -> SessionState:
+        """
+        Load the conversation of a session, without decoding its turns.
+
+        :param session_id: The session id.
+        :return: The current agent and the most recent turns, empty for an
+            unknown session.
+        """
+        ...
+
+    async def append(
+        self,
+        session_id: str,
+        items: list[TResponseInputItem],
+        agent_name: str | None = None,
+    ) -> None:
+        """
+        Append a turn to the conversation of a session, creating it if needed.
+
+        :param session_id: The session id.
+        :param items: The items of the turn, its input and the items of the run.
+        :param agent_name: The agent that answered, the next turn starts with it.
+            The current agent is kept when omitted.
+        """
+        ...
+
+    async def delete(self, session_id: str) -> bool:
+        """
+        Forget the conversation of a session.
+
+        :param session_id: The session id.
+        :return: True if the session existed.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the counters of the store.
+
+        :return: The metrics by name.
+        """
+        ...
+
+    def close(self) -> None:
+        """
+        Release the resources of the store, such as its database connection.
+        """
+        ...
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from openai_agent.services.specialist_directory import SpecialistRecord
+
+
+class ISpecialistDirectory(Protocol):
+    def search(
+        self, city: str, specialty: str | None = None, limit: int | None = None
+    ) -> list[SpecialistRecord]:
+        """
+        Find specialists practicing in a city. A city that is not known exactly
+        is matched as a prefix of city names, then by similar spelling.
+
+        :param city: The city, partial or misspelled names are matched too.
+        :param specialty: The specialty or a word for its doctors such as
+            "cardiologist", any specialty when omitted.
+        :param limit: The maximum number of specialists, the configured default
+            when omitted.
+        :return: The specialists, those in the best matching city first.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the size of the directory and the lookup counters.
+
+        :return: The metrics by name.
+        """
+        ...
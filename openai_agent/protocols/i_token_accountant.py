@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from typing import TYPE_CHECKING, Protocol
+
+from agents import Usage
+
+if TYPE_CHECKING:
+    from openai_agent.services.token_budget import TokenUsage
+
+
+class ITokenAccountant(Protocol):
+    def track(
+        self, session_usage: TokenUsage | None = None
+    ) -> AbstractContextManager[TokenUsage]:
+        """
+        Account the model calls of a request, including those of nested runs, and
+        enforce the request budget on them. With `session_usage` the calls are
+        also added to the session and the session budget is enforced.
+
+        :param session_usage: The usage of the session so far.
+        :return: Entered around the request, yields the usage of the request.
+        """
+        ...
+
+    def record(self, usage: Usage) -> None:
+        """
+        Add the usage of a model call to the current request and session, and to
+        the totals of the process.
+
+        :param usage: The usage reported for the model call.
+        """
+        ...
+
+    def check(self) -> None:
+        """
+        Called before a model call, fail the run if the current request or
+        session has used up its budget.
+
+        :raises TokenBudgetExceeded: If a budget is used up.
+        """
+        ...
+
+    def get_cost(self, usage: TokenUsage) -> float:
+        """
+        Get the cost of the usage at the configured prices.
+
+        :param usage: The token usage.
+        :return: The cost in USD.
+        """
+        ...
+
+    def get_summary(self, usage: TokenUsage | None = None) -> dict[str, float]:
+        """
+        Get the token counts and cost of a request, a session or the process.
+
+        :param usage: The usage to summarize, the process totals when omitted.
+        :return: The values by name.
+        """
+        ...
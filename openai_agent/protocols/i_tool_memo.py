@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any, Protocol
+
+from agents import FunctionTool
+from agents.result import RunResultBase
+
+if TYPE_CHECKING:
+    from openai_agent.services.tool_memo import ToolMemoStats
+
+ToolKey = Callable[[dict[str, Any]], Hashable]
+"""Maps the arguments of a tool call to the key its output is remembered under."""
+
+
+class IToolMemo(Protocol):
+    def memoize(
+        self,
+        tool: FunctionTool,
+        key: ToolKey | None = None,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+    ) -> FunctionTool:
+        """
+        Wrap a function tool, or an agent made a tool with `as_tool`, so calls
+        with the same key return the remembered output instead of running the
+        tool again. Concurrent calls with the same key share a single run.
+        Tools with the same name share their memory.
+
+        :param tool: The tool to memoize.
+        :param key: Computes the key from the arguments, by default the arguments
+            themselves.
+        :param ttl: Seconds an output is remembered for, 0 for no expiry, the
+            configured default when omitted.
+        :param max_entries: The outputs remembered for the tool, the least
+            recently used are evicted, the configured default when omitted.
+        :return: The memoized tool, or if the memo is disabled the tool only
+            reporting its errors to the model.
+        """
+        ...
+
+    def get_run_stats(self, result: RunResultBase) -> ToolMemoStats:
+        """
+        Get the memo statistics of the memoized tool calls of a run.
+
+        :param result: The result of the run.
+        :return: The statistics, all zero if the run made no memoized calls.
+        """
+        ...
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Get the number of remembered outputs and the statistics of all runs.
+
+        :return: The metrics by name.
+        """
+        ...
@@ -0,0 +1,59 @@
+from typing import Protocol
+
+
+class ITraceMetrics(Protocol):
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether runs should be traced at all.
+
+        :return: True if trace metrics are enabled.
+        """
+        ...
+
+    def install(self) -> None:
+        """
+        Enable tracing in the agents SDK with this as its only processor, in place
+        of the default exporter.
+        """
+        ...
+
+    def record_first_token(self, seconds: float) -> None:
+        """
+        Record the time to the first token of a streamed model call, for the agent
+        of the current span.
+
+        :param seconds: Seconds from the request to the first token.
+        """
+        ...
+
+    def record_cached_tokens(self, tokens: int) -> None:
+        """
+        Record the prompt tokens of a model call that were served from the
+        provider's prompt cache, for the agent of the current span.
+
+        :param tokens: The cached prompt tokens.
+        """
+        ...
+
+    def render_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        :return: The metrics, one sample per line.
+        """
+        ...
+
+    def get_summary(self) -> dict[str, float]:
+        """
+        Get counts, means and percentiles of the metrics so far.
+
+        :return: The values by metric name.
+        """
+        ...
+
+    def log_to_mlflow(self) -> None:
+        """
+        Log the summary as a run of the configured MLflow experiment.
+        """
+        ...
@@ -0,0 +1,38 @@
+from typing import Awaitable, Callable, Protocol
+
+
+class ITranslationMemory(Protocol):
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether translated segments should be remembered at all.
+
+        :return: True if the memory is enabled.
+        """
+        ...
+
+    async def translate(
+        self,
+        text: str,
+        from_language: str,
+        to_language: str,
+        translate_segments: Callable[[list[str]], Awaitable[list[str]]],
+    ) -> str:
+        """
+        Translate a text sentence by sentence. Sentences that were translated
+        before are taken from the memory, the others are translated in a single
+        call to `translate_segments` and remembered.
+
+        :param text: The text to translate.
+        :param from_language: The language of the text.
+        :param to_language: The language to translate to.
+        :param translate_segments: Translates a list of sentences, in order.
+        :return: The translated text.
+        """
+        ...
+
+    def close(self) -> None:
+        """
+        Close the on-disk tier, if any. Later calls only use the memory tier.
+        """
+        ...
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable
+from dataclasses import asdict, dataclass
+
+from azure.core.credentials import AccessToken, TokenCredential
+from azure.identity import DefaultAzureCredential
+
+from openai_agent.services.trace_metrics import format_labels
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+@dataclass
+class TokenFetchStats:
+    """The durations of successful fetches, failed ones are timed apart so they
+    don't skew the average."""
+
+    fetch_count: int = 0
+    failure_count: int = 0
+    last_fetch_seconds: float = 0.0
+    max_fetch_seconds: float = 0.0
+    total_fetch_seconds: float = 0.0
+    total_failure_seconds: float = 0.0
+
+    @property
+    def avg_fetch_seconds(self) -> float:
+        return self.total_fetch_seconds / self.fetch_count if self.fetch_count else 0.0
+
+    def get_metrics(self) -> dict[str, float]:
+        return {**asdict(self), "avg_fetch_seconds": self.avg_fetch_seconds}
+
+
+class AzureADTokenProvider:
+    """Callable bearer token provider that caches the Azure AD access token and
+    refreshes it on a background timer `refresh_margin` seconds before it expires,
+    so callers only wait when there is no valid token at all (first call or after
+    the process was suspended past expiry). Then the token is fetched in a worker
+    thread and the call returns an awaitable, which the async client awaits, so
+    the event loop never blocks on the credential chain. Tokens that live shorter
+    than the margin are refreshed halfway through their lifetime, at most every
+    `retry_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        credential: TokenCredential,
+        scope: str = COGNITIVE_SERVICES_SCOPE,
+        refresh_margin: float = 300.0,
+        retry_interval: float = 30.0,
+    ):
+        self.credential = credential
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.stats = TokenFetchStats()
+        self._token: AccessToken | None = None
+        self._fetch_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._closed = False
+
+    def __call__(self) -> str | Awaitable[str]:
+        token = self._token
+        if token is None or token.expires_on <= time.time():
+            return self.get_token()
+        return token.token
+
+    async def get_token(self) -> str:
+        """The cached token, fetched off the event loop if there is no valid one."""
+        token = self._token
+        if token is None or token.expires_on <= time.time():
+            token = await asyncio.to_thread(self._fetch, False)
+        return token.token
+
+    def prefetch(self) -> None:
+        """Fetch the first token in the background if none is cached yet."""
+        if self._token is None:
+            self._schedule(0)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def _fetch(self, force: bool) -> AccessToken:
+        with self._fetch_lock:
+            token = self._token
+            if (
+                not force
+                and token is not None
+                and token.expires_on > time.time() + self.refresh_margin
+            ):
+                return token
+
+            start = time.perf_counter()
+            try:
+                token = self.credential.get_token(self.scope)
+            except Exception:
+                self.stats.failure_count += 1
+                self.stats.total_failure_seconds += time.perf_counter() - start
+                raise
+
+            elapsed = time.perf_counter() - start
+            self.stats.fetch_count += 1
+            self.stats.last_fetch_seconds = elapsed
+            self.stats.total_fetch_seconds += elapsed
+            self.stats.max_fetch_seconds = max(self.stats.max_fetch_seconds, elapsed)
+            self._token = token
+            self._schedule(self._get_refresh_delay(token))
+            return token
+
+    def _get_refresh_delay(self, token: AccessToken) -> float:
+        lifetime = token.expires_on - time.time()
+        delay = lifetime - self.refresh_margin
+        if delay < self.retry_interval:
+            # a short-lived token would otherwise be refreshed in a tight loop
+            delay = max(lifetime / 2, self.retry_interval)
+        return delay
+
+    def _background_refresh(self) -> None:
+        try:
+            self._fetch(force=True)
+        except Exception:
+            # keep serving the current token and try again shortly; callers only
+            # wait for a fetch once it has actually expired.
+            self._schedule(self.retry_interval)
+
+    def _schedule(self, delay: float) -> None:
+        if self._closed:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+
+_providers: dict[str, AzureADTokenProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_azure_ad_token_provider(
+    scope: str = COGNITIVE_SERVICES_SCOPE,
+) -> AzureADTokenProvider:
+    """Return the process-wide token provider for `scope`, creating it (and its
+    DefaultAzureCredential) on first use.
+    """
+    with _providers_lock:
+        provider = _providers.get(scope)
+        if provider is None:
+            provider = AzureADTokenProvider(DefaultAzureCredential(), scope)
+            provider.prefetch()
+            _providers[scope] = provider
+        return provider
+
+
+def get_token_fetch_metrics() -> dict[str, dict[str, float]]:
+    """The token fetch statistics of every provider by scope, empty when the
+    Azure OpenAI client uses an API key."""
+    with _providers_lock:
+        return {
+            scope: provider.stats.get_metrics()
+            for scope, provider in _providers.items()
+        }
+
+
+def render_token_fetch_prometheus() -> str:
+    """The token fetch statistics in the Prometheus text format."""
+    series = {
+        "aad_token_fetches_total": ("counter", "Access tokens fetched.", "fetch_count"),
+        "aad_token_fetch_failures_total": (
+            "counter",
+            "Access token fetches that failed.",
+            "failure_count",
+        ),
+        "aad_token_fetch_seconds_total": (
+            "counter",
+            "Seconds spent fetching access tokens.",
+            "total_fetch_seconds",
+        ),
+        "aad_token_fetch_failure_seconds_total": (
+            "counter",
+            "Seconds spent on access token fetches that failed.",
+            "total_failure_seconds",
+        ),
+        "aad_token_fetch_seconds_max": (
+            "gauge",
+            "Slowest access token fetch in seconds.",
+            "max_fetch_seconds",
+        ),
+    }
+    metrics = get_token_fetch_metrics()
+    if not metrics:
+        return ""
+    lines: list[str] = []
+    for name, (kind, description, stat) in series.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        for scope, values in metrics.items():
+            lines.append(f"{name}{format_labels((('scope', scope),))} {values[stat]}")
+    return "\n".join(lines) + "\n"
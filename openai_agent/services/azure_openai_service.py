@@ -1,11 +1,19 @@
-from dataclasses import dataclass
-from typing import Callable
+import asyncio
+import importlib.util
+import threading
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+import httpx
 from lagom.environment import Env
-from openai import AsyncAzureOpenAI
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
 
 from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
+from openai_agent.protocols.i_endpoint_pool import IEndpointPool
+from openai_agent.protocols.i_rate_limiter import IRateLimiter
+from openai_agent.services.azure_ad_token_provider import get_azure_ad_token_provider
+from openai_agent.services.endpoint_pool import BalancedTransport
+from openai_agent.services.rate_limiter import RateLimitedTransport
 
 
 class AzureOpenAIServiceEnv(Env):
@@ -13,28 +21,135 @@ class AzureOpenAIServiceEnv(Env):
     azure_openai_api_key: str | None = None
     azure_openai_api_version: str
     azure_openai_deployed_model_name: str
+    azure_openai_max_connections: int = 100
+    azure_openai_max_keepalive_connections: int = 20
+    azure_openai_keepalive_expiry: float = 30.0
+    azure_openai_http2: bool = False
+    azure_openai_warm_up_connections: int = 1
+    """Connections opened to every endpoint by `warm_up`."""
+
+
+WARM_UP_TIMEOUT = 10.0
+"""Seconds a warm-up request may take, startup waits for it."""
 
 
 @dataclass
 class AzureOpenAIService(IAzureOpenAIService):
     env: AzureOpenAIServiceEnv
+    rate_limiter: IRateLimiter
+    endpoint_pool: IEndpointPool
+    _client: AsyncAzureOpenAI | None = field(default=None, init=False, repr=False)
+    _http_client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+    _transport: httpx.AsyncHTTPTransport | None = field(
+        default=None, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
 
-    def get_openai_auth_key(self) -> dict[str, str | Callable[[], str]]:
+    def get_openai_auth_key(
+        self,
+    ) -> dict[str, str | Callable[[], str | Awaitable[str]]]:
         if self.env.azure_openai_api_key:
             return {"api_key": self.env.azure_openai_api_key}
 
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-        )
+        return {"azure_ad_token_provider": get_azure_ad_token_provider()}
 
-        return {"azure_ad_token_provider": token_provider}
+    def get_http_client(self) -> httpx.AsyncClient:
+        if self.env.azure_openai_http2 and importlib.util.find_spec("h2") is None:
+            raise ValueError(
+                "AZURE_OPENAI_HTTP2=true requires the h2 package, install "
+                "httpx[http2] or disable it."
+            )
 
-    def get_client(self) -> AsyncAzureOpenAI:
-        return AsyncAzureOpenAI(
-            azure_endpoint=self.env.azure_openai_endpoint,
-            api_version=self.env.azure_openai_api_version,
-            **self.get_openai_auth_key(),  # type: ignore
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=self.env.azure_openai_max_connections,
+                max_keepalive_connections=self.env.azure_openai_max_keepalive_connections,
+                keepalive_expiry=self.env.azure_openai_keepalive_expiry,
+            ),
+            http2=self.env.azure_openai_http2,
         )
+        transport: httpx.AsyncBaseTransport = self._transport
+        if self.endpoint_pool.size > 1:
+            # every endpoint has its own limits, the limiter keeps one per endpoint
+            return DefaultAsyncHttpxClient(
+                transport=BalancedTransport(
+                    transport, self.endpoint_pool, self.rate_limiter
+                )
+            )
+        # every request to the deployment goes through the shared limiter
+        return DefaultAsyncHttpxClient(
+            transport=RateLimitedTransport(transport, self.rate_limiter)
+        )
+
+    def get_client(self) -> AsyncAzureOpenAI:
+        with self._lock:
+            if self._client is None:
+                self._http_client = self.get_http_client()
+                self._client = AsyncAzureOpenAI(
+                    azure_endpoint=self.env.azure_openai_endpoint,
+                    api_version=self.env.azure_openai_api_version,
+                    http_client=self._http_client,
+                    **self.get_openai_auth_key(),  # type: ignore
+                )
+            return self._client
 
     def get_deployed_model_name(self) -> str:
         return self.env.azure_openai_deployed_model_name
+
+    async def warm_up(self, connections: int | None = None) -> None:
+        count = (
+            self.env.azure_openai_warm_up_connections
+            if connections is None
+            else connections
+        )
+        if count <= 0:
+            await self._fetch_token()
+            return
+
+        # any response (even 401/404) leaves an established TLS connection in the
+        # pool, so the status code is irrelevant here. The requests go straight
+        # to the connection pool, a HEAD is no model call to limit or balance.
+        self.get_client()
+        transport = self._transport
+        assert transport is not None
+        timeout = httpx.Timeout(WARM_UP_TIMEOUT).as_dict()
+
+        async def _open(url: httpx.URL) -> None:
+            try:
+                response = await transport.handle_async_request(
+                    httpx.Request("HEAD", url, extensions={"timeout": timeout})
+                )
+                # a response closed before its (empty) body was read closes the
+                # connection instead of returning it to the pool
+                await response.aread()
+                await response.aclose()
+            except httpx.HTTPError:
+                pass
+
+        await asyncio.gather(
+            self._fetch_token(),
+            *(
+                _open(endpoint.url)
+                for endpoint in self.endpoint_pool.endpoints
+                for _ in range(count)
+            ),
+        )
+
+    async def _fetch_token(self) -> None:
+        """Fetch the first Azure AD token, so no request waits for it."""
+        if self.env.azure_openai_api_key:
+            return
+        try:
+            await get_azure_ad_token_provider().get_token()
+        except Exception:
+            # the first request fetches it again and raises the error
+            pass
+
+    async def close(self) -> None:
+        with self._lock:
+            client, self._client, self._http_client = self._client, None, None
+            self._transport = None
+        if client is not None:
+            await client.close()
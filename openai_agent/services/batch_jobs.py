@@ -0,0 +1,409 @@
+import asyncio
+import itertools
+import json
+import shutil
+import sqlite3
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
+
+from agents import Agent, AgentOutputSchema, AgentOutputSchemaBase
+from agents.models.chatcmpl_converter import Converter
+from lagom.environment import Env
+from openai import NOT_GIVEN, AsyncOpenAI
+
+from openai_agent.protocols.i_azure_openai_service import IAzureOpenAIService
+from openai_agent.protocols.i_batch_job_backend import IBatchJobBackend
+from openai_agent.services.batch_runner import Record, drop_partial_line
+
+BATCH_URL = "/chat/completions"
+"""The endpoint of the requests in a batch file, relative to the deployment."""
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+Complete = Callable[[Record], Awaitable[Record]]
+"""Sends the body of a chat completion request and returns the response body."""
+
+
+class BatchJobEnv(Env):
+    batch_backend: Literal["azure", "local"] = "azure"
+    batch_completion_window: str = "24h"
+    batch_poll_interval: float = 60.0
+    batch_local_dir: str = ".batch_jobs"
+    batch_local_concurrency: int = 16
+    azure_openai_batch_deployed_model_name: str | None = None
+
+
+@dataclass
+class BatchJob:
+    id: str
+    status: str
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    output_file_id: str | None = None
+    error_file_id: str | None = None
+    error: str | None = None
+    """Why the job failed, such as invalid input."""
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+def get_output_schema(agent: Agent[Any]) -> AgentOutputSchemaBase | None:
+    if agent.output_type is None or agent.output_type is str:
+        return None
+    if isinstance(agent.output_type, AgentOutputSchemaBase):
+        return agent.output_type
+    return AgentOutputSchema(agent.output_type)
+
+
+def build_agent_request(
+    agent: Agent[Any], custom_id: str, input: str, model: str
+) -> Record:
+    """A batch request line for a single turn of `agent`, with the same
+    instructions, response format and sampling settings a run would use."""
+    if not isinstance(agent.instructions, str):
+        raise ValueError(f"Agent '{agent.name}' has no static instructions.")
+
+    body: Record = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": agent.instructions},
+            {"role": "user", "content": input},
+        ],
+    }
+    settings = agent.model_settings
+    for name in ("temperature", "top_p", "max_tokens"):
+        if (value := getattr(settings, name)) is not None:
+            body[name] = value
+    response_format = Converter.convert_response_format(get_output_schema(agent))
+    if response_format is not NOT_GIVEN:
+        body["response_format"] = response_format
+
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_URL, "body": body}
+
+
+def parse_agent_output(agent: Agent[Any], content: str) -> Any:
+    """The final output of `agent` from the content of its response."""
+    output_schema = get_output_schema(agent)
+    if output_schema is None:
+        return content
+    return output_schema.validate_json(content)
+
+
+def write_requests(path: Path, requests: Iterable[Record]) -> int:
+    """Write requests to a JSONL file as they are produced, returns the count."""
+    count = 0
+    with path.open("w") as file:
+        for request in requests:
+            file.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def read_results(path: Path) -> Iterator[tuple[str, str | None, str | None]]:
+    """Streams the custom id, the message content and the error of every line of
+    an output or error file of a job."""
+    if not path.exists():
+        return
+
+    with path.open() as file:
+        for line in file:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            body = response.get("body") or {}
+            if response.get("status_code") == 200 and body.get("choices"):
+                yield (
+                    result["custom_id"],
+                    body["choices"][0]["message"]["content"],
+                    None,
+                )
+            else:
+                error = result.get("error") or body.get("error") or {}
+                message = (
+                    error.get("message") or f"status {response.get('status_code')}"
+                )
+                yield result["custom_id"], None, message
+
+
+async def wait_for_job(
+    backend: IBatchJobBackend,
+    job_id: str,
+    poll_interval: float,
+    on_poll: Callable[[BatchJob], None] | None = None,
+) -> BatchJob:
+    while True:
+        job = await backend.get_job(job_id)
+        if on_poll is not None:
+            on_poll(job)
+        if job.done:
+            return job
+        await asyncio.sleep(poll_interval)
+
+
+class ResultIndex:
+    """Results of the stages of a bulk run by record id. Kept in SQLite, so joining
+    the stages of a large run doesn't hold them in memory."""
+
+    def __init__(self, path: Path) -> None:
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (stage TEXT NOT NULL, "
+            "id TEXT NOT NULL, content TEXT, error TEXT, PRIMARY KEY (stage, id))"
+        )
+
+    def add(
+        self, stage: str, *results: Iterable[tuple[str, str | None, str | None]]
+    ) -> None:
+        """Add the results of a stage, such as its outputs and its errors, in a
+        single transaction, so an interrupted stage has no results at all."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results (stage, id, content, error) "
+                "VALUES (?, ?, ?, ?)",
+                ((stage, *result) for result in itertools.chain(*results)),
+            )
+
+    def get(self, stage: str, id: str) -> tuple[str | None, str | None] | None:
+        """The content and error of a record, None if the stage has no result."""
+        return self._db.execute(
+            "SELECT content, error FROM results WHERE stage = ? AND id = ?",
+            (stage, id),
+        ).fetchone()
+
+    def has_stage(self, stage: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM results WHERE stage = ? LIMIT 1", (stage,)
+        ).fetchone()
+        return row is not None
+
+    def close(self) -> None:
+        self._db.close()
+
+
+@dataclass
+class AzureBatchJobBackend(IBatchJobBackend):
+    """Jobs on the Azure OpenAI Batch API of the shared client. The requests
+    must name a deployment of the Global Batch (or Data Zone Batch) type."""
+
+    env: BatchJobEnv
+    azure_openai_service: IAzureOpenAIService
+
+    async def submit(self, requests_path: Path) -> BatchJob:
+        client = self.azure_openai_service.get_client()
+        # an open file is streamed as multipart, a path would be read into memory
+        with requests_path.open("rb") as file:
+            uploaded = await client.files.create(
+                file=(requests_path.name, file), purpose="batch"
+            )
+        batch = await client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_URL,  # type: ignore
+            completion_window=self.env.batch_completion_window,  # type: ignore
+        )
+        return self._to_job(batch)
+
+    async def get_job(self, job_id: str) -> BatchJob:
+        client = self.azure_openai_service.get_client()
+        return self._to_job(await client.batches.retrieve(job_id))
+
+    async def download(
+        self, job: BatchJob, output_path: Path, errors_path: Path
+    ) -> None:
+        client = self.azure_openai_service.get_client()
+        for file_id, path in (
+            (job.output_file_id, output_path),
+            (job.error_file_id, errors_path),
+        ):
+            with path.open("wb") as file:
+                if file_id is None:
+                    continue
+                async with client.files.with_streaming_response.content(
+                    file_id
+                ) as response:
+                    async for chunk in response.iter_bytes():
+                        file.write(chunk)
+
+    @staticmethod
+    def _to_job(batch: Any) -> BatchJob:
+        counts = batch.request_counts
+        errors = batch.errors.data if batch.errors and batch.errors.data else []
+        return BatchJob(
+            id=batch.id,
+            status=batch.status,
+            total=counts.total if counts else 0,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+            output_file_id=batch.output_file_id,
+            error_file_id=batch.error_file_id,
+            error="; ".join(str(error.message) for error in errors) or None,
+        )
+
+
+def complete_with_client(client: AsyncOpenAI) -> Complete:
+    """Sends the requests of a local job as real-time chat completions."""
+
+    async def complete(body: Record) -> Record:
+        response = await client.chat.completions.create(**body)
+        return response.model_dump()
+
+    return complete
+
+
+@dataclass
+class LocalBatchJobBackend(IBatchJobBackend):
+    """A file based stand-in for the Batch API, for tests and for deployments
+    without batch quota.
+
+    Every job is a directory with the uploaded requests, its state and the
+    output and error files in the format of the Batch API. Requests are sent to
+    `complete` with bounded concurrency. A job interrupted with the process
+    resumes on the next poll and skips the requests already answered. A job
+    that can't be processed, such as one with a malformed input line, fails
+    with the error, like the Batch API fails invalid input.
+    """
+
+    directory: Path
+    complete: Complete
+    concurrency: int = 16
+    progress_every: int = 100
+    _tasks: dict[str, asyncio.Task[None]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    async def submit(self, requests_path: Path) -> BatchJob:
+        job = BatchJob(id=f"batch_{uuid.uuid4().hex}", status="validating")
+        job_dir = self.directory / job.id
+        job_dir.mkdir(parents=True)
+        await asyncio.to_thread(shutil.copyfile, requests_path, job_dir / "input.jsonl")
+        self._save(job)
+        return await self.get_job(job.id)
+
+    async def get_job(self, job_id: str) -> BatchJob:
+        job = self._load(job_id)
+        if not job.done and job_id not in self._tasks:
+            task = asyncio.create_task(self._process(job))
+            self._tasks[job_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def download(
+        self, job: BatchJob, output_path: Path, errors_path: Path
+    ) -> None:
+        job_dir = self.directory / job.id
+        for name, path in (
+            ("output.jsonl", output_path),
+            ("errors.jsonl", errors_path),
+        ):
+            source = job_dir / name
+            if source.exists():
+                await asyncio.to_thread(shutil.copyfile, source, path)
+            else:
+                path.write_bytes(b"")
+
+    async def _process(self, job: BatchJob) -> None:
+        try:
+            await self._run(job)
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            self._save(job)
+
+    async def _run(self, job: BatchJob) -> None:
+        job_dir = self.directory / job.id
+        for name in ("output.jsonl", "errors.jsonl"):
+            drop_partial_line(job_dir / name)
+        answered = {
+            custom_id
+            for name in ("output.jsonl", "errors.jsonl")
+            for custom_id, _, _ in read_results(job_dir / name)
+        }
+        with (job_dir / "input.jsonl").open() as file:
+            job.total = sum(1 for line in file if line.strip())
+        job.status = "in_progress"
+        self._save(job)
+
+        queue: asyncio.Queue[Record] = asyncio.Queue(self.concurrency * 2)
+        with (
+            (job_dir / "output.jsonl").open("a") as output,
+            (job_dir / "errors.jsonl").open("a") as errors,
+        ):
+
+            async def work() -> None:
+                while True:
+                    request = await queue.get()
+                    try:
+                        line = await self._send(request)
+                        if line["error"] is None:
+                            output.write(json.dumps(line) + "\n")
+                            job.completed += 1
+                        else:
+                            errors.write(json.dumps(line) + "\n")
+                            job.failed += 1
+                        if (job.completed + job.failed) % self.progress_every == 0:
+                            output.flush()
+                            errors.flush()
+                            self._save(job)
+                    finally:
+                        queue.task_done()
+
+            async def feed() -> None:
+                with (job_dir / "input.jsonl").open() as file:
+                    for line in file:
+                        if not line.strip():
+                            continue
+                        request = json.loads(line)
+                        if request["custom_id"] not in answered:
+                            await queue.put(request)
+                await queue.join()
+
+            workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+            feeder = asyncio.create_task(feed())
+            try:
+                # workers only stop on an error, which would leave the queue
+                # without consumers
+                await asyncio.wait(
+                    [feeder, *workers], return_when=asyncio.FIRST_COMPLETED
+                )
+                for worker in workers:
+                    if worker.done():
+                        worker.result()
+                feeder.result()
+            finally:
+                for pending in (feeder, *workers):
+                    pending.cancel()
+                await asyncio.gather(feeder, *workers, return_exceptions=True)
+
+        # the counts saved before an interruption may be behind the files
+        job.completed = sum(1 for _ in read_results(job_dir / "output.jsonl"))
+        job.failed = sum(1 for _ in read_results(job_dir / "errors.jsonl"))
+        job.status = "completed"
+        self._save(job)
+
+    async def _send(self, request: Record) -> Record:
+        line: Record = {
+            "id": f"response_{uuid.uuid4().hex}",
+            "custom_id": request["custom_id"],
+            "response": None,
+            "error": None,
+        }
+        try:
+            body = await self.complete(request["body"])
+            line["response"] = {"status_code": 200, "body": body}
+        except Exception as e:
+            line["error"] = {"code": type(e).__name__, "message": str(e)}
+        return line
+
+    def _load(self, job_id: str) -> BatchJob:
+        path = self.directory / job_id / "job.json"
+        return BatchJob(**json.loads(path.read_text()))
+
+    def _save(self, job: BatchJob) -> None:
+        path = self.directory / job.id / "job.json"
+        path.write_text(json.dumps(asdict(job)))
@@ -0,0 +1,183 @@
+import asyncio
+import csv
+import json
+import os
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable
+
+from agents import Usage
+from pydantic import BaseModel
+
+Record = dict[str, Any]
+
+BatchTask = Callable[[Record], Awaitable[tuple[Any, Usage]]]
+"""Processes one record and returns its output and the tokens it used."""
+
+
+def read_records(path: Path, id_field: str = "id") -> Iterator[tuple[str, Record]]:
+    """Streams the records of a JSONL or CSV file with their ids. Records without
+    `id_field` are identified by their row number."""
+    with path.open(newline="") as file:
+        if path.suffix == ".csv":
+            rows: Iterator[Record] = csv.DictReader(file)
+        else:
+            rows = (json.loads(line) for line in file if line.strip())
+
+        for number, record in enumerate(rows):
+            yield str(record.get(id_field, number)), record
+
+
+def drop_partial_line(path: Path) -> None:
+    """Remove a last line cut short by an interrupted run, so the file can be
+    appended to again."""
+    if not path.exists():
+        return
+
+    with path.open("rb+") as file:
+        size = end = file.seek(0, os.SEEK_END)
+        # scan back from the end in blocks, a large file is never read in full
+        while end > 0:
+            start = max(0, end - 4096)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            file.truncate(end)
+
+
+def load_checkpoint(path: Path) -> set[str]:
+    """The ids already written to the output file. A line cut short by an
+    interrupted run is removed, so the file can be appended to again."""
+    if not path.exists():
+        return set()
+
+    drop_partial_line(path)
+    with path.open() as file:
+        return {json.loads(line)["id"] for line in file if line.strip()}
+
+
+@dataclass
+class BatchStats:
+    completed: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    """Records skipped because a record with the same id came earlier in the run."""
+    failed: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.completed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        tokens = self.input_tokens + self.output_tokens
+        return tokens / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass
+class BatchRunner:
+    """Runs a task over a stream of records with bounded concurrency.
+
+    Results are appended to a JSONL file as soon as they complete, which also
+    serves as the checkpoint: records already in the output are skipped, so an
+    interrupted batch resumes without running finished records again. Failed
+    records are written to the `errors_path` and retried on the next run, which
+    starts the file anew, so it lists the failures of the last run only. An
+    error outside of the task, such as a failed write or `on_progress`, stops
+    the batch and is raised.
+    """
+
+    output_path: Path
+    errors_path: Path
+    concurrency: int = 16
+    stats: BatchStats = field(default_factory=BatchStats)
+    on_progress: Callable[[BatchStats], None] | None = None
+    progress_every: int = 100
+
+    async def run(self, records: Iterator[tuple[str, Record]], task: BatchTask) -> None:
+        done = load_checkpoint(self.output_path)
+        queue: asyncio.Queue[tuple[str, Record]] = asyncio.Queue(self.concurrency * 2)
+        started = time.perf_counter()
+
+        with (
+            self.output_path.open("a") as output,
+            # the failures of earlier runs are retried, not kept
+            self.errors_path.open("w") as errors,
+        ):
+
+            async def work() -> None:
+                while True:
+                    record_id, record = await queue.get()
+                    try:
+                        await self._process(record_id, record, task, output, errors)
+                    finally:
+                        self.stats.elapsed_seconds = time.perf_counter() - started
+                        queue.task_done()
+
+            async def feed() -> None:
+                queued: set[str] = set()
+                for record_id, record in records:
+                    if record_id in done:
+                        self.stats.skipped += 1
+                        continue
+                    if record_id in queued:
+                        self.stats.duplicates += 1
+                        continue
+                    queued.add(record_id)
+                    # blocks while all workers are busy, so records stream in
+                    await queue.put((record_id, record))
+                await queue.join()
+
+            workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+            feeder = asyncio.create_task(feed())
+            try:
+                # workers only stop on an error, which would leave the queue
+                # without consumers
+                await asyncio.wait(
+                    [feeder, *workers], return_when=asyncio.FIRST_COMPLETED
+                )
+                for worker in workers:
+                    if worker.done():
+                        worker.result()
+                feeder.result()
+            finally:
+                for pending in (feeder, *workers):
+                    pending.cancel()
+                await asyncio.gather(feeder, *workers, return_exceptions=True)
+
+    async def _process(
+        self,
+        record_id: str,
+        record: Record,
+        task: BatchTask,
+        output: IO[str],
+        errors: IO[str],
+    ) -> None:
+        try:
+            result, usage = await task(record)
+        except Exception as e:
+            self.stats.failed += 1
+            self._write(errors, {"id": record_id, "input": record, "error": repr(e)})
+            return
+
+        if isinstance(result, BaseModel):
+            result = result.model_dump(mode="json")
+        self._write(output, {"id": record_id, "input": record, "output": result})
+        self.stats.completed += 1
+        self.stats.input_tokens += usage.input_tokens
+        self.stats.output_tokens += usage.output_tokens
+        if self.on_progress and self.stats.completed % self.progress_every == 0:
+            self.on_progress(self.stats)
+
+    def _write(self, file: IO[str], row: Record) -> None:
+        file.write(json.dumps(row) + "\n")
+        file.flush()
@@ -0,0 +1,83 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from has have i if in into "
+    "is it its me my of on or our so than that the their them then there these "
+    "they this to was we were what when where which while who will with you your "
+    "also any all some very been being had having just about over under".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower cased words without stopwords, with a naive plural strip."""
+    tokens = []
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if word in STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+@dataclass
+class BM25Index:
+    """In-process Okapi BM25 index over a small set of documents."""
+
+    documents: dict[str, str]
+    k1: float = 1.5
+    b: float = 0.75
+    _term_freqs: dict[str, Counter[str]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _doc_lengths: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _idf: dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _avg_length: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        doc_freqs: Counter[str] = Counter()
+        for doc_id, text in self.documents.items():
+            tokens = tokenize(text)
+            self._term_freqs[doc_id] = Counter(tokens)
+            self._doc_lengths[doc_id] = len(tokens)
+            doc_freqs.update(set(tokens))
+
+        count = len(self.documents)
+        self._avg_length = sum(self._doc_lengths.values()) / count if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - freq + 0.5) / (freq + 0.5))
+            for term, freq in doc_freqs.items()
+        }
+
+    def score(self, query: str) -> dict[str, float]:
+        terms = [term for term in tokenize(query) if term in self._idf]
+        scores: dict[str, float] = {}
+        for doc_id, term_freqs in self._term_freqs.items():
+            norm = self.k1 * (
+                1 - self.b + self.b * self._doc_lengths[doc_id] / self._avg_length
+            )
+            scores[doc_id] = sum(
+                self._idf[term]
+                * term_freqs[term]
+                * (self.k1 + 1)
+                / (term_freqs[term] + norm)
+                for term in terms
+                if term in term_freqs
+            )
+        return scores
+
+    def get_matches(self, query: str, doc_id: str) -> set[str]:
+        """The distinct terms of the query found in a document."""
+        term_freqs = self._term_freqs[doc_id]
+        return {term for term in tokenize(query) if term in term_freqs}
+
+    def search(self, query: str, top_k: int | None = None) -> list[tuple[str, float]]:
+        ranked = sorted(
+            ((doc_id, score) for doc_id, score in self.score(query).items() if score),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return ranked[:top_k] if top_k else ranked
@@ -0,0 +1,399 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections.abc import Collection
+from dataclasses import dataclass, field
+
+import httpx
+from lagom.environment import Env
+
+from openai_agent.protocols.i_endpoint_pool import IEndpointPool
+from openai_agent.protocols.i_rate_limiter import IRateLimiter
+from openai_agent.services.rate_limiter import (
+    RateLimitedTransport,
+    ReleasingStream,
+    get_retry_after,
+)
+
+EWMA_ALPHA = 0.2
+"""Weight of the latest latency in the moving average of an endpoint."""
+
+LATENCY_DECAY_SECONDS = 10.0
+"""The latency of an endpoint that was not used for this long counts for a third,
+so endpoints that were slow are tried again."""
+
+CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+"""States of a circuit, as reported in the metrics."""
+
+_DEPLOYMENT = re.compile(r"(/deployments/)([^/]+)")
+
+
+class EndpointPoolEnv(Env):
+    azure_openai_endpoint: str
+    azure_openai_deployed_model_name: str
+    azure_openai_endpoints: str = ""
+    """A JSON list of endpoints, each with an `endpoint`, a `deployment` and
+    optionally a `weight` and an `api_key`. Empty for only the endpoint above."""
+    azure_openai_circuit_failures: int = 5
+    """Consecutive failures that open the circuit of an endpoint."""
+    azure_openai_circuit_open_seconds: float = 30.0
+
+
+@dataclass(frozen=True)
+class EndpointConfig:
+    endpoint: str
+    deployment: str
+    weight: float = 1.0
+    api_key: str | None = None
+    """The key of the endpoint, the client's key or token is sent when None."""
+
+
+def parse_endpoints(value: str, default_deployment: str) -> list[EndpointConfig]:
+    """The endpoints of `AZURE_OPENAI_ENDPOINTS`, the deployment defaults to the
+    deployed model name.
+
+    :raises ValueError: If the value is not a list of endpoints.
+    """
+    entries = json.loads(value)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("AZURE_OPENAI_ENDPOINTS must be a non-empty JSON list.")
+    try:
+        endpoints = [
+            EndpointConfig(**{"deployment": default_deployment, **entry})
+            for entry in entries
+        ]
+    except TypeError as e:
+        raise ValueError(f"Invalid entry in AZURE_OPENAI_ENDPOINTS: {e}") from e
+    if any(endpoint.weight <= 0 for endpoint in endpoints):
+        raise ValueError("The weights of AZURE_OPENAI_ENDPOINTS must be positive.")
+    return endpoints
+
+
+@dataclass
+class CircuitBreaker:
+    """Stops requests to an endpoint after `failure_threshold` consecutive
+    failures, for `open_seconds`. Then a single request probes the endpoint, its
+    success closes the circuit and its failure opens it again."""
+
+    failure_threshold: int
+    open_seconds: float
+    failures: int = 0
+    open_until: float = 0.0
+    probing: bool = False
+
+    def get_state(self, now: float) -> int:
+        if self.failures < self.failure_threshold:
+            return CLOSED
+        return OPEN if now < self.open_until or self.probing else HALF_OPEN
+
+    def acquire(self, now: float) -> bool:
+        """Start a request, True if it is the probe of a half-open circuit."""
+        self.probing = self.get_state(now) == HALF_OPEN
+        return self.probing
+
+    def release(self, probe: bool) -> None:
+        # a probe that ended without a response doesn't keep the circuit open,
+        # other requests leave a probe in flight alone
+        if probe:
+            self.probing = False
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self.probing = False
+
+    def on_failure(self, now: float, open_seconds: float | None = None) -> None:
+        """Count a failure, `open_seconds` opens the circuit right away, as the
+        retry-after of a 429 does."""
+        self.failures += 1
+        if open_seconds is not None:
+            self.failures = max(self.failures, self.failure_threshold)
+        if self.failures >= self.failure_threshold:
+            self.open_until = now + (open_seconds or self.open_seconds)
+        self.probing = False
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    failures: int = 0
+
+
+@dataclass
+class Endpoint:
+    index: int
+    config: EndpointConfig
+    breaker: CircuitBreaker
+    default_deployment: str
+    """The deployment the client requests, the others keep their name."""
+    url: httpx.URL = field(init=False)
+    stats: EndpointStats = field(default_factory=EndpointStats)
+    latency: float = 0.0
+    """Moving average of the seconds until the response headers."""
+    updated: float = 0.0
+    outstanding: int = 0
+
+    def __post_init__(self) -> None:
+        self.url = httpx.URL(self.config.endpoint)
+
+    @property
+    def name(self) -> str:
+        return f"{self.url.host}/{self.config.deployment}"
+
+    def get_deployment(self, requested: str) -> str:
+        """The deployment of the endpoint for a request to `requested`, the
+        deployments of other model tiers have the same name on every endpoint."""
+        if requested == self.default_deployment:
+            return self.config.deployment
+        return requested
+
+    def get_cost(self, now: float) -> float:
+        """The expected wait for a response, relative to the other endpoints."""
+        decay = math.exp(-(now - self.updated) / LATENCY_DECAY_SECONDS)
+        return self.latency * decay * (self.outstanding + 1) / self.config.weight
+
+
+@dataclass
+class EndpointPoolStats:
+    failovers: int = 0
+    unavailable: int = 0
+    """Requests failed right away because every circuit was open."""
+
+
+@dataclass
+class EndpointPool(IEndpointPool):
+    """The deployments requests are balanced across, with a circuit breaker each.
+
+    Of two endpoints drawn by weight, a request goes to the one with the lower
+    cost: its latency, the moving average of the time to the response headers
+    of its successful requests, times its outstanding requests. An endpoint with
+    many requests in flight or a slow one gets fewer new requests, and the
+    latency of an unused endpoint decays, so it is retried once it recovered.
+    """
+
+    env: EndpointPoolEnv
+    stats: EndpointPoolStats = field(default_factory=EndpointPoolStats, init=False)
+    endpoints: list[Endpoint] = field(init=False)
+    _rng: random.Random = field(default_factory=random.Random, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        configs = [
+            EndpointConfig(
+                self.env.azure_openai_endpoint,
+                self.env.azure_openai_deployed_model_name,
+            )
+        ]
+        if self.env.azure_openai_endpoints:
+            configs = parse_endpoints(
+                self.env.azure_openai_endpoints,
+                self.env.azure_openai_deployed_model_name,
+            )
+        self.endpoints = [
+            Endpoint(
+                index,
+                config,
+                CircuitBreaker(
+                    self.env.azure_openai_circuit_failures,
+                    self.env.azure_openai_circuit_open_seconds,
+                ),
+                self.env.azure_openai_deployed_model_name,
+            )
+            for index, config in enumerate(configs)
+        ]
+
+    @property
+    def size(self) -> int:
+        return len(self.endpoints)
+
+    def choose(self, exclude: Collection[int] = ()) -> tuple[Endpoint, bool] | None:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                endpoint
+                for endpoint in self.endpoints
+                if endpoint.index not in exclude
+                and endpoint.breaker.get_state(now) != OPEN
+            ]
+            if not candidates:
+                if not exclude:
+                    self.stats.unavailable += 1
+                return None
+
+            first, second = self._rng.choices(
+                candidates, [endpoint.config.weight for endpoint in candidates], k=2
+            )
+            chosen = min(first, second, key=lambda endpoint: endpoint.get_cost(now))
+            probe = chosen.breaker.acquire(now)
+            chosen.outstanding += 1
+            chosen.stats.requests += 1
+            self.stats.failovers += bool(exclude)
+            return chosen, probe
+
+    def record(
+        self,
+        endpoint: Endpoint,
+        seconds: float,
+        status_code: int | None,
+        retry_after: float | None = None,
+    ) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if status_code is not None and status_code < 500 and status_code != 429:
+                endpoint.latency += EWMA_ALPHA * (seconds - endpoint.latency)
+                endpoint.updated = now
+                endpoint.breaker.on_success()
+                return
+
+            endpoint.stats.failures += 1
+            endpoint.breaker.on_failure(
+                now, retry_after if status_code == 429 else None
+            )
+
+    def release(self, endpoint: Endpoint, probe: bool = False) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.breaker.release(probe)
+
+    def get_metrics(self) -> dict[str, float]:
+        now = time.monotonic()
+        metrics: dict[str, float] = {
+            "failovers": self.stats.failovers,
+            "unavailable": self.stats.unavailable,
+        }
+        for endpoint in self.endpoints:
+            metrics |= {
+                f"{endpoint.name}.requests": endpoint.stats.requests,
+                f"{endpoint.name}.failures": endpoint.stats.failures,
+                f"{endpoint.name}.latency_ms": endpoint.latency * 1000,
+                f"{endpoint.name}.outstanding": endpoint.outstanding,
+                f"{endpoint.name}.circuit": endpoint.breaker.get_state(now),
+            }
+        return metrics
+
+
+class BalancedTransport(httpx.AsyncBaseTransport):
+    """Sends each request to a deployment of the pool, chosen per request, and
+    fails over to another one when the endpoint fails, answers 5xx or 429.
+
+    Only requests to a deployment are balanced; the others, such as batch files
+    and jobs, which only exist on the endpoint they were created on, go to the
+    client's endpoint. A request is sent to each endpoint at most once, the
+    response of the last one is returned as is, so the client still retries.
+
+    With a `limiter`, each endpoint is sent its requests through the limiter of
+    the endpoint, which adapts to that endpoint's 429s and rate limit headers.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        pool: IEndpointPool,
+        limiter: IRateLimiter | None = None,
+    ):
+        self._transport = transport
+        self._pool = pool
+        self._limiter = limiter
+        self._transports: dict[int, httpx.AsyncBaseTransport] = {}
+
+    def _get_transport(self, endpoint: Endpoint) -> httpx.AsyncBaseTransport:
+        if self._limiter is None:
+            return self._transport
+
+        transport = self._transports.get(endpoint.index)
+        if transport is None:
+            transport = self._transports[endpoint.index] = RateLimitedTransport(
+                self._transport, self._limiter.for_endpoint(endpoint.name)
+            )
+        return transport
+
+    def _rewrite(self, request: httpx.Request, endpoint: Endpoint) -> httpx.Request:
+        url = endpoint.url
+        path = _DEPLOYMENT.sub(
+            lambda match: match.group(1) + endpoint.get_deployment(match.group(2)),
+            request.url.path,
+            count=1,
+        )
+        headers = request.headers.copy()
+        headers["host"] = url.netloc.decode()
+        if endpoint.config.api_key:
+            headers["api-key"] = endpoint.config.api_key
+        return httpx.Request(
+            request.method,
+            request.url.copy_with(
+                scheme=url.scheme, host=url.host, port=url.port, path=path
+            ),
+            headers=headers,
+            content=request.content,
+            extensions=request.extensions,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if "/deployments/" not in request.url.path or not isinstance(
+            request.stream, httpx.ByteStream
+        ):
+            return await self._transport.handle_async_request(request)
+
+        tried: list[int] = []
+        failed: httpx.Response | None = None
+        error: httpx.TransportError | None = None
+        while (chosen := self._pool.choose(tried)) is not None:
+            endpoint, probe = chosen
+            if failed is not None:
+                await failed.aclose()
+                failed = None
+            tried.append(endpoint.index)
+
+            started = time.monotonic()
+            try:
+                response = await self._get_transport(endpoint).handle_async_request(
+                    self._rewrite(request, endpoint)
+                )
+            except httpx.TransportError as e:
+                self._pool.record(endpoint, time.monotonic() - started, None)
+                self._pool.release(endpoint, probe)
+                error = e
+                continue
+            except BaseException:
+                self._pool.release(endpoint, probe)
+                raise
+
+            status_code = response.status_code
+            self._pool.record(
+                endpoint,
+                time.monotonic() - started,
+                status_code,
+                get_retry_after(response.headers) if status_code == 429 else None,
+            )
+
+            async def release(
+                endpoint: Endpoint = endpoint, probe: bool = probe
+            ) -> None:
+                self._pool.release(endpoint, probe)
+
+            assert isinstance(response.stream, httpx.AsyncByteStream)
+            response = httpx.Response(
+                status_code=status_code,
+                headers=response.headers,
+                stream=ReleasingStream(response.stream, release),
+                extensions=response.extensions,
+                request=request,
+            )
+            if status_code < 500 and status_code != 429:
+                return response
+            failed = response
+
+        if failed is not None:
+            return failed
+        if error is not None:
+            raise error
+        raise httpx.ConnectError(
+            "The circuits of all endpoints are open.", request=request
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
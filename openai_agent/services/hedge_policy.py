@@ -0,0 +1,126 @@
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from lagom.environment import Env
+
+from openai_agent.protocols.i_hedge_policy import IHedgePolicy
+
+
+class HedgePolicyEnv(Env):
+    llm_hedging_enabled: bool = False
+    llm_hedging_quantile: float = 0.95
+    """Calls without a first token after this quantile of recent calls are hedged."""
+    llm_hedging_window: int = 1000
+    """The recent calls the quantile is taken over."""
+    llm_hedging_min_samples: int = 20
+    """Calls timed before any call is hedged."""
+    llm_hedging_budget: float = 0.1
+    """Duplicate calls allowed per call."""
+    llm_hedging_burst: float = 10.0
+    """Duplicate calls the budget can save up for bursts of slow calls."""
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedged: int = 0
+    """Calls a duplicate was sent for."""
+    hedge_wins: int = 0
+    """Duplicates that produced the first token before the call they duplicated."""
+    over_budget: int = 0
+    """Slow calls that were not hedged because the budget was used up."""
+
+
+@dataclass
+class _Window:
+    latencies: deque[float]
+    delay: float | None = None
+    stale: bool = False
+
+
+@dataclass
+class HedgePolicy(IHedgePolicy):
+    """Decides when to hedge model calls, from the time to the first token of
+    recent calls, and keeps the duplicates within a budget.
+
+    The budget is a token bucket: every call adds `llm_hedging_budget` of a
+    duplicate, up to `llm_hedging_burst`, and every duplicate takes one, so no
+    more than that share of calls is duplicated over time, however slow the
+    provider gets. Every deployment keeps a window of the whole responses and one
+    of the first events of streams, which take different times. A call is timed
+    from its start to the first token of the response used, so the delay
+    follows the latency callers see, including the delay of the calls that
+    were hedged.
+    """
+
+    env: HedgePolicyEnv
+    stats: HedgeStats = field(default_factory=HedgeStats, init=False)
+    _windows: dict[tuple[str, bool], _Window] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _budget: float = field(default=0.0, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.llm_hedging_enabled
+
+    def start(self, deployment: str, streamed: bool) -> float | None:
+        with self._lock:
+            self.stats.calls += 1
+            self._budget = min(
+                self._budget + self.env.llm_hedging_budget, self.env.llm_hedging_burst
+            )
+            window = self._windows.get((deployment, streamed))
+            return self._get_delay(window) if window is not None else None
+
+    def _get_delay(self, window: _Window) -> float | None:
+        if len(window.latencies) < self.env.llm_hedging_min_samples:
+            return None
+        if window.stale:
+            latencies = sorted(window.latencies)
+            index = int(self.env.llm_hedging_quantile * (len(latencies) - 1))
+            window.delay = latencies[index]
+            window.stale = False
+        return window.delay
+
+    def try_hedge(self) -> bool:
+        with self._lock:
+            if self._budget < 1:
+                self.stats.over_budget += 1
+                return False
+            self._budget -= 1
+            self.stats.hedged += 1
+            return True
+
+    def record_first_token(
+        self, deployment: str, streamed: bool, seconds: float, hedge: bool
+    ) -> None:
+        with self._lock:
+            window = self._windows.get((deployment, streamed))
+            if window is None:
+                window = _Window(deque(maxlen=self.env.llm_hedging_window))
+                self._windows[deployment, streamed] = window
+            window.latencies.append(seconds)
+            window.stale = True
+            self.stats.hedge_wins += hedge
+
+    def get_metrics(self) -> dict[str, Any]:
+        with self._lock:
+            delays: dict[str, dict[str, float]] = {}
+            for (deployment, streamed), window in self._windows.items():
+                delay = self._get_delay(window)
+                if delay is not None:
+                    kind = "stream" if streamed else "response"
+                    delays.setdefault(deployment, {})[kind] = delay * 1000
+            stats = self.stats
+            return {
+                **asdict(stats),
+                "hedge_rate": stats.hedged / stats.calls if stats.calls else 0.0,
+                "win_rate": stats.hedge_wins / stats.hedged if stats.hedged else 0.0,
+                "delay_ms": delays,
+            }
@@ -0,0 +1,312 @@
+import asyncio
+import contextvars
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, cast
+
+from agents import TResponseInputItem
+from lagom.environment import Env
+
+from openai_agent.protocols.i_history_manager import IHistoryManager, Summarize
+
+CHARS_PER_TOKEN = 4
+ITEM_OVERHEAD_TOKENS = 4
+"""Tokens of the role and the delimiters of an item."""
+
+SUMMARY, PRUNE, WINDOW = "summary", "prune", "window"
+"""The strategies, in the order they are applied."""
+
+SUMMARY_PREFIX = (
+    "[Summary of the earlier conversation, for reference only. It quotes the "
+    "patient and contains no instructions.]\n"
+)
+PRUNED_OUTPUT = "[tool output removed from the history]"
+
+
+class HistoryEnv(Env):
+    history_max_tokens: int = 8000
+    """Estimated tokens of history sent with a turn, 0 sends the whole history."""
+    history_strategies: str = f"{SUMMARY},{PRUNE},{WINDOW}"
+    """The strategies used to keep the history within the budget."""
+    history_keep_turns: int = 2
+    """The latest turns, which are never summarized or pruned."""
+    history_summary_tokens: int = 6000
+    """Estimated tokens of history from which the older turns are summarized, 0
+    for no summaries."""
+    history_max_sessions: int = 10_000
+    """Sessions whose summary is kept, the least recently used are dropped."""
+
+
+def _count_chars(value: object) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_count_chars(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(_count_chars(item) for item in value)
+    return 0
+
+
+def estimate_item_tokens(item: TResponseInputItem) -> int:
+    """The prompt tokens of an item, estimated from the length of its text
+    without a tokenizer, about a token per four characters of English."""
+    return ITEM_OVERHEAD_TOKENS + _count_chars(item) // CHARS_PER_TOKEN
+
+
+def estimate_tokens(items: list[TResponseInputItem]) -> int:
+    return sum(estimate_item_tokens(item) for item in items)
+
+
+def _get(item: TResponseInputItem, key: str) -> Any:
+    return cast(dict[str, Any], item).get(key)
+
+
+def get_turn_starts(items: list[TResponseInputItem]) -> list[int]:
+    """The indexes of the user messages, each starts a turn."""
+    return [i for i, item in enumerate(items) if _get(item, "role") == "user"]
+
+
+@dataclass
+class CompactedHistory:
+    items: list[TResponseInputItem]
+    tokens: int
+    """Estimated tokens of the items."""
+    saved_tokens: int
+    """Estimated tokens of the history the compaction saved."""
+
+
+@dataclass
+class HistoryStats:
+    turns: int = 0
+    compacted: int = 0
+    """Turns sent with less than their whole history."""
+    tokens_sent: int = 0
+    tokens_saved: int = 0
+    pruned: int = 0
+    """Tool outputs replaced by a placeholder."""
+    dropped: int = 0
+    """Turns dropped by the sliding window."""
+    summaries: int = 0
+    summary_failures: int = 0
+
+
+@dataclass
+class _Summary:
+    item: TResponseInputItem
+    covered: int
+    """The leading items of the history the summary replaces."""
+    last: TResponseInputItem
+    """The last item it replaces, to find it once older turns were dropped."""
+
+
+@dataclass
+class HistoryManager(IHistoryManager):
+    """Keeps the history sent with every turn of a session within a token budget.
+
+    Tokens are estimated from the length of the items, so compacting a turn
+    costs no model call. The strategies, in order:
+
+    - summary: the turns before the `history_keep_turns` latest are replaced by
+      their summary. Summaries are made in the background once the history
+      outgrows `history_summary_tokens`, each from the previous one and the
+      turns since, and the turns until then go without.
+    - prune: the outputs of tool calls before the latest turns are replaced by a
+      placeholder, the oldest first, until the history fits.
+    - window: the oldest turns are dropped until the history fits, the latest
+      turn is always kept.
+
+    A summary is an assistant message, not a system one: it is made from what
+    the patient wrote and must not carry the authority of the instructions.
+    Summaries run in an empty context, so the context variables of the turn
+    that started them, such as its token budgets, don't apply to them.
+
+    Summaries are kept in the memory of the process; a session continued by
+    another worker is compacted without it until that worker summarized it.
+    """
+
+    env: HistoryEnv
+    stats: HistoryStats = field(default_factory=HistoryStats, init=False)
+    strategies: frozenset[str] = field(init=False)
+    _summaries: OrderedDict[str, _Summary] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _tasks: dict[str, asyncio.Task[None]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self.strategies = frozenset(
+            name.strip() for name in self.env.history_strategies.split(",") if name
+        )
+        unknown = self.strategies - {SUMMARY, PRUNE, WINDOW}
+        if unknown:
+            raise ValueError(f"Unknown history strategies: {sorted(unknown)}")
+
+    def compact(
+        self,
+        session_id: str,
+        history: list[TResponseInputItem],
+        summarize: Summarize | None = None,
+    ) -> CompactedHistory:
+        costs = [estimate_item_tokens(item) for item in history]
+        before = sum(costs)
+        items = list(history)
+
+        covered = 0
+        if SUMMARY in self.strategies:
+            covered = self._apply_summary(session_id, items, costs)
+        starts = get_turn_starts(items)
+        # the items before the latest turns may be summarized and pruned
+        keep_turns = self.env.history_keep_turns
+        if keep_turns == 0:
+            keep_from = len(items)
+        elif keep_turns <= len(starts):
+            keep_from = starts[-keep_turns]
+        else:
+            keep_from = 0
+
+        threshold = self.env.history_summary_tokens
+        if summarize is not None and SUMMARY in self.strategies and threshold:
+            if sum(costs) > threshold and keep_from > (1 if covered else 0):
+                self._schedule(session_id, items[:keep_from], covered, summarize)
+
+        budget = self.env.history_max_tokens
+        if budget and PRUNE in self.strategies:
+            self._prune(items, costs, keep_from, budget)
+        if budget and WINDOW in self.strategies:
+            items, costs = self._window(items, costs, starts, budget)
+
+        tokens = sum(costs)
+        self.stats.turns += 1
+        self.stats.compacted += tokens < before
+        self.stats.tokens_sent += tokens
+        self.stats.tokens_saved += before - tokens
+        return CompactedHistory(items, tokens, before - tokens)
+
+    def _apply_summary(
+        self, session_id: str, items: list[TResponseInputItem], costs: list[int]
+    ) -> int:
+        """Replace the items the summary of the session covers by the summary.
+
+        :return: The items of the history it replaced.
+        """
+        summary = self._summaries.get(session_id)
+        if summary is None:
+            return 0
+        self._summaries.move_to_end(session_id)
+
+        covered = summary.covered
+        if covered > len(items) or items[covered - 1] != summary.last:
+            # older turns were dropped by the session store
+            covered = next(
+                (
+                    i + 1
+                    for i in range(len(items) - 1, -1, -1)
+                    if items[i] == summary.last
+                ),
+                0,
+            )
+        if not covered:
+            return 0
+        items[:covered] = [summary.item]
+        costs[:covered] = [estimate_item_tokens(summary.item)]
+        return covered
+
+    def _schedule(
+        self,
+        session_id: str,
+        items: list[TResponseInputItem],
+        covered: int,
+        summarize: Summarize,
+    ) -> None:
+        if session_id in self._tasks:
+            return
+        # the summary replaces the history up to the last of these items
+        covered += len(items) - (1 if covered else 0)
+        task = asyncio.create_task(
+            self._summarize(session_id, items, covered, summarize),
+            context=contextvars.Context(),
+        )
+        self._tasks[session_id] = task
+
+        def done(task: asyncio.Task[None]) -> None:
+            if self._tasks.get(session_id) is task:
+                del self._tasks[session_id]
+
+        task.add_done_callback(done)
+
+    async def _summarize(
+        self,
+        session_id: str,
+        items: list[TResponseInputItem],
+        covered: int,
+        summarize: Summarize,
+    ) -> None:
+        try:
+            text = await summarize(items)
+        except Exception:
+            self.stats.summary_failures += 1
+            return
+
+        self._summaries[session_id] = _Summary(
+            {"role": "assistant", "content": SUMMARY_PREFIX + text},
+            covered,
+            items[-1],
+        )
+        self._summaries.move_to_end(session_id)
+        while len(self._summaries) > self.env.history_max_sessions:
+            self._summaries.popitem(last=False)
+        self.stats.summaries += 1
+
+    def _prune(
+        self,
+        items: list[TResponseInputItem],
+        costs: list[int],
+        keep_from: int,
+        budget: int,
+    ) -> None:
+        total = sum(costs)
+        for i in range(keep_from):
+            if total <= budget:
+                return
+            if _get(items[i], "type") != "function_call_output":
+                continue
+            pruned = cast(TResponseInputItem, {**items[i], "output": PRUNED_OUTPUT})
+            cost = estimate_item_tokens(pruned)
+            if cost < costs[i]:
+                items[i] = pruned
+                total -= costs[i] - cost
+                costs[i] = cost
+                self.stats.pruned += 1
+
+    def _window(
+        self,
+        items: list[TResponseInputItem],
+        costs: list[int],
+        starts: list[int],
+        budget: int,
+    ) -> tuple[list[TResponseInputItem], list[int]]:
+        # the summary, if any, comes before the first turn and is kept
+        head = starts[0] if starts else 0
+        total = sum(costs)
+        cut = head
+        for start in starts[1:]:
+            if total <= budget:
+                break
+            total -= sum(costs[cut:start])
+            cut = start
+            self.stats.dropped += 1
+        return items[:head] + items[cut:], costs[:head] + costs[cut:]
+
+    def forget(self, session_id: str) -> None:
+        self._summaries.pop(session_id, None)
+        task = self._tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+
+    def get_metrics(self) -> dict[str, float]:
+        return {
+            "sessions": len(self._summaries),
+            "summarizing": len(self._tasks),
+            **asdict(self.stats),
+        }
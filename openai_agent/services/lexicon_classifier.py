@@ -0,0 +1,56 @@
+import re
+from dataclasses import dataclass, field
+from typing import Literal
+
+LexiconDecision = Literal["allow", "block", "uncertain"]
+
+
+@dataclass
+class LexiconVerdict:
+    decision: LexiconDecision
+    score: float
+    matches: list[str]
+
+
+@dataclass
+class LexiconClassifier:
+    """Scores text against a weighted lexicon of regular expressions.
+
+    Each pattern counts once (case insensitive, matched on word boundaries). Scores
+    at or above `block_threshold` are blocked, scores at or below
+    `allow_threshold` are allowed and everything in between is uncertain and
+    should be escalated to a more expensive check. Text that matches a pattern
+    with a positive weight is never allowed: negative weights can lower a block to
+    uncertain, but cannot cancel a cue out.
+    """
+
+    weights: dict[str, float]
+    block_threshold: float
+    allow_threshold: float
+    _patterns: list[tuple[str, re.Pattern[str], float]] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.allow_threshold >= self.block_threshold:
+            raise ValueError("allow_threshold must be lower than block_threshold.")
+
+        self._patterns = [
+            (term, re.compile(rf"\b(?:{term})\b", re.IGNORECASE), weight)
+            for term, weight in self.weights.items()
+        ]
+
+    def classify(self, text: str) -> LexiconVerdict:
+        matches = [term for term, pattern, _ in self._patterns if pattern.search(text)]
+        score = sum(self.weights[term] for term in matches)
+
+        if score >= self.block_threshold:
+            decision: LexiconDecision = "block"
+        elif score <= self.allow_threshold and not any(
+            self.weights[term] > 0 for term in matches
+        ):
+            decision = "allow"
+        else:
+            decision = "uncertain"
+
+        return LexiconVerdict(decision=decision, score=score, matches=matches)
@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+
+from openai_agent.services.bm25_index import BM25Index, tokenize
+
+
+@dataclass
+class RouteDecision:
+    route: str | None
+    """The selected route, None when the router is not confident enough."""
+
+    confidence: float
+    candidates: list[tuple[str, float]]
+    matches: int = 0
+    """The distinct terms of the message found in the vocabulary of the best route."""
+    escalated: bool = False
+    """True when the message has a term of `escalate_terms`."""
+
+
+@dataclass
+class LocalRouterStats:
+    routed: int = 0
+    fallbacks: int = 0
+    escalations: int = 0
+    """Fallbacks because of a term of `escalate_terms`."""
+
+
+@dataclass
+class LocalRouter:
+    """Routes a message to one of `routes` (route name to vocabulary text) with a
+    BM25 index, so confident cases skip an LLM triage call.
+
+    Confidence is the relative margin between the best and the second best score.
+    A route is only returned when the best score reaches `min_score`, it leads
+    the second by at least `min_margin`, the confidence reaches
+    `min_confidence` and at least `min_matches` distinct terms of the message
+    are in its vocabulary. A single matching word gives a confidence of 1 on
+    its own, so the absolute evidence is what keeps it from routing. Messages
+    with any of the `escalate_terms`, such as the signs of an emergency, are
+    always left to the LLM.
+    """
+
+    routes: dict[str, str]
+    min_score: float = 1.0
+    min_confidence: float = 0.4
+    min_margin: float = 0.0
+    min_matches: int = 2
+    escalate_terms: str = ""
+    stats: LocalRouterStats = field(default_factory=LocalRouterStats)
+    _index: BM25Index = field(init=False, repr=False)
+    _escalate: frozenset[str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._index = BM25Index(self.routes)
+        self._escalate = frozenset(tokenize(self.escalate_terms))
+
+    def route(self, text: str) -> RouteDecision:
+        candidates = self._index.search(text, top_k=3)
+        best = candidates[0][1] if candidates else 0.0
+        second = candidates[1][1] if len(candidates) > 1 else 0.0
+        confidence = 1 - second / best if best else 0.0
+        matches = len(self._index.get_matches(text, candidates[0][0])) if best else 0
+
+        if not self._escalate.isdisjoint(tokenize(text)):
+            self.stats.fallbacks += 1
+            self.stats.escalations += 1
+            return RouteDecision(None, confidence, candidates, matches, True)
+
+        if (
+            best >= self.min_score
+            and best - second >= self.min_margin
+            and confidence >= self.min_confidence
+            and matches >= self.min_matches
+        ):
+            self.stats.routed += 1
+            return RouteDecision(candidates[0][0], confidence, candidates, matches)
+
+        self.stats.fallbacks += 1
+        return RouteDecision(None, confidence, candidates, matches)
@@ -0,0 +1,82 @@
+import json
+from dataclasses import dataclass, field
+
+from lagom.environment import Env
+
+from openai_agent.protocols.i_model_tiers import IModelTiers
+
+FAST, SMALL, LARGE = "fast", "small", "large"
+"""The tiers agents declare: `fast` for classifications and routing on the
+critical path, `small` for simple generation such as translation and `large` for
+reasoning."""
+
+DEFAULT_TIER = LARGE
+
+
+class ModelTiersEnv(Env):
+    azure_openai_deployed_model_name: str
+    llm_model_tiers: str = ""
+    """A JSON object of the deployment of each tier, e.g. `{"fast": "gpt-4.1-nano"}`.
+    Tiers that are not listed run on the deployed model name."""
+    llm_agent_tiers: str = ""
+    """A JSON object of the tier of agents by name, overriding the tier they
+    declare, e.g. `{"triage_agent": "large"}`."""
+
+
+def parse_mapping(value: str, name: str) -> dict[str, str]:
+    """The JSON object of strings in `value`, empty for an empty value.
+
+    :raises ValueError: If the value is not a JSON object of strings.
+    """
+    if not value:
+        return {}
+    mapping = json.loads(value)
+    if not isinstance(mapping, dict) or not all(
+        isinstance(key, str) and isinstance(item, str) and item
+        for key, item in mapping.items()
+    ):
+        raise ValueError(f"{name} must be a JSON object of names.")
+    return mapping
+
+
+@dataclass
+class ModelTiers(IModelTiers):
+    """The deployments agents run on, by tier.
+
+    Agents declare the tier they need and the configuration maps every tier to a
+    deployment, so latency sensitive hops run on smaller, faster deployments
+    while a single deployment keeps serving every tier by default. Each
+    environment can move an agent to another tier with `LLM_AGENT_TIERS`.
+    """
+
+    env: ModelTiersEnv
+    deployments: dict[str, str] = field(init=False)
+    overrides: dict[str, str] = field(init=False)
+    _agents: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        default = self.env.azure_openai_deployed_model_name
+        self.deployments = {
+            FAST: default,
+            SMALL: default,
+            LARGE: default,
+            **parse_mapping(self.env.llm_model_tiers, "LLM_MODEL_TIERS"),
+        }
+        self.overrides = parse_mapping(self.env.llm_agent_tiers, "LLM_AGENT_TIERS")
+        unknown = set(self.overrides.values()) - set(self.deployments)
+        if unknown:
+            raise ValueError(f"LLM_AGENT_TIERS uses unknown tiers: {sorted(unknown)}")
+
+    def get_tier(self, agent: str, default: str) -> str:
+        tier = self.overrides.get(agent, default)
+        self._agents[agent] = tier
+        return tier
+
+    def get_deployment(self, tier: str) -> str:
+        try:
+            return self.deployments[tier]
+        except KeyError:
+            raise ValueError(f"Unknown model tier: {tier}") from None
+
+    def get_metrics(self) -> dict[str, dict[str, str]]:
+        return {"tiers": dict(self.deployments), "agents": dict(self._agents)}
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Mapping
+
+import httpx
+from lagom.environment import Env
+
+from openai_agent.protocols.i_rate_limiter import IRateLimiter
+
+DEFAULT_RETRY_AFTER = 1.0
+"""Seconds to pause after a 429 without a retry-after header."""
+
+
+class RateLimiterEnv(Env):
+    azure_openai_rpm_limit: int = 0
+    azure_openai_tpm_limit: int = 0
+    azure_openai_max_concurrency: int = 64
+    azure_openai_min_concurrency: int = 1
+
+
+def estimate_tokens(body: bytes) -> int:
+    """The prompt tokens of a request body at roughly 4 bytes per token, plus the
+    completion budget the deployment reserves for it."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+
+    completion = 0
+    if isinstance(payload, dict):
+        completion = payload.get("max_completion_tokens") or payload.get("max_tokens")
+    return len(body) // 4 + int(completion or 0)
+
+
+def get_retry_after(headers: Mapping[str, str]) -> float:
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, ValueError):
+            continue
+    return DEFAULT_RETRY_AFTER
+
+
+@dataclass
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to one minute's worth.
+
+    Reservations may overdraw the bucket; later callers wait until the debt has
+    refilled. Callers are served in arrival order and large requests can't be
+    starved by small ones.
+    """
+
+    per_minute: int
+    _available: float = field(init=False, repr=False)
+    _updated: float = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._available = float(self.per_minute)
+        self._updated = time.monotonic()
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._available
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units and return the seconds to wait before using them."""
+        self._refill()
+        self._available -= amount
+        return max(0.0, -self._available) * 60 / self.per_minute
+
+    def refund(self, amount: float) -> None:
+        """Give back units reserved for a request that was never sent."""
+        self._refill()
+        self._available = min(float(self.per_minute), self._available + amount)
+
+    def sync(self, remaining: float) -> None:
+        """Lower the level to what the server reports as remaining."""
+        self._refill()
+        self._available = min(self._available, remaining)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        refill = (now - self._updated) * self.per_minute / 60
+        self._available = min(float(self.per_minute), self._available + refill)
+        self._updated = now
+
+
+@dataclass
+class RateLimiterStats:
+    requests: int = 0
+    throttled: int = 0
+    decreases: int = 0
+    wait_seconds: float = 0.0
+
+
+@dataclass
+class RateLimiter(IRateLimiter):
+    """Client side limits for requests per minute, tokens per minute and
+    concurrent requests, shared by every caller of the deployment.
+
+    The concurrency limit adapts AIMD style: it grows by one per window of
+    successful requests and halves when the deployment answers 429. A 429 also
+    pauses all requests for its retry-after, so retries don't arrive as a burst.
+    The buckets follow the remaining requests and tokens the deployment reports.
+    Deployments balanced across endpoints have a limiter of the same limits per
+    endpoint, so one endpoint's 429 doesn't hold back the others.
+    """
+
+    env: RateLimiterEnv
+    stats: RateLimiterStats = field(default_factory=RateLimiterStats, init=False)
+    _requests: TokenBucket | None = field(default=None, init=False, repr=False)
+    _tokens: TokenBucket | None = field(default=None, init=False, repr=False)
+    _limit: float = field(default=0.0, init=False, repr=False)
+    _in_flight: int = field(default=0, init=False, repr=False)
+    _paused_until: float = field(default=0.0, init=False, repr=False)
+    _condition: asyncio.Condition = field(
+        default_factory=asyncio.Condition, init=False, repr=False
+    )
+    _endpoints: dict[str, "RateLimiter"] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.env.azure_openai_rpm_limit > 0:
+            self._requests = TokenBucket(self.env.azure_openai_rpm_limit)
+        if self.env.azure_openai_tpm_limit > 0:
+            self._tokens = TokenBucket(self.env.azure_openai_tpm_limit)
+        self._limit = float(self.env.azure_openai_max_concurrency)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        started = time.monotonic()
+        reserved = [
+            (bucket, amount)
+            for bucket, amount in (
+                (self._requests, 1),
+                (self._tokens, estimated_tokens),
+            )
+            if bucket is not None
+        ]
+        waits = [bucket.reserve(amount) for bucket, amount in reserved]
+        acquired = False
+        try:
+            await asyncio.sleep(max(waits, default=0.0))
+
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: self._in_flight < int(self._limit)
+                )
+                self._in_flight += 1
+                acquired = True
+
+            while (pause := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(pause)
+        except BaseException:
+            # the request is never sent, later callers may use its reservation
+            for bucket, amount in reserved:
+                bucket.refund(amount)
+            if acquired:
+                await self.release()
+            raise
+
+        self.stats.requests += 1
+        self.stats.wait_seconds += time.monotonic() - started
+
+    def on_response(self, status_code: int, headers: Mapping[str, str]) -> None:
+        now = time.monotonic()
+        if status_code == 429:
+            self.stats.throttled += 1
+            # the requests throttled together count as a single decrease
+            if now >= self._paused_until:
+                self._limit = max(
+                    float(self.env.azure_openai_min_concurrency), self._limit / 2
+                )
+                self.stats.decreases += 1
+            self._paused_until = max(self._paused_until, now + get_retry_after(headers))
+        elif status_code < 400:
+            self._limit = min(
+                float(self.env.azure_openai_max_concurrency),
+                self._limit + 1 / self._limit,
+            )
+
+        for name, bucket in (
+            ("x-ratelimit-remaining-requests", self._requests),
+            ("x-ratelimit-remaining-tokens", self._tokens),
+        ):
+            if bucket is not None and name in headers:
+                try:
+                    bucket.sync(float(headers[name]))
+                except ValueError:
+                    pass
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def for_endpoint(self, name: str) -> IRateLimiter:
+        limiter = self._endpoints.get(name)
+        if limiter is None:
+            limiter = self._endpoints[name] = RateLimiter(self.env)
+        return limiter
+
+    def get_metrics(self) -> dict[str, float]:
+        metrics: dict[str, float] = {
+            "concurrency_limit": self._limit,
+            "in_flight": self._in_flight,
+            "paused_seconds": max(0.0, self._paused_until - time.monotonic()),
+            **asdict(self.stats),
+        }
+        if self._requests is not None:
+            metrics["requests_available"] = self._requests.available
+        if self._tokens is not None:
+            metrics["tokens_available"] = self._tokens.available
+        for name, limiter in self._endpoints.items():
+            metrics |= {
+                f"{name}.{key}": value for key, value in limiter.get_metrics().items()
+            }
+        return metrics
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """A response body that calls `release` once it is closed."""
+
+    def __init__(
+        self, stream: httpx.AsyncByteStream, release: Callable[[], Awaitable[None]]
+    ) -> None:
+        self._stream = stream
+        self._release: Callable[[], Awaitable[None]] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                await release()
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Sends the POST requests of a client through a rate limiter. A request holds
+    its concurrency slot until its (possibly streamed) response is closed.
+    Streamed uploads, such as batch input files, are not model calls and pass
+    through."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: IRateLimiter):
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST" or not isinstance(request.stream, httpx.ByteStream):
+            return await self._transport.handle_async_request(request)
+
+        await self._limiter.acquire(estimate_tokens(request.content))
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            await self._limiter.release()
+            raise
+
+        self._limiter.on_response(response.status_code, response.headers)
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=ReleasingStream(response.stream, self._limiter.release),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,185 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable
+
+from lagom.environment import Env
+
+from openai_agent.protocols.i_response_cache import IResponseCache
+
+
+class ResponseCacheEnv(Env):
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: float = 3600.0
+    llm_cache_sqlite_path: str | None = None
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task[str]
+    waiters: int = 0
+
+
+@dataclass
+class ResponseCache(IResponseCache):
+    """Two tier (in-memory LRU and optional SQLite) cache with TTL. Concurrent
+    lookups of a missing key are coalesced into a single call to the factory,
+    which runs in its own task until the last caller waiting for it is cancelled.
+    """
+
+    env: ResponseCacheEnv
+    stats: ResponseCacheStats = field(default_factory=ResponseCacheStats, init=False)
+    _entries: OrderedDict[str, tuple[float, str]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _in_flight: dict[str, _Call] = field(default_factory=dict, init=False, repr=False)
+    _db: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+    _db_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.env.llm_cache_sqlite_path:
+            self._db = sqlite3.connect(
+                self.env.llm_cache_sqlite_path, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.llm_cache_enabled
+
+    async def get_or_set(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        if not self.enabled:
+            return await factory()
+
+        value = self._get_memory(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+
+        call = self._in_flight.get(key)
+        if call is None:
+            call = self._in_flight[key] = _Call(
+                asyncio.ensure_future(self._fill(key, factory))
+            )
+        else:
+            self.stats.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # nobody waits for the value anymore, stop computing it
+            if call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    async def _fill(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        try:
+            value = await self._get_disk(key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                self._set_memory(key, value)
+                return value
+
+            self.stats.misses += 1
+            value = await factory()
+            self._set_memory(key, value)
+            await self._set_disk(key, value)
+            return value
+        finally:
+            del self._in_flight[key]
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def get_metrics(self) -> dict[str, float]:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            **asdict(self.stats),
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _get_memory(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: str) -> None:
+        self._entries[key] = (time.time() + self.env.llm_cache_ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.env.llm_cache_max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _get_disk(self, key: str) -> str | None:
+        db = self._db
+        if db is None:
+            return None
+
+        def _select() -> str | None:
+            with self._db_lock:
+                row = db.execute(
+                    "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+            return row[0] if row else None
+
+        return await asyncio.to_thread(_select)
+
+    async def _set_disk(self, key: str, value: str) -> None:
+        db = self._db
+        if db is None:
+            return
+
+        def _upsert() -> None:
+            with self._db_lock:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, value, time.time() + self.env.llm_cache_ttl_seconds),
+                )
+                db.commit()
+
+        await asyncio.to_thread(_upsert)
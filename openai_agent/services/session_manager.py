@@ -0,0 +1,147 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+from lagom.environment import Env
+
+from openai_agent.protocols.i_session_manager import ISessionManager
+from openai_agent.services.token_budget import TokenUsage
+
+T = TypeVar("T")
+
+
+class ServerBusyError(Exception):
+    """Raised when a run is not admitted, the client should retry later."""
+
+
+class SessionManagerEnv(Env):
+    session_max_concurrent_runs: int = 64
+    session_max_queued_runs: int = 256
+    session_max_sessions: int = 10_000
+
+
+@dataclass
+class Session:
+    id: str
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    """The tokens used by all runs of the session."""
+
+    tasks: set[asyncio.Task[Any]] = field(default_factory=set, repr=False)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+
+@dataclass
+class SessionManagerStats:
+    admitted: int = 0
+    rejected: int = 0
+    cancelled: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class SessionManager(ISessionManager):
+    """Keeps the run state per session and bounds the concurrent runs. The
+    conversations are kept in the session store, so evicting a session here
+    only forgets its locks and counters.
+
+    A run waits for the previous run of its session and for one of
+    `session_max_concurrent_runs` slots. When `session_max_queued_runs` runs
+    are already waiting, new runs are rejected instead of queued, so a
+    burst of requests is pushed back to the clients rather than piling up.
+    """
+
+    env: SessionManagerEnv
+    stats: SessionManagerStats = field(default_factory=SessionManagerStats, init=False)
+    draining: bool = field(default=False, init=False)
+    _sessions: OrderedDict[str, Session] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _tasks: set[asyncio.Task[Any]] = field(default_factory=set, init=False, repr=False)
+    _running: int = field(default=0, init=False, repr=False)
+    _semaphore: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.env.session_max_concurrent_runs)
+
+    def get_session(self, session_id: str | None = None) -> Session:
+        session_id = session_id or uuid.uuid4().hex
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = Session(session_id)
+            self._evict()
+
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def remove_session(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+
+        for task in session.tasks:
+            task.cancel()
+        return True
+
+    def start(
+        self, session: Session, run: Callable[[], Awaitable[T]]
+    ) -> asyncio.Task[T]:
+        if self.draining or len(self._tasks) >= (
+            self.env.session_max_concurrent_runs + self.env.session_max_queued_runs
+        ):
+            self.stats.rejected += 1
+            raise ServerBusyError("Too many runs in progress, retry later.")
+
+        task = asyncio.create_task(self._execute(session, run))
+        self.stats.admitted += 1
+        self._tasks.add(task)
+        session.tasks.add(task)
+
+        def done(task: asyncio.Task[T]) -> None:
+            self._tasks.discard(task)
+            session.tasks.discard(task)
+            if task.cancelled():
+                self.stats.cancelled += 1
+
+        task.add_done_callback(done)
+        return task
+
+    async def drain(self, timeout: float) -> None:
+        self.draining = True
+        if not self._tasks:
+            return
+
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_status(self) -> dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "running": self._running,
+            "queued": len(self._tasks) - self._running,
+            "draining": self.draining,
+            **asdict(self.stats),
+        }
+
+    async def _execute(self, session: Session, run: Callable[[], Awaitable[T]]) -> T:
+        async with session.lock, self._semaphore:
+            self._running += 1
+            try:
+                return await run()
+            finally:
+                self._running -= 1
+
+    def _evict(self) -> None:
+        """Drop the least recently used idle sessions above the limit."""
+        excess = len(self._sessions) - self.env.session_max_sessions
+        # the newest session is the one just requested
+        for session_id in list(self._sessions)[:-1]:
+            if excess <= 0:
+                break
+            if not self._sessions[session_id].tasks:
+                del self._sessions[session_id]
+                self.stats.evicted += 1
+                excess -= 1
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Literal
+
+from agents import TResponseInputItem
+from lagom.environment import Env
+
+from openai_agent.protocols.i_session_store import ISessionStore
+
+
+class SessionStoreEnv(Env):
+    session_store_backend: Literal["memory", "sqlite"] = "memory"
+    session_store_sqlite_path: str = ".sessions.sqlite"
+    session_store_max_turns: int = 50
+    """Turns loaded per session, 0 loads the whole conversation. Older turns only
+    live on in the history manager's summary of the session."""
+    session_store_max_sessions: int = 10_000
+    """Sessions kept by the memory backend, the least recently used are dropped."""
+
+
+def encode_turn(items: list[TResponseInputItem]) -> bytes:
+    """The items of a turn as compressed compact JSON."""
+    return zlib.compress(
+        json.dumps(items, separators=(",", ":"), ensure_ascii=False).encode()
+    )
+
+
+def decode_turn(turn: bytes) -> list[TResponseInputItem]:
+    return json.loads(zlib.decompress(turn))
+
+
+@dataclass
+class SessionState:
+    agent_name: str | None = None
+    """The agent that answered last, so later turns skip the triage."""
+
+    turns: list[bytes] = field(default_factory=list, repr=False)
+    """The encoded turns, oldest first."""
+
+    @property
+    def history(self) -> list[TResponseInputItem]:
+        """The items of all turns, decoded on access."""
+        return [item for turn in self.turns for item in decode_turn(turn)]
+
+
+@dataclass
+class SessionStoreStats:
+    loads: int = 0
+    appends: int = 0
+    turns_loaded: int = 0
+    bytes_written: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class MemorySessionStore(ISessionStore):
+    """Conversations of the sessions of this process, encoded so an idle session
+    takes a few compressed blobs. Only the last `session_store_max_turns` turns
+    of a session are kept."""
+
+    env: SessionStoreEnv
+    stats: SessionStoreStats = field(default_factory=SessionStoreStats, init=False)
+    _sessions: OrderedDict[str, SessionState] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+
+    async def load(self, session_id: str) -> SessionState:
+        self.stats.loads += 1
+        state = self._sessions.get(session_id)
+        if state is None:
+            return SessionState()
+
+        self._sessions.move_to_end(session_id)
+        self.stats.turns_loaded += len(state.turns)
+        return SessionState(state.agent_name, list(state.turns))
+
+    async def append(
+        self,
+        session_id: str,
+        items: list[TResponseInputItem],
+        agent_name: str | None = None,
+    ) -> None:
+        turn = encode_turn(items)
+        self.stats.appends += 1
+        self.stats.bytes_written += len(turn)
+
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = SessionState()
+        self._sessions.move_to_end(session_id)
+        state.agent_name = agent_name or state.agent_name
+        state.turns.append(turn)
+        if self.env.session_store_max_turns:
+            del state.turns[: -self.env.session_store_max_turns]
+
+        while len(self._sessions) > self.env.session_store_max_sessions:
+            self._sessions.popitem(last=False)
+            self.stats.evicted += 1
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def get_metrics(self) -> dict[str, float]:
+        return {"sessions": len(self._sessions), **asdict(self.stats)}
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class SqliteSessionStore(ISessionStore):
+    """Conversations in a SQLite database shared by the workers of a host, so any
+    worker can continue any session. Turns are only ever appended; loading reads
+    the last `session_store_max_turns` of them."""
+
+    env: SessionStoreEnv
+    stats: SessionStoreStats = field(default_factory=SessionStoreStats, init=False)
+    _db: sqlite3.Connection = field(init=False, repr=False)
+    _db_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self._db = sqlite3.connect(
+            self.env.session_store_sqlite_path, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(id TEXT PRIMARY KEY, agent TEXT, updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS turns (session_id TEXT NOT NULL, "
+            "seq INTEGER NOT NULL, items BLOB NOT NULL, PRIMARY KEY (session_id, seq))"
+        )
+        self._db.commit()
+
+    async def load(self, session_id: str) -> SessionState:
+        def _select() -> SessionState:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT agent FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    return SessionState()
+                turns = self._db.execute(
+                    "SELECT items FROM turns WHERE session_id = ? "
+                    "ORDER BY seq DESC LIMIT ?",
+                    (session_id, self.env.session_store_max_turns or -1),
+                ).fetchall()
+            return SessionState(row[0], [items for (items,) in reversed(turns)])
+
+        state = await asyncio.to_thread(_select)
+        self.stats.loads += 1
+        self.stats.turns_loaded += len(state.turns)
+        return state
+
+    async def append(
+        self,
+        session_id: str,
+        items: list[TResponseInputItem],
+        agent_name: str | None = None,
+    ) -> None:
+        turn = encode_turn(items)
+
+        def _insert() -> None:
+            with self._db_lock, self._db:
+                self._db.execute(
+                    "INSERT INTO sessions (id, agent, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET "
+                    "agent = COALESCE(excluded.agent, agent), "
+                    "updated_at = excluded.updated_at",
+                    (session_id, agent_name, time.time()),
+                )
+                self._db.execute(
+                    "INSERT INTO turns (session_id, seq, items) SELECT ?, "
+                    "COALESCE(MAX(seq), 0) + 1, ? FROM turns WHERE session_id = ?",
+                    (session_id, turn, session_id),
+                )
+
+        await asyncio.to_thread(_insert)
+        self.stats.appends += 1
+        self.stats.bytes_written += len(turn)
+
+    async def delete(self, session_id: str) -> bool:
+        def _delete() -> bool:
+            with self._db_lock, self._db:
+                self._db.execute(
+                    "DELETE FROM turns WHERE session_id = ?", (session_id,)
+                )
+                cursor = self._db.execute(
+                    "DELETE FROM sessions WHERE id = ?", (session_id,)
+                )
+            return cursor.rowcount > 0
+
+        return await asyncio.to_thread(_delete)
+
+    def get_metrics(self) -> dict[str, float]:
+        return asdict(self.stats)
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._db.close()
@@ -0,0 +1,416 @@
+import bisect
+import difflib
+import io
+import json
+import mmap
+import random
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from lagom.environment import Env
+
+from openai_agent.protocols.i_specialist_directory import ISpecialistDirectory
+
+SPECIALTIES = (
+    "Cardiology",
+    "Dermatology",
+    "Emergency Medicine",
+    "Endocrinology",
+    "Gastroenterology",
+    "Neurology",
+    "Obstetrics",
+    "Oncology",
+    "Ophthalmology",
+    "Orthopedics",
+    "Pediatrics",
+    "Psychiatry",
+    "Pulmonology",
+    "Radiology",
+    "Surgery",
+    "Urology",
+)
+
+MAJOR_CITIES = (
+    "New York",
+    "Los Angeles",
+    "Chicago",
+    "Houston",
+    "Phoenix",
+    "Philadelphia",
+    "San Antonio",
+    "San Diego",
+    "Dallas",
+    "San Jose",
+    "Austin",
+    "Seattle",
+    "Denver",
+    "Boston",
+    "Miami",
+    "Portland",
+)
+"""Real cities, the largest of a generated directory, followed by Faker's."""
+
+MAGIC = b"SPECDIR1"
+
+_ALIGNMENT = 8
+
+
+class SpecialistDirectoryEnv(Env):
+    specialist_directory_path: str = ".specialists.bin"
+    specialist_directory_sample_size: int = 10_000
+    """Specialists generated in memory when there is no directory file."""
+    specialist_directory_max_results: int = 5
+    specialist_directory_fuzzy_cutoff: float = 0.75
+
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.casefold()))
+
+
+def get_trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class SpecialistRecord:
+    first_name: str
+    last_name: str
+    specialty: str
+    city: str
+
+
+@dataclass
+class SpecialistData:
+    """The columns of a directory before it is written, one row per specialist.
+    The row columns hold indexes into the name, city and specialty lists."""
+
+    first_names: list[str]
+    last_names: list[str]
+    cities: list[str]
+    specialties: list[str]
+    city: array
+    specialty: array
+    first_name: array
+    last_name: array
+
+
+def generate_specialists(
+    count: int, cities: int = 1000, seed: int | None = None
+) -> SpecialistData:
+    """A synthetic directory. Names and cities come from Faker, the specialists
+    are drawn from them, most of them in the first, largest cities."""
+    from faker import Faker
+
+    faker = Faker()
+    faker.seed_instance(seed)
+    rng = random.Random(seed)
+
+    first_names = sorted({faker.first_name() for _ in range(3000)})
+    last_names = sorted({faker.last_name() for _ in range(3000)})
+    city_names = {normalize(city): city for city in MAJOR_CITIES[:cities]}
+    while len(city_names) < cities:
+        city = faker.city()
+        city_names.setdefault(normalize(city), city)
+    weights = [1 / rank for rank in range(1, cities + 1)]
+
+    return SpecialistData(
+        first_names=first_names,
+        last_names=last_names,
+        cities=list(city_names.values()),
+        specialties=list(SPECIALTIES),
+        city=array("I", rng.choices(range(cities), weights, k=count)),
+        specialty=array("I", (rng.randrange(len(SPECIALTIES)) for _ in range(count))),
+        first_name=array("I", (rng.randrange(len(first_names)) for _ in range(count))),
+        last_name=array("I", (rng.randrange(len(last_names)) for _ in range(count))),
+    )
+
+
+def _align(size: int) -> int:
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _get_zeros(size: int, count: int) -> array:
+    """`count` zeros in the smallest unsigned type that holds `size` values."""
+    typecode = "H" if size <= 0xFFFF else "I"
+    return array(typecode, bytes(array(typecode).itemsize * count))
+
+
+def _encode_strings(strings: Sequence[str]) -> tuple[array, bytes]:
+    encoded = [string.encode() for string in strings]
+    offsets = array("I", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b"".join(encoded)
+
+
+def write_directory(data: SpecialistData, file: BinaryIO) -> None:
+    """Writes the directory sorted by city and specialty, with the first row of
+    every (city, specialty) group as its index.
+
+    Only the name columns are stored per row, the city and specialty of a row
+    follow from its group. Columns are arrays in native byte order, so a
+    directory is read where it was written or on a host of the same byte order.
+    """
+    specialties = len(data.specialties)
+    groups = array("I", bytes(4 * (len(data.cities) * specialties + 1)))
+    for city, specialty in zip(data.city, data.specialty):
+        groups[city * specialties + specialty + 1] += 1
+    for group in range(1, len(groups)):
+        groups[group] += groups[group - 1]
+
+    positions = groups[:-1]
+    count = len(data.city)
+    first_name = _get_zeros(len(data.first_names), count)
+    last_name = _get_zeros(len(data.last_names), count)
+    for row in range(count):
+        group = data.city[row] * specialties + data.specialty[row]
+        position = positions[group]
+        positions[group] += 1
+        first_name[position] = data.first_name[row]
+        last_name[position] = data.last_name[row]
+
+    sections: dict[str, array | bytes] = {"groups": groups}
+    for name, strings in (
+        ("first_names", data.first_names),
+        ("last_names", data.last_names),
+        ("cities", data.cities),
+    ):
+        sections[f"{name}.offsets"], sections[f"{name}.data"] = _encode_strings(strings)
+    sections["first_name"] = first_name
+    sections["last_name"] = last_name
+
+    encoded = {
+        name: section.tobytes() if isinstance(section, array) else section
+        for name, section in sections.items()
+    }
+    layout: dict[str, tuple[int, int, str]] = {}
+    offset = 0
+    for name, section in encoded.items():
+        layout[name] = (offset, len(section), getattr(sections[name], "typecode", "B"))
+        offset += _align(len(section))
+
+    header = json.dumps(
+        {
+            "byteorder": sys.byteorder,
+            "count": count,
+            "specialties": data.specialties,
+            "sections": layout,
+        }
+    ).encode()
+    start = len(MAGIC) + 4 + len(header)
+    file.write(MAGIC + struct.pack("<I", len(header)) + header)
+    file.write(bytes(_align(start) - start))
+    for section in encoded.values():
+        file.write(section)
+        file.write(bytes(_align(len(section)) - len(section)))
+
+
+@dataclass
+class SpecialistDirectoryStats:
+    lookups: int = 0
+    exact: int = 0
+    prefix: int = 0
+    fuzzy: int = 0
+    misses: int = 0
+
+
+@dataclass
+class SpecialistDirectory(ISpecialistDirectory):
+    """Specialists by city and specialty, read in place from a directory written
+    by `write_directory`, usually a memory mapped file. A lookup reads only the
+    rows of its groups, so memory use does not grow with the directory size
+    beyond the city names, which are kept in memory for matching.
+
+    Cities are matched exactly, then as a prefix of the city names with the
+    larger cities first, then by spelling: the cities sharing the most trigrams
+    with the query are ranked by similarity and kept from
+    `specialist_directory_fuzzy_cutoff` on.
+    """
+
+    env: SpecialistDirectoryEnv
+    buffer: bytes | mmap.mmap = field(repr=False)
+    stats: SpecialistDirectoryStats = field(
+        default_factory=SpecialistDirectoryStats, init=False
+    )
+    specialties: list[str] = field(init=False)
+    cities: list[str] = field(init=False, repr=False)
+    _views: list[memoryview] = field(default_factory=list, init=False, repr=False)
+    _sections: dict[str, memoryview] = field(init=False, repr=False)
+    _keys: list[str] = field(init=False, repr=False)
+    _sorted_keys: list[tuple[str, int]] = field(init=False, repr=False)
+    _exact: dict[str, int] = field(init=False, repr=False)
+    _trigrams: dict[str, list[int]] = field(init=False, repr=False)
+    _specialty_keys: list[str] = field(init=False, repr=False)
+    _specialty_matches: dict[str, list[int]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        view = memoryview(self.buffer)
+        self._views.append(view)
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a specialist directory.")
+        (header_size,) = struct.unpack_from("<I", view, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start : start + header_size]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError("The directory was written with another byte order.")
+
+        base = _align(start + header_size)
+        self._sections = {}
+        for name, (offset, size, typecode) in header["sections"].items():
+            section = view[base + offset : base + offset + size].cast(typecode)
+            self._views.append(section)
+            self._sections[name] = section
+
+        self.specialties = header["specialties"]
+        self.cities = self._get_strings("cities")
+        self._keys = [normalize(city) for city in self.cities]
+        self._sorted_keys = sorted((key, city) for city, key in enumerate(self._keys))
+        self._exact = {key: city for city, key in enumerate(self._keys)}
+        self._trigrams = {}
+        for city, key in enumerate(self._keys):
+            for trigram in get_trigrams(key):
+                self._trigrams.setdefault(trigram, []).append(city)
+        self._specialty_keys = [normalize(specialty) for specialty in self.specialties]
+
+    @classmethod
+    def open(
+        cls, env: SpecialistDirectoryEnv, path: str | Path
+    ) -> "SpecialistDirectory":
+        with open(path, "rb") as file:
+            return cls(env, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def load(cls, env: SpecialistDirectoryEnv) -> "SpecialistDirectory":
+        """The directory at `specialist_directory_path`, or a generated sample
+        kept in memory when there is no file."""
+        if Path(env.specialist_directory_path).exists():
+            return cls.open(env, env.specialist_directory_path)
+
+        data = generate_specialists(env.specialist_directory_sample_size, seed=0)
+        file = io.BytesIO()
+        write_directory(data, file)
+        return cls(env, file.getvalue())
+
+    @property
+    def count(self) -> int:
+        return self._sections["groups"][-1]
+
+    def search(
+        self, city: str, specialty: str | None = None, limit: int | None = None
+    ) -> list[SpecialistRecord]:
+        limit = limit or self.env.specialist_directory_max_results
+        self.stats.lookups += 1
+        specialties = self._match_specialties(specialty)
+        groups = self._sections["groups"]
+        first_name = self._sections["first_name"]
+        last_name = self._sections["last_name"]
+
+        records: list[SpecialistRecord] = []
+        for city_index in self.match_cities(city):
+            for specialty_index in specialties:
+                group = city_index * len(self.specialties) + specialty_index
+                end = min(groups[group + 1], groups[group] + limit - len(records))
+                for row in range(groups[group], end):
+                    records.append(
+                        SpecialistRecord(
+                            first_name=self._get_string("first_names", first_name[row]),
+                            last_name=self._get_string("last_names", last_name[row]),
+                            specialty=self.specialties[specialty_index],
+                            city=self.cities[city_index],
+                        )
+                    )
+                if len(records) >= limit:
+                    return records
+        return records
+
+    def match_cities(self, query: str) -> list[int]:
+        """The indexes of the cities matching `query`, best match first."""
+        key = normalize(query)
+        if not key:
+            self.stats.misses += 1
+            return []
+        if key in self._exact:
+            self.stats.exact += 1
+            return [self._exact[key]]
+
+        start = bisect.bisect_left(self._sorted_keys, (key, -1))
+        prefixed = []
+        for prefix_key, city in self._sorted_keys[start:]:
+            if not prefix_key.startswith(key):
+                break
+            prefixed.append(city)
+        if prefixed:
+            self.stats.prefix += 1
+            return sorted(prefixed, key=self._get_city_size, reverse=True)
+
+        shared: Counter[int] = Counter()
+        for trigram in get_trigrams(key):
+            shared.update(self._trigrams.get(trigram, ()))
+        cutoff = self.env.specialist_directory_fuzzy_cutoff
+        # the matcher caches what it learned about the query across candidates
+        matcher = difflib.SequenceMatcher(b=key)
+        scored: list[tuple[float, int]] = []
+        for city, _ in shared.most_common(32):
+            matcher.set_seq1(self._keys[city])
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                scored.append((matcher.ratio(), city))
+        matches = [
+            city for score, city in sorted(scored, reverse=True) if score >= cutoff
+        ]
+        if matches:
+            self.stats.fuzzy += 1
+        else:
+            self.stats.misses += 1
+        return matches
+
+    def get_metrics(self) -> dict[str, float]:
+        return {
+            "specialists": self.count,
+            "cities": len(self.cities),
+            "bytes": len(self.buffer),
+            **asdict(self.stats),
+        }
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def _match_specialties(self, query: str | None) -> list[int]:
+        key = normalize(query or "")
+        if not key:
+            return list(range(len(self.specialties)))
+        matches = self._specialty_matches.get(key)
+        if matches is None:
+            # "cardiologist" is closest to "cardiology"
+            close = difflib.get_close_matches(key, self._specialty_keys, 1, 0.6)
+            matches = [self._specialty_keys.index(match) for match in close]
+            if len(self._specialty_matches) >= 1024:
+                self._specialty_matches.clear()
+            self._specialty_matches[key] = matches
+        return matches
+
+    def _get_city_size(self, city: int) -> int:
+        groups = self._sections["groups"]
+        specialties = len(self.specialties)
+        return groups[(city + 1) * specialties] - groups[city * specialties]
+
+    def _get_string(self, table: str, index: int) -> str:
+        offsets = self._sections[f"{table}.offsets"]
+        data = self._sections[f"{table}.data"]
+        return bytes(data[offsets[index] : offsets[index + 1]]).decode()
+
+    def _get_strings(self, table: str) -> list[str]:
+        count = len(self._sections[f"{table}.offsets"]) - 1
+        return [self._get_string(table, index) for index in range(count)]
@@ -0,0 +1,169 @@
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Literal
+
+from agents import Agent, RawResponsesStreamEvent, RunResultStreaming
+from openai.types.responses import ResponseCreatedEvent, ResponseTextDeltaEvent
+from pydantic import BaseModel, TypeAdapter
+
+_State = Literal["start", "key", "in_key", "colon", "value", "in_value", "next", "end"]
+
+
+@dataclass
+class JsonFieldParser:
+    """Parses a JSON object from text fed in arbitrary pieces and returns each of
+    its top level fields as soon as its value is complete.
+
+    Values are complete at their closing quote or bracket, numbers and literals
+    once the next delimiter arrives. Nested values are returned whole.
+    """
+
+    _state: _State = field(default="start", init=False, repr=False)
+    _key: list[str] = field(default_factory=list, init=False, repr=False)
+    _value: list[str] = field(default_factory=list, init=False, repr=False)
+    _depth: int = field(default=0, init=False, repr=False)
+    _in_string: bool = field(default=False, init=False, repr=False)
+    _escaped: bool = field(default=False, init=False, repr=False)
+
+    @property
+    def complete(self) -> bool:
+        return self._state == "end"
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """The fields completed by `text`, in order.
+
+        :raises ValueError: If the text is not a JSON object.
+        """
+        fields: list[tuple[str, Any]] = []
+        for char in text:
+            if self._state == "in_key":
+                self._feed_key(char)
+            elif self._state == "in_value" and self._ends_literal(char):
+                fields.append(self._pop_field())
+                if not char.isspace():
+                    self._feed_delimiter(char)
+            elif self._state == "in_value":
+                if self._feed_value(char):
+                    fields.append(self._pop_field())
+            elif not char.isspace():
+                self._feed_delimiter(char)
+        return fields
+
+    def _feed_key(self, char: str) -> None:
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._state = "colon"
+            return
+        self._key.append(char)
+
+    def _ends_literal(self, char: str) -> bool:
+        """Whether `char` ends the current number, `true`, `false` or `null`."""
+        return self._value[0] not in '"[{' and (char.isspace() or char in ",}")
+
+    def _feed_value(self, char: str) -> bool:
+        """Adds a character to the current value, True once the value is complete."""
+        if self._in_string:
+            self._value.append(char)
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                return self._depth == 0
+            return False
+
+        self._value.append(char)
+        if char == '"':
+            self._in_string = True
+        elif char in "[{":
+            self._depth += 1
+        elif char in "]}":
+            self._depth -= 1
+            return self._depth == 0
+        return False
+
+    def _feed_delimiter(self, char: str) -> None:
+        match self._state, char:
+            case "start", "{":
+                self._state = "key"
+            case "key", '"':
+                self._state = "in_key"
+            case "key" | "next", "}":
+                self._state = "end"
+            case "colon", ":":
+                self._state = "value"
+            case "value", _:
+                self._state = "in_value"
+                self._feed_value(char)
+            case "next", ",":
+                self._state = "key"
+            case _:
+                raise ValueError(f"Unexpected {char!r} in a JSON object.")
+
+    def _pop_field(self) -> tuple[str, Any]:
+        key = json.loads(f'"{"".join(self._key)}"')
+        value = json.loads("".join(self._value))
+        self._key.clear()
+        self._value.clear()
+        self._state = "next"
+        return key, value
+
+
+@dataclass
+class FieldEvent:
+    agent: Agent[Any]
+    """The agent producing the output."""
+
+    name: str
+    value: Any
+    """The value validated against the field of the output type."""
+
+
+@cache
+def _get_adapter(output_type: type[BaseModel], name: str) -> TypeAdapter[Any]:
+    info = output_type.model_fields.get(name)
+    return TypeAdapter(info.annotation if info is not None else Any)
+
+
+async def stream_fields(
+    result: RunResultStreaming, stop_after: str | None = None
+) -> AsyncIterator[FieldEvent]:
+    """The fields of the structured output of a streamed run, as each completes.
+
+    Only agents with a pydantic output type are parsed, the text of other agents
+    is skipped. The fields arrive in the order of the output type, so the fields
+    a caller needs early should be declared first.
+
+    :param result: The streamed run.
+    :param stop_after: Cancels the run once this field arrived, so no tokens are
+        spent on the fields after it. The run then has no final output, and the
+        usage of the cancelled call is not reported by the model.
+    :return: The fields of every structured output of the run.
+    """
+    parser = JsonFieldParser()
+    async for event in result.stream_events():
+        if not isinstance(event, RawResponsesStreamEvent):
+            continue
+        if isinstance(event.data, ResponseCreatedEvent):
+            parser = JsonFieldParser()
+            continue
+        output_type = result.current_agent.output_type
+        if not (
+            isinstance(event.data, ResponseTextDeltaEvent)
+            and isinstance(output_type, type)
+            and issubclass(output_type, BaseModel)
+        ):
+            continue
+
+        for name, value in parser.feed(event.data.delta):
+            value = _get_adapter(output_type, name).validate_python(value)
+            yield FieldEvent(result.current_agent, name, value)
+            if name == stop_after:
+                result.cancel()
+                return
@@ -0,0 +1,141 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+
+from agents import AgentsException, Usage
+from lagom.environment import Env
+
+from openai_agent.protocols.i_token_accountant import ITokenAccountant
+
+
+class TokenBudgetEnv(Env):
+    token_budget_request_max_tokens: int = 0
+    token_budget_request_max_cost: float = 0.0
+    token_budget_session_max_tokens: int = 0
+    token_budget_session_max_cost: float = 0.0
+    token_price_input: float = 2.0
+    token_price_cached_input: float = 0.5
+    token_price_output: float = 8.0
+
+
+class TokenBudgetExceeded(AgentsException):
+    """Raised before a model call when a request or session has used up its budget."""
+
+
+@dataclass
+class TokenUsage:
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    """The part of the input tokens that was served from the prompt cache."""
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, usage: Usage) -> None:
+        self.requests += usage.requests
+        self.input_tokens += usage.input_tokens
+        self.cached_tokens += usage.input_tokens_details.cached_tokens or 0
+        self.output_tokens += usage.output_tokens
+
+
+@dataclass
+class Budget:
+    name: str
+    usage: TokenUsage
+    max_tokens: int = 0
+    """0 for no limit."""
+    max_cost: float = 0.0
+    """In USD, 0 for no limit."""
+
+
+_budgets: ContextVar[tuple[Budget, ...]] = ContextVar("token_budgets", default=())
+"""The budgets of the current request, innermost last."""
+
+
+@dataclass
+class TokenAccountantStats:
+    exceeded: int = 0
+
+
+@dataclass
+class TokenAccountant(ITokenAccountant):
+    """Accounts the tokens of every model call to the requests and sessions it was
+    made for.
+
+    The budgets of a request are kept in a context variable, so runs started
+    within the request, agents called as tools or concurrent branches, add to the
+    same budgets. A budget is checked before each model call, so a run stops at
+    the first call after its budget was used up; a run nested in a tool fails that
+    tool call and its parent run stops at its next call.
+    """
+
+    env: TokenBudgetEnv
+    totals: TokenUsage = field(default_factory=TokenUsage, init=False)
+    stats: TokenAccountantStats = field(
+        default_factory=TokenAccountantStats, init=False
+    )
+
+    @contextmanager
+    def track(self, session_usage: TokenUsage | None = None) -> Iterator[TokenUsage]:
+        budgets = _budgets.get()
+        if session_usage is not None:
+            budgets += (
+                Budget(
+                    "session",
+                    session_usage,
+                    self.env.token_budget_session_max_tokens,
+                    self.env.token_budget_session_max_cost,
+                ),
+            )
+        request = Budget(
+            "request",
+            TokenUsage(),
+            self.env.token_budget_request_max_tokens,
+            self.env.token_budget_request_max_cost,
+        )
+        token = _budgets.set((*budgets, request))
+        try:
+            yield request.usage
+        finally:
+            _budgets.reset(token)
+
+    def record(self, usage: Usage) -> None:
+        self.totals.add(usage)
+        for budget in _budgets.get():
+            budget.usage.add(usage)
+
+    def check(self) -> None:
+        for budget in _budgets.get():
+            usage = budget.usage
+            if budget.max_tokens and usage.total_tokens >= budget.max_tokens:
+                exceeded = f"{usage.total_tokens} of {budget.max_tokens} tokens"
+            elif budget.max_cost and self.get_cost(usage) >= budget.max_cost:
+                exceeded = f"${self.get_cost(usage):.4f} of ${budget.max_cost:.4f}"
+            else:
+                continue
+            self.stats.exceeded += 1
+            raise TokenBudgetExceeded(f"The {budget.name} used {exceeded}.")
+
+    def get_cost(self, usage: TokenUsage) -> float:
+        uncached = usage.input_tokens - usage.cached_tokens
+        return (
+            uncached * self.env.token_price_input
+            + usage.cached_tokens * self.env.token_price_cached_input
+            + usage.output_tokens * self.env.token_price_output
+        ) / 1_000_000
+
+    def get_summary(self, usage: TokenUsage | None = None) -> dict[str, float]:
+        if usage is None:
+            usage = self.totals
+        summary: dict[str, float] = {
+            **asdict(usage),
+            "total_tokens": usage.total_tokens,
+            "cost": round(self.get_cost(usage), 6),
+        }
+        if usage is self.totals:
+            summary |= asdict(self.stats)
+        return summary
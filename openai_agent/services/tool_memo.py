@@ -0,0 +1,198 @@
+import asyncio
+import json
+import math
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any
+
+from agents import FunctionTool, Usage, default_tool_error_function
+from agents.result import RunResultBase
+from agents.tool_context import ToolContext
+from lagom.environment import Env
+
+from openai_agent.protocols.i_tool_memo import IToolMemo, ToolKey
+
+ToolFunction = Callable[[ToolContext[Any], str], Awaitable[Any]]
+
+
+class ToolMemoEnv(Env):
+    tool_memo_enabled: bool = True
+    tool_memo_ttl: float = 300.0
+    """Seconds a tool output is remembered for, 0 for no expiry."""
+    tool_memo_max_entries: int = 1024
+    """Outputs remembered per tool."""
+
+
+def get_arguments_key(arguments: dict[str, Any]) -> str:
+    """The arguments as canonical JSON, so the order of the keys doesn't matter."""
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass
+class ToolMemoStats:
+    hits: int = 0
+    misses: int = 0
+    joined: int = 0
+    """Calls that waited for a concurrent call with the same key."""
+    expired: int = 0
+    errors: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class _Entry:
+    output: Any
+    expires_at: float
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task[Any]
+    waiters: int = 0
+
+
+@dataclass
+class _ToolCache:
+    ttl: float
+    max_entries: int
+    entries: OrderedDict[Hashable, _Entry] = field(default_factory=OrderedDict)
+    calls: dict[Hashable, _Call] = field(default_factory=dict)
+
+
+def _report_errors(invoke: ToolFunction) -> ToolFunction:
+    """Turns the errors of a tool into messages for the model, as `function_tool`
+    does by default."""
+
+    async def on_invoke_tool(context: ToolContext[Any], input: str) -> Any:
+        try:
+            return await invoke(context, input)
+        except Exception as e:
+            return default_tool_error_function(context, e)
+
+    return on_invoke_tool
+
+
+@dataclass
+class ToolMemo(IToolMemo):
+    """Remembers the outputs of tool calls in memory, per tool name, so the same
+    call in a later turn or another run is answered without running the tool.
+
+    Only outputs are remembered; a call that raises is retried by the next call
+    with its key. Tools that turn their errors into messages, as `function_tool`
+    does by default and `as_tool` always does, return those messages like
+    outputs, so tools that can fail should be made with
+    `failure_error_function=None` and are converted here instead, also when the
+    memo is disabled.
+
+    The statistics of a run are kept for as long as its result, by the identity of
+    the run's usage, which every tool call of the run shares.
+    """
+
+    env: ToolMemoEnv
+    stats: ToolMemoStats = field(default_factory=ToolMemoStats, init=False)
+    _caches: dict[str, _ToolCache] = field(default_factory=dict, init=False, repr=False)
+    _runs: dict[int, ToolMemoStats] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def memoize(
+        self,
+        tool: FunctionTool,
+        key: ToolKey | None = None,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+    ) -> FunctionTool:
+        if not self.env.tool_memo_enabled:
+            return replace(tool, on_invoke_tool=_report_errors(tool.on_invoke_tool))
+
+        cache = self._caches.get(tool.name)
+        if cache is None:
+            cache = self._caches[tool.name] = _ToolCache(
+                ttl=self.env.tool_memo_ttl if ttl is None else ttl,
+                max_entries=max_entries or self.env.tool_memo_max_entries,
+            )
+        get_key = key or get_arguments_key
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(context: ToolContext[Any], input: str) -> Any:
+            try:
+                call_key = get_key(json.loads(input) if input else {})
+            except Exception:
+                # invalid arguments, the tool reports them
+                return await invoke(context, input)
+
+            stats = self._get_run_stats(context.usage)
+            entry = cache.entries.get(call_key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                cache.entries.move_to_end(call_key)
+                self._count(stats, "hits")
+                return entry.output
+            if entry is not None:
+                del cache.entries[call_key]
+                self._count(stats, "expired")
+
+            call = cache.calls.get(call_key)
+            if call is None:
+                self._count(stats, "misses")
+                call = cache.calls[call_key] = _Call(
+                    asyncio.ensure_future(invoke(context, input))
+                )
+                call.task.add_done_callback(
+                    lambda task: self._remember(cache, call_key, task)
+                )
+            else:
+                self._count(stats, "joined")
+
+            call.waiters += 1
+            try:
+                return await asyncio.shield(call.task)
+            except asyncio.CancelledError:
+                # nobody waits for the output anymore, stop running the tool
+                if call.waiters == 1:
+                    call.task.cancel()
+                raise
+            except Exception as e:
+                self._count(stats, "errors")
+                return default_tool_error_function(context, e)
+            finally:
+                call.waiters -= 1
+
+        return replace(tool, on_invoke_tool=on_invoke_tool)
+
+    def _remember(
+        self, cache: _ToolCache, call_key: Hashable, task: asyncio.Task[Any]
+    ) -> None:
+        del cache.calls[call_key]
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        expires_at = time.monotonic() + cache.ttl if cache.ttl else math.inf
+        cache.entries[call_key] = _Entry(task.result(), expires_at)
+        while len(cache.entries) > cache.max_entries:
+            cache.entries.popitem(last=False)
+            self.stats.evicted += 1
+
+    def _get_run_stats(self, usage: Usage) -> ToolMemoStats:
+        run_key = id(usage)
+        stats = self._runs.get(run_key)
+        if stats is None:
+            stats = self._runs[run_key] = ToolMemoStats()
+            weakref.finalize(usage, self._runs.pop, run_key, None)
+        return stats
+
+    def _count(self, stats: ToolMemoStats, name: str) -> None:
+        setattr(stats, name, getattr(stats, name) + 1)
+        setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def get_run_stats(self, result: RunResultBase) -> ToolMemoStats:
+        return self._runs.get(id(result.context_wrapper.usage), ToolMemoStats())
+
+    def get_metrics(self) -> dict[str, float]:
+        return {
+            "tools": len(self._caches),
+            "entries": sum(len(cache.entries) for cache in self._caches.values()),
+            **asdict(self.stats),
+        }
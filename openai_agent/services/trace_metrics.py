@@ -0,0 +1,308 @@
+import math
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import (
+    AgentSpanData,
+    FunctionSpanData,
+    GenerationSpanData,
+    GuardrailSpanData,
+    HandoffSpanData,
+    Span,
+    Trace,
+    TracingProcessor,
+    get_current_span,
+    set_trace_processors,
+    set_tracing_disabled,
+)
+from lagom.environment import Env
+
+from openai_agent.protocols.i_trace_metrics import ITraceMetrics
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+"""Upper bounds in seconds of the histogram buckets."""
+
+HISTOGRAMS = {
+    "agent_run_seconds": "Time an agent was active in a run, until it handed off "
+    "or finished.",
+    "agent_first_token_seconds": "Time to the first token of streamed model calls.",
+    "agent_generation_seconds": "Duration of model calls.",
+    "agent_tool_seconds": "Duration of tool calls.",
+    "agent_guardrail_seconds": "Duration of guardrail checks.",
+}
+
+COUNTERS = {
+    "agent_tokens_total": "Tokens used by model calls, cached tokens are the part "
+    "of the input tokens served from the prompt cache.",
+    "agent_handoffs_total": "Handoffs between agents.",
+    "agent_guardrail_triggered_total": "Guardrail checks that tripped.",
+    "agent_errors_total": "Spans that ended with an error.",
+    "agent_traces_total": "Traces started, by whether they were sampled.",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+UNKNOWN_AGENT = "unknown"
+"""Label of spans that did not run within a sampled agent span."""
+
+
+class TraceMetricsEnv(Env):
+    trace_metrics_enabled: bool = True
+    trace_metrics_sample_rate: float = 1.0
+    trace_metrics_mlflow_experiment: str | None = None
+
+
+@dataclass
+class Histogram:
+    """Cumulative histogram with fixed buckets, like a Prometheus histogram."""
+
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    """Observations per bucket, the last one is the +Inf bucket."""
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = self.counts or [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimated like Prometheus' `histogram_quantile`, interpolating linearly
+        within the bucket the quantile falls into."""
+        if not self.count:
+            return math.nan
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Labels, **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def get_metric_key(name: str, labels: Labels, stat: str | None = None) -> str:
+    """The MLflow metric name of a series, like `agent_run_seconds.triage_agent.p95`."""
+    key = ".".join([name, *(value for _, value in labels), *([stat] if stat else [])])
+    return re.sub(r"[^\w.\-/ ]", "_", key)
+
+
+@dataclass
+class TraceMetrics(TracingProcessor, ITraceMetrics):
+    """Tracing processor that keeps latency, token and tool metrics per agent in
+    memory instead of exporting spans.
+
+    Whole traces are sampled at `TRACE_METRICS_SAMPLE_RATE`, spans of traces that
+    were not sampled are dropped on arrival, so the counts cover the sampled
+    traces only; `agent_traces_total` has the ratio to scale them by. Durations
+    are measured with the monotonic clock when the SDK starts and ends a span.
+    """
+
+    env: TraceMetricsEnv
+    _rng: random.Random = field(default_factory=random.Random, init=False, repr=False)
+    _sampled: set[str] = field(default_factory=set, init=False, repr=False)
+    _started: dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _agents: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    """Names of the open agent spans by span id."""
+    _histograms: dict[str, dict[Labels, Histogram]] = field(
+        default_factory=lambda: {name: {} for name in HISTOGRAMS},
+        init=False,
+        repr=False,
+    )
+    _counters: dict[str, Counter[Labels]] = field(
+        default_factory=lambda: {name: Counter() for name in COUNTERS},
+        init=False,
+        repr=False,
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.trace_metrics_enabled
+
+    def install(self) -> None:
+        set_trace_processors([self])
+        set_tracing_disabled(False)
+
+    def on_trace_start(self, trace: Trace) -> None:
+        sampled = self._rng.random() < self.env.trace_metrics_sample_rate
+        with self._lock:
+            if sampled:
+                self._sampled.add(trace.trace_id)
+            self._counters["agent_traces_total"][(("sampled", str(sampled)),)] += 1
+
+    def on_trace_end(self, trace: Trace) -> None:
+        with self._lock:
+            self._sampled.discard(trace.trace_id)
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        if span.trace_id not in self._sampled:
+            return
+        with self._lock:
+            self._started[span.span_id] = time.perf_counter()
+            if isinstance(span.span_data, AgentSpanData):
+                self._agents[span.span_id] = span.span_data.name
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        ended = time.perf_counter()
+        with self._lock:
+            started = self._started.pop(span.span_id, None)
+            if started is None:
+                return
+            self._record(span, ended - started)
+
+    def _record(self, span: Span[Any], seconds: float) -> None:
+        data = span.span_data
+        if isinstance(data, AgentSpanData):
+            agent = self._agents.pop(span.span_id, data.name)
+        else:
+            agent = self._agents.get(span.parent_id or "", UNKNOWN_AGENT)
+        by_agent: Labels = (("agent", agent),)
+
+        if isinstance(data, AgentSpanData):
+            self._observe("agent_run_seconds", by_agent, seconds)
+        elif isinstance(data, GenerationSpanData):
+            self._observe("agent_generation_seconds", by_agent, seconds)
+            tokens = self._counters["agent_tokens_total"]
+            for kind in ("input", "output"):
+                count = (data.usage or {}).get(f"{kind}_tokens") or 0
+                tokens[(*by_agent, ("kind", kind))] += count
+        elif isinstance(data, FunctionSpanData):
+            self._observe(
+                "agent_tool_seconds", (*by_agent, ("tool", data.name)), seconds
+            )
+        elif isinstance(data, GuardrailSpanData):
+            by_guardrail: Labels = (("guardrail", data.name),)
+            self._observe("agent_guardrail_seconds", by_guardrail, seconds)
+            if data.triggered:
+                self._counters["agent_guardrail_triggered_total"][by_guardrail] += 1
+        elif isinstance(data, HandoffSpanData):
+            labels = (
+                ("from_agent", data.from_agent or UNKNOWN_AGENT),
+                ("to_agent", data.to_agent or UNKNOWN_AGENT),
+            )
+            self._counters["agent_handoffs_total"][labels] += 1
+
+        if span.error is not None:
+            self._counters["agent_errors_total"][(*by_agent, ("span", data.type))] += 1
+
+    def _observe(self, name: str, labels: Labels, seconds: float) -> None:
+        histograms = self._histograms[name]
+        histogram = histograms.get(labels)
+        if histogram is None:
+            histogram = histograms[labels] = Histogram()
+        histogram.observe(seconds)
+
+    def _get_current_agent(self) -> str | None:
+        """The agent of the current span, None if its trace is not sampled."""
+        span = get_current_span()
+        if span is None or span.trace_id not in self._sampled:
+            return None
+        # within the model call the current span is its generation span
+        return self._agents.get(span.span_id) or self._agents.get(
+            span.parent_id or "", UNKNOWN_AGENT
+        )
+
+    def record_first_token(self, seconds: float) -> None:
+        with self._lock:
+            if (agent := self._get_current_agent()) is not None:
+                labels: Labels = (("agent", agent),)
+                self._observe("agent_first_token_seconds", labels, seconds)
+
+    def record_cached_tokens(self, tokens: int) -> None:
+        with self._lock:
+            if (agent := self._get_current_agent()) is not None:
+                labels: Labels = (("agent", agent), ("kind", "cached"))
+                self._counters["agent_tokens_total"][labels] += tokens
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, help in HISTOGRAMS.items():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+                for labels, histogram in self._histograms[name].items():
+                    cumulative = 0
+                    bounds = [*map(str, histogram.buckets), "+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        bucket = format_labels(labels, le=bound)
+                        lines.append(f"{name}_bucket{bucket} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{format_labels(labels)} {histogram.count}"
+                    )
+            for name, help in COUNTERS.items():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+                for labels, value in self._counters[name].items():
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def get_summary(self) -> dict[str, float]:
+        summary: dict[str, float] = {}
+        with self._lock:
+            for name in HISTOGRAMS:
+                for labels, histogram in self._histograms[name].items():
+                    summary[get_metric_key(name, labels, "count")] = histogram.count
+                    summary[get_metric_key(name, labels, "mean")] = (
+                        histogram.sum / histogram.count
+                    )
+                    for q in (50, 95, 99):
+                        summary[get_metric_key(name, labels, f"p{q}")] = (
+                            histogram.quantile(q / 100)
+                        )
+            for name in COUNTERS:
+                for labels, value in self._counters[name].items():
+                    summary[get_metric_key(name, labels)] = value
+
+            tokens = self._counters["agent_tokens_total"]
+            for (agent, kind), value in list(tokens.items()):
+                cached = tokens[(agent, ("kind", "cached"))]
+                if kind == ("kind", "input") and value:
+                    key = get_metric_key("agent_prompt_cache_ratio", (agent,))
+                    summary[key] = cached / value
+        return summary
+
+    def log_to_mlflow(self) -> None:
+        summary = self.get_summary()
+        if not summary or not self.env.trace_metrics_mlflow_experiment:
+            return
+
+        import mlflow
+
+        mlflow.set_experiment(self.env.trace_metrics_mlflow_experiment)
+        with mlflow.start_run(run_name="trace-metrics"):
+            mlflow.log_metrics(summary)
+
+    def shutdown(self) -> None:
+        """Called by the SDK at exit, logs the metrics of the process to MLflow
+        if an experiment is configured."""
+        self.log_to_mlflow()
+
+    def force_flush(self) -> None:
+        """Metrics are only kept in memory, there is nothing to flush."""
@@ -0,0 +1,221 @@
+import asyncio
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from lagom.environment import Env
+
+from openai_agent.protocols.i_translation_memory import ITranslationMemory
+
+SegmentKey = tuple[str, str, str]
+"""The source text, the language it is in and the language it is translated to."""
+
+ABBREVIATIONS = {"approx", "dr", "e.g", "etc", "i.e", "mr", "mrs", "ms", "no", "vs"}
+"""Words ending in a period that don't end a sentence."""
+
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+
+class TranslationMemoryEnv(Env):
+    translation_memory_enabled: bool = True
+    translation_memory_max_entries: int = 10_000
+    translation_memory_sqlite_path: str | None = None
+
+
+def _ends_sentence(segment: str) -> bool:
+    words = segment.split()
+    if not words:
+        return False
+    last = words[-1].lower().rstrip(".")
+    return last not in ABBREVIATIONS and not (len(last) == 1 and last.isalpha())
+
+
+def split_segments(text: str) -> list[tuple[str, str]]:
+    """Split a text into sentences, each paired with the whitespace that follows
+    it, so joining the pairs gives back the text. Line breaks always end a
+    sentence, a period after an abbreviation or an initial doesn't."""
+    segments: list[tuple[str, str]] = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        segment = text[start : match.start()]
+        if "\n" not in match.group() and not _ends_sentence(segment):
+            continue
+        segments.append((segment, match.group()))
+        start = match.end()
+    segments.append((text[start:], ""))
+    return segments
+
+
+def normalize(segment: str) -> str:
+    return " ".join(segment.split())
+
+
+@dataclass
+class TranslationMemoryStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    calls: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class TranslationMemory(ITranslationMemory):
+    """Sentence level translation memory, in memory (LRU) and optionally in
+    SQLite so translations outlive the process. Entries never expire, a sentence
+    keeps its translation until it is evicted or the memory is cleared.
+    """
+
+    env: TranslationMemoryEnv
+    stats: TranslationMemoryStats = field(
+        default_factory=TranslationMemoryStats, init=False
+    )
+    _entries: OrderedDict[SegmentKey, str] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _db: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+    _db_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.env.translation_memory_sqlite_path:
+            self._db = sqlite3.connect(
+                self.env.translation_memory_sqlite_path, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS segments (source TEXT NOT NULL, "
+                "from_language TEXT NOT NULL, to_language TEXT NOT NULL, "
+                "target TEXT NOT NULL, "
+                "PRIMARY KEY (source, from_language, to_language))"
+            )
+            self._db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.translation_memory_enabled
+
+    async def translate(
+        self,
+        text: str,
+        from_language: str,
+        to_language: str,
+        translate_segments: Callable[[list[str]], Awaitable[list[str]]],
+    ) -> str:
+        if not self.enabled:
+            self.stats.calls += 1
+            return (await translate_segments([text]))[0]
+
+        segments = split_segments(text)
+        keys = list(
+            dict.fromkeys(
+                (normalize(segment), from_language, to_language)
+                for segment, _ in segments
+                if segment.strip()
+            )
+        )
+
+        found: dict[SegmentKey, str] = {}
+        for key in keys:
+            target = self._get_memory(key)
+            if target is not None:
+                self.stats.hits += 1
+                found[key] = target
+
+        disk = await self._get_disk([key for key in keys if key not in found])
+        self.stats.disk_hits += len(disk)
+        for key, target in disk.items():
+            self._set_memory(key, target)
+        found.update(disk)
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            self.stats.misses += len(missing)
+            self.stats.calls += 1
+            targets = await translate_segments([source for source, _, _ in missing])
+            if len(targets) != len(missing):
+                raise ValueError(
+                    f"Expected {len(missing)} translated segments, got {len(targets)}."
+                )
+            translated = dict(zip(missing, targets))
+            for key, target in translated.items():
+                self._set_memory(key, target)
+            await self._set_disk(translated)
+            found.update(translated)
+
+        return "".join(
+            (
+                found[(normalize(segment), from_language, to_language)]
+                if segment.strip()
+                else segment
+            )
+            + separator
+            for segment, separator in segments
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM segments")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def _get_memory(self, key: SegmentKey) -> str | None:
+        target = self._entries.get(key)
+        if target is not None:
+            self._entries.move_to_end(key)
+        return target
+
+    def _set_memory(self, key: SegmentKey, target: str) -> None:
+        self._entries[key] = target
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.env.translation_memory_max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _get_disk(self, keys: list[SegmentKey]) -> dict[SegmentKey, str]:
+        db = self._db
+        if db is None or not keys:
+            return {}
+
+        def _select() -> dict[SegmentKey, str]:
+            found: dict[SegmentKey, str] = {}
+            with self._db_lock:
+                for key in keys:
+                    row = db.execute(
+                        "SELECT target FROM segments WHERE source = ? "
+                        "AND from_language = ? AND to_language = ?",
+                        key,
+                    ).fetchone()
+                    if row:
+                        found[key] = row[0]
+            return found
+
+        return await asyncio.to_thread(_select)
+
+    async def _set_disk(self, translated: dict[SegmentKey, str]) -> None:
+        db = self._db
+        if db is None:
+            return
+
+        def _upsert() -> None:
+            with self._db_lock:
+                db.executemany(
+                    "INSERT OR REPLACE INTO segments "
+                    "(source, from_language, to_language, target) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(*key, target) for key, target in translated.items()],
+                )
+                db.commit()
+
+        await asyncio.to_thread(_upsert)
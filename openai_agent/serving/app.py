@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import AbstractContextManager, asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from lagom.environment import Env
+from pydantic import BaseModel, ValidationError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route
+
+from openai_agent.protocols.i_session_manager import ISessionManager
+from openai_agent.services.session_manager import ServerBusyError, Session
+from openai_agent.services.token_budget import TokenBudgetExceeded
+
+
+class ServerEnv(Env):
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_drain_timeout: float = 30.0
+    server_stream_buffer: int = 64
+
+
+ServerSentEvent = tuple[str, Any]
+"""An event name and its JSON serializable data."""
+
+
+class SessionRequest(BaseModel):
+    session_id: str | None = None
+    """Continues an existing conversation, a new session is created if omitted."""
+
+
+@dataclass
+class Endpoint:
+    request_model: type[SessionRequest]
+    handler: Callable[[Session, Any], Awaitable[Any]]
+    """Runs one turn of the session and returns its output."""
+
+
+@dataclass
+class StreamingEndpoint:
+    request_model: type[SessionRequest]
+    handler: Callable[[Session, Any], AsyncIterator[ServerSentEvent]]
+    """Runs one turn of the session and yields its events as they happen."""
+
+
+def to_json(value: Any) -> Any:
+    return value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+
+
+def format_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(to_json(data))}\n\n"
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Returns once the client has gone away, the body must have been read."""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+def create_app(
+    sessions: ISessionManager,
+    endpoints: dict[str, Endpoint | StreamingEndpoint],
+    logger: logging.Logger,
+    drain_timeout: float = 30.0,
+    stream_buffer: int = 64,
+    on_startup: Callable[[], Awaitable[None]] | None = None,
+    on_shutdown: Callable[[], Awaitable[None]] | None = None,
+    on_remove: Callable[[str], Awaitable[bool]] | None = None,
+    metrics: dict[str, Callable[[], dict[str, Any]]] | None = None,
+    prometheus: Callable[[], str] | None = None,
+    run_scope: Callable[[Session], AbstractContextManager[Any]] | None = None,
+) -> Starlette:
+    """Exposes every endpoint as `POST /patterns/{name}`.
+
+    Each request is a run of its session, admitted by `sessions`; a full run
+    queue is answered with 503. Runs are cancelled when the client disconnects
+    or the session is deleted. On shutdown, active runs get `drain_timeout`
+    seconds to finish.
+
+    :param sessions: Keeps the session state and bounds the concurrent runs.
+    :param endpoints: The endpoints by name.
+    :param logger: Logs failed streaming runs.
+    :param drain_timeout: Seconds active runs may take to finish on shutdown.
+    :param stream_buffer: Events buffered per stream before the run is paused
+        until the client catches up.
+    :param on_startup: Prepares resources before the first request is served,
+        such as connections to the deployment.
+    :param on_shutdown: Releases resources after the runs were drained.
+    :param on_remove: Forgets the stored state of a deleted session, True if
+        there was any. Sessions of other workers can be deleted this way.
+    :param metrics: Further components reported by `GET /health`, by name.
+    :param prometheus: Renders the metrics served by `GET /metrics`, in the
+        Prometheus text format.
+    :param run_scope: Entered around every run of a session, within its task.
+        Runs that exceed their token budget are answered with 429.
+    :return: The ASGI application.
+    """
+    scope = run_scope or (lambda session: nullcontext())
+
+    async def run_scoped(
+        endpoint: Endpoint, session: Session, payload: SessionRequest
+    ) -> Any:
+        with scope(session):
+            return await endpoint.handler(session, payload)
+
+    async def run_turn(
+        endpoint: Endpoint, session: Session, payload: SessionRequest, request: Request
+    ) -> Response:
+        task = sessions.start(session, partial(run_scoped, endpoint, session, payload))
+        disconnected = asyncio.create_task(wait_for_disconnect(request))
+        try:
+            done, _ = await asyncio.wait(
+                {task, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            disconnected.cancel()
+            if not task.done():
+                task.cancel()
+
+        if task not in done:
+            # nobody is left to read the response
+            return Response(status_code=499)
+        if task.cancelled():
+            return JSONResponse(
+                {"session_id": session.id, "error": "The run was cancelled."}, 409
+            )
+        if isinstance(error := task.exception(), TokenBudgetExceeded):
+            return JSONResponse({"session_id": session.id, "error": str(error)}, 429)
+        return JSONResponse(
+            {"session_id": session.id, "output": to_json(task.result())}
+        )
+
+    async def stream_events(
+        session: Session,
+        queue: asyncio.Queue[ServerSentEvent],
+        task: asyncio.Task[None],
+    ) -> AsyncIterator[str]:
+        try:
+            yield format_event("session", {"session_id": session.id})
+            while not (task.done() and queue.empty()):
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield format_event(*getter.result())
+                else:
+                    getter.cancel()
+
+            if task.cancelled():
+                yield format_event("cancelled", {})
+            elif isinstance(error := task.exception(), TokenBudgetExceeded):
+                yield format_event("error", {"error": str(error)})
+            elif error is not None:
+                logger.error("Streaming run failed", exc_info=error)
+                yield format_event("error", {"error": "The run failed."})
+        finally:
+            # the client disconnected or the stream is complete
+            task.cancel()
+
+    def run_stream(
+        endpoint: StreamingEndpoint, session: Session, payload: SessionRequest
+    ) -> Response:
+        queue: asyncio.Queue[ServerSentEvent] = asyncio.Queue(maxsize=stream_buffer)
+
+        async def produce() -> None:
+            with scope(session):
+                async for event in endpoint.handler(session, payload):
+                    await queue.put(event)
+
+        task = sessions.start(session, produce)
+        return StreamingResponse(
+            stream_events(session, queue, task),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Session-Id": session.id},
+        )
+
+    async def handle(
+        endpoint: Endpoint | StreamingEndpoint, request: Request
+    ) -> Response:
+        try:
+            payload = endpoint.request_model.model_validate_json(await request.body())
+        except ValidationError as e:
+            return JSONResponse({"error": e.errors(include_url=False)}, 422)
+
+        session = sessions.get_session(payload.session_id)
+        try:
+            if isinstance(endpoint, StreamingEndpoint):
+                return run_stream(endpoint, session, payload)
+            return await run_turn(endpoint, session, payload, request)
+        except ServerBusyError as e:
+            return JSONResponse({"error": str(e)}, 503, headers={"Retry-After": "1"})
+
+    async def delete_session(request: Request) -> Response:
+        session_id = request.path_params["session_id"]
+        removed = sessions.remove_session(session_id)
+        if on_remove is not None:
+            removed = await on_remove(session_id) or removed
+        return Response(status_code=204 if removed else 404)
+
+    async def health(request: Request) -> Response:
+        status = {"sessions": sessions.get_status()}
+        for name, get_metrics in (metrics or {}).items():
+            status[name] = get_metrics()
+        return JSONResponse(status)
+
+    async def render_metrics(render: Callable[[], str], request: Request) -> Response:
+        return PlainTextResponse(
+            render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        if on_startup is not None:
+            await on_startup()
+        yield
+        await sessions.drain(drain_timeout)
+        if on_shutdown is not None:
+            await on_shutdown()
+
+    routes = [
+        Route(f"/patterns/{name}", partial(handle, endpoint), methods=["POST"])
+        for name, endpoint in endpoints.items()
+    ]
+    routes += [
+        Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/health", health, methods=["GET"]),
+    ]
+    if prometheus is not None:
+        routes.append(
+            Route("/metrics", partial(render_metrics, prometheus), methods=["GET"])
+        )
+    return Starlette(routes=routes, lifespan=lifespan)
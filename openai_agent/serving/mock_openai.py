@@ -0,0 +1,455 @@
+"""A local stand-in for the Azure OpenAI chat completions endpoint.
+
+Answers are generated from the request instead of a model: JSON that matches the
+requested `response_format` schema, a call of one of the offered tools while the
+last message is not a tool result, and filler text otherwise. Prompt prefixes seen
+before are reported as cached tokens like the provider's prompt cache. Latency,
+streaming speed and throttling are configurable, so the patterns can be load tested
+without spending tokens. Point the client at it with
+`AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8100` and any `AZURE_OPENAI_API_KEY`.
+
+Usage:
+python -m openai_agent.serving.mock_openai
+MOCK_OPENAI_LATENCY_MS=800 MOCK_OPENAI_RPM_LIMIT=600 python -m openai_agent.serving.mock_openai
+"""  # noqa: E501
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal
+
+from lagom.environment import Env
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+FILLER = (
+    "The patient should rest, drink plenty of fluids and follow up with their "
+    "doctor if the symptoms persist or get worse over the next few days."
+).split()
+
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP_TOKENS = 128
+"""Prompts are cached from 1024 tokens on, in steps of 128 tokens."""
+
+LatencyDistribution = Literal["constant", "uniform", "normal", "lognormal"]
+
+
+class MockOpenAIEnv(Env):
+    mock_openai_host: str = "127.0.0.1"
+    mock_openai_port: int = 8100
+    mock_openai_latency: LatencyDistribution = "lognormal"
+    mock_openai_latency_ms: float = 400.0
+    mock_openai_latency_spread: float = 0.5
+    mock_openai_token_latency_ms: float = 10.0
+    mock_openai_output_tokens: int = 40
+    mock_openai_tool_call_rate: float = 1.0
+    mock_openai_error_rate: float = 0.0
+    mock_openai_rpm_limit: int = 0
+    mock_openai_retry_after_ms: int = 1000
+    mock_openai_seed: str | None = None
+    mock_openai_prompt_cache: bool = True
+
+
+def sample_latency(
+    rng: random.Random,
+    distribution: LatencyDistribution,
+    median_ms: float,
+    spread: float,
+) -> float:
+    """Seconds of latency with the given median. `spread` is the relative half
+    width for uniform, the relative deviation for normal and sigma for lognormal."""
+    match distribution:
+        case "constant":
+            ms = median_ms
+        case "uniform":
+            ms = rng.uniform(median_ms * (1 - spread), median_ms * (1 + spread))
+        case "normal":
+            ms = rng.gauss(median_ms, median_ms * spread)
+        case "lognormal":
+            ms = median_ms * math.exp(rng.gauss(0, spread))
+    return max(0.0, ms) / 1000
+
+
+def sample_json(schema: dict[str, Any], root: dict[str, Any], name: str) -> Any:
+    """A value that matches a JSON schema, strings are named after their field."""
+    if "$ref" in schema:
+        *_, section, ref = schema["$ref"].split("/")
+        return sample_json(root[section][ref], root, name)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"]
+            return sample_json((options or schema[key])[0], root, name)
+
+    type_ = schema.get("type", "string")
+    if isinstance(type_, list):
+        type_ = next((t for t in type_ if t != "null"), "null")
+    match type_:
+        case "object":
+            return {
+                key: sample_json(value, root, key)
+                for key, value in schema.get("properties", {}).items()
+            }
+        case "array":
+            return [sample_json(schema.get("items", {}), root, name)]
+        case "integer":
+            return 1
+        case "number":
+            return 1.0
+        case "boolean":
+            return True
+        case "null":
+            return None
+        case _:
+            return f"mock {name}"
+
+
+def count_tokens(value: Any) -> int:
+    """Roughly 4 characters per token."""
+    return max(1, len(json.dumps(value)) // 4)
+
+
+@dataclass
+class MockCompletion:
+    content: str | None
+    tool_calls: list[dict[str, Any]]
+    prompt_tokens: int
+    cached_tokens: int = 0
+
+    @property
+    def finish_reason(self) -> str:
+        return "tool_calls" if self.tool_calls else "stop"
+
+    @property
+    def completion_tokens(self) -> int:
+        return count_tokens(self.content or self.tool_calls)
+
+    @property
+    def usage(self) -> dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": self.cached_tokens},
+        }
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    streamed: int = 0
+    throttled: int = 0
+    tool_calls: int = 0
+    structured: int = 0
+    cached_tokens: int = 0
+
+
+@dataclass
+class MockOpenAI:
+    """Generates the completions and keeps the throttling state."""
+
+    env: MockOpenAIEnv
+    stats: MockStats = field(default_factory=MockStats, init=False)
+    _rng: random.Random = field(init=False, repr=False)
+    _window: deque[float] = field(default_factory=deque, init=False, repr=False)
+    _prefixes: set[bytes] = field(default_factory=set, init=False, repr=False)
+    """Digests of the prompt prefixes seen so far, at every cache step."""
+
+    def __post_init__(self) -> None:
+        seed = self.env.mock_openai_seed
+        try:
+            self._rng = random.Random(int(seed) if seed else None)
+        except ValueError:
+            raise ValueError(
+                f"MOCK_OPENAI_SEED must be an integer, got '{seed}'."
+            ) from None
+
+    def throttle(self) -> Response | None:
+        """A 429 response when the request is over the limit or drawn as an
+        injected error, None otherwise."""
+        now = time.monotonic()
+        while self._window and self._window[0] <= now - 60:
+            self._window.popleft()
+
+        limit = self.env.mock_openai_rpm_limit
+        over_limit = limit > 0 and len(self._window) >= limit
+        if not over_limit and self._rng.random() >= self.env.mock_openai_error_rate:
+            self._window.append(now)
+            return None
+
+        self.stats.throttled += 1
+        retry_after_ms = self.env.mock_openai_retry_after_ms
+        if over_limit:
+            retry_after_ms = max(
+                retry_after_ms, int((self._window[0] + 60 - now) * 1000)
+            )
+        return JSONResponse(
+            {
+                "error": {
+                    "code": "429",
+                    "message": "Requests have exceeded the rate limit of the mock.",
+                }
+            },
+            status_code=429,
+            headers={
+                "retry-after-ms": str(retry_after_ms),
+                "retry-after": str(math.ceil(retry_after_ms / 1000)),
+            },
+        )
+
+    def get_headers(self) -> dict[str, str]:
+        limit = self.env.mock_openai_rpm_limit
+        if limit <= 0:
+            return {}
+        return {"x-ratelimit-remaining-requests": str(limit - len(self._window))}
+
+    def complete(self, body: dict[str, Any]) -> MockCompletion:
+        messages = body.get("messages", [])
+        prompt_tokens = count_tokens(messages)
+        cached_tokens = self.cache_prompt(body)
+        self.stats.cached_tokens += cached_tokens
+
+        tool = self._choose_tool(body)
+        if tool is not None:
+            self.stats.tool_calls += 1
+            function = tool["function"]
+            arguments = sample_json(
+                function.get("parameters", {}), function.get("parameters", {}), "arg"
+            )
+            call = {
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {
+                    "name": function["name"],
+                    "arguments": json.dumps(arguments),
+                },
+            }
+            return MockCompletion(None, [call], prompt_tokens, cached_tokens)
+
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            self.stats.structured += 1
+            schema = response_format["json_schema"].get("schema", {})
+            content = json.dumps(sample_json(schema, schema, "output"))
+        else:
+            count = self.env.mock_openai_output_tokens
+            content = " ".join(FILLER[i % len(FILLER)] for i in range(count))
+        return MockCompletion(content, [], prompt_tokens, cached_tokens)
+
+    def cache_prompt(self, body: dict[str, Any]) -> int:
+        """Caches the prefixes of the prompt like the provider does, and returns
+        the tokens of the longest prefix that was cached before."""
+        if not self.env.mock_openai_prompt_cache:
+            return 0
+
+        prompt = json.dumps(
+            [body.get("messages"), body.get("tools"), body.get("response_format")]
+        ).encode()
+        # about 4 bytes per token, like count_tokens
+        step = PROMPT_CACHE_STEP_TOKENS * 4
+        digest = hashlib.sha256()
+        cached = 0
+        for end in range(step, len(prompt) + 1, step):
+            digest.update(prompt[end - step : end])
+            prefix = digest.digest()
+            if end < PROMPT_CACHE_MIN_TOKENS * 4:
+                continue
+            if prefix in self._prefixes:
+                cached = end // 4
+            else:
+                self._prefixes.add(prefix)
+        return cached
+
+    def get_first_token_latency(self) -> float:
+        return sample_latency(
+            self._rng,
+            self.env.mock_openai_latency,
+            self.env.mock_openai_latency_ms,
+            self.env.mock_openai_latency_spread,
+        )
+
+    def _choose_tool(self, body: dict[str, Any]) -> dict[str, Any] | None:
+        tools = [t for t in body.get("tools") or [] if t.get("type") == "function"]
+        choice = body.get("tool_choice", "auto")
+        if not tools or choice == "none":
+            return None
+        if isinstance(choice, dict):
+            name = choice.get("function", {}).get("name")
+            return next((t for t in tools if t["function"]["name"] == name), None)
+        if choice != "required":
+            messages = body.get("messages", [])
+            # answer once the tools were called, like a model would
+            if messages and messages[-1].get("role") == "tool":
+                return None
+            if self._rng.random() >= self.env.mock_openai_tool_call_rate:
+                return None
+        return self._rng.choice(tools)
+
+
+def create_mock_app(mock: MockOpenAI) -> Starlette:
+    """Serves chat completions on the Azure (`/openai/deployments/{name}/...`)
+    and the OpenAI (`/v1/...`) paths, and the counters on `GET /stats`."""
+
+    def to_response(
+        completion: MockCompletion, id: str, created: int, model: str
+    ) -> dict[str, Any]:
+        message: dict[str, Any] = {"role": "assistant", "content": completion.content}
+        if completion.tool_calls:
+            message["tool_calls"] = completion.tool_calls
+        return {
+            "id": id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": completion.finish_reason,
+                }
+            ],
+            "usage": completion.usage,
+        }
+
+    async def stream(
+        completion: MockCompletion,
+        id: str,
+        created: int,
+        model: str,
+        include_usage: bool,
+    ) -> AsyncIterator[str]:
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+            data = {
+                "id": id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        token_latency = mock.env.mock_openai_token_latency_ms / 1000
+        yield chunk({"role": "assistant", "content": ""})
+        for index, call in enumerate(completion.tool_calls):
+            function = call["function"]
+            yield chunk(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "id": call["id"],
+                            "type": "function",
+                            "function": {"name": function["name"], "arguments": ""},
+                        }
+                    ]
+                }
+            )
+            arguments = function["arguments"]
+            for start in range(0, len(arguments), 16):
+                await asyncio.sleep(token_latency)
+                yield chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "function": {
+                                    "arguments": arguments[start : start + 16]
+                                },
+                            }
+                        ]
+                    }
+                )
+        if completion.content is not None:
+            for piece in completion.content.split(" "):
+                await asyncio.sleep(token_latency)
+                yield chunk({"content": piece + " "})
+        yield chunk({}, completion.finish_reason)
+        if include_usage:
+            data = {
+                "id": id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": completion.usage,
+            }
+            yield f"data: {json.dumps(data)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def chat_completions(request: Request) -> Response:
+        mock.stats.requests += 1
+        throttled = mock.throttle()
+        if throttled is not None:
+            return throttled
+
+        body = await request.json()
+        completion = mock.complete(body)
+        id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = request.path_params.get("deployment") or body.get("model", "mock")
+        await asyncio.sleep(mock.get_first_token_latency())
+
+        if body.get("stream"):
+            mock.stats.streamed += 1
+            include_usage = (body.get("stream_options") or {}).get("include_usage")
+            return StreamingResponse(
+                stream(completion, id, created, model, bool(include_usage)),
+                media_type="text/event-stream",
+                headers=mock.get_headers(),
+            )
+
+        # a non streamed response arrives once all tokens are generated
+        tokens = completion.completion_tokens
+        await asyncio.sleep(tokens * mock.env.mock_openai_token_latency_ms / 1000)
+        return JSONResponse(
+            to_response(completion, id, created, model), headers=mock.get_headers()
+        )
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse(asdict(mock.stats))
+
+    return Starlette(
+        routes=[
+            Route(
+                "/openai/deployments/{deployment}/chat/completions",
+                chat_completions,
+                methods=["POST"],
+            ),
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/chat/completions", chat_completions, methods=["POST"]),
+            Route("/stats", stats),
+        ]
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    from openai_agent.hosting import container, load_env
+
+    load_env()
+    env = container[MockOpenAIEnv]
+    uvicorn.run(
+        create_mock_app(MockOpenAI(env)),
+        host=env.mock_openai_host,
+        port=env.mock_openai_port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+from agents import Agent
+
+from openai_agent.agentic_patterns.common.agent_registry import AgentRegistry
+
+
+def test_agents_are_built_lazily():
+    registry = AgentRegistry()
+    built: list[str] = []
+
+    @registry.register("triage")
+    def get_triage() -> Agent:
+        built.append("triage")
+        return Agent(name="triage")
+
+    assert registry.names() == ["triage"]
+    assert built == [] and not registry.is_built("triage")
+
+    agent = get_triage()
+    assert agent.name == "triage"
+    assert registry.is_built("triage")
+    assert get_triage() is registry.get("triage") is agent
+    assert built == ["triage"]
+
+
+def test_default_name_is_the_qualified_name():
+    registry = AgentRegistry()
+
+    @registry.register()
+    def get_agent() -> Agent:
+        return Agent(name="agent")
+
+    name = f"{__name__}.test_default_name_is_the_qualified_name.<locals>.get_agent"
+    assert registry.names() == [name]
+
+
+def test_concurrent_gets_build_once():
+    registry = AgentRegistry()
+    calls = 0
+
+    def build() -> Agent:
+        nonlocal calls
+        calls += 1
+        time.sleep(0.01)
+        return Agent(name="slow")
+
+    registry.add("slow", build)
+    agents: list[Agent] = []
+    threads = [
+        threading.Thread(target=lambda: agents.append(registry.get("slow")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == 1
+    assert all(agent is agents[0] for agent in agents)
+
+
+def test_factories_may_get_other_agents():
+    registry = AgentRegistry()
+    registry.add("doctor", lambda: Agent(name="doctor"))
+    registry.add(
+        "triage", lambda: Agent(name="triage", handoffs=[registry.get("doctor")])
+    )
+
+    assert registry.get("triage").handoffs == [registry.get("doctor")]
+
+
+def test_unknown_and_duplicate_names_are_rejected():
+    registry = AgentRegistry()
+    registry.add("triage", lambda: Agent(name="triage"))
+
+    with pytest.raises(KeyError):
+        registry.get("doctor")
+    assert not registry.is_built("doctor")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.add("triage", lambda: Agent(name="other"))
@@ -0,0 +1,42 @@
+import pytest
+from agents import Agent, RunContextWrapper
+from pytest_mock import MockerFixture
+
+from openai_agent.agentic_patterns.common.agent_registry import agent_registry
+from openai_agent.agentic_patterns.common.doctor_agents import (
+    get_back_to_triage,
+    get_doctor_router,
+)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "My son swallowed a whole bottle of pills an hour ago",
+        "My lips and tongue are swelling up after eating peanuts",
+        "I'm 30 weeks along and my waters might have broken",
+        "There's blood in my stool and I've lost weight",
+        "What are the side effects of ibuprofen?",
+    ],
+)
+def test_emergencies_and_weak_evidence_go_to_triage(message: str):
+    assert get_doctor_router().route(message).route is None
+
+
+def test_clear_messages_are_routed():
+    router = get_doctor_router()
+
+    assert router.route("I keep getting heartburn and acid reflux").route == (
+        "gastroenterology_agent"
+    )
+
+
+@pytest.mark.asyncio
+async def test_specialists_can_hand_back_to_triage(mocker: MockerFixture):
+    triage = Agent(name="triage_agent")
+    mocker.patch.object(agent_registry, "get", return_value=triage)
+    back = get_back_to_triage()
+
+    assert back.tool_name == "transfer_to_triage_agent"
+    assert await back.on_invoke_handoff(RunContextWrapper(None), "{}") is triage
+    agent_registry.get.assert_called_once_with("triage_agent")  # type: ignore
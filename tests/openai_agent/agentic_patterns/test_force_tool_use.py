@@ -0,0 +1,39 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from agents import FunctionToolResult, RunContextWrapper
+
+from openai_agent.agentic_patterns.force_tool_use import (
+    Specialist,
+    custom_tool_use_behavior,
+)
+
+
+async def get_final_output(output: Any) -> Any:
+    result = FunctionToolResult(tool=MagicMock(), output=output, run_item=MagicMock())
+    behavior = await custom_tool_use_behavior(RunContextWrapper(None), [result])
+    assert behavior.is_final_output
+    return behavior.final_output
+
+
+@pytest.mark.asyncio
+async def test_first_specialist_is_the_final_output():
+    specialists = [
+        Specialist(
+            first_name="Ada", last_name="Lee", specialty="cardiology", city="Seattle"
+        ),
+        Specialist(
+            first_name="Bo", last_name="Kim", specialty="cardiology", city="Seattle"
+        ),
+    ]
+
+    assert await get_final_output(specialists) == str(specialists[0])
+    assert await get_final_output([]) == "No specialist found."
+
+
+@pytest.mark.asyncio
+async def test_tool_error_is_passed_through():
+    error = "An error occurred while running the tool. Please try again."
+
+    assert await get_final_output(error) == error
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from openai_agent.agentic_patterns import tool_conditional
+from openai_agent.agentic_patterns.tool_conditional import (
+    AppContext,
+    get_enabled_translators,
+    translate_fan_out,
+)
+
+DELAYS = {"Spanish": 0.02, "French": 0.001, "Italian": 0.001}
+
+
+@pytest.fixture
+def translations(mocker: MockerFixture) -> list[tuple[str, str, str]]:
+    calls: list[tuple[str, str, str]] = []
+
+    async def translate_from(text: str, from_language: str, to_language: str) -> str:
+        calls.append((text, from_language, to_language))
+        await asyncio.sleep(DELAYS[to_language])
+        return f"{to_language}({text})"
+
+    mocker.patch.object(tool_conditional, "translate_from", translate_from)
+    return calls
+
+
+def test_enabled_translators():
+    def languages(preference: str) -> list[str]:
+        context = AppContext(language_preference=preference)  # type: ignore
+        return [translator.language for translator in get_enabled_translators(context)]
+
+    assert languages("spanish_only") == ["Spanish"]
+    assert languages("french_spanish") == ["Spanish", "French"]
+    assert languages("italian_spanish") == ["Spanish", "Italian"]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_merges_in_translator_order(
+    translations: list[tuple[str, str, str]],
+):
+    context = AppContext(language_preference="french_spanish")
+
+    output = await translate_fan_out("hello", context)
+
+    # French finishes first but is listed after Spanish
+    assert output.input_text == "hello"
+    assert output.translated_text == "Spanish: Spanish(hello)\nFrench: French(hello)"
+    assert sorted(translations) == [
+        ("hello", "English", "French"),
+        ("hello", "English", "Spanish"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_skips_disabled_languages(
+    translations: list[tuple[str, str, str]],
+):
+    output = await translate_fan_out("hello", AppContext())
+
+    assert output.translated_text == "Spanish: Spanish(hello)"
+    assert translations == [("hello", "English", "Spanish")]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_chains_from_the_source_translation(
+    translations: list[tuple[str, str, str]],
+):
+    context = AppContext(language_preference="italian_spanish")
+
+    output = await translate_fan_out("hello", context)
+
+    # Italian is translated from the Spanish translation, which runs once
+    assert output.translated_text == (
+        "Spanish: Spanish(hello)\nItalian: Italian(Spanish(hello))"
+    )
+    assert translations == [
+        ("hello", "English", "Spanish"),
+        ("Spanish(hello)", "Spanish", "Italian"),
+    ]
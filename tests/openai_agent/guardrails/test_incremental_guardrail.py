@@ -0,0 +1,193 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from agents import (
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    RunContextWrapper,
+    TResponseInputItem,
+)
+
+from openai_agent.guardrails.incremental_guardrail import (
+    FullHistoryPolicy,
+    GuardrailContext,
+    IncrementalGuardrail,
+    get_new_user_messages,
+)
+
+
+class FakeCheck:
+    """Trips on any user message containing 'buy' and records its inputs."""
+
+    def __init__(self) -> None:
+        self.inputs: list[list[TResponseInputItem]] = []
+
+    async def __call__(
+        self, context: Any, agent: Any, input: list[TResponseInputItem]
+    ) -> GuardrailFunctionOutput:
+        self.inputs.append(input)
+        return GuardrailFunctionOutput(
+            output_info=None,
+            tripwire_triggered=any(
+                "buy" in str(item.get("content"))
+                for item in input
+                if item.get("role") == "user"
+            ),
+        )
+
+
+def user(content: str) -> TResponseInputItem:
+    return {"role": "user", "content": content}
+
+
+def assistant(content: str) -> TResponseInputItem:
+    return {"role": "assistant", "content": content}
+
+
+@pytest.fixture
+def fake_check() -> FakeCheck:
+    return FakeCheck()
+
+
+def get_guardrail(
+    fake_check: FakeCheck, policy: FullHistoryPolicy | None = None
+) -> IncrementalGuardrail:
+    return IncrementalGuardrail(
+        InputGuardrail(guardrail_function=fake_check, name="fake"),  # type: ignore
+        policy=policy or FullHistoryPolicy(),
+    )
+
+
+def test_get_new_user_messages():
+    items = [user("a"), assistant("b"), user("c"), user("d")]
+    assert get_new_user_messages(items) == (2, [user("c"), user("d")])
+    assert get_new_user_messages([assistant("b")]) == (1, [])
+
+
+@pytest.mark.asyncio
+async def test_only_new_messages_are_checked(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check)
+    history = [user("hello")]
+
+    await guardrail.check(MagicMock(), MagicMock(), history)
+    history += [assistant("hi"), user("opening hours?")]
+    output = await guardrail.check(MagicMock(), MagicMock(), history)
+
+    assert not output.tripwire_triggered
+    assert fake_check.inputs == [[user("hello")], [user("opening hours?")]]
+    assert guardrail.stats.messages_checked == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_content_is_not_checked_twice(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check)
+
+    first = await guardrail.check(MagicMock(), MagicMock(), "I want to buy pills")
+    second = await guardrail.check(
+        MagicMock(),
+        MagicMock(),
+        [user("hello"), assistant("hi"), user("I want to buy pills")],
+    )
+    third = await guardrail.check(MagicMock(), MagicMock(), "I want to buy pills")
+
+    assert first.tripwire_triggered and second.tripwire_triggered
+    assert third.tripwire_triggered
+    assert len(fake_check.inputs) == 1
+    assert guardrail.stats.messages_skipped == 2
+
+
+@pytest.mark.asyncio
+async def test_no_new_messages(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check)
+
+    output = await guardrail.check(MagicMock(), MagicMock(), [assistant("hi")])
+    assert not output.tripwire_triggered
+    assert fake_check.inputs == []
+
+
+@pytest.mark.asyncio
+async def test_context_messages(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check, FullHistoryPolicy(context_messages=1))
+
+    await guardrail.check(
+        MagicMock(), MagicMock(), [user("a"), assistant("b"), user("c")]
+    )
+    assert fake_check.inputs == [[assistant("b"), user("c")]]
+
+
+@pytest.mark.asyncio
+async def test_full_history_policy(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check, FullHistoryPolicy(every_n_checks=2))
+    history = [user("a"), assistant("b"), user("c")]
+
+    await guardrail.check(MagicMock(), MagicMock(), history)
+    await guardrail.check(MagicMock(), MagicMock(), history)
+
+    assert fake_check.inputs == [[user("c")], history]
+    assert guardrail.stats.full_checks == 1
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_trip_is_not_stored(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check)
+
+    output = await guardrail.check(
+        MagicMock(), MagicMock(), [user("hello"), user("buy pills")]
+    )
+    await guardrail.check(MagicMock(), MagicMock(), "hello")
+
+    assert output.tripwire_triggered
+    assert len(fake_check.inputs) == 2
+
+
+@pytest.mark.asyncio
+async def test_verdicts_are_bounded(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check)
+    guardrail.max_verdicts = 1
+
+    await guardrail.check(MagicMock(), MagicMock(), "a")
+    await guardrail.check(MagicMock(), MagicMock(), "b")
+    assert len(guardrail._verdicts) == 1
+
+
+@pytest.mark.asyncio
+async def test_as_input_guardrail(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check).as_input_guardrail()
+
+    result = await guardrail.run(MagicMock(), "buy pills", MagicMock())
+    assert result.output.tripwire_triggered
+
+
+@pytest.mark.asyncio
+async def test_full_history_checks_are_counted_per_session(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check, FullHistoryPolicy(every_n_checks=2))
+    history = [user("a"), assistant("b"), user("c")]
+
+    for session_id in ("s1", "s2", "s1"):
+        context = RunContextWrapper(GuardrailContext(session_id))
+        await guardrail.check(context, MagicMock(), history)
+
+    # only the second check of s1 is a full check, s2 reuses the verdict of "c"
+    assert fake_check.inputs == [[user("c")], history]
+    assert guardrail.stats.full_checks == 1
+
+
+@pytest.mark.asyncio
+async def test_verdicts_depend_on_their_context(fake_check: FakeCheck):
+    guardrail = get_guardrail(fake_check, FullHistoryPolicy(context_messages=1))
+
+    await guardrail.check(
+        MagicMock(), MagicMock(), [user("a"), assistant("b"), user("c")]
+    )
+    await guardrail.check(
+        MagicMock(), MagicMock(), [user("x"), assistant("y"), user("c")]
+    )
+    await guardrail.check(
+        MagicMock(), MagicMock(), [user("z"), assistant("b"), user("c")]
+    )
+
+    assert fake_check.inputs == [
+        [assistant("b"), user("c")],
+        [assistant("y"), user("c")],
+    ]
@@ -0,0 +1,139 @@
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from agents import (
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    InputGuardrailTripwireTriggered,
+    TResponseInputItem,
+)
+from pytest_mock import MockerFixture
+
+from openai_agent.guardrails.tiered_guardrail import (
+    TieredGuardrail,
+    get_last_user_message,
+    get_user_messages,
+    run_guarded,
+)
+from openai_agent.services.lexicon_classifier import LexiconClassifier
+
+
+def get_llm_guardrail(tripwire: bool, delay: float = 0.0) -> InputGuardrail[Any]:
+    async def check(context: Any, agent: Any, input: Any) -> GuardrailFunctionOutput:
+        await asyncio.sleep(delay)
+        return GuardrailFunctionOutput(output_info=None, tripwire_triggered=tripwire)
+
+    return InputGuardrail(guardrail_function=check)
+
+
+def get_tiered_guardrail(tripwire: bool = False) -> TieredGuardrail:
+    return TieredGuardrail(
+        classifier=LexiconClassifier(
+            weights={r"buy": 1.0, r"pills": 1.0},
+            block_threshold=2.0,
+            allow_threshold=0.0,
+        ),
+        guardrail=get_llm_guardrail(tripwire),
+    )
+
+
+@pytest.fixture
+def mock_run(mocker: MockerFixture) -> AsyncMock:
+    return mocker.patch(
+        "openai_agent.guardrails.tiered_guardrail.Runner.run",
+        new_callable=AsyncMock,
+        return_value="result",
+    )
+
+
+def test_get_last_user_message():
+    items: list[TResponseInputItem] = [
+        {"role": "user", "content": "first"},
+        {"role": "user", "content": [{"type": "input_text", "text": "second"}]},
+        {"role": "assistant", "content": "answer"},
+    ]
+    assert get_last_user_message("text") == "text"
+    assert get_last_user_message(items) == "second"
+    assert get_last_user_message(items[2:]) == ""
+    assert get_user_messages(items) == ["first", "second"]
+
+
+def test_check_local():
+    guardrail = get_tiered_guardrail()
+
+    assert guardrail.check_local("hello") is not None
+    assert guardrail.check_local("can I buy something") is None
+    blocked = guardrail.check_local("buy pills")
+
+    assert blocked is not None and blocked.output.tripwire_triggered
+    assert guardrail.stats.local_allowed == 1
+    assert guardrail.stats.escalated == 1
+    assert guardrail.stats.local_blocked == 1
+
+
+def test_check_local_escalates_cues_in_earlier_messages():
+    guardrail = get_tiered_guardrail()
+    clean: list[TResponseInputItem] = [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "buy pills"},
+        {"role": "user", "content": "thanks"},
+    ]
+    spread: list[TResponseInputItem] = [
+        {"role": "user", "content": "where can I buy"},
+        {"role": "assistant", "content": "what?"},
+        {"role": "user", "content": "pills"},
+        {"role": "user", "content": "please"},
+    ]
+
+    allowed = guardrail.check_local(clean)
+
+    assert allowed is not None and not allowed.output.tripwire_triggered
+    assert guardrail.check_local(spread) is None
+    assert guardrail.stats.local_allowed == 1
+    assert guardrail.stats.escalated == 1
+
+
+@pytest.mark.asyncio
+async def test_run_guarded_local_allow(mock_run: AsyncMock):
+    guardrail = get_tiered_guardrail(tripwire=True)
+
+    assert await run_guarded(MagicMock(), "hello", [guardrail]) == "result"
+    mock_run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_guarded_local_block(mock_run: AsyncMock):
+    with pytest.raises(InputGuardrailTripwireTriggered):
+        await run_guarded(MagicMock(), "buy pills", [get_tiered_guardrail()])
+    mock_run.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_guarded_escalated_pass(mock_run: AsyncMock):
+    guardrails = [get_tiered_guardrail(), get_llm_guardrail(False, delay=0.01)]
+
+    assert await run_guarded(MagicMock(), "buy", guardrails) == "result"
+
+
+@pytest.mark.asyncio
+async def test_run_guarded_escalated_trip_cancels_run(mock_run: AsyncMock):
+    cancelled = asyncio.Event()
+
+    async def slow_run(*args: Any, **kwargs: Any) -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "result"
+
+    mock_run.side_effect = slow_run
+    guardrails = [get_llm_guardrail(False, delay=10), get_tiered_guardrail(True)]
+
+    with pytest.raises(InputGuardrailTripwireTriggered):
+        await run_guarded(MagicMock(), "buy", guardrails)
+
+    # the run has finished cancelling when run_guarded returns
+    assert cancelled.is_set()
@@ -0,0 +1,114 @@
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from agents import AgentOutputSchema, ModelResponse, ModelSettings, ModelTracing, Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from pydantic import BaseModel
+
+from openai_agent.models.caching_model import CachingModel, get_cache_key
+from openai_agent.services.response_cache import ResponseCache, ResponseCacheEnv
+
+
+class Output(BaseModel):
+    answer: str
+
+
+def get_response(text: str) -> ModelResponse:
+    return ModelResponse(
+        output=[
+            ResponseOutputMessage(
+                id="msg_1",
+                content=[
+                    ResponseOutputText(text=text, type="output_text", annotations=[])
+                ],
+                role="assistant",
+                status="completed",
+                type="message",
+            )
+        ],
+        usage=Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15),
+        response_id="resp_1",
+    )
+
+
+def get_args(input: str = "diabetes", **kwargs: Any) -> dict[str, Any]:
+    return {
+        "system_instructions": "You are a medical symptom generator.",
+        "input": input,
+        "model_settings": ModelSettings(),
+        "tools": [],
+        "output_schema": None,
+        "handoffs": [],
+        "tracing": ModelTracing.DISABLED,
+        "previous_response_id": None,
+        "conversation_id": None,
+        "prompt": None,
+    } | kwargs
+
+
+@pytest.fixture
+def inner_model() -> MagicMock:
+    model = MagicMock()
+    model.get_response = AsyncMock(side_effect=lambda *a, **kw: get_response("hi"))
+    return model
+
+
+@pytest.fixture
+def caching_model(inner_model: MagicMock) -> CachingModel:
+    return CachingModel(inner_model, "gpt-4.1", ResponseCache(env=ResponseCacheEnv()))
+
+
+@pytest.mark.asyncio
+async def test_get_response_is_cached(
+    caching_model: CachingModel, inner_model: MagicMock
+):
+    first = await caching_model.get_response(**get_args())
+    second = await caching_model.get_response(**get_args())
+
+    assert inner_model.get_response.await_count == 1
+    assert first.usage.total_tokens == 15
+    assert second.usage.total_tokens == 0
+    assert second.output == first.output
+
+
+@pytest.mark.asyncio
+async def test_different_input_is_not_cached(
+    caching_model: CachingModel, inner_model: MagicMock
+):
+    await caching_model.get_response(**get_args("diabetes"))
+    await caching_model.get_response(**get_args("migraine"))
+
+    assert inner_model.get_response.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_conversation_state_is_passed_through(
+    caching_model: CachingModel, inner_model: MagicMock
+):
+    await caching_model.get_response(**get_args(previous_response_id="resp_0"))
+    await caching_model.get_response(**get_args(previous_response_id="resp_0"))
+
+    assert inner_model.get_response.await_count == 2
+
+
+def test_stream_response_is_passed_through(
+    caching_model: CachingModel, inner_model: MagicMock
+):
+    caching_model.stream_response(**get_args())
+    inner_model.stream_response.assert_called_once()
+
+
+def test_get_cache_key_includes_output_schema():
+    args = get_args()
+    del args["tracing"], args["previous_response_id"]
+    del args["conversation_id"], args["prompt"]
+
+    plain = get_cache_key("gpt-4.1", **args)
+    structured = get_cache_key(
+        "gpt-4.1", **(args | {"output_schema": AgentOutputSchema(Output)})
+    )
+    other_model = get_cache_key("gpt-4.1-mini", **args)
+
+    assert plain == get_cache_key("gpt-4.1", **args)
+    assert len({plain, structured, other_model}) == 3
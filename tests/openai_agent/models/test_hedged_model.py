@@ -0,0 +1,152 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any, cast
+
+import pytest
+from agents import ModelResponse, ModelSettings, ModelTracing, Usage
+
+from openai_agent.models.hedged_model import HedgedModel
+from openai_agent.models.metered_model import MeteredModel
+from openai_agent.services.hedge_policy import HedgePolicy, HedgePolicyEnv
+from openai_agent.services.token_budget import TokenAccountant, TokenBudgetEnv
+
+
+class SlowModel:
+    """Answers the n-th call after the n-th delay, with the number of the call."""
+
+    def __init__(self, *delays: float):
+        self.delays = list(delays)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def _wait(self) -> int:
+        self.calls += 1
+        call = self.calls
+        try:
+            await asyncio.sleep(self.delays[call - 1])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.delays[call - 1] < 0:
+            raise RuntimeError(f"call {call} failed")
+        return call
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        call = await self._wait()
+        return ModelResponse(output=[], usage=Usage(), response_id=str(call))
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        call = await self._wait()
+        for event in range(3):
+            yield (call, event)
+
+
+def get_args() -> dict[str, Any]:
+    return {
+        "system_instructions": None,
+        "input": "diabetes",
+        "model_settings": ModelSettings(),
+        "tools": [],
+        "output_schema": None,
+        "handoffs": [],
+        "tracing": ModelTracing.DISABLED,
+        "previous_response_id": None,
+        "conversation_id": None,
+        "prompt": None,
+    }
+
+
+def get_model(inner: Any, delay_ms: float = 20) -> HedgedModel:
+    policy = HedgePolicy(
+        env=HedgePolicyEnv(llm_hedging_min_samples=1, llm_hedging_burst=1)
+    )
+    for streamed in (False, True):
+        policy.record_first_token("gpt", streamed, delay_ms / 1000, hedge=False)
+    for _ in range(10):
+        policy.start("gpt", False)
+    return HedgedModel(inner, policy, "gpt")  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+    inner = SlowModel(0.001)
+    model = get_model(inner)
+
+    response = await model.get_response(**get_args())
+
+    assert response.response_id == "1"
+    assert inner.calls == 1
+    assert model.policy.get_metrics()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_cancelled():
+    inner = SlowModel(10, 0.001)
+    model = get_model(inner)
+
+    response = await model.get_response(**get_args())
+
+    await asyncio.sleep(0)
+    assert response.response_id == "2"
+    assert (inner.calls, inner.cancelled) == (2, 1)
+    metrics = model.policy.get_metrics()
+    assert (metrics["hedged"], metrics["hedge_wins"]) == (1, 1)
+    # the latency of the call is the one its caller saw, delay included
+    policy = cast(HedgePolicy, model.policy)
+    assert policy._windows["gpt", False].latencies[-1] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_both_calls_are_accounted_inside_the_hedge():
+    accountant = TokenAccountant(TokenBudgetEnv())
+    model = get_model(MeteredModel(SlowModel(10, 0.001), accountant))  # type: ignore
+
+    with accountant.track() as usage:
+        await model.get_response(**get_args())
+        await asyncio.sleep(0)
+
+    # the winner reports empty usage, the cancelled call is estimated
+    assert usage.requests == 1
+    assert usage.input_tokens == len("diabetes") // 4
+
+
+@pytest.mark.asyncio
+async def test_hedges_are_bounded_by_the_budget():
+    inner = SlowModel(0.05, 0.001, 0.05)
+    model = get_model(inner)
+
+    first = await model.get_response(**get_args())
+    second = await model.get_response(**get_args())
+
+    # the budget held a single hedge, the second call waits for itself
+    assert (first.response_id, second.response_id) == ("2", "3")
+    assert model.policy.get_metrics()["over_budget"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_call_waits_for_its_twin():
+    inner = SlowModel(0.03, -0.001)
+    model = get_model(inner)
+
+    assert (await model.get_response(**get_args())).response_id == "1"
+
+    inner = SlowModel(-0.001)
+    with pytest.raises(RuntimeError, match="call 1 failed"):
+        await get_model(inner).get_response(**get_args())
+
+
+@pytest.mark.asyncio
+async def test_stream_continues_with_the_first_to_answer():
+    inner = SlowModel(10, 0.001)
+    model = get_model(inner)
+
+    events = [event async for event in model.stream_response(**get_args())]
+
+    await asyncio.sleep(0.01)
+    assert events == [(2, 0), (2, 1), (2, 2)]
+    assert inner.cancelled == 1
+
+    inner = SlowModel(-0.001)
+    with pytest.raises(RuntimeError, match="call 1 failed"):
+        async for _ in get_model(inner).stream_response(**get_args()):
+            pass
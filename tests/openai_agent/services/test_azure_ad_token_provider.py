@@ -0,0 +1,191 @@
+import asyncio
+import inspect
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from azure.core.credentials import AccessToken
+from pytest_mock import MockerFixture
+
+from openai_agent.services import azure_ad_token_provider
+from openai_agent.services.azure_ad_token_provider import (
+    AzureADTokenProvider,
+    get_azure_ad_token_provider,
+    get_token_fetch_metrics,
+    render_token_fetch_prometheus,
+)
+
+
+def mock_credential(*tokens: AccessToken | Exception) -> MagicMock:
+    credential = MagicMock()
+    credential.get_token.side_effect = list(tokens)
+    return credential
+
+
+@pytest.mark.asyncio
+async def test_token_is_cached():
+    credential = mock_credential(AccessToken("token-1", int(time.time()) + 3600))
+    provider = AzureADTokenProvider(credential)
+
+    assert await provider.get_token() == "token-1"
+    assert provider() == "token-1"
+    assert credential.get_token.call_count == 1
+    assert provider.stats.fetch_count == 1
+    assert provider.stats.avg_fetch_seconds >= 0
+    provider.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_fetched_off_the_event_loop():
+    fetching = threading.Event()
+    release = threading.Event()
+    credential = MagicMock()
+
+    def get_token(scope: str) -> AccessToken:
+        fetching.set()
+        release.wait(timeout=2)
+        count = credential.get_token.call_count
+        lifetime = -1 if count == 1 else 3600
+        return AccessToken(f"token-{count}", int(time.time()) + lifetime)
+
+    credential.get_token.side_effect = get_token
+    provider = AzureADTokenProvider(credential)
+
+    token = provider()
+    assert inspect.isawaitable(token)
+    fetch = asyncio.ensure_future(token)
+    # the loop keeps running while the credential chain runs in a thread
+    while not fetching.is_set():
+        await asyncio.sleep(0.01)
+    assert not fetch.done()
+    release.set()
+    assert await fetch == "token-1"
+
+    # the token has expired
+    token = provider()
+    assert inspect.isawaitable(token)
+    assert await token == "token-2"
+    assert provider() == "token-2"
+    assert credential.get_token.call_count == 2
+    provider.close()
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_before_expiry():
+    refreshed = threading.Event()
+    credential = MagicMock()
+
+    def get_token(scope: str) -> AccessToken:
+        count = credential.get_token.call_count
+        if count == 2:
+            refreshed.set()
+        # only the first token is refreshed right away
+        lifetime = 60 if count == 1 else 3600
+        return AccessToken(f"token-{count}", time.time() + lifetime)  # type: ignore
+
+    credential.get_token.side_effect = get_token
+    provider = AzureADTokenProvider(credential, refresh_margin=59.9, retry_interval=0)
+
+    assert await provider.get_token() == "token-1"
+    assert refreshed.wait(timeout=2)
+    with provider._fetch_lock:
+        # the refresh has stored its token
+        provider.close()
+    assert provider() == "token-2"
+
+
+def test_short_lived_token_is_refreshed_halfway():
+    provider = AzureADTokenProvider(MagicMock(), refresh_margin=300, retry_interval=30)
+    now = time.time()
+
+    assert provider._get_refresh_delay(AccessToken("t", int(now) + 3600)) > 3290
+    # a token living shorter than the margin is not refreshed in a loop
+    assert 159 < provider._get_refresh_delay(AccessToken("t", int(now) + 320)) <= 160
+    assert 149 < provider._get_refresh_delay(AccessToken("t", int(now) + 300)) <= 150
+    assert provider._get_refresh_delay(AccessToken("t", int(now) + 10)) == 30
+    assert provider._get_refresh_delay(AccessToken("t", int(now) - 1)) == 30
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_failure_keeps_current_token():
+    credential = mock_credential(
+        AccessToken("token-1", int(time.time()) + 3600),
+        RuntimeError("credential chain failed"),
+    )
+    provider = AzureADTokenProvider(credential, retry_interval=3600)
+    await provider.get_token()
+
+    provider._background_refresh()
+
+    assert provider() == "token-1"
+    assert provider.stats.failure_count == 1
+    assert provider._timer is not None
+    provider.close()
+
+
+def test_prefetch():
+    fetched = threading.Event()
+    credential = MagicMock()
+
+    def get_token(scope: str) -> AccessToken:
+        fetched.set()
+        return AccessToken("token-1", int(time.time()) + 3600)
+
+    credential.get_token.side_effect = get_token
+    provider = AzureADTokenProvider(credential)
+
+    provider.prefetch()
+    assert fetched.wait(timeout=2)
+    with provider._fetch_lock:
+        # the prefetch has stored its token
+        assert provider() == "token-1"
+    provider.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_failure_is_raised():
+    credential = mock_credential(RuntimeError("no credential"))
+    provider = AzureADTokenProvider(credential)
+
+    with pytest.raises(RuntimeError):
+        await provider.get_token()
+    assert provider.stats.failure_count == 1
+    # a failure doesn't count towards the average of the successful fetches
+    assert provider.stats.total_fetch_seconds == 0.0
+    assert provider.stats.total_failure_seconds > 0.0
+    assert provider.stats.avg_fetch_seconds == 0.0
+
+
+def test_get_azure_ad_token_provider_is_shared(mocker: MockerFixture):
+    mocker.patch.dict(azure_ad_token_provider._providers, clear=True)
+    mock_credential_cls = mocker.patch(
+        "openai_agent.services.azure_ad_token_provider.DefaultAzureCredential",
+        return_value=mock_credential(AccessToken("token", int(time.time()) + 3600)),
+    )
+
+    provider = get_azure_ad_token_provider()
+    assert get_azure_ad_token_provider() is provider
+    assert mock_credential_cls.call_count == 1
+    provider.close()
+
+
+@pytest.mark.asyncio
+async def test_token_fetch_metrics(mocker: MockerFixture):
+    mocker.patch.dict(azure_ad_token_provider._providers, clear=True)
+    assert get_token_fetch_metrics() == {}
+    assert render_token_fetch_prometheus() == ""
+
+    provider = AzureADTokenProvider(
+        mock_credential(AccessToken("token", int(time.time()) + 3600))
+    )
+    azure_ad_token_provider._providers["scope"] = provider
+    await provider.get_token()
+
+    metrics = get_token_fetch_metrics()["scope"]
+    assert (metrics["fetch_count"], metrics["failure_count"]) == (1, 0)
+    assert metrics["avg_fetch_seconds"] == metrics["total_fetch_seconds"]
+    rendered = render_token_fetch_prometheus()
+    assert "# TYPE aad_token_fetches_total counter" in rendered
+    assert 'aad_token_fetches_total{scope="scope"} 1' in rendered
+    provider.close()
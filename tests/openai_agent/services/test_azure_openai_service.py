@@ -1,10 +1,13 @@
 from typing import Callable
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
 from pytest_mock import MockerFixture
 
 from openai_agent.services.azure_openai_service import AzureOpenAIService
+from openai_agent.services.endpoint_pool import BalancedTransport
+from openai_agent.services.rate_limiter import RateLimitedTransport
 
 
 @pytest.fixture
@@ -15,20 +18,29 @@ def fn_mock_service(mocker: MockerFixture) -> Callable[[bool], AzureOpenAIServic
             autospec=True,
         )
 
-        mock_cred = MagicMock()
-        mock_cred.get_token.return_value = MagicMock(
-            token="mock_token",
-            scope="https://example.com/.default",
-        )
         mocker.patch(
-            "openai_agent.services.azure_openai_service.DefaultAzureCredential",
-            return_value=mock_cred,
+            "openai_agent.services.azure_openai_service.get_azure_ad_token_provider",
+            return_value=MagicMock(
+                return_value="mock_token",
+                get_token=AsyncMock(return_value="mock_token"),
+            ),
         )
 
         env = MagicMock()
+        env.azure_openai_endpoint = "https://example.openai.azure.com"
+        env.azure_openai_max_connections = 10
+        env.azure_openai_max_keepalive_connections = 5
+        env.azure_openai_keepalive_expiry = 30.0
+        env.azure_openai_http2 = False
+        env.azure_openai_warm_up_connections = 2
         if not with_api_key:
             env.azure_openai_api_key = None
-        return AzureOpenAIService(env=env)
+        endpoint_pool = MagicMock(
+            size=1, endpoints=[MagicMock(url=httpx.URL(env.azure_openai_endpoint))]
+        )
+        return AzureOpenAIService(
+            env=env, rate_limiter=MagicMock(), endpoint_pool=endpoint_pool
+        )
 
     return wrapper
 
@@ -47,6 +59,32 @@ def test_get_client_without_api_key(
     assert mock_service.get_client() is not None
 
 
+def test_get_client_is_shared(
+    fn_mock_service: Callable[[bool], AzureOpenAIService],
+):
+    mock_service = fn_mock_service(with_api_key=True)  # type: ignore
+    assert mock_service.get_client() is mock_service.get_client()
+
+
+def test_get_http_client(
+    fn_mock_service: Callable[[bool], AzureOpenAIService],
+):
+    mock_service = fn_mock_service(with_api_key=True)  # type: ignore
+    http_client = mock_service.get_http_client()
+
+    assert isinstance(http_client, httpx.AsyncClient)
+    assert isinstance(http_client._transport, RateLimitedTransport)
+    pool = http_client._transport._transport._pool  # type: ignore
+    assert pool._max_connections == 10
+    assert pool._max_keepalive_connections == 5
+
+    mock_service.endpoint_pool = MagicMock(size=2)
+    http_client = mock_service.get_http_client()
+    # each endpoint is limited on its own, inside the balanced transport
+    assert isinstance(http_client._transport, BalancedTransport)
+    assert http_client._transport._limiter is mock_service.rate_limiter
+
+
 def test_get_deployed_model(
     fn_mock_service: Callable[[bool], AzureOpenAIService],
 ):
@@ -55,3 +93,78 @@ def test_get_deployed_model(
 
     model_name = mock_service.get_deployed_model_name()
     assert model_name == "test-model"
+
+
+@pytest.mark.asyncio
+async def test_warm_up(
+    fn_mock_service: Callable[[bool], AzureOpenAIService], mocker: MockerFixture
+):
+    mock_service = fn_mock_service(with_api_key=True)  # type: ignore
+    mock_service.endpoint_pool.endpoints.append(  # type: ignore
+        MagicMock(url=httpx.URL("https://west.example.com"))
+    )
+    mock_send = mocker.patch.object(
+        httpx.AsyncHTTPTransport,
+        "handle_async_request",
+        new_callable=AsyncMock,
+        side_effect=[httpx.Response(404)] * 3 + [httpx.ConnectError("boom")],
+    )
+
+    await mock_service.warm_up()
+
+    # two connections to each endpoint, past the rate limiter
+    hosts = sorted(call.args[0].url.host for call in mock_send.await_args_list)
+    assert hosts == ["example.openai.azure.com"] * 2 + ["west.example.com"] * 2
+    assert mock_send.await_args_list[0].args[0].method == "HEAD"
+    mock_service.rate_limiter.acquire.assert_not_called()  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_warm_up_disabled(
+    fn_mock_service: Callable[[bool], AzureOpenAIService], mocker: MockerFixture
+):
+    mock_service = fn_mock_service(with_api_key=True)  # type: ignore
+    mock_send = mocker.patch.object(
+        httpx.AsyncHTTPTransport, "handle_async_request", new_callable=AsyncMock
+    )
+
+    await mock_service.warm_up(connections=0)
+    mock_send.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fetches_the_token(
+    fn_mock_service: Callable[[bool], AzureOpenAIService], mocker: MockerFixture
+):
+    mock_service = fn_mock_service(with_api_key=False)  # type: ignore
+    provider = mock_service.get_openai_auth_key()["azure_ad_token_provider"]
+
+    await mock_service.warm_up(connections=0)
+    provider.get_token.assert_awaited_once()  # type: ignore
+
+    # a failed fetch is raised by the first request instead
+    provider.get_token.side_effect = RuntimeError("no credential")  # type: ignore
+    await mock_service.warm_up(connections=0)
+
+
+def test_http2_requires_h2(
+    fn_mock_service: Callable[[bool], AzureOpenAIService], mocker: MockerFixture
+):
+    mock_service = fn_mock_service(with_api_key=True)  # type: ignore
+    mock_service.env.azure_openai_http2 = True
+    mocker.patch("importlib.util.find_spec", return_value=None)
+
+    with pytest.raises(ValueError, match="requires the h2 package"):
+        mock_service.get_http_client()
+
+
+@pytest.mark.asyncio
+async def test_close(
+    fn_mock_service: Callable[[bool], AzureOpenAIService],
+):
+    mock_service = fn_mock_service(with_api_key=True)  # type: ignore
+    client = mock_service.get_client()
+
+    await mock_service.close()
+    client.close.assert_awaited_once()  # type: ignore
+    assert mock_service._client is None
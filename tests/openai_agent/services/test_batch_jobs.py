@@ -0,0 +1,237 @@
+import asyncio
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from agents import Agent, ModelSettings
+from pydantic import BaseModel
+
+from openai_agent.services.batch_jobs import (
+    AzureBatchJobBackend,
+    BatchJob,
+    BatchJobEnv,
+    LocalBatchJobBackend,
+    ResultIndex,
+    build_agent_request,
+    parse_agent_output,
+    read_results,
+    wait_for_job,
+    write_requests,
+)
+from openai_agent.services.batch_runner import Record
+
+
+class Department(BaseModel):
+    name: str
+
+
+department_agent = Agent(
+    name="department_agent",
+    instructions="Pick a department.",
+    output_type=Department,
+    model_settings=ModelSettings(temperature=0.0),
+)
+
+text_agent = Agent(name="text_agent", instructions="Translate.")
+
+
+async def echo(body: Record) -> Record:
+    content = body["messages"][-1]["content"]
+    if content == "fail":
+        raise RuntimeError("boom")
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def write_inputs(path: Path, inputs: list[str]) -> Path:
+    write_requests(
+        path,
+        (
+            build_agent_request(text_agent, str(i), input, "gpt-4.1")
+            for i, input in enumerate(inputs)
+        ),
+    )
+    return path
+
+
+def test_build_agent_request():
+    request = build_agent_request(department_agent, "7", "chest pain", "gpt-4.1")
+
+    assert request["custom_id"] == "7"
+    assert request["url"] == "/chat/completions"
+    body = request["body"]
+    assert body["messages"][0] == {"role": "system", "content": "Pick a department."}
+    assert body["temperature"] == 0.0
+    assert body["response_format"]["type"] == "json_schema"
+    assert body["response_format"]["json_schema"]["schema"]["required"] == ["name"]
+
+    assert "response_format" not in build_agent_request(text_agent, "1", "hi", "m")
+    with pytest.raises(ValueError):
+        build_agent_request(Agent(name="x"), "1", "hi", "m")
+
+
+def test_parse_agent_output():
+    assert parse_agent_output(department_agent, '{"name": "Cardiology"}') == (
+        Department(name="Cardiology")
+    )
+    assert parse_agent_output(text_agent, "hola") == "hola"
+
+
+def test_read_results(tmp_path: Path):
+    path = tmp_path / "results.jsonl"
+    lines = [
+        {
+            "custom_id": "a",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": "ok"}}]},
+            },
+        },
+        {
+            "custom_id": "b",
+            "response": {"status_code": 400, "body": {"error": {"message": "bad"}}},
+        },
+        {"custom_id": "c", "response": None, "error": {"message": "expired"}},
+        {"custom_id": "d", "response": {"status_code": 500, "body": {}}},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n\n")
+
+    assert list(read_results(path)) == [
+        ("a", "ok", None),
+        ("b", None, "bad"),
+        ("c", None, "expired"),
+        ("d", None, "status 500"),
+    ]
+    assert list(read_results(tmp_path / "missing.jsonl")) == []
+
+
+def test_result_index(tmp_path: Path):
+    index = ResultIndex(tmp_path / "index.db")
+    assert not index.has_stage("symptoms")
+
+    index.add("symptoms", [("1", "fever", None)], [("2", None, "boom")])
+
+    assert index.has_stage("symptoms")
+    assert index.get("symptoms", "1") == ("fever", None)
+    assert index.get("symptoms", "2") == (None, "boom")
+    assert index.get("symptoms", "3") is None
+
+    def interrupted() -> Iterator[tuple[str, str | None, str | None]]:
+        yield "1", "fever", None
+        raise KeyboardInterrupt
+
+    # a stage interrupted while its results are added has none of them
+    with pytest.raises(KeyboardInterrupt):
+        index.add("translation", [("1", "fiebre", None)], interrupted())
+    assert not index.has_stage("translation")
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_local_backend(tmp_path: Path):
+    backend = LocalBatchJobBackend(tmp_path / "jobs", echo, concurrency=2)
+    requests_path = write_inputs(tmp_path / "in.jsonl", ["flu", "fail", "gout"])
+
+    job = await backend.submit(requests_path)
+    polls: list[str] = []
+    job = await wait_for_job(
+        backend, job.id, 0.01, lambda job: polls.append(job.status)
+    )
+
+    assert job.status == "completed"
+    assert (job.total, job.completed, job.failed) == (3, 2, 1)
+    assert polls[-1] == "completed"
+
+    await backend.download(job, tmp_path / "out.jsonl", tmp_path / "err.jsonl")
+    assert sorted(read_results(tmp_path / "out.jsonl")) == [
+        ("0", "flu", None),
+        ("2", "gout", None),
+    ]
+    assert list(read_results(tmp_path / "err.jsonl")) == [("1", None, "boom")]
+
+
+@pytest.mark.asyncio
+async def test_local_backend_resumes_interrupted_job(tmp_path: Path):
+    complete = AsyncMock(side_effect=echo)
+    backend = LocalBatchJobBackend(tmp_path / "jobs", complete)
+    job = BatchJob(id="batch_1", status="in_progress", total=2, completed=1)
+    job_dir = tmp_path / "jobs" / job.id
+    job_dir.mkdir(parents=True)
+    write_inputs(job_dir / "input.jsonl", ["flu", "gout"])
+    (job_dir / "job.json").write_text(json.dumps(job.__dict__))
+    answered = {"custom_id": "0", "response": {"status_code": 200, "body": {}}}
+    (job_dir / "output.jsonl").write_text(json.dumps(answered) + '\n{"custom_id"')
+
+    job = await wait_for_job(backend, job.id, 0.01)
+
+    assert (job.completed, job.failed) == (2, 0)
+    complete.assert_awaited_once()
+    assert complete.await_args_list[0].args[0]["messages"][-1]["content"] == "gout"
+
+
+@pytest.mark.asyncio
+async def test_local_backend_fails_malformed_input(tmp_path: Path):
+    complete = AsyncMock(side_effect=echo)
+    backend = LocalBatchJobBackend(tmp_path / "jobs", complete, concurrency=2)
+    requests_path = write_inputs(tmp_path / "in.jsonl", ["flu", "gout"])
+    with requests_path.open("a") as file:
+        file.write('{"custom_id": "2", "body":\n')
+
+    job = await backend.submit(requests_path)
+    job = await wait_for_job(backend, job.id, 0.01)
+
+    assert job.status == "failed"
+    assert job.error is not None and job.error.startswith("JSONDecodeError")
+    assert backend._tasks == {}
+    # a failed job is not processed again
+    assert await backend.get_job(job.id) == job
+    assert backend._tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_local_backend_fails_on_worker_errors(tmp_path: Path):
+    backend = LocalBatchJobBackend(tmp_path / "jobs", echo, concurrency=2)
+    requests_path = write_inputs(tmp_path / "in.jsonl", ["flu"] * 10)
+    backend._send = AsyncMock(side_effect=OSError("disk full"))  # type: ignore
+
+    job = await backend.submit(requests_path)
+    job = await asyncio.wait_for(wait_for_job(backend, job.id, 0.01), timeout=2)
+
+    assert (job.status, job.error) == ("failed", "OSError: disk full")
+
+
+@pytest.mark.asyncio
+async def test_azure_backend(tmp_path: Path):
+    batch = SimpleNamespace(
+        id="batch_1",
+        status="completed",
+        request_counts=SimpleNamespace(total=2, completed=2, failed=0),
+        output_file_id="file_out",
+        error_file_id=None,
+        errors=None,
+    )
+    client = MagicMock()
+    client.files.create = AsyncMock(return_value=SimpleNamespace(id="file_in"))
+    client.batches.create = AsyncMock(return_value=batch)
+    client.batches.retrieve = AsyncMock(return_value=batch)
+
+    async def iter_bytes():
+        yield b'{"custom_id": "0"}\n'
+
+    streaming = client.files.with_streaming_response.content.return_value
+    streaming.__aenter__.return_value.iter_bytes = iter_bytes
+    service = MagicMock()
+    service.get_client.return_value = client
+    backend = AzureBatchJobBackend(env=BatchJobEnv(), azure_openai_service=service)
+
+    job = await backend.submit(write_inputs(tmp_path / "in.jsonl", ["flu"]))
+    assert job == await backend.get_job("batch_1")
+    assert job.done and job.total == 2 and job.output_file_id == "file_out"
+    assert client.files.create.await_args_list[0].kwargs["purpose"] == "batch"
+    assert client.batches.create.await_args_list[0].kwargs["input_file_id"] == "file_in"
+
+    await backend.download(job, tmp_path / "out.jsonl", tmp_path / "err.jsonl")
+    assert (tmp_path / "out.jsonl").read_text() == '{"custom_id": "0"}\n'
+    assert (tmp_path / "err.jsonl").read_text() == ""
@@ -0,0 +1,173 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from agents import Usage
+from pydantic import BaseModel
+
+from openai_agent.services.batch_runner import (
+    BatchRunner,
+    BatchStats,
+    Record,
+    load_checkpoint,
+    read_records,
+)
+
+
+class Output(BaseModel):
+    upper: str
+
+
+async def to_upper(record: Record) -> tuple[Output, Usage]:
+    if record["condition"] == "fail":
+        raise ValueError("failed")
+    await asyncio.sleep(0)
+    return Output(upper=record["condition"].upper()), Usage(
+        input_tokens=3, output_tokens=2
+    )
+
+
+def read_rows(path: Path) -> list[Record]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def get_runner(tmp_path: Path) -> BatchRunner:
+    return BatchRunner(
+        output_path=tmp_path / "out.jsonl",
+        errors_path=tmp_path / "out.errors.jsonl",
+        concurrency=2,
+    )
+
+
+def test_read_records(tmp_path: Path):
+    jsonl = tmp_path / "in.jsonl"
+    jsonl.write_text('{"condition": "flu"}\n\n{"id": "x", "condition": "gout"}\n')
+    csv = tmp_path / "in.csv"
+    csv.write_text("id,condition\na,flu\nb,gout\n")
+
+    assert list(read_records(jsonl)) == [
+        ("0", {"condition": "flu"}),
+        ("x", {"id": "x", "condition": "gout"}),
+    ]
+    assert [record_id for record_id, _ in read_records(csv)] == ["a", "b"]
+
+
+def test_load_checkpoint_drops_partial_line(tmp_path: Path):
+    path = tmp_path / "out.jsonl"
+    assert load_checkpoint(path) == set()
+
+    path.write_text('{"id": "a"}\n{"id": "b"}\n{"id": "c", "out')
+    assert load_checkpoint(path) == {"a", "b"}
+    assert path.read_text() == '{"id": "a"}\n{"id": "b"}\n'
+
+
+@pytest.mark.asyncio
+async def test_run(tmp_path: Path):
+    runner = get_runner(tmp_path)
+    records = [
+        (str(i), {"condition": c}) for i, c in enumerate(["flu", "fail", "gout"])
+    ]
+
+    await runner.run(iter(records), to_upper)
+
+    rows = sorted(read_rows(runner.output_path), key=lambda row: row["id"])
+    assert rows == [
+        {"id": "0", "input": {"condition": "flu"}, "output": {"upper": "FLU"}},
+        {"id": "2", "input": {"condition": "gout"}, "output": {"upper": "GOUT"}},
+    ]
+    assert read_rows(runner.errors_path)[0]["id"] == "1"
+    assert runner.stats.completed == 2 and runner.stats.failed == 1
+    assert runner.stats.input_tokens == 6 and runner.stats.output_tokens == 4
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_finished_records(tmp_path: Path):
+    records = [(str(i), {"condition": c}) for i, c in enumerate(["flu", "gout"])]
+    await get_runner(tmp_path).run(iter(records[:1]), to_upper)
+
+    runner = get_runner(tmp_path)
+    await runner.run(iter(records), to_upper)
+
+    assert [row["id"] for row in read_rows(runner.output_path)] == ["0", "1"]
+    assert runner.stats.skipped == 1 and runner.stats.completed == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_list_the_last_run_only(tmp_path: Path):
+    runner = get_runner(tmp_path)
+    runner.errors_path.write_text('{"id": "0", "error": "boom"}\n{"id": "1", "err')
+
+    await runner.run(iter([("0", {"condition": "flu"})]), to_upper)
+    assert runner.errors_path.read_text() == ""
+
+    await runner.run(iter([("1", {"condition": "fail"})]), to_upper)
+    assert [row["id"] for row in read_rows(runner.errors_path)] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(tmp_path: Path):
+    runner = get_runner(tmp_path)
+    running = peak = 0
+
+    async def task(record: Record) -> tuple[str, Usage]:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return "ok", Usage()
+
+    await runner.run(((str(i), {}) for i in range(10)), task)
+    assert peak == 2
+    assert runner.stats.completed == 10
+
+
+@pytest.mark.asyncio
+async def test_progress(tmp_path: Path):
+    progress: list[int] = []
+    runner = get_runner(tmp_path)
+    runner.progress_every = 2
+    runner.on_progress = lambda stats: progress.append(stats.completed)
+
+    await runner.run(((str(i), {"condition": "a"}) for i in range(4)), to_upper)
+    assert progress == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_ids_run_once(tmp_path: Path):
+    runner = get_runner(tmp_path)
+    records = [("a", {"condition": "flu"}), ("a", {"condition": "gout"})]
+
+    await runner.run(iter(records), to_upper)
+
+    assert [row["output"] for row in read_rows(runner.output_path)] == [
+        {"upper": "FLU"}
+    ]
+    assert runner.stats.completed == 1 and runner.stats.duplicates == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_error_stops_the_batch(tmp_path: Path):
+    runner = get_runner(tmp_path)
+    runner.progress_every = 1
+
+    def on_progress(stats: BatchStats) -> None:
+        raise OSError("disk full")
+
+    runner.on_progress = on_progress
+    records = ((str(i), {"condition": "a"}) for i in range(100))
+
+    with pytest.raises(OSError, match="disk full"):
+        await asyncio.wait_for(runner.run(records, to_upper), timeout=5)
+
+
+def test_stats():
+    assert BatchStats().rows_per_second == 0.0
+    assert BatchStats().tokens_per_second == 0.0
+
+    stats = BatchStats(
+        completed=4, input_tokens=30, output_tokens=10, elapsed_seconds=2
+    )
+    assert stats.rows_per_second == 2.0
+    assert stats.tokens_per_second == 20.0
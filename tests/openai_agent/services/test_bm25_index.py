@@ -0,0 +1,26 @@
+from openai_agent.services.bm25_index import BM25Index, tokenize
+
+
+def test_tokenize():
+    assert tokenize("My knees and the Heart beats!") == ["knee", "heart", "beat"]
+    assert tokenize("stress is a loss") == ["stress", "loss"]
+
+
+def test_search_ranks_matching_documents():
+    index = BM25Index(
+        {
+            "cardiology": "heart chest pain palpitations blood pressure",
+            "orthopedics": "bone fracture joint knee pain",
+            "neurology": "headache migraine seizure",
+        }
+    )
+
+    results = index.search("sharp chest pain")
+    assert [doc_id for doc_id, _ in results] == ["cardiology", "orthopedics"]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("unrelated words") == []
+    assert len(index.search("pain", top_k=1)) == 1
+
+
+def test_empty_index():
+    assert BM25Index({}).search("pain") == []
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import random
+from collections import Counter
+
+import httpx
+import pytest
+
+from openai_agent.services.endpoint_pool import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BalancedTransport,
+    CircuitBreaker,
+    EndpointConfig,
+    EndpointPool,
+    EndpointPoolEnv,
+    parse_endpoints,
+)
+from openai_agent.services.rate_limiter import RateLimiter, RateLimiterEnv
+
+CHAT_URL = "https://primary.example.com/openai/deployments/gpt/chat/completions"
+
+
+def get_pool(*endpoints: dict[str, object], failures: int = 2) -> EndpointPool:
+    pool = EndpointPool(
+        EndpointPoolEnv(
+            azure_openai_endpoint="https://primary.example.com",
+            azure_openai_deployed_model_name="gpt",
+            azure_openai_endpoints=json.dumps(endpoints),
+            azure_openai_circuit_failures=failures,
+        )
+    )
+    pool._rng = random.Random(0)
+    return pool
+
+
+def get_client(pool: EndpointPool, handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=BalancedTransport(httpx.MockTransport(handler), pool)
+    )
+
+
+def test_parse_endpoints():
+    assert parse_endpoints(
+        '[{"endpoint": "https://east", "weight": 2}, '
+        '{"endpoint": "https://west", "deployment": "gpt-west", "api_key": "k"}]',
+        "gpt",
+    ) == [
+        EndpointConfig("https://east", "gpt", 2),
+        EndpointConfig("https://west", "gpt-west", 1, "k"),
+    ]
+    for value in (
+        "[]",
+        '{"endpoint": "x"}',
+        '[{"url": "x"}]',
+        '[{"endpoint": "x", "weight": 0}]',
+    ):
+        with pytest.raises(ValueError):
+            parse_endpoints(value, "gpt")
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=10)
+
+    breaker.on_failure(now=0)
+    assert breaker.get_state(1) == CLOSED
+    breaker.on_failure(now=1)
+    assert breaker.get_state(5) == OPEN
+    # a single request probes the endpoint
+    assert breaker.get_state(11) == HALF_OPEN
+    assert breaker.acquire(11)
+    assert breaker.get_state(11) == OPEN
+    # requests that started before the circuit opened leave the probe alone
+    breaker.release(probe=False)
+    assert breaker.get_state(11) == OPEN
+    breaker.on_failure(now=12)
+    assert breaker.get_state(21) == OPEN
+    breaker.acquire(22)
+    breaker.on_success()
+    assert breaker.get_state(22) == CLOSED
+
+    # a 429 opens the circuit for its retry-after
+    breaker.on_failure(now=30, open_seconds=3)
+    assert (breaker.get_state(32), breaker.get_state(33)) == (OPEN, HALF_OPEN)
+
+
+@pytest.mark.asyncio
+async def test_requests_go_to_the_deployment_of_the_endpoint():
+    pool = get_pool(
+        {"endpoint": "https://east.example.com", "api_key": "east-key"},
+        {"endpoint": "https://west.example.com:8443", "deployment": "gpt-west"},
+    )
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    async with get_client(pool, handler) as client:
+        for _ in range(10):
+            response = await client.post(
+                CHAT_URL, params={"api-version": "v"}, json={}, headers={"api-key": "k"}
+            )
+            assert response.json() == {"ok": True}
+        # batch files and jobs only exist on the client's endpoint
+        await client.get(
+            "https://primary.example.com/openai/files", headers={"api-key": "k"}
+        )
+
+    urls = {(str(r.url), r.headers["api-key"], r.headers["host"]) for r in requests}
+    assert urls == {
+        (
+            "https://east.example.com/openai/deployments/gpt/chat/completions"
+            "?api-version=v",
+            "east-key",
+            "east.example.com",
+        ),
+        (
+            "https://west.example.com:8443/openai/deployments/gpt-west/chat/completions"
+            "?api-version=v",
+            "k",
+            "west.example.com:8443",
+        ),
+        ("https://primary.example.com/openai/files", "k", "primary.example.com"),
+    }
+    assert pool.get_metrics()["east.example.com/gpt.outstanding"] == 0
+    # the deployments of other model tiers keep their name
+    assert pool.endpoints[1].get_deployment("gpt-mini") == "gpt-mini"
+
+
+@pytest.mark.asyncio
+async def test_slow_endpoint_gets_fewer_requests():
+    pool = get_pool(
+        {"endpoint": "https://slow.example.com"},
+        {"endpoint": "https://fast.example.com"},
+    )
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "slow.example.com":
+            await asyncio.sleep(0.02)
+        return httpx.Response(200)
+
+    async with get_client(pool, handler) as client:
+        hosts = Counter(
+            [(await client.post(CHAT_URL, json={})).request.url.host for _ in range(40)]
+        )
+
+    metrics = pool.get_metrics()
+    assert metrics["slow.example.com/gpt.requests"] < 15
+    assert metrics["fast.example.com/gpt.requests"] > 25
+    assert hosts == {"primary.example.com": 40}
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_fails_over_and_opens_its_circuit():
+    pool = get_pool(
+        {"endpoint": "https://down.example.com", "weight": 1000},
+        {"endpoint": "https://up.example.com", "weight": 0.001},
+    )
+    calls: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls[request.url.host] += 1
+        if request.url.host == "down.example.com":
+            if calls["down.example.com"] == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(503)
+        return httpx.Response(200)
+
+    async with get_client(pool, handler) as client:
+        for _ in range(4):
+            assert (await client.post(CHAT_URL, json={})).status_code == 200
+
+    assert calls == {"down.example.com": 2, "up.example.com": 4}
+    metrics = pool.get_metrics()
+    assert metrics["failovers"] == 2
+    assert metrics["down.example.com/gpt.failures"] == 2
+    assert metrics["down.example.com/gpt.circuit"] == OPEN
+
+
+@pytest.mark.asyncio
+async def test_stream_across_the_open_circuit_keeps_a_single_probe():
+    pool = get_pool({"endpoint": "https://east.example.com"}, failures=1)
+    pool.endpoints[0].breaker.open_seconds = 0.05
+    probing = asyncio.Event()
+    answer = asyncio.Event()
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            return httpx.Response(503)
+        if calls == 3:
+            probing.set()
+            await answer.wait()
+        return httpx.Response(200, content=b"data: done\n\n")
+
+    async with get_client(pool, handler) as client:
+        async with client.stream("POST", CHAT_URL, json={}) as stream:
+            assert (await client.post(CHAT_URL, json={})).status_code == 503
+            await asyncio.sleep(0.06)
+            assert pool.get_metrics()["east.example.com/gpt.circuit"] == HALF_OPEN
+
+            probe = asyncio.create_task(client.post(CHAT_URL, json={}))
+            await probing.wait()
+            await stream.aread()
+
+        # the stream that started before the circuit opened has ended
+        assert pool.get_metrics()["east.example.com/gpt.circuit"] == OPEN
+        assert pool.choose() is None
+
+        answer.set()
+        assert (await probe).status_code == 200
+
+    metrics = pool.get_metrics()
+    assert metrics["east.example.com/gpt.circuit"] == CLOSED
+    assert metrics["east.example.com/gpt.outstanding"] == 0
+
+
+@pytest.mark.asyncio
+async def test_last_failure_is_returned_when_every_endpoint_failed():
+    pool = get_pool(
+        {"endpoint": "https://east.example.com"},
+        {"endpoint": "https://west.example.com"},
+        failures=1,
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"retry-after": "60"})
+
+    async with get_client(pool, handler) as client:
+        assert (await client.post(CHAT_URL, json={})).status_code == 429
+        with pytest.raises(httpx.ConnectError):
+            await client.post(CHAT_URL, json={})
+
+    metrics = pool.get_metrics()
+    assert (metrics["failovers"], metrics["unavailable"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_endpoints_are_rate_limited_on_their_own():
+    pool = get_pool(
+        {"endpoint": "https://east.example.com"},
+        {"endpoint": "https://west.example.com"},
+        failures=5,
+    )
+    limiter = RateLimiter(RateLimiterEnv(azure_openai_max_concurrency=8))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "east.example.com":
+            return httpx.Response(429, headers={"retry-after-ms": "1"})
+        return httpx.Response(200)
+
+    transport = BalancedTransport(httpx.MockTransport(handler), pool, limiter)
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(4):
+            assert (await client.post(CHAT_URL, json={})).status_code == 200
+
+    metrics = limiter.get_metrics()
+    assert metrics["east.example.com/gpt.throttled"] > 0
+    assert metrics["west.example.com/gpt.throttled"] == 0
+    assert metrics["west.example.com/gpt.concurrency_limit"] == 8.0
+    assert metrics["west.example.com/gpt.in_flight"] == 0
+    assert metrics["throttled"] == 0
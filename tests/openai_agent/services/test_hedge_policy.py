@@ -0,0 +1,61 @@
+from openai_agent.services.hedge_policy import HedgePolicy, HedgePolicyEnv
+
+
+def get_policy(**kwargs: object) -> HedgePolicy:
+    return HedgePolicy(env=HedgePolicyEnv(**kwargs))  # type: ignore
+
+
+def test_delay_is_the_quantile_of_recent_calls():
+    policy = get_policy(llm_hedging_min_samples=10, llm_hedging_window=100)
+
+    for ms in range(1, 10):
+        assert policy.start("gpt", False) is None
+        policy.record_first_token("gpt", False, ms / 1000, hedge=False)
+    policy.record_first_token("gpt", False, 0.010, hedge=False)
+    assert policy.start("gpt", False) == 0.009
+
+    for ms in range(100, 200):
+        policy.record_first_token("gpt", False, ms / 1000, hedge=False)
+    # only the last 100 calls count
+    assert policy.start("gpt", False) == 0.194
+
+
+def test_budget_bounds_the_hedges():
+    policy = get_policy(llm_hedging_budget=0.25, llm_hedging_burst=2)
+
+    for _ in range(20):
+        policy.start("gpt", False)
+    hedges = [policy.try_hedge() for _ in range(3)]
+    for _ in range(4):
+        policy.start("gpt", False)
+    hedges.append(policy.try_hedge())
+    policy.record_first_token("gpt", False, 0.1, hedge=True)
+
+    # the burst was saved up, then a call per 4 calls
+    assert hedges == [True, True, False, True]
+    assert policy.get_metrics() == {
+        "calls": 24,
+        "hedged": 3,
+        "hedge_wins": 1,
+        "over_budget": 1,
+        "hedge_rate": 0.125,
+        "win_rate": 1 / 3,
+        "delay_ms": {},
+    }
+
+
+def test_delays_are_kept_per_deployment_and_kind():
+    policy = get_policy(llm_hedging_min_samples=1)
+
+    policy.record_first_token("gpt", False, 2.0, hedge=False)
+    policy.record_first_token("gpt", True, 0.2, hedge=False)
+    policy.record_first_token("gpt-mini", False, 0.5, hedge=False)
+
+    assert policy.start("gpt", False) == 2.0
+    assert policy.start("gpt", True) == 0.2
+    assert policy.start("gpt-mini", False) == 0.5
+    assert policy.start("gpt-mini", True) is None
+    assert policy.get_metrics()["delay_ms"] == {
+        "gpt": {"response": 2000.0, "stream": 200.0},
+        "gpt-mini": {"response": 500.0},
+    }
@@ -0,0 +1,172 @@
+import asyncio
+import contextvars
+
+import pytest
+from agents import TResponseInputItem
+
+from openai_agent.services.history_manager import (
+    PRUNED_OUTPUT,
+    SUMMARY_PREFIX,
+    HistoryEnv,
+    HistoryManager,
+    estimate_item_tokens,
+    estimate_tokens,
+)
+
+
+def get_manager(**kwargs: object) -> HistoryManager:
+    return HistoryManager(env=HistoryEnv(**kwargs))  # type: ignore
+
+
+def get_turn(i: int, output_chars: int = 0) -> list[TResponseInputItem]:
+    return [
+        {"role": "user", "content": f"message {i} " + "x" * 200},
+        {
+            "type": "function_call",
+            "call_id": f"call_{i}",
+            "name": "get_specialist",
+            "arguments": "{}",
+        },
+        {
+            "type": "function_call_output",
+            "call_id": f"call_{i}",
+            "output": "y" * output_chars,
+        },
+        {"role": "assistant", "content": f"reply {i}"},
+    ]
+
+
+def get_summary(text: str) -> TResponseInputItem:
+    return {"role": "assistant", "content": SUMMARY_PREFIX + text}
+
+
+def get_history(turns: int, output_chars: int = 0) -> list[TResponseInputItem]:
+    return [item for i in range(turns) for item in get_turn(i, output_chars)]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens([{"role": "user", "content": "x" * 400}]) == 105
+    assert estimate_tokens(get_turn(0)) == estimate_tokens(get_turn(1)) == 87
+
+
+def test_window_drops_the_oldest_turns():
+    manager = get_manager(history_max_tokens=270, history_strategies="window")
+    history = get_history(5)
+
+    compacted = manager.compact("s", history)
+
+    assert compacted.items == history[-12:]
+    assert (compacted.tokens, compacted.saved_tokens) == (261, 174)
+    # the latest turn is kept even when it doesn't fit
+    assert manager.compact("s", get_turn(0, 2000)).items == get_turn(0, 2000)
+    metrics = manager.get_metrics()
+    assert (metrics["dropped"], metrics["tokens_saved"]) == (2, 174)
+
+
+def test_prune_replaces_old_tool_outputs():
+    manager = get_manager(
+        history_max_tokens=600, history_strategies="prune", history_keep_turns=1
+    )
+    history = get_history(3, output_chars=1200)
+
+    compacted = manager.compact("s", history)
+
+    outputs = [item["output"] for item in compacted.items if "output" in item]
+    assert outputs == [PRUNED_OUTPUT, PRUNED_OUTPUT, "y" * 1200]
+    assert compacted.items[0] is history[0]
+    assert compacted.tokens == estimate_tokens(compacted.items) < 600
+    assert history == get_history(3, output_chars=1200)
+    # nothing is pruned when the history fits
+    assert manager.compact("s", history[:4]).saved_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_summary_replaces_the_older_turns_off_the_critical_path():
+    manager = get_manager(history_summary_tokens=300, history_keep_turns=2)
+    release = asyncio.Event()
+    summarized: list[list[TResponseInputItem]] = []
+
+    async def summarize(items: list[TResponseInputItem]) -> str:
+        summarized.append(items)
+        await release.wait()
+        return f"summary {len(summarized)}"
+
+    history = get_history(5)
+    # the turn doesn't wait for the summary
+    assert manager.compact("s", history, summarize).items == history
+    assert manager.get_metrics()["summarizing"] == 1
+    release.set()
+    await asyncio.sleep(0.01)
+    assert summarized == [history[:12]]
+
+    history += get_turn(5)
+    compacted = manager.compact("s", history, summarize)
+    summary = get_summary("summary 1")
+    assert compacted.items == [summary, *history[12:]]
+    assert compacted.saved_tokens == (
+        estimate_tokens(history[:12]) - estimate_item_tokens(summary)
+    )
+
+    # the next summary rolls the previous one and the turns since into one
+    history += get_turn(6) + get_turn(7)
+    manager.compact("s", history, summarize)
+    await asyncio.sleep(0.01)
+    assert summarized[1] == [summary, *history[12:24]]
+    assert manager.compact("s", history, summarize).items == [
+        get_summary("summary 2"),
+        *history[24:],
+    ]
+    assert manager.get_metrics()["summaries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_summary_follows_turns_dropped_by_the_store():
+    manager = get_manager(history_summary_tokens=300, history_keep_turns=2)
+    calls = 0
+
+    async def summarize(items: list[TResponseInputItem]) -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("model unavailable")
+        return "summary"
+
+    history = get_history(5)
+    manager.compact("s", history, summarize)
+    await asyncio.sleep(0.01)
+    manager.compact("s", history, summarize)
+    await asyncio.sleep(0.01)
+    assert manager.get_metrics()["summary_failures"] == 1
+
+    # the store keeps the last 4 turns only
+    compacted = manager.compact("s", history[4:] + get_turn(5))
+    assert compacted.items == [
+        get_summary("summary"),
+        *history[12:],
+        *get_turn(5),
+    ]
+
+    manager.forget("s")
+    assert manager.compact("s", history).items == history
+
+
+@pytest.mark.asyncio
+async def test_summary_runs_outside_the_context_of_the_turn():
+    manager = get_manager(history_summary_tokens=300)
+    turn: contextvars.ContextVar[str] = contextvars.ContextVar("turn", default="")
+    seen: list[str] = []
+
+    async def summarize(items: list[TResponseInputItem]) -> str:
+        seen.append(turn.get())
+        return "summary"
+
+    turn.set("turn 1")
+    manager.compact("s", get_history(5), summarize)
+    await asyncio.sleep(0.01)
+
+    assert seen == [""]
+
+
+def test_invalid_strategies_are_rejected():
+    with pytest.raises(ValueError):
+        get_manager(history_strategies="summary,truncate")
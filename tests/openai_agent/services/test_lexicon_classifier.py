@@ -0,0 +1,40 @@
+import pytest
+
+from openai_agent.services.lexicon_classifier import LexiconClassifier
+
+
+@pytest.fixture
+def classifier() -> LexiconClassifier:
+    return LexiconClassifier(
+        weights={r"buy|order": 1.0, r"pills?": 1.0, r"side effects?": -1.0},
+        block_threshold=2.0,
+        allow_threshold=0.0,
+    )
+
+
+@pytest.mark.parametrize(
+    "text, decision, score",
+    [
+        ("I want to BUY pills", "block", 2.0),
+        ("What are your opening hours?", "allow", 0.0),
+        ("Can I order a wheelchair?", "uncertain", 1.0),
+        ("What are the side effects of these pills?", "uncertain", 0.0),
+        ("What are the side effects?", "allow", -1.0),
+    ],
+)
+def test_classify(
+    classifier: LexiconClassifier, text: str, decision: str, score: float
+):
+    verdict = classifier.classify(text)
+    assert verdict.decision == decision
+    assert verdict.score == score
+
+
+def test_classify_matches_whole_words(classifier: LexiconClassifier):
+    verdict = classifier.classify("The buyer ordered a spillway")
+    assert verdict.matches == []
+
+
+def test_invalid_thresholds():
+    with pytest.raises(ValueError):
+        LexiconClassifier(weights={}, block_threshold=1.0, allow_threshold=1.0)
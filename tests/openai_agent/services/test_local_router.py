@@ -0,0 +1,67 @@
+import pytest
+
+from openai_agent.services.local_router import LocalRouter
+
+
+@pytest.fixture
+def router() -> LocalRouter:
+    return LocalRouter(
+        {
+            "cardiology": "heart chest pain palpitations blood pressure",
+            "orthopedics": "bone fracture joint knee pain",
+            "neurology": "headache migraine seizure",
+        }
+    )
+
+
+def test_confident_route(router: LocalRouter):
+    decision = router.route("I have palpitations and high blood pressure")
+
+    assert decision.route == "cardiology"
+    assert decision.confidence == 1.0
+    assert router.stats.routed == 1
+
+
+def test_ambiguous_message_falls_back(router: LocalRouter):
+    decision = router.route("I am in pain")
+
+    assert decision.route is None
+    assert {route for route, _ in decision.candidates} == {"cardiology", "orthopedics"}
+    assert router.stats.fallbacks == 1
+
+
+def test_unknown_message_falls_back(router: LocalRouter):
+    decision = router.route("hello there")
+
+    assert decision.route is None
+    assert decision.confidence == 0.0
+    assert decision.candidates == []
+
+
+def test_single_matching_term_falls_back(router: LocalRouter):
+    decision = router.route("a migraine")
+
+    # one term matching one route only is certain but not evidence enough
+    assert decision.confidence == 1.0 and decision.matches == 1
+    assert decision.route is None
+    assert LocalRouter(router.routes, min_matches=1).route("a migraine").route == (
+        "neurology"
+    )
+
+
+def test_score_margin_is_required(router: LocalRouter):
+    strict = LocalRouter(router.routes, min_margin=100.0)
+
+    assert strict.route("I have palpitations and high blood pressure").route is None
+
+
+def test_escalate_terms_fall_back():
+    router = LocalRouter(
+        {"orthopedics": "bone fracture joint knee pain", "neurology": "headache"},
+        escalate_terms="bleeding unconscious",
+    )
+
+    decision = router.route("My knee joint is bleeding")
+
+    assert decision.route is None and decision.escalated
+    assert router.stats.escalations == router.stats.fallbacks == 1
@@ -0,0 +1,70 @@
+import pytest
+
+from openai_agent.services.model_tiers import (
+    FAST,
+    LARGE,
+    SMALL,
+    ModelTiers,
+    ModelTiersEnv,
+)
+
+
+def get_tiers(tiers: str = "", agents: str = "") -> ModelTiers:
+    return ModelTiers(
+        ModelTiersEnv(
+            azure_openai_deployed_model_name="gpt-4.1",
+            llm_model_tiers=tiers,
+            llm_agent_tiers=agents,
+        )
+    )
+
+
+def test_every_tier_runs_on_the_deployed_model_by_default():
+    tiers = get_tiers()
+
+    assert [tiers.get_deployment(tier) for tier in (FAST, SMALL, LARGE)] == [
+        "gpt-4.1"
+    ] * 3
+    assert tiers.get_tier("triage_agent", FAST) == FAST
+    with pytest.raises(ValueError):
+        tiers.get_deployment("huge")
+
+
+def test_agents_run_on_the_configured_tier():
+    tiers = get_tiers(
+        '{"fast": "gpt-4.1-nano", "reasoning": "o4-mini"}',
+        '{"triage_agent": "large", "medical_agent": "reasoning"}',
+    )
+
+    assert tiers.get_deployment(tiers.get_tier("Guardrail check", FAST)) == (
+        "gpt-4.1-nano"
+    )
+    assert tiers.get_tier("triage_agent", FAST) == LARGE
+    assert tiers.get_deployment(tiers.get_tier("medical_agent", LARGE)) == "o4-mini"
+    assert tiers.get_metrics() == {
+        "tiers": {
+            "fast": "gpt-4.1-nano",
+            "small": "gpt-4.1",
+            "large": "gpt-4.1",
+            "reasoning": "o4-mini",
+        },
+        "agents": {
+            "Guardrail check": "fast",
+            "triage_agent": "large",
+            "medical_agent": "reasoning",
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "tiers, agents",
+    [
+        ('["gpt-4.1-nano"]', ""),
+        ('{"fast": ""}', ""),
+        ("", '{"triage_agent": 1}'),
+        ("", '{"triage_agent": "huge"}'),
+    ],
+)
+def test_invalid_configuration_is_rejected(tiers: str, agents: str):
+    with pytest.raises(ValueError):
+        get_tiers(tiers, agents)
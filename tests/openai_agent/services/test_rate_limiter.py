@@ -0,0 +1,212 @@
+import asyncio
+import io
+import json
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from openai_agent.services.rate_limiter import (
+    RateLimitedTransport,
+    RateLimiter,
+    RateLimiterEnv,
+    TokenBucket,
+    estimate_tokens,
+    get_retry_after,
+)
+
+
+def get_limiter(
+    rpm: int = 0, tpm: int = 0, max_concurrency: int = 4, min_concurrency: int = 1
+) -> RateLimiter:
+    return RateLimiter(
+        RateLimiterEnv(
+            azure_openai_rpm_limit=rpm,
+            azure_openai_tpm_limit=tpm,
+            azure_openai_max_concurrency=max_concurrency,
+            azure_openai_min_concurrency=min_concurrency,
+        )
+    )
+
+
+def test_estimate_tokens():
+    body = json.dumps({"messages": "x" * 396, "max_tokens": 50}).encode()
+    assert estimate_tokens(body) == len(body) // 4 + 50
+    assert estimate_tokens(b"not json") == 2
+    assert estimate_tokens(b"[1, 2]") == 1
+
+
+def test_get_retry_after():
+    assert get_retry_after({"retry-after-ms": "1500", "retry-after": "3"}) == 1.5
+    assert get_retry_after({"retry-after": "3"}) == 3.0
+    assert get_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 1.0
+
+
+def test_token_bucket(mocker: MockerFixture):
+    clock = mocker.patch("time.monotonic", return_value=0.0)
+    bucket = TokenBucket(per_minute=60)
+
+    assert bucket.reserve(30) == 0.0
+    assert bucket.reserve(40) == 10.0
+    clock.return_value = 20.0
+    assert bucket.available == 10.0
+    clock.return_value = 200.0
+    assert bucket.available == 60.0
+
+    bucket.sync(5)
+    assert bucket.available == 5.0
+    bucket.refund(100)
+    assert bucket.available == 60.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_the_buckets(mocker: MockerFixture):
+    sleep = mocker.patch("asyncio.sleep")
+    limiter = get_limiter(rpm=600, tpm=6000)
+    limiter._tokens.reserve(6000)  # type: ignore
+
+    await limiter.acquire(estimated_tokens=100)
+    assert sleep.await_args_list[0].args[0] == pytest.approx(1.0, abs=0.01)
+
+    metrics = limiter.get_metrics()
+    assert metrics["in_flight"] == 1
+    assert metrics["requests_available"] == pytest.approx(599, abs=1)
+    assert metrics["tokens_available"] == pytest.approx(-100, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    limiter = get_limiter(max_concurrency=2)
+    await limiter.acquire(1)
+    await limiter.acquire(1)
+
+    waiting = asyncio.create_task(limiter.acquire(1))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    await limiter.release()
+    await asyncio.wait_for(waiting, 1)
+    assert limiter.get_metrics()["in_flight"] == 2
+
+
+def test_aimd():
+    limiter = get_limiter(max_concurrency=8, min_concurrency=2)
+
+    limiter.on_response(429, {"retry-after-ms": "100"})
+    limiter.on_response(429, {"retry-after-ms": "100"})
+    assert limiter.get_metrics()["concurrency_limit"] == 4.0
+    assert limiter.stats.throttled == 2 and limiter.stats.decreases == 1
+
+    limiter._paused_until = 0
+    limiter.on_response(429, {})
+    limiter._paused_until = 0
+    limiter.on_response(429, {})
+    assert limiter.get_metrics()["concurrency_limit"] == 2.0
+
+    for _ in range(4):
+        limiter.on_response(200, {})
+    assert limiter.get_metrics()["concurrency_limit"] > 3.0
+
+
+@pytest.mark.asyncio
+async def test_throttling_pauses_requests():
+    limiter = get_limiter()
+    limiter.on_response(429, {"retry-after-ms": "50"})
+
+    started = asyncio.get_running_loop().time()
+    await limiter.acquire(1)
+    assert asyncio.get_running_loop().time() - started >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_cancelled_acquire_releases_its_slot():
+    limiter = get_limiter()
+    limiter.on_response(429, {"retry-after": "10"})
+
+    task = asyncio.create_task(limiter.acquire(1))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert limiter.get_metrics()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_acquire_refunds_its_reservation():
+    limiter = get_limiter(rpm=60, tpm=600)
+    limiter._tokens.reserve(600)  # type: ignore
+
+    task = asyncio.create_task(limiter.acquire(300))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    metrics = limiter.get_metrics()
+    assert metrics["requests_available"] == pytest.approx(60, abs=0.1)
+    assert metrics["tokens_available"] == pytest.approx(0, abs=1)
+    assert metrics["requests"] == 0
+
+
+def test_endpoints_have_their_own_limiter():
+    limiter = get_limiter(max_concurrency=8)
+    east = limiter.for_endpoint("east/gpt")
+
+    east.on_response(429, {"retry-after": "10"})
+
+    assert limiter.for_endpoint("east/gpt") is east
+    metrics = limiter.get_metrics()
+    assert metrics["concurrency_limit"] == 8.0
+    assert metrics["paused_seconds"] == 0.0
+    assert metrics["east/gpt.concurrency_limit"] == 4.0
+    assert metrics["east/gpt.throttled"] == 1
+
+
+def test_headers_sync_the_buckets():
+    limiter = get_limiter(rpm=100, tpm=1000)
+
+    limiter.on_response(
+        200,
+        {"x-ratelimit-remaining-requests": "3", "x-ratelimit-remaining-tokens": "x"},
+    )
+    assert limiter.get_metrics()["requests_available"] == pytest.approx(3, abs=0.1)
+    assert limiter.get_metrics()["tokens_available"] == pytest.approx(1000, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_transport():
+    limiter = get_limiter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/fail":
+            raise httpx.ConnectError("boom")
+        return httpx.Response(429, headers={"retry-after-ms": "1"}, text="slow down")
+
+    async with httpx.AsyncClient(
+        transport=RateLimitedTransport(httpx.MockTransport(handler), limiter),
+        base_url="http://test",
+    ) as client:
+        response = await client.post("/chat", json={"max_tokens": 10})
+        assert response.text == "slow down"
+        assert (await client.head("/chat")).status_code == 429
+        upload = ("input.jsonl", io.BytesIO(b"{}"))
+        assert (await client.post("/files", files={"file": upload})).status_code == 429
+        with pytest.raises(httpx.ConnectError):
+            await client.post("/fail")
+
+    assert limiter.stats.requests == 2
+    assert limiter.stats.throttled == 1
+    assert limiter.get_metrics()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_holds_its_slot():
+    limiter = get_limiter()
+    transport = RateLimitedTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, text="data")),
+        limiter,
+    )
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with client.stream("POST", "/chat") as response:
+            assert limiter.get_metrics()["in_flight"] == 1
+            assert await response.aread() == b"data"
+        assert limiter.get_metrics()["in_flight"] == 0
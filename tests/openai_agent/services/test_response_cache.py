@@ -0,0 +1,185 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from openai_agent.services.response_cache import ResponseCache, ResponseCacheEnv
+
+
+def get_cache(**kwargs: object) -> ResponseCache:
+    return ResponseCache(env=ResponseCacheEnv(**kwargs))  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_hit_and_miss():
+    cache = get_cache()
+    factory = AsyncMock(return_value="value")
+
+    assert await cache.get_or_set("key", factory) == "value"
+    assert await cache.get_or_set("key", factory) == "value"
+
+    factory.assert_awaited_once()
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_disabled():
+    cache = get_cache(llm_cache_enabled=False)
+    factory = AsyncMock(return_value="value")
+
+    await cache.get_or_set("key", factory)
+    await cache.get_or_set("key", factory)
+
+    assert factory.await_count == 2
+    assert cache.enabled is False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    cache = get_cache()
+    calls = 0
+
+    async def factory() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(
+        *(cache.get_or_set("key", factory) for _ in range(5))
+    )
+
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert cache.stats.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_factory_error_is_shared_and_not_cached():
+    cache = get_cache()
+    factory = AsyncMock(side_effect=[RuntimeError("boom"), "value"])
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_set("key", factory)
+
+    assert await cache.get_or_set("key", factory) == "value"
+    assert cache.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_factory():
+    cache = get_cache()
+
+    async def factory() -> str:
+        await asyncio.sleep(10)
+        return "value"
+
+    task = asyncio.create_task(cache.get_or_set("key", factory))
+    await asyncio.sleep(0)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cache._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+    cache = get_cache()
+    started = asyncio.Event()
+
+    async def factory() -> str:
+        started.set()
+        await asyncio.sleep(0.01)
+        return "value"
+
+    leader = asyncio.create_task(cache.get_or_set("key", factory))
+    await started.wait()
+    follower = asyncio.create_task(cache.get_or_set("key", factory))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "value"
+    assert leader.cancelled()
+    assert cache.stats.misses == 1
+    assert cache.stats.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_get_metrics():
+    cache = get_cache()
+
+    await cache.get_or_set("key", AsyncMock(return_value="value"))
+    await cache.get_or_set("key", AsyncMock(return_value="value"))
+
+    assert cache.get_metrics() == {
+        "entries": 1,
+        "in_flight": 0,
+        "hits": 1,
+        "disk_hits": 0,
+        "misses": 1,
+        "coalesced": 0,
+        "evictions": 0,
+        "expirations": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    cache = get_cache(llm_cache_max_entries=2)
+
+    for key in ["a", "b", "a", "c"]:
+        await cache.get_or_set(key, AsyncMock(return_value=key))
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiration(mocker: MockerFixture):
+    cache = get_cache(llm_cache_ttl_seconds=10)
+    mock_time = mocker.patch(
+        "openai_agent.services.response_cache.time.time", return_value=100.0
+    )
+    await cache.get_or_set("key", AsyncMock(return_value="old"))
+
+    mock_time.return_value = 111.0
+    assert await cache.get_or_set("key", AsyncMock(return_value="new")) == "new"
+    assert cache.stats.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_tier(tmp_path: Path):
+    path = str(tmp_path / "cache.db")
+    first = get_cache(llm_cache_sqlite_path=path)
+    await first.get_or_set("key", AsyncMock(return_value="value"))
+    first.close()
+
+    cache = get_cache(llm_cache_sqlite_path=path)
+    factory = AsyncMock()
+    assert await cache.get_or_set("key", factory) == "value"
+    assert await cache.get_or_set("key", factory) == "value"
+
+    factory.assert_not_awaited()
+    assert cache.stats.disk_hits == 1
+    assert cache.stats.hits == 1
+
+    cache.clear()
+    assert await cache.get_or_set("key", AsyncMock(return_value="new")) == "new"
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_close(tmp_path: Path):
+    cache = get_cache(llm_cache_sqlite_path=str(tmp_path / "cache.db"))
+    cache.close()
+    cache.close()
+
+    # the memory tier still works
+    factory = AsyncMock(return_value="value")
+    assert await cache.get_or_set("key", factory) == "value"
+    assert await cache.get_or_set("key", factory) == "value"
+    factory.assert_awaited_once()
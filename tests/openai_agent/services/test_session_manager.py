@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from openai_agent.services.session_manager import (
+    ServerBusyError,
+    SessionManager,
+    SessionManagerEnv,
+)
+
+
+def get_session_manager(
+    max_concurrent_runs: int = 2, max_queued_runs: int = 1, max_sessions: int = 10
+) -> SessionManager:
+    env = SessionManagerEnv(
+        session_max_concurrent_runs=max_concurrent_runs,
+        session_max_queued_runs=max_queued_runs,
+        session_max_sessions=max_sessions,
+    )
+    return SessionManager(env)
+
+
+def test_get_session():
+    sessions = get_session_manager()
+
+    session = sessions.get_session()
+    assert sessions.get_session(session.id) is session
+    assert sessions.get_session("other") is not session
+    assert sessions.get_status()["sessions"] == 2
+
+
+def test_idle_sessions_are_evicted():
+    sessions = get_session_manager(max_sessions=2)
+
+    first = sessions.get_session("a")
+    sessions.get_session("b")
+    sessions.get_session("a")
+    sessions.get_session("c")
+
+    assert sessions.get_session("a") is first
+    assert sessions.stats.evicted == 1
+    assert sessions.get_status()["sessions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_busy_sessions_are_not_evicted():
+    sessions = get_session_manager(max_sessions=1)
+    busy = sessions.get_session("a")
+    task = sessions.start(busy, asyncio.Event().wait)
+
+    sessions.get_session("b")
+    assert sessions.get_session("a") is busy
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_runs_of_a_session_are_serialized():
+    sessions = get_session_manager()
+    session = sessions.get_session()
+    order: list[str] = []
+
+    async def run(name: str) -> str:
+        order.append(f"start {name}")
+        await asyncio.sleep(0.01)
+        order.append(f"end {name}")
+        return name
+
+    first = sessions.start(session, lambda: run("first"))
+    second = sessions.start(session, lambda: run("second"))
+
+    assert await asyncio.gather(first, second) == ["first", "second"]
+    assert order == ["start first", "end first", "start second", "end second"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_are_bounded():
+    sessions = get_session_manager(max_concurrent_runs=2, max_queued_runs=1)
+    release = asyncio.Event()
+
+    tasks = [sessions.start(sessions.get_session(), release.wait) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert sessions.get_status()["running"] == 2
+    assert sessions.get_status()["queued"] == 1
+
+    with pytest.raises(ServerBusyError):
+        sessions.start(sessions.get_session(), release.wait)
+    assert sessions.stats.rejected == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert sessions.stats.admitted == 3
+
+
+@pytest.mark.asyncio
+async def test_remove_session_cancels_its_runs():
+    sessions = get_session_manager()
+    session = sessions.get_session()
+    task = sessions.start(session, asyncio.Event().wait)
+    await asyncio.sleep(0)
+
+    assert sessions.remove_session(session.id)
+    assert not sessions.remove_session(session.id)
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert sessions.stats.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_drain():
+    sessions = get_session_manager()
+    finishing = sessions.start(sessions.get_session(), lambda: asyncio.sleep(0.01))
+    hanging = sessions.start(sessions.get_session(), asyncio.Event().wait)
+
+    await sessions.drain(timeout=0.1)
+
+    assert finishing.done() and not finishing.cancelled()
+    assert hanging.cancelled()
+    with pytest.raises(ServerBusyError):
+        sessions.start(sessions.get_session(), lambda: asyncio.sleep(0))
+    await sessions.drain(timeout=0.1)
@@ -0,0 +1,110 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from openai_agent.services.session_store import (
+    MemorySessionStore,
+    SessionStoreEnv,
+    SqliteSessionStore,
+)
+
+
+def user(content: str) -> Any:
+    return {"role": "user", "content": content}
+
+
+def assistant(content: str) -> Any:
+    return {"role": "assistant", "content": content}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def get_store(request: pytest.FixtureRequest, tmp_path: Path):
+    stores: list[MemorySessionStore | SqliteSessionStore] = []
+
+    def get_store(**kwargs: Any) -> MemorySessionStore | SqliteSessionStore:
+        env = SessionStoreEnv(
+            session_store_sqlite_path=str(tmp_path / "sessions.sqlite"),
+            **kwargs,
+        )
+        store: MemorySessionStore | SqliteSessionStore = MemorySessionStore(env)
+        if request.param == "sqlite":
+            store = SqliteSessionStore(env)
+        stores.append(store)
+        return store
+
+    yield get_store
+    for store in stores:
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_append_and_load(get_store):
+    store = get_store()
+    assert (await store.load("s1")).history == []
+
+    await store.append("s1", [user("I broke my wrist"), assistant("Ouch")], "triage")
+    await store.append("s1", [user("What now?"), assistant("Rest")])
+    await store.append("s2", [user("hello")], "other")
+
+    state = await store.load("s1")
+    # the agent is kept when a turn doesn't name one
+    assert state.agent_name == "triage"
+    assert state.history == [
+        user("I broke my wrist"),
+        assistant("Ouch"),
+        user("What now?"),
+        assistant("Rest"),
+    ]
+    assert store.get_metrics()["appends"] == 3
+    assert store.get_metrics()["turns_loaded"] == 2
+
+
+@pytest.mark.asyncio
+async def test_max_turns(get_store):
+    store = get_store(session_store_max_turns=2)
+    for i in range(5):
+        await store.append("s1", [user(f"message {i}")], f"agent {i}")
+
+    state = await store.load("s1")
+    assert state.history == [user("message 3"), user("message 4")]
+    assert state.agent_name == "agent 4"
+
+
+@pytest.mark.asyncio
+async def test_delete(get_store):
+    store = get_store()
+    await store.append("s1", [user("hello")], "triage")
+
+    assert await store.delete("s1") is True
+    assert await store.delete("s1") is False
+    state = await store.load("s1")
+    assert state.agent_name is None and state.turns == []
+
+
+@pytest.mark.asyncio
+async def test_memory_evicts_least_recently_used_sessions():
+    store = MemorySessionStore(SessionStoreEnv(session_store_max_sessions=2))
+    await store.append("s1", [user("a")])
+    await store.append("s2", [user("b")])
+    await store.load("s1")
+    await store.append("s3", [user("c")])
+
+    assert (await store.load("s1")).history == [user("a")]
+    assert (await store.load("s2")).history == []
+    assert store.stats.evicted == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_sessions_are_shared_by_workers(tmp_path: Path):
+    env = SessionStoreEnv(session_store_sqlite_path=str(tmp_path / "sessions.sqlite"))
+    first, second = SqliteSessionStore(env), SqliteSessionStore(env)
+
+    await first.append("s1", [user("I broke my wrist")], "orthopedics_agent")
+    await second.append("s1", [user("It is swollen")])
+    first.close()
+
+    state = await second.load("s1")
+    second.close()
+    assert state.agent_name == "orthopedics_agent"
+    assert state.history == [user("I broke my wrist"), user("It is swollen")]
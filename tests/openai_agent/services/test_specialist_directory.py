@@ -0,0 +1,105 @@
+import io
+from array import array
+from pathlib import Path
+
+import pytest
+
+from openai_agent.services.specialist_directory import (
+    SpecialistData,
+    SpecialistDirectory,
+    SpecialistDirectoryEnv,
+    SpecialistRecord,
+    generate_specialists,
+    write_directory,
+)
+
+
+@pytest.fixture
+def directory() -> SpecialistDirectory:
+    # rows: city, specialty, first name, last name
+    rows = [
+        (0, 0, 0, 0),
+        (1, 1, 1, 1),
+        (0, 0, 1, 2),
+        (2, 0, 2, 0),
+        (2, 0, 0, 1),
+        (3, 0, 1, 1),
+        (0, 1, 2, 2),
+    ]
+    data = SpecialistData(
+        first_names=["Ada", "Ben", "Cleo"],
+        last_names=["Stone", "Ward", "Young"],
+        cities=["Seattle", "Boston", "San Diego", "San Jose"],
+        specialties=["Cardiology", "Pediatrics"],
+        city=array("I", [row[0] for row in rows]),
+        specialty=array("I", [row[1] for row in rows]),
+        first_name=array("I", [row[2] for row in rows]),
+        last_name=array("I", [row[3] for row in rows]),
+    )
+    file = io.BytesIO()
+    write_directory(data, file)
+    return SpecialistDirectory(SpecialistDirectoryEnv(), file.getvalue())
+
+
+def test_search_by_city_and_specialty(directory: SpecialistDirectory):
+    assert directory.search("seattle", "Cardiology") == [
+        SpecialistRecord("Ada", "Stone", "Cardiology", "Seattle"),
+        SpecialistRecord("Ben", "Young", "Cardiology", "Seattle"),
+    ]
+    assert directory.search("Seattle", "pediatrician") == [
+        SpecialistRecord("Cleo", "Young", "Pediatrics", "Seattle")
+    ]
+    assert len(directory.search("Seattle")) == 3
+    assert len(directory.search("Seattle", limit=1)) == 1
+    assert directory.search("Seattle", "dentist") == []
+
+
+def test_city_matching(directory: SpecialistDirectory):
+    # the larger of the prefixed cities first
+    assert [record.city for record in directory.search("san")] == [
+        "San Diego",
+        "San Diego",
+        "San Jose",
+    ]
+    assert [record.city for record in directory.search("Bostn")] == ["Boston"]
+    assert directory.search("Atlantis") == []
+    assert directory.search("  ") == []
+    assert directory.get_metrics() == {
+        "specialists": 7,
+        "cities": 4,
+        "bytes": len(directory.buffer),
+        "lookups": 4,
+        "exact": 0,
+        "prefix": 1,
+        "fuzzy": 1,
+        "misses": 2,
+    }
+
+
+def test_generated_directory_is_memory_mapped(tmp_path: Path):
+    path = tmp_path / "specialists.bin"
+    with path.open("wb") as file:
+        write_directory(generate_specialists(5000, cities=50, seed=1), file)
+
+    directory = SpecialistDirectory.open(SpecialistDirectoryEnv(), path)
+    assert directory.count == 5000
+    assert len(directory.cities) == 50
+    records = directory.search("Seattle", "cardiologist", limit=3)
+    assert len(records) == 3
+    assert {(record.city, record.specialty) for record in records} == {
+        ("Seattle", "Cardiology")
+    }
+    directory.close()
+
+
+def test_load_generates_a_sample_without_a_file(tmp_path: Path):
+    env = SpecialistDirectoryEnv(
+        specialist_directory_path=str(tmp_path / "missing.bin"),
+        specialist_directory_sample_size=100,
+    )
+    assert SpecialistDirectory.load(env).count == 100
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        SpecialistDirectory(SpecialistDirectoryEnv(), b"not a directory")
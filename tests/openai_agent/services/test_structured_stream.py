@@ -0,0 +1,109 @@
+import json
+import random
+
+import httpx
+import pytest
+from agents import Agent, OpenAIChatCompletionsModel, Runner
+from openai import AsyncAzureOpenAI
+from pydantic import BaseModel
+
+from openai_agent.services.structured_stream import JsonFieldParser, stream_fields
+from openai_agent.serving.mock_openai import MockOpenAI, MockOpenAIEnv, create_mock_app
+
+
+class Code(BaseModel):
+    system: str
+    value: int
+
+
+class Department(BaseModel):
+    department_name: str
+    urgent: bool
+    code: Code
+    reasoning: str
+
+
+def get_agent() -> Agent:
+    mock = MockOpenAI(
+        MockOpenAIEnv(
+            mock_openai_latency="constant",
+            mock_openai_latency_ms=0,
+            mock_openai_token_latency_ms=0,
+            mock_openai_seed="1",
+        )
+    )
+    client = AsyncAzureOpenAI(
+        azure_endpoint="http://mock",
+        api_key="mock",
+        api_version="2025-04-01-preview",
+        http_client=httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_mock_app(mock))
+        ),
+    )
+    return Agent(
+        name="medical_agent",
+        model=OpenAIChatCompletionsModel("gpt", client),
+        output_type=Department,
+    )
+
+
+def test_parser_returns_fields_as_they_complete():
+    value = {
+        'na"me': 'a "quoted" \\ value, with } and ]',
+        "count": -12.5e3,
+        "flags": [True, None, {"x": [1, 2]}],
+        "nested": {"a": "{", "b": []},
+        "done": False,
+    }
+    text = json.dumps(value, indent=2)
+    rng = random.Random(1)
+
+    for _ in range(20):
+        parser = JsonFieldParser()
+        fields = []
+        start = 0
+        while start < len(text):
+            end = start + rng.randint(1, 8)
+            fields += parser.feed(text[start:end])
+            start = end
+        assert fields == list(value.items())
+        assert parser.complete
+
+    parser = JsonFieldParser()
+    assert parser.feed('{"a": "x", "b": 1') == [("a", "x")]
+    # a number is only complete once the next delimiter arrives
+    assert parser.feed("}") == [("b", 1)]
+
+
+def test_parser_rejects_other_json():
+    with pytest.raises(ValueError):
+        JsonFieldParser().feed("[1, 2]")
+    with pytest.raises(ValueError):
+        JsonFieldParser().feed('{"a" 1}')
+
+
+@pytest.mark.asyncio
+async def test_stream_fields():
+    result = Runner.run_streamed(get_agent(), "I broke my wrist")
+    events = [event async for event in stream_fields(result)]
+
+    assert [event.name for event in events] == [
+        "department_name",
+        "urgent",
+        "code",
+        "reasoning",
+    ]
+    assert events[2].value == Code(system="mock system", value=1)
+    assert {event.agent.name for event in events} == {"medical_agent"}
+    assert result.final_output == Department(
+        **{event.name: event.value for event in events}
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_fields_stops_after_a_field():
+    result = Runner.run_streamed(get_agent(), "I broke my wrist")
+    events = [event async for event in stream_fields(result, "urgent")]
+
+    assert [event.name for event in events] == ["department_name", "urgent"]
+    assert result.is_complete and result.final_output is None
@@ -0,0 +1,186 @@
+import asyncio
+
+import httpx
+import pytest
+from agents import Agent, OpenAIChatCompletionsModel, Runner, Usage
+from openai import AsyncAzureOpenAI
+from openai.types.responses.response_usage import InputTokensDetails
+
+from openai_agent.models.metered_model import MeteredModel, estimate_usage
+from openai_agent.services.token_budget import (
+    TokenAccountant,
+    TokenBudgetEnv,
+    TokenBudgetExceeded,
+    TokenUsage,
+)
+from openai_agent.serving.mock_openai import MockOpenAI, MockOpenAIEnv, create_mock_app
+
+
+def get_usage(input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> Usage:
+    return Usage(
+        requests=1,
+        input_tokens=input_tokens,
+        input_tokens_details=InputTokensDetails(cached_tokens=cached_tokens),
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+def get_model(
+    accountant: TokenAccountant, latency_ms: float = 0, token_latency_ms: float = 0
+) -> MeteredModel:
+    mock = MockOpenAI(
+        MockOpenAIEnv(
+            mock_openai_latency="constant",
+            mock_openai_latency_ms=latency_ms,
+            mock_openai_token_latency_ms=token_latency_ms,
+            mock_openai_seed="1",
+        )
+    )
+    client = AsyncAzureOpenAI(
+        azure_endpoint="http://mock",
+        api_key="mock",
+        api_version="2025-04-01-preview",
+        http_client=httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_mock_app(mock))
+        ),
+    )
+    return MeteredModel(OpenAIChatCompletionsModel("gpt", client), accountant)
+
+
+def get_orchestrator(accountant: TokenAccountant) -> Agent:
+    translator = Agent(
+        name="spanish_agent",
+        instructions="Translate to Spanish.",
+        model=get_model(accountant),
+    )
+    return Agent(
+        name="orchestrator_agent",
+        instructions="Delegate translations.",
+        tools=[translator.as_tool("translate_to_spanish", "Translate to Spanish.")],
+        model=get_model(accountant),
+    )
+
+
+def test_track_nested_budgets():
+    accountant = TokenAccountant(TokenBudgetEnv())
+    session = TokenUsage(requests=1, input_tokens=100, output_tokens=10)
+
+    accountant.record(get_usage(1, 1))
+    with accountant.track(session) as request:
+        accountant.record(get_usage(1000, 200, cached_tokens=800))
+        with accountant.track() as nested:
+            accountant.record(get_usage(10, 5))
+
+    assert nested == TokenUsage(requests=1, input_tokens=10, output_tokens=5)
+    assert request.total_tokens == 1215 and request.cached_tokens == 800
+    assert session.requests == 3 and session.total_tokens == 1325
+    assert accountant.totals.requests == 3
+    # 211 uncached at $2, 800 cached at $0.5 and 206 output tokens at $8 per million
+    assert accountant.get_summary()["cost"] == pytest.approx(0.00247)
+    assert accountant.get_summary(nested)["total_tokens"] == 15
+
+
+def test_check():
+    accountant = TokenAccountant(
+        TokenBudgetEnv(
+            token_budget_request_max_tokens=100, token_budget_session_max_cost=0.01
+        )
+    )
+    accountant.check()
+
+    with accountant.track(TokenUsage()):
+        accountant.record(get_usage(90, 9))
+        accountant.check()
+        accountant.record(get_usage(1, 0))
+        with pytest.raises(TokenBudgetExceeded, match="request used 100 of 100"):
+            accountant.check()
+
+    with accountant.track(TokenUsage(output_tokens=1250)):
+        with pytest.raises(TokenBudgetExceeded, match=r"session used \$0.0100"):
+            accountant.check()
+    assert accountant.stats.exceeded == 2
+
+
+@pytest.mark.asyncio
+async def test_accounts_agents_called_as_tools():
+    accountant = TokenAccountant(TokenBudgetEnv())
+
+    with accountant.track() as usage:
+        await Runner.run(get_orchestrator(accountant), "Translate: rest")
+
+    # the orchestrator calls the tool and answers, the translator answers once
+    assert usage.requests == 3
+    assert usage.input_tokens > 0 and usage.output_tokens > 0
+
+    with accountant.track() as usage:
+        result = Runner.run_streamed(get_orchestrator(accountant), "Translate: rest")
+        async for _ in result.stream_events():
+            pass
+    assert usage.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_budget_stops_the_run():
+    accountant = TokenAccountant(TokenBudgetEnv(token_budget_request_max_tokens=1))
+
+    with accountant.track() as usage:
+        with pytest.raises(TokenBudgetExceeded):
+            await Runner.run(get_orchestrator(accountant), "Translate: rest")
+
+    # the translator call fails as a tool call, the orchestrator stops after it
+    assert usage.requests == 1
+
+
+def test_estimate_usage():
+    usage = estimate_usage("x" * 40, [{"role": "user", "content": "hi"}], 3)
+
+    assert usage.requests == 1
+    assert usage.input_tokens == (40 + len('[{"role": "user", "content": "hi"}]')) // 4
+    assert usage.output_tokens == 3
+    assert usage.total_tokens == usage.input_tokens + 3
+
+
+@pytest.mark.asyncio
+async def test_accounts_cancelled_calls():
+    accountant = TokenAccountant(TokenBudgetEnv())
+    agent = Agent(
+        name="spanish_agent",
+        instructions="Translate to Spanish.",
+        model=get_model(accountant, latency_ms=1000),
+    )
+
+    with accountant.track() as usage:
+        task = asyncio.create_task(Runner.run(agent, "Translate: rest"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    # the prompt was sent, no output was received
+    assert usage.requests == 1
+    assert usage.input_tokens > 0 and usage.output_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_accounts_streams_given_up():
+    accountant = TokenAccountant(TokenBudgetEnv())
+    agent = Agent(
+        name="spanish_agent",
+        instructions="Translate to Spanish.",
+        model=get_model(accountant, token_latency_ms=5),
+    )
+
+    with accountant.track() as usage:
+        result = Runner.run_streamed(agent, "Translate: rest")
+        deltas = 0
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and event.data.type.endswith(
+                ".delta"
+            ):
+                deltas += 1
+                if deltas == 3:
+                    result.cancel()
+        await asyncio.sleep(0.01)
+
+    assert usage.requests == 1
+    assert usage.input_tokens > 0 and usage.output_tokens >= 3
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from agents import FunctionTool, RunContextWrapper, Usage, function_tool
+from agents.tool_context import ToolContext
+
+from openai_agent.services.tool_memo import ToolMemo, ToolMemoEnv, ToolMemoStats
+
+
+def get_memo(**kwargs: Any) -> ToolMemo:
+    return ToolMemo(env=ToolMemoEnv(**kwargs))
+
+
+def get_tool(calls: list[str], started: asyncio.Event | None = None) -> FunctionTool:
+    async def lookup(city: str, specialty: str = "any") -> str:
+        calls.append(city)
+        if started is not None:
+            started.set()
+            await asyncio.sleep(0.05)
+        if city == "Atlantis":
+            raise LookupError(city)
+        return f"{specialty} in {city}"
+
+    return function_tool(lookup, failure_error_function=None)
+
+
+async def invoke(tool: FunctionTool, usage: Usage, **arguments: str) -> Any:
+    input = json.dumps(arguments)
+    context = ToolContext(
+        context=None,
+        usage=usage,
+        tool_name=tool.name,
+        tool_call_id="call",
+        tool_arguments=input,
+    )
+    return await tool.on_invoke_tool(context, input)
+
+
+def get_run_stats(memo: ToolMemo, usage: Usage) -> ToolMemoStats:
+    result = SimpleNamespace(context_wrapper=RunContextWrapper(None, usage))
+    return memo.get_run_stats(result)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_outputs_are_remembered_across_runs():
+    memo = get_memo()
+    calls: list[str] = []
+    tool = memo.memoize(get_tool(calls))
+    first_run, second_run = Usage(), Usage()
+
+    assert await invoke(tool, first_run, city="Seattle") == "any in Seattle"
+    assert await invoke(tool, first_run, city="Seattle") == "any in Seattle"
+    assert await invoke(tool, first_run, city="Boston") == "any in Boston"
+    # the order of the arguments doesn't matter
+    assert await invoke(
+        tool, second_run, specialty="any", city="Seattle"
+    ) == await invoke(tool, second_run, city="Seattle", specialty="any")
+
+    assert calls == ["Seattle", "Boston", "Seattle"]
+    assert get_run_stats(memo, first_run) == ToolMemoStats(hits=1, misses=2)
+    assert get_run_stats(memo, second_run) == ToolMemoStats(hits=1, misses=1)
+    assert get_run_stats(memo, Usage()) == ToolMemoStats()
+    assert memo.get_metrics() == {
+        "tools": 1,
+        "entries": 3,
+        **vars(ToolMemoStats(hits=2, misses=3)),
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_a_run():
+    memo = get_memo()
+    calls: list[str] = []
+    tool = memo.memoize(get_tool(calls, asyncio.Event()))
+    usage = Usage()
+
+    outputs = await asyncio.gather(
+        *(invoke(tool, usage, city="Seattle") for _ in range(3))
+    )
+
+    assert outputs == ["any in Seattle"] * 3
+    assert calls == ["Seattle"]
+    assert get_run_stats(memo, usage) == ToolMemoStats(misses=1, joined=2)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_only_caller_cancels_the_tool():
+    memo = get_memo()
+    started = asyncio.Event()
+    tool = memo.memoize(get_tool([], started))
+
+    call = asyncio.create_task(invoke(tool, Usage(), city="Seattle"))
+    await started.wait()
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    await asyncio.sleep(0)
+
+    assert memo.get_metrics()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_remembered():
+    memo = get_memo()
+    calls: list[str] = []
+    tool = memo.memoize(get_tool(calls))
+    usage = Usage()
+
+    for _ in range(2):
+        output = await invoke(tool, usage, city="Atlantis")
+        assert "Atlantis" in output
+
+    assert calls == ["Atlantis", "Atlantis"]
+    assert get_run_stats(memo, usage) == ToolMemoStats(misses=2, errors=2)
+
+
+@pytest.mark.asyncio
+async def test_expiry_and_eviction(monkeypatch: pytest.MonkeyPatch):
+    memo = get_memo()
+    calls: list[str] = []
+    now = 1000.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+
+    def by_city(arguments: dict[str, Any]) -> str:
+        return arguments["city"].lower()
+
+    tool = memo.memoize(get_tool(calls), key=by_city, ttl=10, max_entries=5)
+    # tools with the same name share the memory and its settings
+    other = memo.memoize(get_tool(calls), key=by_city)
+    usage = Usage()
+
+    await invoke(tool, usage, city="Seattle")
+    await invoke(other, usage, city="seattle")
+    now += 11
+    await invoke(tool, usage, city="Seattle")
+    for city in ("a", "b", "c", "d", "e", "f"):
+        await invoke(tool, usage, city=city)
+
+    assert calls == ["Seattle", "Seattle", "a", "b", "c", "d", "e", "f"]
+    assert memo.get_metrics() == {
+        "tools": 1,
+        "entries": 5,
+        **vars(ToolMemoStats(hits=1, misses=8, expired=1, evicted=2)),
+    }
+
+
+@pytest.mark.asyncio
+async def test_disabled_memo_runs_the_tool_and_reports_errors():
+    memo = get_memo(tool_memo_enabled=False)
+    calls: list[str] = []
+    tool = memo.memoize(get_tool(calls))
+    usage = Usage()
+
+    assert await invoke(tool, usage, city="Seattle") == "any in Seattle"
+    assert await invoke(tool, usage, city="Seattle") == "any in Seattle"
+    output = await invoke(tool, usage, city="Atlantis")
+
+    assert "error" in output and "Atlantis" in output
+    assert calls == ["Seattle", "Seattle", "Atlantis"]
+    assert memo.get_metrics()["tools"] == 0
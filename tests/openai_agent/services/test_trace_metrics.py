@@ -0,0 +1,161 @@
+import sys
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    ModelSettings,
+    OpenAIChatCompletionsModel,
+    Runner,
+    SpanError,
+    agent_span,
+    function_tool,
+    generation_span,
+    handoff_span,
+    input_guardrail,
+    set_trace_processors,
+    set_tracing_disabled,
+    trace,
+)
+from openai import AsyncAzureOpenAI
+
+from openai_agent.models.traced_model import TracedModel
+from openai_agent.services.trace_metrics import (
+    Histogram,
+    TraceMetrics,
+    TraceMetricsEnv,
+    format_labels,
+)
+from openai_agent.serving.mock_openai import MockOpenAI, MockOpenAIEnv, create_mock_app
+
+
+@pytest.fixture
+def metrics() -> Iterator[TraceMetrics]:
+    metrics = TraceMetrics(env=TraceMetricsEnv())
+    metrics.install()
+    yield metrics
+    set_trace_processors([])
+    set_tracing_disabled(True)
+
+
+def get_model(metrics: TraceMetrics) -> TracedModel:
+    mock = MockOpenAI(
+        MockOpenAIEnv(
+            mock_openai_latency="constant",
+            mock_openai_latency_ms=0,
+            mock_openai_token_latency_ms=0,
+            mock_openai_seed="1",
+        )
+    )
+    client = AsyncAzureOpenAI(
+        azure_endpoint="http://mock",
+        api_key="mock",
+        api_version="2025-04-01-preview",
+        http_client=httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_mock_app(mock))
+        ),
+    )
+    return TracedModel(OpenAIChatCompletionsModel("gpt", client), metrics)
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert (histogram.count, histogram.sum) == (5, 16.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(0.7) == pytest.approx(3.0)
+    assert histogram.quantile(1.0) == 4.0
+    assert Histogram().quantile(0.5) != Histogram().quantile(0.5)  # nan
+
+
+@pytest.mark.asyncio
+async def test_records_runs_per_agent(metrics: TraceMetrics):
+    @function_tool
+    def get_department_code(name: str) -> int:
+        return 7
+
+    @input_guardrail
+    def allow(context: Any, agent: Any, input: Any) -> GuardrailFunctionOutput:
+        return GuardrailFunctionOutput(output_info=None, tripwire_triggered=False)
+
+    agent = Agent(
+        name="medical_agent",
+        instructions="Pick a department.",
+        tools=[get_department_code],
+        input_guardrails=[allow],
+        model=get_model(metrics),
+        model_settings=ModelSettings(include_usage=True),
+    )
+
+    result = Runner.run_streamed(agent, "chest pain")
+    async for _ in result.stream_events():
+        pass
+
+    summary = metrics.get_summary()
+    assert summary["agent_traces_total.True"] == 1
+    assert summary["agent_run_seconds.medical_agent.count"] == 1
+    assert summary["agent_generation_seconds.medical_agent.count"] == 2
+    assert summary["agent_first_token_seconds.medical_agent.count"] == 2
+    assert summary["agent_tool_seconds.medical_agent.get_department_code.count"] == 1
+    assert summary["agent_guardrail_seconds.allow.count"] == 1
+    assert summary["agent_tokens_total.medical_agent.output"] > 0
+
+
+def test_handoffs_and_errors(metrics: TraceMetrics):
+    with trace("triage"):
+        with agent_span("triage_agent") as span:
+            with handoff_span(from_agent="triage_agent", to_agent="medical_agent"):
+                pass
+            span.set_error(SpanError(message="boom", data=None))
+
+    text = metrics.render_prometheus()
+    assert (
+        'agent_handoffs_total{from_agent="triage_agent",to_agent="medical_agent"} 1'
+        in text
+    )
+    assert 'agent_errors_total{agent="triage_agent",span="agent"} 1' in text
+    assert 'agent_run_seconds_bucket{agent="triage_agent",le="+Inf"} 1' in text
+    assert "# TYPE agent_run_seconds histogram" in text
+    assert format_labels((("agent", 'a"b\\'),)) == '{agent="a\\"b\\\\"}'
+
+
+def test_prompt_cache_ratio(metrics: TraceMetrics):
+    with trace("triage"):
+        with agent_span("cardiology_agent"):
+            with generation_span(usage={"input_tokens": 2000, "output_tokens": 10}):
+                metrics.record_cached_tokens(1536)
+
+    summary = metrics.get_summary()
+    assert summary["agent_tokens_total.cardiology_agent.cached"] == 1536
+    assert summary["agent_prompt_cache_ratio.cardiology_agent"] == 0.768
+
+
+def test_sampling(metrics: TraceMetrics):
+    metrics.env.trace_metrics_sample_rate = 0.0
+    with trace("triage"):
+        with agent_span("triage_agent"):
+            metrics.record_first_token(0.1)
+
+    assert metrics.get_summary() == {"agent_traces_total.False": 1}
+
+
+def test_log_to_mlflow(metrics: TraceMetrics, monkeypatch: pytest.MonkeyPatch):
+    mlflow = MagicMock()
+    monkeypatch.setitem(sys.modules, "mlflow", mlflow)
+    with trace("triage"):
+        pass
+
+    metrics.shutdown()
+    mlflow.log_metrics.assert_not_called()
+
+    metrics.env.trace_metrics_mlflow_experiment = "agents"
+    metrics.shutdown()
+    mlflow.set_experiment.assert_called_once_with("agents")
+    mlflow.log_metrics.assert_called_once_with({"agent_traces_total.True": 1})
@@ -0,0 +1,133 @@
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from openai_agent.services.translation_memory import (
+    TranslationMemory,
+    TranslationMemoryEnv,
+    split_segments,
+)
+
+
+def get_memory(**kwargs: object) -> TranslationMemory:
+    return TranslationMemory(env=TranslationMemoryEnv(**kwargs))  # type: ignore
+
+
+def get_translator() -> AsyncMock:
+    return AsyncMock(side_effect=lambda segments: [s.upper() for s in segments])
+
+
+def test_split_segments():
+    text = "Take 2 tablets. Call Dr. Smith!  Rest, e.g. on the couch.\n\nDone"
+
+    segments = split_segments(text)
+
+    assert segments == [
+        ("Take 2 tablets.", " "),
+        ("Call Dr. Smith!", "  "),
+        ("Rest, e.g. on the couch.", "\n\n"),
+        ("Done", ""),
+    ]
+    assert "".join(segment + separator for segment, separator in segments) == text
+
+
+@pytest.mark.asyncio
+async def test_only_new_segments_are_translated():
+    memory = get_memory()
+    translate_segments = get_translator()
+
+    first = await memory.translate("Rest. Drink water.", "en", "es", translate_segments)
+    second = await memory.translate(
+        "Drink  water.\nRest. Rest. Eat.", "en", "es", translate_segments
+    )
+
+    assert first == "REST. DRINK WATER."
+    assert second == "DRINK WATER.\nREST. REST. EAT."
+    assert translate_segments.await_args_list[1].args[0] == ["Eat."]
+    assert memory.stats.hits == 2 and memory.stats.misses == 3
+    assert memory.stats.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_languages_are_part_of_the_key():
+    memory = get_memory()
+    translate_segments = get_translator()
+
+    await memory.translate("Rest.", "en", "es", translate_segments)
+    await memory.translate("Rest.", "en", "fr", translate_segments)
+    await memory.translate("Rest.", "es", "it", translate_segments)
+
+    assert translate_segments.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_whitespace_only_text_is_not_translated():
+    memory = get_memory()
+    translate_segments = get_translator()
+
+    assert await memory.translate(" \n", "en", "es", translate_segments) == " \n"
+    translate_segments.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_misaligned_translations_are_not_remembered():
+    memory = get_memory()
+
+    with pytest.raises(ValueError):
+        await memory.translate(
+            "Rest. Eat.", "en", "es", AsyncMock(return_value=["REST. EAT."])
+        )
+    assert memory._entries == {}
+
+
+@pytest.mark.asyncio
+async def test_disabled():
+    memory = get_memory(translation_memory_enabled=False)
+    translate_segments = get_translator()
+
+    assert await memory.translate("Rest. Eat.", "en", "es", translate_segments) == (
+        "REST. EAT."
+    )
+    await memory.translate("Rest. Eat.", "en", "es", translate_segments)
+
+    assert translate_segments.await_args_list[0].args[0] == ["Rest. Eat."]
+    assert translate_segments.await_count == 2
+    assert memory.enabled is False
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    memory = get_memory(translation_memory_max_entries=2)
+
+    await memory.translate("Rest. Eat. Rest. Sleep.", "en", "es", get_translator())
+
+    assert [source for source, _, _ in memory._entries] == ["Eat.", "Sleep."]
+    assert memory.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_tier(tmp_path: Path):
+    path = str(tmp_path / "memory.db")
+    first = get_memory(translation_memory_sqlite_path=path)
+    await first.translate("Rest.", "en", "es", get_translator())
+    first.close()
+
+    memory = get_memory(translation_memory_sqlite_path=path)
+    translate_segments = get_translator()
+    assert await memory.translate("Rest. Eat.", "en", "es", translate_segments) == (
+        "REST. EAT."
+    )
+    assert await memory.translate("Rest.", "en", "es", translate_segments) == "REST."
+
+    assert translate_segments.await_args_list[0].args[0] == ["Eat."]
+    assert memory.stats.disk_hits == 1 and memory.stats.hits == 1
+
+    memory.clear()
+    await memory.translate("Rest.", "en", "es", translate_segments)
+    assert translate_segments.await_count == 2
+
+    memory.close()
+    memory.close()
+    await memory.translate("Eat.", "en", "es", translate_segments)
+    assert translate_segments.await_count == 3
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from functools import partial
+from typing import Any
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from agents import Usage
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+from starlette.types import Message
+
+from openai_agent.services.session_manager import (
+    Session,
+    SessionManager,
+    SessionManagerEnv,
+)
+from openai_agent.services.session_store import MemorySessionStore, SessionStoreEnv
+from openai_agent.services.token_budget import (
+    TokenAccountant,
+    TokenBudgetEnv,
+)
+from openai_agent.serving.app import (
+    Endpoint,
+    ServerSentEvent,
+    SessionRequest,
+    StreamingEndpoint,
+    create_app,
+)
+
+
+class EchoRequest(SessionRequest):
+    message: str
+
+
+async def echo(
+    store: MemorySessionStore, session: Session, request: EchoRequest
+) -> dict[str, Any]:
+    history = (await store.load(session.id)).history
+    if request.message == "hang":
+        await asyncio.Event().wait()
+    await store.append(session.id, [{"role": "user", "content": request.message}])
+    return {"echo": request.message, "turns": len(history) + 1}
+
+
+async def stream_echo(
+    session: Session, request: EchoRequest
+) -> AsyncIterator[ServerSentEvent]:
+    for word in request.message.split():
+        if word == "fail":
+            raise RuntimeError("failed")
+        if word == "hang":
+            await asyncio.Event().wait()
+        yield "delta", {"text": word}
+    yield "done", {}
+
+
+def parse_events(body: str) -> list[tuple[str, Any]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data[6:])))
+    return events
+
+
+@pytest.fixture
+def sessions() -> SessionManager:
+    return SessionManager(
+        SessionManagerEnv(session_max_concurrent_runs=1, session_max_queued_runs=0)
+    )
+
+
+@pytest.fixture
+def store() -> MemorySessionStore:
+    return MemorySessionStore(SessionStoreEnv())
+
+
+@pytest.fixture
+def app(sessions: SessionManager, store: MemorySessionStore) -> Starlette:
+    return create_app(
+        sessions,
+        {
+            "echo": Endpoint(EchoRequest, partial(echo, store)),
+            "stream": StreamingEndpoint(EchoRequest, stream_echo),
+        },
+        logging.getLogger("test"),
+        drain_timeout=0.1,
+        on_remove=store.delete,
+    )
+
+
+@pytest.fixture
+def client(app: Starlette) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+async def call_and_disconnect(
+    app: Starlette, path: str, body: dict[str, Any]
+) -> list[Message]:
+    """Sends a request and disconnects right after the body."""
+    messages: list[Message] = [
+        {"type": "http.request", "body": json.dumps(body).encode()},
+        {"type": "http.disconnect"},
+    ]
+    sent: list[Message] = []
+
+    async def receive() -> Message:
+        if len(messages) > 1:
+            return messages.pop(0)
+        await asyncio.sleep(0.01)
+        return messages[0]
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "server": ("test", 80),
+        "client": ("test", 1234),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_turns_share_the_session(client: httpx.AsyncClient):
+    first = await client.post("/patterns/echo", json={"message": "hello"})
+    session_id = first.json()["session_id"]
+    second = await client.post(
+        "/patterns/echo", json={"message": "again", "session_id": session_id}
+    )
+
+    assert first.json()["output"] == {"echo": "hello", "turns": 1}
+    assert second.json() == {
+        "session_id": session_id,
+        "output": {"echo": "again", "turns": 2},
+    }
+
+
+@pytest.mark.asyncio
+async def test_invalid_request(client: httpx.AsyncClient):
+    response = await client.post("/patterns/echo", json={"text": "hello"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_busy(client: httpx.AsyncClient, sessions: SessionManager):
+    task = sessions.start(sessions.get_session(), asyncio.Event().wait)
+
+    response = await client.post("/patterns/echo", json={"message": "hello"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    response = await client.post("/patterns/stream", json={"message": "hello"})
+    assert response.status_code == 503
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_delete_session_cancels_the_run(
+    client: httpx.AsyncClient, sessions: SessionManager
+):
+    session = sessions.get_session("s1")
+    request = asyncio.create_task(
+        client.post("/patterns/echo", json={"message": "hang", "session_id": "s1"})
+    )
+    while not session.tasks:
+        await asyncio.sleep(0.001)
+
+    assert (await client.delete("/sessions/s1")).status_code == 204
+    assert (await client.delete("/sessions/s1")).status_code == 404
+
+    response = await request
+    assert response.status_code == 409
+    assert sessions.stats.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_session_of_another_worker(
+    client: httpx.AsyncClient, store: MemorySessionStore
+):
+    await store.append("s1", [{"role": "user", "content": "hello"}])
+
+    assert (await client.delete("/sessions/s1")).status_code == 204
+    assert (await store.load("s1")).turns == []
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_run(app: Starlette, sessions: SessionManager):
+    sent = await call_and_disconnect(app, "/patterns/echo", {"message": "hang"})
+
+    assert sent[0]["status"] == 499
+    await asyncio.sleep(0.01)
+    assert sessions.stats.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_stream(client: httpx.AsyncClient):
+    response = await client.post("/patterns/stream", json={"message": "a b"})
+    session_id = response.headers["X-Session-Id"]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_events(response.text) == [
+        ("session", {"session_id": session_id}),
+        ("delta", {"text": "a"}),
+        ("delta", {"text": "b"}),
+        ("done", {}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_error(client: httpx.AsyncClient):
+    response = await client.post("/patterns/stream", json={"message": "a fail"})
+
+    events = parse_events(response.text)
+    assert events[1:] == [
+        ("delta", {"text": "a"}),
+        ("error", {"error": "The run failed."}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_is_cancelled_with_the_session(
+    client: httpx.AsyncClient, sessions: SessionManager
+):
+    session = sessions.get_session("s1")
+    request = asyncio.create_task(
+        client.post("/patterns/stream", json={"message": "a hang", "session_id": "s1"})
+    )
+    while not session.tasks:
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.01)
+    sessions.remove_session("s1")
+
+    events = parse_events((await request).text)
+    assert events[1:] == [("delta", {"text": "a"}), ("cancelled", {})]
+
+
+@pytest.mark.asyncio
+async def test_stream_disconnect_cancels_the_run(
+    app: Starlette, sessions: SessionManager
+):
+    await call_and_disconnect(app, "/patterns/stream", {"message": "a hang"})
+
+    await asyncio.sleep(0.01)
+    assert sessions.stats.cancelled == 1
+
+
+def test_health_startup_and_shutdown(sessions: SessionManager):
+    on_startup, on_shutdown = AsyncMock(), AsyncMock()
+    app = create_app(
+        sessions,
+        {},
+        logging.getLogger("test"),
+        on_startup=on_startup,
+        on_shutdown=on_shutdown,
+        metrics={"limiter": lambda: {"in_flight": 0}},
+        prometheus=lambda: "agent_errors_total 0\n",
+    )
+
+    with TestClient(app) as client:
+        on_startup.assert_awaited_once()
+        health = client.get("/health").json()
+        assert health["sessions"]["draining"] is False
+        assert health["limiter"] == {"in_flight": 0}
+        assert client.get("/metrics").text == "agent_errors_total 0\n"
+
+    assert sessions.draining
+    on_shutdown.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_token_budget(sessions: SessionManager):
+    accountant = TokenAccountant(TokenBudgetEnv(token_budget_session_max_tokens=10))
+
+    async def spend(session: Session, request: EchoRequest) -> int:
+        accountant.check()
+        accountant.record(Usage(requests=1, input_tokens=int(request.message)))
+        return session.usage.total_tokens
+
+    async def stream_spend(
+        session: Session, request: EchoRequest
+    ) -> AsyncIterator[ServerSentEvent]:
+        yield "delta", {"text": str(await spend(session, request))}
+
+    app = create_app(
+        sessions,
+        {
+            "spend": Endpoint(EchoRequest, spend),
+            "stream": StreamingEndpoint(EchoRequest, stream_spend),
+        },
+        logging.getLogger("test"),
+        run_scope=lambda session: accountant.track(session.usage),
+    )
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+    response = await client.post("/patterns/spend", json={"message": "6"})
+    session_id = response.json()["session_id"]
+    assert response.json()["output"] == 6
+
+    body = {"message": "6", "session_id": session_id}
+    response = await client.post("/patterns/spend", json=body)
+    assert response.json()["output"] == 12
+
+    response = await client.post("/patterns/spend", json=body)
+    assert response.status_code == 429
+    assert response.json()["error"] == "The session used 12 of 10 tokens."
+
+    response = await client.post("/patterns/stream", json=body)
+    assert parse_events(response.text)[1] == (
+        "error",
+        {"error": "The session used 12 of 10 tokens."},
+    )
+    assert accountant.get_summary()["exceeded"] == 2
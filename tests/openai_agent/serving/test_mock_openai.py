@@ -0,0 +1,256 @@
+import json
+import random
+import statistics
+from typing import Any
+
+import httpx
+import openai
+import pytest
+from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
+from openai import AsyncAzureOpenAI
+from pydantic import BaseModel
+
+from openai_agent.serving.mock_openai import (
+    MockOpenAI,
+    MockOpenAIEnv,
+    create_mock_app,
+    sample_json,
+    sample_latency,
+)
+
+
+class Department(BaseModel):
+    reasoning: str
+    department_name: str
+    urgent: bool
+    codes: list[int]
+
+
+def get_mock(**kwargs: Any) -> MockOpenAI:
+    env = {
+        "mock_openai_latency": "constant",
+        "mock_openai_latency_ms": 0,
+        "mock_openai_token_latency_ms": 0,
+        "mock_openai_seed": "1",
+        **kwargs,
+    }
+    return MockOpenAI(MockOpenAIEnv(**env))
+
+
+def get_client(mock: MockOpenAI) -> AsyncAzureOpenAI:
+    return AsyncAzureOpenAI(
+        azure_endpoint="http://mock",
+        api_key="mock",
+        api_version="2025-04-01-preview",
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_mock_app(mock))
+        ),
+    )
+
+
+WEATHER_TOOL: Any = {
+    "type": "function",
+    "function": {
+        "name": "get_weather",
+        "parameters": {
+            "type": "object",
+            "properties": {"city": {"type": "string"}},
+            "required": ["city"],
+        },
+    },
+}
+
+
+def test_sample_latency():
+    rng = random.Random(1)
+    assert sample_latency(rng, "constant", 200, 0.5) == 0.2
+
+    samples = [sample_latency(rng, "lognormal", 200, 0.5) for _ in range(2000)]
+    assert statistics.median(samples) == pytest.approx(0.2, rel=0.1)
+    assert max(samples) > 0.4
+
+    samples = [sample_latency(rng, "uniform", 200, 0.5) for _ in range(200)]
+    assert all(0.1 <= sample <= 0.3 for sample in samples)
+    assert min(sample_latency(rng, "normal", 10, 5) for _ in range(50)) == 0.0
+
+
+def test_empty_seed(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("MOCK_OPENAI_SEED", "")
+    assert MockOpenAIEnv().mock_openai_seed == ""
+    MockOpenAI(MockOpenAIEnv())
+
+    first, second = get_mock(), get_mock()
+    assert first._rng.random() == second._rng.random()
+
+    with pytest.raises(ValueError, match="MOCK_OPENAI_SEED must be an integer"):
+        get_mock(mock_openai_seed="abc")
+
+
+def test_sample_json():
+    schema = Department.model_json_schema()
+    value = sample_json(schema, schema, "output")
+
+    assert Department.model_validate(value).department_name == "mock department_name"
+    nested = {
+        "$defs": {"Kind": {"enum": ["a", "b"]}},
+        "type": "object",
+        "properties": {
+            "kind": {"$ref": "#/$defs/Kind"},
+            "note": {"anyOf": [{"type": "null"}, {"type": "string"}]},
+            "score": {"type": ["null", "number"]},
+            "fixed": {"const": 3},
+        },
+    }
+    assert sample_json(nested, nested, "x") == {
+        "kind": "a",
+        "note": "mock note",
+        "score": 1.0,
+        "fixed": 3,
+    }
+
+
+@pytest.mark.asyncio
+async def test_text_and_structured_output():
+    mock = get_mock(mock_openai_output_tokens=5)
+    client = get_client(mock)
+    messages: Any = [{"role": "user", "content": "Hi"}]
+
+    response = await client.chat.completions.create(model="gpt", messages=messages)
+    assert response.choices[0].message.content == "The patient should rest, drink"
+    assert response.usage is not None and response.usage.prompt_tokens > 0
+
+    response = await client.chat.completions.create(
+        model="gpt",
+        messages=messages,
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "final_output",
+                "schema": Department.model_json_schema(),
+            },
+        },
+    )
+    Department.model_validate_json(response.choices[0].message.content or "")
+    assert mock.stats.requests == 2 and mock.stats.structured == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_calls():
+    client = get_client(get_mock())
+    messages: Any = [{"role": "user", "content": "Weather in Paris?"}]
+
+    response = await client.chat.completions.create(
+        model="gpt", messages=messages, tools=[WEATHER_TOOL]
+    )
+    choice = response.choices[0]
+    assert choice.finish_reason == "tool_calls"
+    call: Any = (choice.message.tool_calls or [])[0]
+    assert json.loads(call.function.arguments) == {"city": "mock city"}
+
+    messages += [
+        choice.message.model_dump(exclude_none=True),
+        {"role": "tool", "tool_call_id": call.id, "content": "sunny"},
+    ]
+    response = await client.chat.completions.create(
+        model="gpt", messages=messages, tools=[WEATHER_TOOL]
+    )
+    assert response.choices[0].finish_reason == "stop"
+
+    response = await client.chat.completions.create(
+        model="gpt", messages=messages, tools=[WEATHER_TOOL], tool_choice="none"
+    )
+    assert response.choices[0].message.tool_calls is None
+
+
+@pytest.mark.asyncio
+async def test_streaming():
+    mock = get_mock(mock_openai_output_tokens=3)
+    client = get_client(mock)
+    messages: Any = [{"role": "user", "content": "Hi"}]
+
+    stream = await client.chat.completions.create(
+        model="gpt",
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    chunks = [chunk async for chunk in stream]
+    text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    assert text.strip() == "The patient should"
+    assert chunks[-1].usage is not None
+
+    stream = await client.chat.completions.create(
+        model="gpt", messages=messages, tools=[WEATHER_TOOL], stream=True
+    )
+    arguments = ""
+    async for chunk in stream:
+        for call in chunk.choices[0].delta.tool_calls or []:
+            arguments += (call.function and call.function.arguments) or ""
+    assert json.loads(arguments) == {"city": "mock city"}
+    assert mock.stats.streamed == 2
+
+
+@pytest.mark.asyncio
+async def test_throttling():
+    client = get_client(get_mock(mock_openai_rpm_limit=1))
+    messages: Any = [{"role": "user", "content": "Hi"}]
+
+    response = await client.chat.completions.with_raw_response.create(
+        model="gpt", messages=messages
+    )
+    assert response.headers["x-ratelimit-remaining-requests"] == "0"
+    with pytest.raises(openai.RateLimitError) as error:
+        await client.chat.completions.create(model="gpt", messages=messages)
+    assert float(error.value.response.headers["retry-after-ms"]) > 59_000
+
+    client = get_client(get_mock(mock_openai_error_rate=1.0))
+    with pytest.raises(openai.RateLimitError):
+        await client.chat.completions.create(model="gpt", messages=messages)
+
+
+@pytest.mark.asyncio
+async def test_agent_run():
+    @function_tool
+    def get_department_code(name: str) -> int:
+        return 7
+
+    model = OpenAIChatCompletionsModel(
+        model="gpt", openai_client=get_client(get_mock())
+    )
+    agent = Agent(
+        name="medical_agent",
+        instructions="Pick a department.",
+        tools=[get_department_code],
+        output_type=Department,
+        model=model,
+    )
+
+    result = await Runner.run(agent, "chest pain")
+
+    assert isinstance(result.final_output, Department)
+    assert result.context_wrapper.usage.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_prompt_cache():
+    mock = get_mock()
+    client = get_client(mock)
+    system = {"role": "system", "content": "Follow the rules. " * 300}
+
+    async def get_cached_tokens(message: str) -> int:
+        messages: Any = [system, {"role": "user", "content": message}]
+        response = await client.chat.completions.create(model="gpt", messages=messages)
+        details = response.usage and response.usage.prompt_tokens_details
+        return (details and details.cached_tokens) or 0
+
+    assert await get_cached_tokens("Hi") == 0
+    cached = await get_cached_tokens("Hello")
+    assert cached >= 1024 and cached % 128 == 0
+    # only whole steps of the prompt are cached
+    assert await get_cached_tokens("Hi") == cached
+    assert mock.stats.cached_tokens == 2 * cached
+
+    client = get_client(get_mock(mock_openai_prompt_cache=False))
+    assert await get_cached_tokens("Hi") == 0
+    assert await get_cached_tokens("Hi") == 0